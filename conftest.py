@@ -22,7 +22,7 @@ def pytest_addoption(parser):
         "--changed-products",
         action="store",
         default="data/product_changes.json",
-        help="变更检测报告文件路径"
+        help="变更检测报告文件路径（也可以是 discover_products.py --incremental 输出的变更增量）"
     )
     parser.addoption(
         "--priority",
@@ -32,6 +32,22 @@ def pytest_addoption(parser):
     )
 
 
+def _test_targets(changes: Dict) -> List[Dict]:
+    """
+    从变更报告中提取测试目标
+
+    支持 detect_product_changes.py 的变更报告，以及 discover_products.py --incremental
+    输出的变更增量（新增商品为 P0，updated_at 变化的商品为 P1）。
+    """
+    if 'test_targets' in changes:
+        return changes['test_targets']
+
+    return (
+        [{'id': pid, 'reason': 'new_product', 'priority': 'P0'} for pid in changes.get('added', [])]
+        + [{'id': pid, 'reason': 'updated', 'priority': 'P1'} for pid in changes.get('changed', [])]
+    )
+
+
 def pytest_configure(config):
     """配置 pytest"""
     # 注册自定义标记
@@ -61,7 +77,7 @@ def pytest_collection_modifyitems(config, items):
         changes = json.load(f)
 
     # 提取需要测试的商品 ID
-    test_targets = changes.get('test_targets', [])
+    test_targets = _test_targets(changes)
 
     if not test_targets:
         print("\n✅ 无商品变更，跳过所有测试")
@@ -161,7 +177,7 @@ def changed_product_ids(product_changes):
     Returns:
         变更商品 ID 集合
     """
-    return {target['id'] for target in product_changes.get('test_targets', [])}
+    return {target['id'] for target in _test_targets(product_changes)}
 
 
 @pytest.fixture
@@ -0,0 +1,159 @@
+"""
+浏览器池模块
+
+批量测试时只启动一次 Chromium，为每个商品分配独立的 BrowserContext，
+避免每个商品都重复启动/关闭浏览器带来的开销。
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """共享浏览器池
+
+    一个批次共享同一个浏览器进程，每次调用 new_context() 都返回一个全新的、
+    相互隔离的 BrowserContext（独立的 cookie、localStorage 和购物车状态）。
+
+    使用示例:
+        async with BrowserPool(headless=True) as pool:
+            context = await pool.new_context()
+            ...
+            await context.close()
+    """
+
+    def __init__(
+        self,
+        headless: bool = True,
+        launch_timeout: int = 60000,
+        context_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        初始化浏览器池
+
+        Args:
+            headless: 是否无头模式运行
+            launch_timeout: 浏览器启动超时（毫秒）
+            context_options: 创建 BrowserContext 时的默认参数
+        """
+        self.headless = headless
+        self.launch_timeout = launch_timeout
+        self.context_options = context_options or {}
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._lock = asyncio.Lock()  # 并发测试时防止重复启动浏览器
+        self._idle_contexts: List[BrowserContext] = []  # 可复用的空闲上下文
+        self.contexts_created = 0
+        self.contexts_reused = 0
+
+    @property
+    def browser(self) -> Optional[Browser]:
+        """当前共享的浏览器实例（未启动时为 None）"""
+        return self._browser
+
+    async def start(self) -> Browser:
+        """启动浏览器（重复调用不会重复启动）
+
+        Returns:
+            共享的 Browser 实例
+        """
+        async with self._lock:
+            if self._browser and self._browser.is_connected():
+                return self._browser
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            self._browser = await self._playwright.chromium.launch(
+                headless=self.headless,
+                timeout=self.launch_timeout
+            )
+            logger.info("浏览器池已启动")
+            return self._browser
+
+    async def new_context(self, **options) -> BrowserContext:
+        """创建一个新的隔离 BrowserContext
+
+        浏览器意外断开时会自动重新启动。
+
+        Args:
+            **options: 覆盖默认 context_options 的参数
+
+        Returns:
+            新的 BrowserContext，由调用方负责关闭
+        """
+        browser = await self.start()
+        context = await browser.new_context(**{**self.context_options, **options})
+        self.contexts_created += 1
+        return context
+
+    async def acquire_context(
+        self,
+        reset: Optional[Callable[[BrowserContext], Awaitable[bool]]] = None,
+        **options
+    ) -> BrowserContext:
+        """获取一个可复用的 BrowserContext
+
+        优先取出空闲上下文并调用 reset 恢复干净状态（如清空购物车）；
+        reset 失败时丢弃该上下文并新建一个。
+
+        Args:
+            reset: 复用前执行的重置函数，返回是否重置成功
+            **options: 新建上下文时的参数
+
+        Returns:
+            BrowserContext，用完后调用 release_context 归还
+        """
+        while self._idle_contexts:
+            context = self._idle_contexts.pop()
+            if reset is None or await reset(context):
+                self.contexts_reused += 1
+                return context
+            logger.info("上下文重置失败，改为新建上下文")
+            await self._close_context(context)
+
+        return await self.new_context(**options)
+
+    async def release_context(self, context: BrowserContext):
+        """归还上下文，供后续 acquire_context 复用"""
+        if self._browser and self._browser.is_connected():
+            self._idle_contexts.append(context)
+        else:
+            await self._close_context(context)
+
+    async def _close_context(self, context: BrowserContext):
+        """关闭上下文（忽略已断开等错误）"""
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"关闭上下文失败: {e}")
+
+    async def close(self):
+        """关闭浏览器并停止 Playwright"""
+        while self._idle_contexts:
+            await self._close_context(self._idle_contexts.pop())
+
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug(f"关闭浏览器失败: {e}")
+            self._browser = None
+
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+        logger.info(f"浏览器池已关闭 (共创建 {self.contexts_created} 个上下文, 复用 {self.contexts_reused} 次)")
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -2,22 +2,74 @@
 商品爬虫缓存模块
 
 提供商品数据缓存功能，避免重复爬取，提升性能。
+缓存条目可附带响应的 ETag / Last-Modified，用于条件请求重新验证：
+服务端返回 304 时直接复用缓存内容并刷新有效期。
+
+缓存条目和内容都保存在 SQLite 索引（WAL 模式）中：内容按 zlib 压缩，以 SHA-256 内容哈希去重，
+多个 URL 返回相同内容时只存一份；命中时只在内存中记录访问时间，批量写回索引；
+压缩后总大小超过上限时按最近访问时间淘汰（LRU）。
+多个线程或多个爬虫进程可以同时使用同一缓存目录。
 """
 
 import json
 import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
+logger = logging.getLogger(__name__)
+
+
+# 索引数据库文件名
+INDEX_FILENAME = "cache_index.db"
+# 旧版本的 JSON 元数据文件名（首次打开时导入索引）
+LEGACY_METADATA_FILENAME = "cache_metadata.json"
+# 缓存总大小上限（MB），超过后按最近访问时间淘汰
+DEFAULT_MAX_SIZE_MB = 500
+# 累积多少次访问时间更新后批量写回索引
+ACCESS_FLUSH_BATCH = 100
+# 等待其他进程释放数据库锁的最长时间（秒）
+BUSY_TIMEOUT_SECONDS = 10.0
+# zlib 压缩级别
+COMPRESSION_LEVEL = 6
+
+# entries.size_bytes 为未压缩的 JSON 大小，blobs.size_bytes 为压缩后大小（计入大小上限）
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    cache_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    cached_at REAL NOT NULL,
+    last_accessed REAL NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_accessed ON entries (last_accessed);
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size_bytes INTEGER NOT NULL
+);
+"""
+
 
 class CrawlerCache:
-    """爬虫缓存管理器"""
+    """爬虫缓存管理器
+
+    索引操作加锁，可被并发抓取的多个线程共享；SQLite WAL 模式允许多个进程同时读写。
+    压缩和解压在锁外进行。
+    """
 
     def __init__(
         self,
         cache_dir: str = "data/cache",
-        ttl_hours: int = 24
+        ttl_hours: int = 24,
+        max_size_mb: Optional[float] = DEFAULT_MAX_SIZE_MB
     ):
         """
         初始化缓存管理器
@@ -25,24 +77,138 @@ class CrawlerCache:
         Args:
             cache_dir: 缓存目录
             ttl_hours: 缓存有效期（小时）
+            max_size_mb: 缓存总大小上限（MB），None 表示不限制
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.ttl = timedelta(hours=ttl_hours)
-        self.metadata_file = self.cache_dir / "cache_metadata.json"
-        self.metadata = self._load_metadata()
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.index_file = self.cache_dir / INDEX_FILENAME
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        self._pending_access: Dict[str, float] = {}
+        self._import_legacy_metadata()
+        self._migrate_cache_files()
+        self._size_estimate = self._total_size()
+
+        # 本次运行的命中统计
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evicted = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开索引数据库并启用 WAL 模式"""
+        conn = sqlite3.connect(
+            str(self.index_file),
+            timeout=BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False
+        )
+        # 仅对新建的数据库生效：淘汰后可以归还空闲页，数据库文件随之缩小
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+        if 'content_hash' not in columns:
+            conn.execute("ALTER TABLE entries ADD COLUMN content_hash TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_content_hash ON entries (content_hash)")
+        conn.commit()
+        return conn
+
+    def _import_legacy_metadata(self):
+        """将旧版本的 cache_metadata.json 导入索引后删除"""
+        legacy_file = self.cache_dir / LEGACY_METADATA_FILENAME
+        if not legacy_file.exists():
+            return
 
-    def _load_metadata(self) -> Dict:
-        """加载缓存元数据"""
-        if self.metadata_file.exists():
-            with open(self.metadata_file) as f:
-                return json.load(f)
-        return {}
+        try:
+            with open(legacy_file) as f:
+                metadata = json.load(f)
+        except Exception as e:
+            logger.warning(f"读取旧缓存元数据失败: {e}")
+            return
+
+        rows = []
+        for cache_key, meta in metadata.items():
+            try:
+                cached_at = datetime.fromisoformat(meta['cached_at']).timestamp()
+                last_accessed = datetime.fromisoformat(meta.get('last_accessed', meta['cached_at'])).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            rows.append((
+                cache_key, meta.get('url', ''), cached_at, last_accessed,
+                meta.get('size_bytes', 0), meta.get('etag'), meta.get('last_modified')
+            ))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entries "
+                "(cache_key, url, cached_at, last_accessed, size_bytes, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        legacy_file.unlink()
+        logger.info(f"已将 {len(rows)} 个旧缓存条目导入索引")
+
+    def _migrate_cache_files(self):
+        """将旧版本逐条目保存的 {cache_key}.json 文件压缩存入索引后删除"""
+        with self._lock:
+            pending = [
+                row[0] for row in self._conn.execute(
+                    "SELECT cache_key FROM entries WHERE content_hash IS NULL"
+                )
+            ]
+        if not pending:
+            return
+
+        migrated = []
+        for cache_key in pending:
+            cache_path = self.cache_dir / f"{cache_key}.json"
+            try:
+                raw = cache_path.read_bytes()
+            except FileNotFoundError:
+                migrated.append((cache_key, None))
+                continue
+            content_hash, compressed = self._encode(raw)
+            migrated.append((cache_key, (content_hash, compressed, len(raw))))
+
+        with self._lock, self._conn:
+            for cache_key, body in migrated:
+                if body is None:
+                    self._conn.execute("DELETE FROM entries WHERE cache_key = ?", (cache_key,))
+                    continue
+                content_hash, compressed, raw_size = body
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (content_hash, data, size_bytes) VALUES (?, ?, ?)",
+                    (content_hash, compressed, len(compressed))
+                )
+                self._conn.execute(
+                    "UPDATE entries SET content_hash = ?, size_bytes = ? WHERE cache_key = ?",
+                    (content_hash, raw_size, cache_key)
+                )
+
+        for cache_key, _ in migrated:
+            (self.cache_dir / f"{cache_key}.json").unlink(missing_ok=True)
+        logger.info(f"已将 {len(migrated)} 个缓存文件压缩存入索引")
+
+    @staticmethod
+    def _encode(raw: bytes):
+        """计算内容哈希并压缩
 
-    def _save_metadata(self):
-        """保存缓存元数据"""
-        with open(self.metadata_file, 'w') as f:
-            json.dump(self.metadata, f, indent=2)
+        Returns:
+            (SHA-256 内容哈希, 压缩后的内容)
+        """
+        return hashlib.sha256(raw).hexdigest(), zlib.compress(raw, COMPRESSION_LEVEL)
+
+    @staticmethod
+    def _decode(compressed: bytes) -> Optional[Dict[str, Any]]:
+        """解压并解析缓存内容，内容损坏时返回 None"""
+        try:
+            return json.loads(zlib.decompress(compressed))
+        except Exception as e:
+            logger.warning(f"⚠️ 读取缓存失败: {e}")
+            return None
 
     def _get_cache_key(self, url: str) -> str:
         """
@@ -56,90 +222,260 @@ class CrawlerCache:
         """
         return hashlib.md5(url.encode()).hexdigest()
 
-    def _get_cache_path(self, cache_key: str) -> Path:
-        """获取缓存文件路径"""
-        return self.cache_dir / f"{cache_key}.json"
+    def _expiry_cutoff(self) -> float:
+        """早于该时间戳缓存的条目视为过期"""
+        return time.time() - self.ttl.total_seconds()
+
+    def _total_size(self) -> int:
+        """所有缓存内容压缩后的总大小（字节，相同内容只计一次）"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM blobs").fetchone()[0]
+
+    def _read(self, cache_key: str) -> Optional[bytes]:
+        """读取条目的压缩内容，条目不存在时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.data FROM entries e JOIN blobs b ON b.content_hash = e.content_hash "
+                "WHERE e.cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _record_access(self, cache_key: str):
+        """记录访问时间，累积到一定数量后批量写回索引（调用方需持有锁）"""
+        self._pending_access[cache_key] = time.time()
+        if len(self._pending_access) >= ACCESS_FLUSH_BATCH:
+            self.flush()
+
+    def flush(self):
+        """将内存中累积的访问时间写回索引"""
+        with self._lock:
+            if not self._pending_access:
+                return
+            pending = [(accessed, key) for key, accessed in self._pending_access.items()]
+            self._pending_access.clear()
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE entries SET last_accessed = MAX(last_accessed, ?) WHERE cache_key = ?",
+                    pending
+                )
 
-    def _is_expired(self, cache_key: str) -> bool:
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
         """
-        检查缓存是否过期
+        从缓存获取数据
 
         Args:
-            cache_key: 缓存键
+            url: 商品 URL
 
         Returns:
-            是否过期
+            缓存的商品数据，如果不存在或已过期则返回 None
         """
-        if cache_key not in self.metadata:
-            return True
+        cache_key = self._get_cache_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT e.cached_at, b.data FROM entries e JOIN blobs b ON b.content_hash = e.content_hash "
+                "WHERE e.cache_key = ?",
+                (cache_key,)
+            ).fetchone()
 
-        cached_time = datetime.fromisoformat(
-            self.metadata[cache_key]['cached_at']
-        )
-        return datetime.now() - cached_time > self.ttl
+        # 检查缓存是否存在且未过期
+        data = None
+        if row and row[0] >= self._expiry_cutoff():
+            data = self._decode(row[1])
 
-    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self._record_access(cache_key)
+            self.hits += 1
+
+        logger.debug(f"✅ 缓存命中: {url}")
+        return data
+
+    def get_validators(self, url: str) -> Dict[str, str]:
         """
-        从缓存获取数据
+        获取条件请求头
+
+        缓存过期后仍返回验证器，让服务端判断内容是否变化。
 
         Args:
-            url: 商品 URL
+            url: 请求 URL
 
         Returns:
-            缓存的商品数据，如果不存在或已过期则返回 None
+            If-None-Match / If-Modified-Since 请求头；没有可用缓存时返回空字典
         """
         cache_key = self._get_cache_key(url)
-        cache_path = self._get_cache_path(cache_key)
-
-        # 检查缓存是否存在且未过期
-        if not cache_path.exists() or self._is_expired(cache_key):
-            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM entries WHERE cache_key = ? AND content_hash IS NOT NULL",
+                (cache_key,)
+            ).fetchone()
+        if not row:
+            return {}
+
+        etag, last_modified = row
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def record_miss(self):
+        """
+        记录一次未命中
 
-        # 读取缓存数据
-        try:
-            with open(cache_path) as f:
-                data = json.load(f)
+        条件请求不经过 get()，服务端返回完整内容（200）时由调用方计入未命中。
+        """
+        with self._lock:
+            self.misses += 1
 
-            # 更新访问时间
-            self.metadata[cache_key]['last_accessed'] = datetime.now().isoformat()
-            self._save_metadata()
+    def revalidate(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        服务端返回 304 后复用缓存内容并刷新有效期
 
-            print(f"✅ 缓存命中: {url}")
-            return data
+        Args:
+            url: 请求 URL
 
-        except Exception as e:
-            print(f"⚠️ 读取缓存失败: {e}")
+        Returns:
+            缓存的数据；缓存内容已被淘汰时返回 None（调用方需重新完整请求）
+        """
+        cache_key = self._get_cache_key(url)
+        compressed = self._read(cache_key)
+        data = self._decode(compressed) if compressed is not None else None
+        if data is None:
             return None
 
-    def set(self, url: str, data: Dict[str, Any]):
+        now = time.time()
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE entries SET cached_at = ?, last_accessed = ? WHERE cache_key = ?",
+                (now, now, cache_key)
+            ).rowcount
+            if not updated:
+                return None
+            self._pending_access.pop(cache_key, None)
+            self.revalidated += 1
+
+        logger.debug(f"🔄 缓存已重新验证: {url}")
+        return data
+
+    def set(self, url: str, data: Any, validators: Optional[Dict[str, str]] = None):
         """
         保存数据到缓存
 
         Args:
             url: 商品 URL
             data: 商品数据
+            validators: 响应验证器，可包含 etag / last_modified
         """
         cache_key = self._get_cache_key(url)
-        cache_path = self._get_cache_path(cache_key)
+        validators = validators or {}
 
-        # 保存数据
         try:
-            with open(cache_path, 'w') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-
-            # 更新元数据
-            self.metadata[cache_key] = {
-                'url': url,
-                'cached_at': datetime.now().isoformat(),
-                'last_accessed': datetime.now().isoformat(),
-                'size_bytes': cache_path.stat().st_size
-            }
-            self._save_metadata()
-
-            print(f"💾 已缓存: {url}")
-
+            raw = json.dumps(data, ensure_ascii=False).encode('utf-8')
         except Exception as e:
-            print(f"⚠️ 保存缓存失败: {e}")
+            logger.warning(f"⚠️ 保存缓存失败: {e}")
+            return
+        content_hash, compressed = self._encode(raw)
+
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                previous = self._conn.execute(
+                    "SELECT content_hash FROM entries WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+                added = self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (content_hash, data, size_bytes) VALUES (?, ?, ?)",
+                    (content_hash, compressed, len(compressed))
+                ).rowcount
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(cache_key, url, cached_at, last_accessed, size_bytes, etag, last_modified, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (cache_key, url, now, now, len(raw),
+                     validators.get('etag') or None, validators.get('last_modified') or None, content_hash)
+                )
+                freed = 0
+                if previous and previous[0] != content_hash:
+                    freed = self._drop_orphan_blobs([previous[0]])
+            self._pending_access.pop(cache_key, None)
+            self._size_estimate += (len(compressed) if added > 0 else 0) - freed
+            if self.max_size_bytes and self._size_estimate > self.max_size_bytes:
+                self._evict()
+
+        logger.debug(f"💾 已缓存: {url}")
+
+    def _evict(self):
+        """按最近访问时间淘汰条目，直到总大小不超过上限（调用方需持有锁）"""
+        self.flush()
+        # 其他进程也可能写入了缓存，以索引中的实际总大小为准
+        total = self._total_size()
+        if total <= self.max_size_bytes:
+            self._size_estimate = total
+            return
+
+        # 相同内容可能被多个条目引用，只有最后一个引用被淘汰时才释放空间
+        references: Dict[str, int] = dict(self._conn.execute(
+            "SELECT content_hash, COUNT(*) FROM entries WHERE content_hash IS NOT NULL GROUP BY content_hash"
+        ).fetchall())
+        blob_sizes: Dict[str, int] = dict(self._conn.execute(
+            "SELECT content_hash, size_bytes FROM blobs"
+        ).fetchall())
+
+        evicted = []
+        for cache_key, content_hash in self._conn.execute(
+            "SELECT cache_key, content_hash FROM entries ORDER BY last_accessed"
+        ).fetchall():
+            if total <= self.max_size_bytes:
+                break
+            evicted.append(cache_key)
+            references[content_hash] = references.get(content_hash, 1) - 1
+            if references[content_hash] == 0:
+                total -= blob_sizes.get(content_hash, 0)
+
+        self._delete(evicted)
+        self._size_estimate = self._total_size()
+        self.evicted += len(evicted)
+        logger.info(f"🗑️ 缓存超过 {self.max_size_bytes / (1024 * 1024):.0f} MB，已淘汰 {len(evicted)} 个条目")
+
+    def _drop_orphan_blobs(self, content_hashes) -> int:
+        """删除不再被任何条目引用的内容（调用方需持有锁并处于事务中）
+
+        Returns:
+            释放的字节数
+        """
+        freed = 0
+        for content_hash in set(content_hashes):
+            row = self._conn.execute(
+                "SELECT size_bytes FROM blobs WHERE content_hash = ? "
+                "AND NOT EXISTS (SELECT 1 FROM entries WHERE content_hash = ?)",
+                (content_hash, content_hash)
+            ).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+                freed += row[0]
+        return freed
+
+    def _delete(self, cache_keys):
+        """从索引删除条目及其不再被引用的内容（调用方需持有锁）"""
+        cache_keys = list(cache_keys)
+        with self._conn:
+            content_hashes = []
+            for cache_key in cache_keys:
+                row = self._conn.execute(
+                    "SELECT content_hash FROM entries WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+                if row and row[0]:
+                    content_hashes.append(row[0])
+            self._conn.executemany(
+                "DELETE FROM entries WHERE cache_key = ?", [(key,) for key in cache_keys]
+            )
+            self._drop_orphan_blobs(content_hashes)
+        self._conn.execute("PRAGMA incremental_vacuum").fetchall()
+        for cache_key in cache_keys:
+            self._pending_access.pop(cache_key, None)
 
     def clear(self, url: Optional[str] = None):
         """
@@ -148,48 +484,36 @@ class CrawlerCache:
         Args:
             url: 如果指定，仅清除该 URL 的缓存；否则清除所有缓存
         """
-        if url:
-            # 清除单个缓存
-            cache_key = self._get_cache_key(url)
-            cache_path = self._get_cache_path(cache_key)
-
-            if cache_path.exists():
-                cache_path.unlink()
-
-            if cache_key in self.metadata:
-                del self.metadata[cache_key]
-                self._save_metadata()
-
-            print(f"🗑️ 已清除缓存: {url}")
-
-        else:
-            # 清除所有缓存
-            for cache_file in self.cache_dir.glob("*.json"):
-                if cache_file.name != "cache_metadata.json":
-                    cache_file.unlink()
-
-            self.metadata = {}
-            self._save_metadata()
-
-            print("🗑️ 已清除所有缓存")
+        with self._lock:
+            if url:
+                # 清除单个缓存
+                self._delete([self._get_cache_key(url)])
+                self._size_estimate = self._total_size()
+                print(f"🗑️ 已清除缓存: {url}")
+
+            else:
+                # 清除所有缓存
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries")
+                    self._conn.execute("DELETE FROM blobs")
+                self._conn.execute("PRAGMA incremental_vacuum").fetchall()
+                self._pending_access.clear()
+                self._size_estimate = 0
+
+                print("🗑️ 已清除所有缓存")
 
     def cleanup_expired(self):
         """清理过期的缓存"""
-        expired_keys = []
-
-        for cache_key in list(self.metadata.keys()):
-            if self._is_expired(cache_key):
-                cache_path = self._get_cache_path(cache_key)
-                if cache_path.exists():
-                    cache_path.unlink()
-                expired_keys.append(cache_key)
-
-        for key in expired_keys:
-            del self.metadata[key]
-
-        if expired_keys:
-            self._save_metadata()
-            print(f"🗑️ 已清理 {len(expired_keys)} 个过期缓存")
+        with self._lock:
+            expired_keys = [
+                row[0] for row in self._conn.execute(
+                    "SELECT cache_key FROM entries WHERE cached_at < ?", (self._expiry_cutoff(),)
+                )
+            ]
+            if expired_keys:
+                self._delete(expired_keys)
+                self._size_estimate = self._total_size()
+                print(f"🗑️ 已清理 {len(expired_keys)} 个过期缓存")
 
     def get_stats(self) -> Dict:
         """
@@ -198,23 +522,31 @@ class CrawlerCache:
         Returns:
             缓存统计数据
         """
-        total_size = sum(
-            meta.get('size_bytes', 0)
-            for meta in self.metadata.values()
-        )
-
-        expired_count = sum(
-            1 for key in self.metadata.keys()
-            if self._is_expired(key)
-        )
+        self.flush()
+        with self._lock:
+            total_items, raw_size, expired_count = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), "
+                "COALESCE(SUM(cached_at < ?), 0) FROM entries",
+                (self._expiry_cutoff(),)
+            ).fetchone()
+            stored_bodies, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM blobs"
+            ).fetchone()
 
         return {
-            'total_items': len(self.metadata),
+            'total_items': total_items,
+            'stored_bodies': stored_bodies,
             'total_size_mb': total_size / (1024 * 1024),
+            'raw_size_mb': raw_size / (1024 * 1024),
+            'max_size_mb': self.max_size_bytes / (1024 * 1024) if self.max_size_bytes else None,
             'expired_items': expired_count,
-            'valid_items': len(self.metadata) - expired_count,
+            'valid_items': total_items - expired_count,
             'cache_dir': str(self.cache_dir),
-            'ttl_hours': self.ttl.total_seconds() / 3600
+            'ttl_hours': self.ttl.total_seconds() / 3600,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'evicted': self.evicted
         }
 
     def print_stats(self):
@@ -225,6 +557,18 @@ class CrawlerCache:
         print(f"  总缓存项: {stats['total_items']}")
         print(f"  有效缓存: {stats['valid_items']}")
         print(f"  过期缓存: {stats['expired_items']}")
-        print(f"  总大小: {stats['total_size_mb']:.2f} MB")
+        print(f"  命中/未命中/重新验证: {stats['hits']}/{stats['misses']}/{stats['revalidated']}")
+        print(f"  总大小: {stats['total_size_mb']:.2f} MB（压缩前 {stats['raw_size_mb']:.2f} MB）")
+        print(f"  去重后内容数: {stats['stored_bodies']}")
+        if stats['max_size_mb']:
+            print(f"  大小上限: {stats['max_size_mb']:.0f} MB（已淘汰 {stats['evicted']} 项）")
         print(f"  有效期: {stats['ttl_hours']} 小时")
         print(f"  缓存目录: {stats['cache_dir']}")
+
+    def close(self):
+        """写回未保存的访问时间并关闭索引数据库"""
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                self._conn.close()
@@ -0,0 +1,69 @@
+"""
+购物车接口模块
+
+通过 Shopify 店铺的 AJAX 购物车接口（/cart.js、/cart/clear.js）在现有
+BrowserContext 内读取和清空购物车，使同一个上下文可以在多个商品测试之间复用。
+"""
+
+import logging
+from typing import Dict, Optional
+
+from playwright.async_api import BrowserContext
+
+logger = logging.getLogger(__name__)
+
+
+async def get_cart(context: BrowserContext, base_url: str, timeout: int = 10000) -> Optional[Dict]:
+    """读取当前购物车
+
+    context.request 与上下文共享 cookie，读取的是该上下文自己的购物车。
+
+    Args:
+        context: 浏览器上下文
+        base_url: 店铺根 URL
+        timeout: 请求超时（毫秒）
+
+    Returns:
+        /cart.js 返回的购物车数据；请求失败时返回 None
+    """
+    try:
+        response = await context.request.get(f"{base_url.rstrip('/')}/cart.js", timeout=timeout)
+        if not response.ok:
+            logger.warning(f"读取购物车失败: HTTP {response.status}")
+            return None
+        return await response.json()
+    except Exception as e:
+        logger.warning(f"读取购物车失败: {e}")
+        return None
+
+
+async def reset_cart(context: BrowserContext, base_url: str, timeout: int = 10000) -> bool:
+    """清空购物车并确认已为空
+
+    Args:
+        context: 浏览器上下文
+        base_url: 店铺根 URL
+        timeout: 请求超时（毫秒）
+
+    Returns:
+        购物车是否已确认为空
+    """
+    try:
+        response = await context.request.post(f"{base_url.rstrip('/')}/cart/clear.js", timeout=timeout)
+        if not response.ok:
+            logger.warning(f"清空购物车失败: HTTP {response.status}")
+            return False
+    except Exception as e:
+        logger.warning(f"清空购物车失败: {e}")
+        return False
+
+    cart = await get_cart(context, base_url, timeout=timeout)
+    if cart is None:
+        return False
+
+    if cart.get("item_count", 0) != 0:
+        logger.warning(f"清空后购物车仍有 {cart.get('item_count')} 件商品")
+        return False
+
+    logger.debug("购物车已清空")
+    return True
@@ -0,0 +1,362 @@
+"""
+商品目录快照模块
+
+每个进程启动时对整个商品目录执行 Product(**data) 需要逐个校验 HttpUrl、变体和选择器。
+本模块把校验通过的商品保存为二进制快照（默认与 JSON 同名的 .snapshot.pkl 文件），
+之后加载时直接还原 Product 对象，不再重复校验。
+load_catalog_entries() 只返回已校验的字段值字典，供紧凑目录等不需要 Product 对象的调用方使用；
+load_derived() 以相同的失效规则缓存由目录派生的对象（如紧凑目录）。
+
+快照以源文件的大小、修改时间和 SHA-256 以及 Product 模型结构为键：
+源文件或模型定义变化后自动重建；strict=True 时忽略快照，从源文件重新校验。
+快照是本工具在本地生成的 pickle 文件，只应加载自己写出的快照。
+"""
+
+import functools
+import gc
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, HttpUrl, ValidationError
+
+from core.models import Product, ProductVariant, Selectors
+
+logger = logging.getLogger(__name__)
+
+
+# 快照格式版本，修改快照结构时递增
+SNAPSHOT_VERSION = 1
+
+
+@dataclass
+class CatalogSnapshot:
+    """加载后的商品目录"""
+    path: Path
+    metadata: Dict[str, Any]
+    # load_catalog() 为 Product 对象；load_catalog_entries() 为已校验的字段值字典
+    products: List[Any]
+    # 校验失败被跳过的条目：(商品ID, 错误信息)
+    invalid: List[Tuple[str, str]] = field(default_factory=list)
+    # 是否来自快照（False 表示本次从源文件校验）
+    from_snapshot: bool = False
+
+
+def snapshot_path_for(json_path: Union[str, Path]) -> Path:
+    """JSON 商品目录对应的默认快照路径"""
+    json_path = Path(json_path)
+    return json_path.with_name(f"{json_path.stem}.snapshot.pkl")
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_fingerprint() -> str:
+    """Product 模型结构指纹（字段名、类型和默认值），模型定义变化后旧快照失效"""
+    parts = [str(SNAPSHOT_VERSION)]
+    for model in (Product, ProductVariant, Selectors):
+        parts.append(f"{model.__name__}:{model.model_config.get('extra')}")
+        parts.extend(f"{name}={field!r}" for name, field in model.model_fields.items())
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _construct(
+    model: Type[BaseModel],
+    values: Dict[str, Any],
+    extra: Optional[Dict[str, Any]] = None
+) -> BaseModel:
+    """用已校验的字段值直接创建模型实例（不校验、不填默认值）"""
+    obj = object.__new__(model)
+    object.__setattr__(obj, '__dict__', values)
+    object.__setattr__(obj, '__pydantic_fields_set__', set(values))
+    object.__setattr__(obj, '__pydantic_extra__', extra)
+    object.__setattr__(obj, '__pydantic_private__', None)
+    return obj
+
+
+def _dump(product: Product) -> Dict[str, Any]:
+    """Product 转为快照中保存的字段值；选择器的额外字段单独保存"""
+    values = product.model_dump(exclude={'selectors'})
+    selectors = product.selectors
+    values['selectors'] = (
+        {name: getattr(selectors, name) for name in Selectors.model_fields},
+        dict(selectors.__pydantic_extra__ or {})
+    )
+    return values
+
+
+def _restore(values: Dict[str, Any]) -> Product:
+    """从快照中的字段值还原 Product（嵌套模型一并还原）"""
+    selector_fields, selector_extra = values['selectors']
+    values['selectors'] = _construct(Selectors, selector_fields, selector_extra)
+    values['variants'] = [_construct(ProductVariant, v) for v in values['variants']]
+    return _construct(Product, values)
+
+
+def _entry(values: Dict[str, Any]) -> Dict[str, Any]:
+    """快照中的字段值转为商品字段字典（选择器的额外字段合并回选择器字典）"""
+    selector_fields, selector_extra = values['selectors']
+    values['selectors'] = {**selector_fields, **selector_extra}
+    return values
+
+
+def construct_product(values: Dict[str, Any]) -> Product:
+    """
+    用已校验的完整字段值直接创建 Product（不再校验）
+
+    values 及其中的选择器、变体字典直接成为模型的字段，调用方之后不应再修改它们。
+
+    Args:
+        values: 包含 Product 全部字段的字典（如 Product.model_dump() 或 load_catalog_entries() 的结果），
+            url 可以是字符串
+
+    Returns:
+        Product
+    """
+    selectors = values['selectors']
+    selector_fields = {name: selectors.pop(name) for name in Selectors.model_fields}
+    values['selectors'] = _construct(Selectors, selector_fields, selectors)
+    values['variants'] = [_construct(ProductVariant, v) for v in values['variants']]
+    if isinstance(values['url'], str):
+        values['url'] = HttpUrl(values['url'])
+    return _construct(Product, values)
+
+
+def _validate_source(json_path: Path) -> CatalogSnapshot:
+    """读取 JSON 商品目录并逐个校验"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        metadata = data.get('metadata', {})
+        entries = data.get('products', [])
+    else:
+        metadata = {}
+        entries = data if isinstance(data, list) else []
+
+    products = []
+    invalid = []
+    for entry in entries:
+        try:
+            products.append(Product(**entry))
+        except ValidationError as e:
+            invalid.append((str(entry.get('id', '<unknown>')), str(e)))
+
+    return CatalogSnapshot(path=json_path, metadata=metadata, products=products, invalid=invalid)
+
+
+def _read_snapshot(snapshot_path: Path, json_path: Path, fingerprint: str) -> Optional[Tuple[Dict, Any]]:
+    """读取与源文件匹配的快照
+
+    Returns:
+        (快照头, 快照内容)；快照不存在、已过期或损坏时返回 None
+    """
+    try:
+        with open(snapshot_path, 'rb') as f:
+            header = pickle.load(f)
+            if header.get('schema') != fingerprint:
+                return None
+
+            stat = json_path.stat()
+            if (header.get('size'), header.get('mtime_ns')) != (stat.st_size, stat.st_mtime_ns):
+                # 文件被重写或 touch 过，内容相同时快照仍然可用
+                if header.get('sha256') != _file_sha256(json_path):
+                    return None
+                header = dict(header, size=stat.st_size, mtime_ns=stat.st_mtime_ns, touched=True)
+
+            gc_was_enabled = gc.isenabled()
+            # 大量小对象反序列化时暂停分代 GC，避免反复扫描新建的容器
+            gc.disable()
+            try:
+                payload = pickle.load(f)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+            return header, payload
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"读取商品快照失败，将重新校验: {e}")
+        return None
+
+
+def _payload(catalog: CatalogSnapshot) -> Dict[str, Any]:
+    """校验结果转为快照内容"""
+    return {
+        'metadata': catalog.metadata,
+        'products': [_dump(p) for p in catalog.products],
+        'invalid': catalog.invalid,
+    }
+
+
+def _write_snapshot(snapshot_path: Path, json_path: Path, fingerprint: str, payload: Any):
+    """写入快照（原子替换）"""
+    stat = json_path.stat()
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'schema': fingerprint,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': _file_sha256(json_path),
+    }
+
+    fd, tmp_path = tempfile.mkstemp(dir=snapshot_path.parent, prefix=f".{snapshot_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _cached_payload(json_path: Path, snapshot_path: Path, fingerprint: str) -> Optional[Any]:
+    """读取有效快照的内容；源文件只是被 touch 过时顺便刷新快照头"""
+    cached = _read_snapshot(snapshot_path, json_path, fingerprint)
+    if not cached:
+        return None
+    header, payload = cached
+    if header.get('touched'):
+        _write_snapshot(snapshot_path, json_path, fingerprint, payload)
+    return payload
+
+
+def _validate_and_store(json_path: Path, snapshot_path: Path, fingerprint: str) -> Tuple[CatalogSnapshot, Dict]:
+    """从源文件校验并写入快照"""
+    catalog = _validate_source(json_path)
+    payload = _payload(catalog)
+    try:
+        _write_snapshot(snapshot_path, json_path, fingerprint, payload)
+    except OSError as e:
+        logger.warning(f"写入商品快照失败: {e}")
+    return catalog, payload
+
+
+def load_catalog(
+    json_path: Union[str, Path],
+    strict: bool = False,
+    snapshot_path: Optional[Union[str, Path]] = None
+) -> CatalogSnapshot:
+    """
+    加载商品目录，优先使用已校验的快照
+
+    Args:
+        json_path: 商品目录 JSON 文件
+        strict: 忽略快照，从源文件重新校验全部商品（并刷新快照）
+        snapshot_path: 快照文件路径，默认与 JSON 同名的 .snapshot.pkl
+
+    Returns:
+        CatalogSnapshot
+    """
+    json_path = Path(json_path)
+    snapshot_path = Path(snapshot_path) if snapshot_path else snapshot_path_for(json_path)
+    fingerprint = _schema_fingerprint()
+
+    payload = None if strict else _cached_payload(json_path, snapshot_path, fingerprint)
+    if payload is None:
+        return _validate_and_store(json_path, snapshot_path, fingerprint)[0]
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        products = [_restore(values) for values in payload['products']]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return CatalogSnapshot(
+        path=json_path,
+        metadata=payload['metadata'],
+        products=products,
+        invalid=[tuple(item) for item in payload['invalid']],
+        from_snapshot=True
+    )
+
+
+def load_catalog_entries(
+    json_path: Union[str, Path],
+    strict: bool = False,
+    snapshot_path: Optional[Union[str, Path]] = None
+) -> CatalogSnapshot:
+    """
+    加载已校验的商品字段值，不创建 Product 对象
+
+    与 load_catalog() 使用同一份快照；products 为包含 Product 全部字段的字典
+    （url 为 HttpUrl，时间为 datetime，选择器的额外字段合并在选择器字典中），
+    可用 construct_product() 直接创建 Product。
+
+    Args:
+        json_path: 商品目录 JSON 文件
+        strict: 忽略快照，从源文件重新校验全部商品（并刷新快照）
+        snapshot_path: 快照文件路径，默认与 JSON 同名的 .snapshot.pkl
+
+    Returns:
+        CatalogSnapshot（products 为字段值字典）
+    """
+    json_path = Path(json_path)
+    snapshot_path = Path(snapshot_path) if snapshot_path else snapshot_path_for(json_path)
+    fingerprint = _schema_fingerprint()
+
+    payload = None if strict else _cached_payload(json_path, snapshot_path, fingerprint)
+    from_snapshot = payload is not None
+    if payload is None:
+        payload = _validate_and_store(json_path, snapshot_path, fingerprint)[1]
+
+    return CatalogSnapshot(
+        path=json_path,
+        metadata=payload['metadata'],
+        products=[_entry(values) for values in payload['products']],
+        invalid=[tuple(item) for item in payload['invalid']],
+        from_snapshot=from_snapshot
+    )
+
+
+def load_derived(
+    json_path: Union[str, Path],
+    derived_path: Union[str, Path],
+    tag: str,
+    build: Callable[[], Any],
+    strict: bool = False
+) -> Tuple[Any, bool]:
+    """
+    加载由商品目录派生的对象（如紧凑目录），缓存不存在或已失效时调用 build() 生成并保存
+
+    与商品快照使用相同的失效规则（源文件内容和 Product 模型结构），tag 标识派生对象的格式版本。
+
+    Args:
+        json_path: 商品目录 JSON 文件
+        derived_path: 派生对象的缓存文件路径
+        tag: 派生对象格式标识，格式变化时修改
+        build: 生成派生对象的函数
+        strict: 忽略缓存，重新生成（build 应同时从源文件重新校验）
+
+    Returns:
+        (派生对象, 是否来自缓存)
+    """
+    json_path = Path(json_path)
+    derived_path = Path(derived_path)
+    fingerprint = f"{_schema_fingerprint()}:{tag}"
+
+    if not strict:
+        cached = _cached_payload(json_path, derived_path, fingerprint)
+        if cached is not None:
+            return cached, True
+
+    derived = build()
+    try:
+        _write_snapshot(derived_path, json_path, fingerprint, derived)
+    except OSError as e:
+        logger.warning(f"写入缓存失败: {derived_path} ({e})")
+    return derived, False
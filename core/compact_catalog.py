@@ -0,0 +1,490 @@
+"""
+紧凑商品目录模块
+
+以 pydantic Product 对象列表保存整个目录时，每个商品、变体和选择器都是独立的模型实例，
+选择器和变体中大量重复的字符串也各占一份内存，多店铺的大目录会占用数 GB 内存。
+
+CompactCatalog 按列保存商品：价格、优先级、测试状态、时间等放在 array 中，
+分类、标签、选择器、变体字段等字符串在目录内驻留（相同内容只保存一份），
+相同的选择器配置和标签组合只保存一次，变体展开为按商品偏移索引的列。
+ProductRecord 是带 __slots__ 的轻量行视图，需要完整模型时通过 to_product() 按需创建 Product。
+
+load() 优先读取紧凑目录快照（与 Product 快照使用相同的失效规则，见 catalog_snapshot）；
+快照失效时直接由已校验的商品字段值重建，不先创建整个 Product 列表。
+来自已校验数据的行在 to_product() 时直接构造模型，不再重复校验。
+"""
+
+import math
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from core.catalog_snapshot import construct_product, load_catalog_entries, load_derived
+from core.models import Product
+
+PRIORITIES = ('P0', 'P1', 'P2')
+TEST_STATUSES = ('untested', 'passing', 'failing', 'flaky')
+VARIANT_TYPES = ('color', 'size', 'style', 'configuration')
+
+# 紧凑目录快照格式版本，修改列结构时递增
+COMPACT_SNAPSHOT_VERSION = 1
+
+# 时间列保存为相对该时间点的微秒数（本地时间），没有值时使用 _NO_TIME；
+# 时区偏移（秒）另存一列，不带时区的时间使用 _NO_OFFSET
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NO_TIME = -(2 ** 63)
+_NO_OFFSET = -(2 ** 31)
+
+
+def _to_datetime(value: Union[str, datetime, None]) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _freeze(value: Any) -> Any:
+    """JSON 值转为可哈希的键（用于选择器配置去重）"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if isinstance(value, list):
+        return (list, tuple(_freeze(v) for v in value))
+    return (type(value), value)
+
+
+def _copy_value(value: Any) -> Any:
+    """复制 JSON 值中的 dict / list（字符串等不可变值共享）"""
+    if isinstance(value, dict):
+        copied = dict(value)
+        for k, v in value.items():
+            if isinstance(v, (dict, list)):
+                copied[k] = _copy_value(v)
+        return copied
+    if isinstance(value, list):
+        return [_copy_value(v) if isinstance(v, (dict, list)) else v for v in value]
+    return value
+
+
+def compact_snapshot_path_for(json_path: Union[str, Path]) -> Path:
+    """JSON 商品目录对应的默认紧凑目录快照路径"""
+    json_path = Path(json_path)
+    return json_path.with_name(f"{json_path.stem}.compact.snapshot.pkl")
+
+
+def _drain(items: List[Any]) -> Iterator[Any]:
+    """依次取出列表元素并释放列表对它的引用"""
+    for i in range(len(items)):
+        item, items[i] = items[i], None
+        yield item
+
+
+class ProductRecord:
+    """紧凑目录中一个商品的只读视图
+
+    常用字段直接从列中读取；其他 Product 属性（variants、selectors、metadata 等）
+    在首次访问时创建完整的 Product 并缓存。url 以字符串返回。
+    """
+
+    __slots__ = ('_catalog', '_row', '_product')
+
+    def __init__(self, catalog: 'CompactCatalog', row: int):
+        self._catalog = catalog
+        self._row = row
+        self._product = None
+
+    @property
+    def id(self) -> str:
+        return self._catalog._ids[self._row]
+
+    @property
+    def name(self) -> str:
+        return self._catalog._names[self._row]
+
+    @property
+    def url(self) -> str:
+        return self._catalog._urls[self._row]
+
+    @property
+    def category(self) -> str:
+        return self._catalog._categories[self._row]
+
+    @property
+    def currency(self) -> str:
+        return self._catalog._currencies[self._row]
+
+    @property
+    def price_min(self) -> float:
+        return self._catalog._price_min[self._row]
+
+    @property
+    def price_max(self) -> float:
+        return self._catalog._price_max[self._row]
+
+    @property
+    def priority(self) -> str:
+        return PRIORITIES[self._catalog._priority[self._row]]
+
+    @property
+    def test_status(self) -> str:
+        return TEST_STATUSES[self._catalog._test_status[self._row]]
+
+    @property
+    def tags(self) -> List[str]:
+        return list(self._catalog._tags[self._row])
+
+    @property
+    def variant_count(self) -> int:
+        starts = self._catalog._variant_start
+        return starts[self._row + 1] - starts[self._row]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转为 products.json 中的商品字典"""
+        return self._catalog._row_dict(self._row)
+
+    def to_product(self) -> Product:
+        """创建（并缓存）完整的 Product 模型（来自已校验数据的行不再重复校验）"""
+        if self._product is None:
+            if self._catalog._validated[self._row]:
+                self._product = construct_product(self.to_dict())
+            else:
+                self._product = Product.model_validate(self.to_dict())
+        return self._product
+
+    def __getattr__(self, name: str) -> Any:
+        # 只有在 __slots__ 和属性中找不到时才会调用
+        return getattr(self.to_product(), name)
+
+    def __repr__(self) -> str:
+        return f"ProductRecord(id={self.id!r}, name={self.name!r})"
+
+
+class CompactCatalog:
+    """按列保存的商品目录
+
+    使用示例:
+        catalog = CompactCatalog.load("data/products.json")
+        for record in catalog.filter(priority="P0"):
+            product = record.to_product()
+    """
+
+    def __init__(self, metadata: Optional[Dict[str, Any]] = None):
+        """
+        创建空目录，通过 append() / extend() 添加商品
+
+        Args:
+            metadata: 目录元数据
+        """
+        self.metadata = metadata or {}
+        # 加载时校验失败被跳过的条目：(商品ID, 错误信息)
+        self.invalid: List[Tuple[str, str]] = []
+        self._strings: Dict[str, str] = {}
+        self._tag_groups: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._selector_keys: Dict[Any, int] = {}
+        self._selector_table: List[Dict[str, Any]] = []
+        self._index: Dict[str, int] = {}
+
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._urls: List[str] = []
+        self._categories: List[str] = []
+        self._currencies: List[str] = []
+        self._tags: List[Tuple[str, ...]] = []
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        self._price_min = array('d')
+        self._price_max = array('d')
+        self._priority = array('B')
+        self._test_status = array('B')
+        self._discovered_at = array('q')
+        self._discovered_offset = array('i')
+        self._last_tested = array('q')
+        self._last_tested_offset = array('i')
+        self._selectors = array('I')
+        self._validated = array('b')
+
+        self._variant_start = array('I', [0])
+        self._variant_names: List[str] = []
+        self._variant_types = array('B')
+        self._variant_selectors: List[str] = []
+        self._variant_available = array('b')
+        self._variant_price_modifier = array('d')
+
+    @classmethod
+    def from_products(
+        cls,
+        products: Iterable[Union[Product, Dict[str, Any]]],
+        metadata: Optional[Dict[str, Any]] = None,
+        validated: bool = False
+    ) -> 'CompactCatalog':
+        """
+        由 Product 对象或商品字典创建目录
+
+        Args:
+            products: Product 对象或 products.json 中的商品字典
+            metadata: 目录元数据
+            validated: 商品字典是否已通过 Product 校验（Product 对象总是视为已校验）
+
+        Returns:
+            CompactCatalog
+        """
+        catalog = cls(metadata)
+        catalog.extend(products, validated=validated)
+        return catalog
+
+    @classmethod
+    def load(
+        cls,
+        json_path: Union[str, Path],
+        strict: bool = False,
+        snapshot_path: Optional[Union[str, Path]] = None
+    ) -> 'CompactCatalog':
+        """
+        从 JSON 商品目录加载（优先使用紧凑目录快照，校验失败的条目记录在 invalid 中）
+
+        Args:
+            json_path: 商品目录 JSON 文件
+            strict: 忽略快照，从源文件重新校验全部商品
+            snapshot_path: 紧凑目录快照路径，默认与 JSON 同名的 .compact.snapshot.pkl
+
+        Returns:
+            CompactCatalog
+        """
+        def build() -> 'CompactCatalog':
+            entries = load_catalog_entries(json_path, strict=strict)
+            catalog = cls(entries.metadata)
+            catalog.invalid = entries.invalid
+            # 逐个释放已写入列的字段值字典，避免整个目录的字典和列同时占用内存
+            catalog.extend(_drain(entries.products), validated=True)
+            return catalog
+
+        catalog, _ = load_derived(
+            json_path,
+            snapshot_path or compact_snapshot_path_for(json_path),
+            f"compact-{COMPACT_SNAPSHOT_VERSION}",
+            build,
+            strict=strict
+        )
+        return catalog
+
+    def _intern(self, value: Optional[str]) -> Optional[str]:
+        """目录内字符串驻留，相同内容只保留一个对象"""
+        if value is None:
+            return None
+        return self._strings.setdefault(value, value)
+
+    def _intern_value(self, value: Any) -> Any:
+        """驻留 JSON 值中的字符串（用于商品 metadata 等自由结构）"""
+        if isinstance(value, str):
+            return self._intern(value)
+        if isinstance(value, dict):
+            return {self._intern(k): self._intern_value(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._intern_value(v) for v in value]
+        return value
+
+    def _selector_row(self, selectors: Dict[str, Any]) -> int:
+        """相同的选择器配置只保存一份，返回其编号"""
+        key = _freeze(selectors)
+        row = self._selector_keys.get(key)
+        if row is None:
+            row = len(self._selector_table)
+            self._selector_keys[key] = row
+            self._selector_table.append(self._intern_value(selectors))
+        return row
+
+    @staticmethod
+    def _time_value(value: Union[str, datetime, None]) -> Tuple[int, int]:
+        """时间转为 (本地时间微秒数, 时区偏移秒数)"""
+        value = _to_datetime(value)
+        if value is None:
+            return _NO_TIME, _NO_OFFSET
+        offset = value.utcoffset()
+        local = (value.replace(tzinfo=None) - _EPOCH) // _MICROSECOND
+        return local, _NO_OFFSET if offset is None else int(offset.total_seconds())
+
+    @staticmethod
+    def _time(value: int, offset: int) -> Optional[datetime]:
+        if value == _NO_TIME:
+            return None
+        result = _EPOCH + value * _MICROSECOND
+        if offset != _NO_OFFSET:
+            result = result.replace(tzinfo=timezone(timedelta(seconds=offset)))
+        return result
+
+    def append(self, product: Union[Product, Dict[str, Any]], validated: bool = False):
+        """
+        添加一个商品
+
+        Args:
+            product: Product 对象或商品字典
+            validated: 商品字典是否已通过 Product 校验（Product 对象总是视为已校验）
+        """
+        if isinstance(product, Product):
+            data = product.model_dump()
+            validated = True
+        else:
+            data = product
+        product_id = str(data['id'])
+        self._index[product_id] = len(self._ids)
+
+        self._ids.append(product_id)
+        self._names.append(data['name'])
+        self._urls.append(str(data['url']))
+        self._categories.append(self._intern(data['category']))
+        self._currencies.append(self._intern(data.get('currency', 'USD')))
+        tags = tuple(data.get('tags') or ())
+        group = self._tag_groups.get(tags)
+        if group is None:
+            group = self._tag_groups[tags] = tuple(self._intern(tag) for tag in tags)
+        self._tags.append(group)
+        self._metadata.append(self._intern_value(data['metadata']) if data.get('metadata') else None)
+        self._price_min.append(data['price_min'])
+        self._price_max.append(data['price_max'])
+        self._priority.append(PRIORITIES.index(data.get('priority', 'P1')))
+        self._test_status.append(TEST_STATUSES.index(data.get('test_status', 'untested')))
+        discovered_at, discovered_offset = self._time_value(data.get('discovered_at'))
+        self._discovered_at.append(discovered_at)
+        self._discovered_offset.append(discovered_offset)
+        last_tested, last_tested_offset = self._time_value(data.get('last_tested'))
+        self._last_tested.append(last_tested)
+        self._last_tested_offset.append(last_tested_offset)
+        self._selectors.append(self._selector_row(data.get('selectors') or {}))
+        self._validated.append(1 if validated else 0)
+
+        for variant in data.get('variants') or ():
+            self._variant_names.append(self._intern(variant['name']))
+            self._variant_types.append(VARIANT_TYPES.index(variant['type']))
+            self._variant_selectors.append(self._intern(variant['selector']))
+            self._variant_available.append(1 if variant.get('available', True) else 0)
+            modifier = variant.get('price_modifier')
+            self._variant_price_modifier.append(math.nan if modifier is None else modifier)
+        self._variant_start.append(len(self._variant_names))
+
+    def extend(self, products: Iterable[Union[Product, Dict[str, Any]]], validated: bool = False):
+        """批量添加商品"""
+        for product in products:
+            self.append(product, validated=validated)
+
+    def _row_dict(self, row: int) -> Dict[str, Any]:
+        """还原第 row 个商品的字典"""
+        variants = []
+        for i in range(self._variant_start[row], self._variant_start[row + 1]):
+            modifier = self._variant_price_modifier[i]
+            variants.append({
+                'name': self._variant_names[i],
+                'type': VARIANT_TYPES[self._variant_types[i]],
+                'selector': self._variant_selectors[i],
+                'available': bool(self._variant_available[i]),
+                'price_modifier': None if math.isnan(modifier) else modifier,
+            })
+
+        selectors = self._selector_table[self._selectors[row]]
+        metadata = self._metadata[row]
+        entry = {
+            'id': self._ids[row],
+            'name': self._names[row],
+            'url': self._urls[row],
+            'category': self._categories[row],
+            'price_min': self._price_min[row],
+            'price_max': self._price_max[row],
+            'currency': self._currencies[row],
+            'variants': variants,
+            'selectors': _copy_value(selectors),
+            'priority': PRIORITIES[self._priority[row]],
+            'tags': list(self._tags[row]),
+            'metadata': dict(metadata) if metadata else {},
+            'discovered_at': self._time(self._discovered_at[row], self._discovered_offset[row]),
+            'last_tested': self._time(self._last_tested[row], self._last_tested_offset[row]),
+            'test_status': TEST_STATUSES[self._test_status[row]],
+        }
+        if entry['discovered_at'] is None:
+            # 原条目没有发现时间，交给 Product 的默认值
+            del entry['discovered_at']
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[ProductRecord]:
+        return (ProductRecord(self, row) for row in range(len(self._ids)))
+
+    def __getitem__(self, row: int) -> ProductRecord:
+        if not -len(self._ids) <= row < len(self._ids):
+            raise IndexError(row)
+        return ProductRecord(self, row % len(self._ids))
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._index
+
+    def get(self, product_id: str) -> Optional[ProductRecord]:
+        """
+        按商品 ID 查找
+
+        Args:
+            product_id: 商品 ID
+
+        Returns:
+            ProductRecord；不存在时返回 None
+        """
+        row = self._index.get(product_id)
+        return ProductRecord(self, row) if row is not None else None
+
+    def filter(
+        self,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        test_status: Optional[str] = None
+    ) -> List[ProductRecord]:
+        """
+        按分类、优先级、测试状态过滤（直接比较列，不创建 Product）
+
+        Args:
+            category: 分类（精确匹配）
+            priority: 优先级（P0/P1/P2）
+            test_status: 测试状态
+
+        Returns:
+            ProductRecord 列表（保持目录顺序）
+        """
+        priority_code = PRIORITIES.index(priority) if priority is not None else None
+        status_code = TEST_STATUSES.index(test_status) if test_status is not None else None
+        return [
+            ProductRecord(self, row)
+            for row in range(len(self._ids))
+            if (category is None or self._categories[row] == category)
+            and (priority_code is None or self._priority[row] == priority_code)
+            and (status_code is None or self._test_status[row] == status_code)
+        ]
+
+    def products(self) -> 'LazyProducts':
+        """按商品 ID 访问完整 Product 的只读映射，访问时才创建模型"""
+        return LazyProducts(self)
+
+
+class LazyProducts(Mapping):
+    """{商品ID: Product} 只读映射，按需创建并缓存 Product"""
+
+    def __init__(self, catalog: CompactCatalog):
+        self._catalog = catalog
+        self._cache: Dict[str, Product] = {}
+
+    def __getitem__(self, product_id: str) -> Product:
+        product = self._cache.get(product_id)
+        if product is None:
+            record = self._catalog.get(product_id)
+            if record is None:
+                raise KeyError(product_id)
+            product = self._cache[product_id] = record.to_product()
+        return product
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._catalog
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._catalog._ids)
+
+    def __len__(self) -> int:
+        return len(self._catalog)
@@ -2,24 +2,80 @@
 Fiido 电商网站产品爬虫模块
 
 负责从 Fiido.com 网站发现和抓取商品信息，支持 Shopify JSON API 和 HTML 解析两种方式。
-集成缓存机制，提升性能。
+集成缓存机制，提升性能：分类 JSON 以 ETag / Last-Modified 条件请求重新验证，
+未变化时服务端只返回 304。
 """
 
 import logging
+import threading
 import time
-from typing import List, Optional, Dict, Any
-from urllib.parse import urljoin
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Dict, Any, Set, Tuple
+from urllib.parse import urljoin, urlencode
 
 import requests
 from bs4 import BeautifulSoup
+from pydantic import HttpUrl
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from core.models import Product, ProductVariant, Selectors
 from core.cache import CrawlerCache
+from core.rate_limiter import HostRateLimiter, DEFAULT_REQUESTS_PER_SECOND, THROTTLE_STATUS_CODES
 
 logger = logging.getLogger(__name__)
 
+# 连接池大小，需不小于并发抓取的线程数
+HTTP_POOL_SIZE = 16
+
+# Shopify products.json 每页最多返回的商品数
+SHOPIFY_PAGE_SIZE = 250
+
+# sitemap XML 命名空间
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """解析 ISO 8601 时间（sitemap lastmod / Shopify updated_at），统一为带时区的时间
+
+    Args:
+        value: 时间字符串
+
+    Returns:
+        datetime 对象；无法解析时返回 None
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _restore_product(data: Dict[str, Any]) -> Product:
+    """从上次保存的商品字典还原 Product，跳过逐字段校验
+
+    数据来自本工具自己写出的 products.json，已校验过，只做类型还原。
+
+    Args:
+        data: Product.model_dump(mode='json') 的结果
+
+    Returns:
+        Product 对象
+    """
+    values = dict(data)
+    values['url'] = HttpUrl(values['url'])
+    values['selectors'] = Selectors.model_construct(**(values.get('selectors') or {}))
+    values['variants'] = [ProductVariant.model_construct(**v) for v in values.get('variants') or []]
+    values['metadata'] = dict(values.get('metadata') or {})
+    for field in ('discovered_at', 'last_tested'):
+        if isinstance(values.get(field), str):
+            values[field] = datetime.fromisoformat(values[field])
+    return Product.model_construct(**values)
+
 
 class ProductCrawler:
     """Fiido 网站产品爬虫
@@ -27,6 +83,7 @@ class ProductCrawler:
     实现商品分类发现、商品列表抓取、商品详情解析等功能。
     优先使用 Shopify JSON API，失败时降级到 HTML 解析。
     支持缓存机制，避免重复爬取。
+    所有请求经过按域名的自适应限速器，可在多线程间共享同一个爬虫实例并发抓取。
     """
 
     def __init__(
@@ -35,20 +92,44 @@ class ProductCrawler:
         timeout: int = 30,
         max_retries: int = 3,
         use_cache: bool = True,
-        cache_ttl_hours: int = 24
+        cache_ttl_hours: int = 24,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        enrich_details: bool = True,
+        detail_workers: int = 4
     ):
         """初始化产品爬虫
 
         Args:
             base_url: 网站根 URL
             timeout: 请求超时时间（秒）
-            max_retries: 最大重试次数
+            max_retries: 最大重试次数（429/503 限流响应由限速器退避后重试）
             use_cache: 是否启用缓存
             cache_ttl_hours: 缓存有效期（小时）
+            requests_per_second: 每个域名每秒请求数（未传入 rate_limiter 时生效）
+            rate_limiter: 共享的限速器实例
+            enrich_details: HTML 降级发现的商品是否补抓详情（价格、变体）
+            detail_workers: 补抓详情的并发线程数
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
         self.use_cache = use_cache
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or HostRateLimiter(requests_per_second)
+
+        # 增量抓取：上次的商品数据（key 为商品ID）与本次 updated_at 未变化的商品ID
+        self._known_products: Dict[str, Dict[str, Any]] = {}
+        self.unchanged_product_ids: Set[str] = set()
+
+        # HTML 降级商品的详情补抓
+        self.enrich_details = enrich_details
+        self.detail_workers = detail_workers
+        self.enriched_products = 0
+        self.enrichment_failures = 0
+        self._enrichment_lock = threading.Lock()
+
+        # sitemap 发现统计
+        self.sitemap_stats: Dict[str, int] = {}
 
         # 初始化缓存
         if use_cache:
@@ -58,14 +139,19 @@ class ProductCrawler:
             self.cache = None
 
         # 配置带重试机制的 Session
+        # 429/503 不在此重试，交给 _get() 按 Retry-After 退避并降低限速器速率
         self.session = requests.Session()
         retry_strategy = Retry(
             total=max_retries,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS"],
             backoff_factor=1
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE
+        )
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
 
@@ -80,6 +166,155 @@ class ProductCrawler:
 
         logger.info(f"ProductCrawler initialized for {base_url}")
 
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """经过限速器发起 GET 请求
+
+        每次响应的状态码和耗时反馈给限速器；遇到 429/503 时限速器降速并暂停该域名，
+        随后重试，最多 max_retries 次。
+
+        Args:
+            url: 请求 URL
+            **kwargs: 传给 session.get 的其他参数
+
+        Returns:
+            响应对象（重试用尽时为最后一次的限流响应）
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+            started = time.monotonic()
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+            self.rate_limiter.record_response(
+                url,
+                response.status_code,
+                time.monotonic() - started,
+                response.headers.get('Retry-After')
+            )
+
+            if response.status_code not in THROTTLE_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            attempt += 1
+            logger.info(f"Retrying {url} after throttle (attempt {attempt}/{self.max_retries})")
+
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """请求 JSON 接口，命中缓存验证器时发送条件请求
+
+        响应 304 时复用缓存内容并刷新有效期；响应 200 时计入缓存未命中，
+        带验证器时连同验证器写入缓存。
+
+        Args:
+            url: 请求 URL
+            params: 查询参数
+
+        Returns:
+            解析后的 JSON 数据
+
+        Raises:
+            requests.HTTPError: 响应状态码表示失败
+        """
+        cache = self.cache if self.use_cache else None
+        cache_url = f"{url}?{urlencode(params)}" if params else url
+        validators = cache.get_validators(cache_url) if cache else {}
+
+        kwargs: Dict[str, Any] = {'params': params}
+        if validators:
+            kwargs['headers'] = validators
+        response = self._get(url, **kwargs)
+
+        if response.status_code == 304 and validators:
+            data = cache.revalidate(cache_url)
+            if data is not None:
+                return data
+            # 缓存内容已丢失，重新完整请求
+            response = self._get(url, params=params)
+
+        response.raise_for_status()
+        data = response.json()
+
+        if cache:
+            cache.record_miss()
+            response_validators = self._response_validators(response)
+            if response_validators:
+                cache.set(cache_url, data, validators=response_validators)
+        return data
+
+    @staticmethod
+    def _response_validators(response: requests.Response) -> Dict[str, str]:
+        """提取响应的 ETag / Last-Modified"""
+        validators = {}
+        for header, name in (('ETag', 'etag'), ('Last-Modified', 'last_modified')):
+            value = response.headers.get(header)
+            if isinstance(value, str) and value:
+                validators[name] = value
+        return validators
+
+    def set_known_products(self, products: Dict[str, Dict[str, Any]]):
+        """设置上次发现的商品，启用按 updated_at 的增量抓取
+
+        之后解析商品 JSON 时，updated_at 与上次相同的商品直接复用上次的数据，
+        不再解析变体、不做模型校验，并记入 unchanged_product_ids。
+
+        Args:
+            products: 上次的商品字典（key 为商品ID，value 为保存的商品数据）
+        """
+        self._known_products = products
+        self.unchanged_product_ids = set()
+
+    def _reuse_known_product(
+        self,
+        product_data: Dict[str, Any],
+        collection_path: str
+    ) -> Optional[Product]:
+        """updated_at 未变化时复用上次的商品数据
+
+        Args:
+            product_data: Shopify 产品 JSON 数据
+            collection_path: 所属分类路径
+
+        Returns:
+            复用的 Product 对象；商品是新的、已修改或缺少 updated_at 时返回 None
+        """
+        product_id = str(product_data.get('id', ''))
+        updated_at = product_data.get('updated_at')
+        known = self._known_products.get(product_id)
+        if not updated_at or not known or known.get('metadata', {}).get('updated_at') != updated_at:
+            return None
+
+        try:
+            product = _restore_product(known)
+        except Exception as e:
+            logger.debug(f"Failed to restore known product {product_id}: {e}")
+            return None
+
+        # 分类只取决于本次所在的分类路径，计算代价很小，与完整解析保持一致
+        category_slug = collection_path.split('/')[-1]
+        product.category = self._format_category_name(category_slug)
+        product.metadata['collection_path'] = collection_path
+        product.metadata['category_slug'] = category_slug
+
+        self.unchanged_product_ids.add(product_id)
+        return product
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取抓取统计
+
+        Returns:
+            统计信息字典：rate_limit 为各域名当前速率和被限流次数，
+            cache 为缓存统计（含命中/未命中/重新验证次数）
+        """
+        stats = {
+            'rate_limit': self.rate_limiter.get_stats(),
+            'enrichment': {
+                'enriched': self.enriched_products,
+                'failed': self.enrichment_failures,
+            },
+        }
+        if self.sitemap_stats:
+            stats['sitemap'] = dict(self.sitemap_stats)
+        if self.use_cache and self.cache:
+            stats['cache'] = self.cache.get_stats()
+        return stats
+
     def discover_collections(self) -> List[str]:
         """发现所有商品分类
 
@@ -131,7 +366,7 @@ class ProductCrawler:
         Returns:
             分类URL集合
         """
-        response = self.session.get(url, timeout=self.timeout)
+        response = self._get(url)
         response.raise_for_status()
 
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -277,11 +512,84 @@ class ProductCrawler:
         try:
             products = self._discover_products_via_html(collection_path, limit)
             logger.info(f"Discovered {len(products)} products via HTML parsing")
-            return products
         except Exception as e:
             logger.error(f"Failed to discover products: {e}")
             raise
 
+        if self.enrich_details:
+            products = self.enrich_products(products)
+        return products
+
+    def enrich_products(self, products: List[Product]) -> List[Product]:
+        """补抓 HTML 降级商品的详情
+
+        对 metadata['needs_detail_fetch'] 为 True 的商品并发请求 /products/{handle}.json
+        （经过限速器和条件请求缓存），解析为完整商品替换占位商品。
+        补抓失败的商品保留占位数据和 needs_detail_fetch 标记。
+
+        Args:
+            products: 商品列表
+
+        Returns:
+            顺序不变的商品列表
+        """
+        pending = [
+            i for i, product in enumerate(products)
+            if product.metadata.get('needs_detail_fetch')
+        ]
+        if not pending:
+            return products
+
+        logger.info(f"Fetching details for {len(pending)} products (workers: {self.detail_workers})")
+        with ThreadPoolExecutor(max_workers=max(1, self.detail_workers)) as executor:
+            details = list(executor.map(lambda i: self._fetch_product_detail(products[i]), pending))
+
+        enriched = list(products)
+        succeeded = 0
+        for i, detail in zip(pending, details):
+            if detail:
+                enriched[i] = detail
+                succeeded += 1
+
+        # 多个分类可能并发补抓，计数需加锁
+        with self._enrichment_lock:
+            self.enriched_products += succeeded
+            self.enrichment_failures += len(pending) - succeeded
+
+        logger.info(f"Enriched {succeeded}/{len(pending)} products")
+        return enriched
+
+    def _fetch_product_detail(self, product: Product) -> Optional[Product]:
+        """请求单个商品的详情 JSON 并解析
+
+        Args:
+            product: HTML 降级得到的占位商品
+
+        Returns:
+            完整的 Product 对象；请求或解析失败时返回 None
+        """
+        return self._fetch_product_by_handle(
+            product.metadata.get('handle'),
+            product.metadata.get('collection_path', '')
+        )
+
+    def _fetch_product_by_handle(self, handle: str, collection_path: str) -> Optional[Product]:
+        """请求 /products/{handle}.json 并解析
+
+        Args:
+            handle: 商品 handle
+            collection_path: 所属分类路径（决定商品分类）
+
+        Returns:
+            Product 对象；请求或解析失败时返回 None
+        """
+        try:
+            data = self._get_json(f"{self.base_url}/products/{handle}.json")
+            return self._parse_product_from_json(data['product'], collection_path)
+        except Exception as e:
+            logger.warning(f"Failed to fetch details for {handle}: {e}")
+            return None
+
     def _discover_products_via_json(
         self,
         collection_path: str,
@@ -304,15 +612,12 @@ class ProductCrawler:
 
         while True:
             # Shopify JSON API 分页参数
-            params = {'page': page, 'limit': 250}  # Shopify 最多支持每页250个商品
+            params = {'page': page, 'limit': SHOPIFY_PAGE_SIZE}  # Shopify 最多支持每页250个商品
             if limit and len(products) >= limit:
                 break
 
             logger.debug(f"Fetching {json_url}?page={page}")
-            response = self.session.get(json_url, params=params, timeout=self.timeout)
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(json_url, params=params)
 
             # Shopify 返回格式: {"products": [...]}
             if 'products' not in data or not data['products']:
@@ -327,14 +632,264 @@ class ProductCrawler:
                     products.append(product)
 
             # 如果返回商品数量少于请求的limit，说明已到最后一页
-            if len(data['products']) < 250:
+            if len(data['products']) < SHOPIFY_PAGE_SIZE:
                 break
 
             page += 1
-            time.sleep(0.5)  # 避免请求过快
 
         return products
 
+    def discover_products_storewide(
+        self,
+        collection_paths: List[str],
+        limit_per_collection: Optional[int] = None,
+        workers: int = 1
+    ) -> Tuple[List[Product], Dict[str, List[str]]]:
+        """通过全站 /products.json 一次性发现商品
+
+        逐个分类抓取时，属于多个分类的商品会被重复下载和解析。这里改为：
+        1. 每个分类只取商品 handle，建立分类归属映射；
+        2. 分页抓取全站 /products.json 一次，每个商品只解析一次。
+        商品的分类取分类列表中第一个包含它的分类，结果顺序与逐个分类抓取后去重一致；
+        不属于任何指定分类的商品不返回。
+
+        Args:
+            collection_paths: 分类路径列表
+            limit_per_collection: 每个分类的商品数量限制
+            workers: 并发获取分类归属的线程数
+
+        Returns:
+            (Product 对象列表, 分类归属映射 {handle: [分类路径, ...]})
+        """
+        def handles_of(collection_path: str) -> List[str]:
+            try:
+                return self._discover_collection_handles(collection_path, limit_per_collection)
+            except Exception as e:
+                logger.error(f"Failed to resolve membership of {collection_path}: {e}")
+                return []
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                handle_lists = list(executor.map(handles_of, collection_paths))
+        else:
+            handle_lists = [handles_of(path) for path in collection_paths]
+
+        # handle -> 所属分类列表（按分类顺序），以及首次出现的位置 (分类序号, 分类内位置)
+        membership: Dict[str, List[str]] = {}
+        first_seen: Dict[str, Tuple[int, int]] = {}
+        for index, (collection_path, handles) in enumerate(zip(collection_paths, handle_lists)):
+            for position, handle in enumerate(handles):
+                collections = membership.setdefault(handle, [])
+                if collection_path not in collections:
+                    collections.append(collection_path)
+                first_seen.setdefault(handle, (index, position))
+
+        ranked = []
+        for product_data in self._iter_storewide_products():
+            handle = product_data.get('handle', '')
+            # pop 保证每个 handle 只解析一次
+            rank = first_seen.pop(handle, None)
+            if rank is None:
+                continue
+            product = self._parse_product_from_json(product_data, collection_paths[rank[0]])
+            if product:
+                product.metadata['collections'] = membership[handle]
+                ranked.append((rank, product))
+
+        ranked.sort(key=lambda item: item[0])
+        products = [product for _, product in ranked]
+        logger.info(
+            f"Discovered {len(products)} products via storewide /products.json "
+            f"({len(membership)} handles in {len(collection_paths)} collections)"
+        )
+        return products, membership
+
+    def _discover_collection_handles(
+        self,
+        collection_path: str,
+        limit: Optional[int] = None
+    ) -> List[str]:
+        """获取分类下的商品 handle 列表（只用于分类归属，不解析商品）
+
+        优先分页请求分类 JSON 并只取 handle（请求 fields=handle 以减小响应），
+        失败时降级到 HTML 解析商品链接。
+
+        Args:
+            collection_path: 分类路径
+            limit: 限制数量
+
+        Returns:
+            按分类内顺序排列的 handle 列表
+        """
+        try:
+            json_url = f"{self.base_url}{collection_path}/products.json"
+            handles: List[str] = []
+            page = 1
+            while not (limit and len(handles) >= limit):
+                params = {'page': page, 'limit': SHOPIFY_PAGE_SIZE, 'fields': 'handle'}
+                items = self._get_json(json_url, params=params).get('products') or []
+                handles.extend(item.get('handle', '') for item in items if item.get('handle'))
+                if len(items) < SHOPIFY_PAGE_SIZE:
+                    break
+                page += 1
+            if handles:
+                return handles[:limit] if limit else handles
+        except Exception as e:
+            logger.warning(f"JSON API failed for {collection_path}, falling back to HTML parsing: {e}")
+
+        products = self._discover_products_via_html(collection_path, limit)
+        return [p.metadata['handle'] for p in products]
+
+    def _iter_storewide_products(self):
+        """分页遍历全站 /products.json
+
+        Yields:
+            Shopify 商品 JSON 数据
+        """
+        json_url = f"{self.base_url}/products.json"
+        page = 1
+        while True:
+            data = self._get_json(json_url, params={'page': page, 'limit': SHOPIFY_PAGE_SIZE})
+            items = data.get('products') or []
+            yield from items
+            if len(items) < SHOPIFY_PAGE_SIZE:
+                break
+            page += 1
+
+    def discover_products_from_sitemap(
+        self,
+        known_products: Dict[str, Dict[str, Any]],
+        workers: Optional[int] = None
+    ) -> List[Product]:
+        """通过 sitemap 的 lastmod 发现商品
+
+        流式读取 /sitemap.xml 及其中的 sitemap_products_*.xml，只对新商品和 lastmod
+        晚于目录记录（sitemap_lastmod，缺失时用 updated_at）的商品请求详情 JSON，
+        其余商品直接复用目录数据并记入 unchanged_product_ids。
+        已知商品沿用原分类；新商品没有分类信息，分类取 product_type。
+        sitemap 中不再出现的商品视为已下架，不返回。
+
+        Args:
+            known_products: 现有商品目录（key 为商品ID）
+            workers: 并发请求详情的线程数，默认使用 detail_workers
+
+        Returns:
+            按 sitemap 顺序排列的 Product 列表
+        """
+        known_by_handle = {}
+        for data in known_products.values():
+            handle = data.get('metadata', {}).get('handle') or str(data.get('url', '')).rstrip('/').split('/products/')[-1]
+            known_by_handle[handle] = data
+
+        products: List[Optional[Product]] = []
+        to_fetch: List[Tuple[int, str, Optional[str], Optional[Dict[str, Any]]]] = []
+        for url, lastmod in self.iter_sitemap_products():
+            handle = url.split('/products/')[-1].split('?')[0].strip('/')
+            known = known_by_handle.get(handle)
+
+            product = None
+            if known and not self._is_newer(lastmod, known):
+                try:
+                    product = _restore_product(known)
+                except Exception as e:
+                    logger.debug(f"Failed to restore known product {handle}: {e}")
+
+            if product:
+                if lastmod:
+                    product.metadata['sitemap_lastmod'] = lastmod
+                self.unchanged_product_ids.add(product.id)
+            else:
+                to_fetch.append((len(products), handle, lastmod, known))
+            products.append(product)
+
+        logger.info(
+            f"Sitemap lists {len(products)} products, "
+            f"{len(to_fetch)} new or modified since last crawl"
+        )
+
+        def fetch(item):
+            _, handle, _, known = item
+            collection_path = (known or {}).get('metadata', {}).get('collection_path', '')
+            return self._fetch_product_by_handle(handle, collection_path)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers or self.detail_workers)) as executor:
+            fetched = list(executor.map(fetch, to_fetch))
+
+        failed = 0
+        for (index, handle, lastmod, known), product in zip(to_fetch, fetched):
+            if product:
+                if lastmod:
+                    product.metadata['sitemap_lastmod'] = lastmod
+                if not product.category:
+                    product.category = product.metadata.get('product_type') or 'Uncategorized'
+                products[index] = product
+            else:
+                failed += 1
+                if known:
+                    # 请求失败时保留旧数据，避免商品从目录中消失
+                    try:
+                        products[index] = _restore_product(known)
+                        self.unchanged_product_ids.add(products[index].id)
+                    except Exception:
+                        pass
+
+        self.sitemap_stats = {
+            'urls': len(products),
+            'fetched': len(to_fetch) - failed,
+            'reused': len(products) - len(to_fetch),
+            'failed': failed,
+        }
+        return [p for p in products if p]
+
+    def iter_sitemap_products(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """遍历 sitemap 中的商品 URL
+
+        Yields:
+            (商品 URL, lastmod)
+        """
+        for sitemap_url, _ in self._iter_sitemap(f"{self.base_url}/sitemap.xml"):
+            if 'sitemap_products' not in sitemap_url:
+                continue
+            for url, lastmod in self._iter_sitemap(sitemap_url):
+                if '/products/' in url:
+                    yield url, lastmod
+
+    def _iter_sitemap(self, url: str) -> Iterator[Tuple[str, Optional[str]]]:
+        """流式解析 sitemap 或 sitemap 索引，逐条产出条目，不把整个文件读入内存
+
+        Args:
+            url: sitemap URL
+
+        Yields:
+            (loc, lastmod)
+        """
+        response = self._get(url, stream=True)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        try:
+            for _, element in ET.iterparse(response.raw, events=('end',)):
+                if element.tag in (f'{SITEMAP_NS}url', f'{SITEMAP_NS}sitemap'):
+                    loc = element.findtext(f'{SITEMAP_NS}loc')
+                    lastmod = element.findtext(f'{SITEMAP_NS}lastmod')
+                    if loc:
+                        yield loc.strip(), lastmod.strip() if lastmod else None
+                    element.clear()
+        finally:
+            response.close()
+
+    @staticmethod
+    def _is_newer(lastmod: Optional[str], known: Dict[str, Any]) -> bool:
+        """判断 sitemap 的 lastmod 是否晚于目录中记录的修改时间
+
+        任一时间缺失或无法解析时视为已修改，宁可多请求一次。
+        """
+        sitemap_time = _parse_timestamp(lastmod)
+        metadata = known.get('metadata', {})
+        known_time = _parse_timestamp(metadata.get('sitemap_lastmod') or metadata.get('updated_at'))
+        if sitemap_time is None or known_time is None:
+            return True
+        return sitemap_time > known_time
+
     def _parse_product_from_json(
         self,
         product_data: Dict[str, Any],
@@ -350,14 +905,21 @@ class ProductCrawler:
             Product 对象，解析失败返回 None
         """
         try:
+            # 增量抓取：updated_at 未变化的商品直接复用
+            if self._known_products:
+                known_product = self._reuse_known_product(product_data, collection_path)
+                if known_product:
+                    return known_product
+
             # 构建商品 URL
             handle = product_data.get('handle', '')
             product_url = f"{self.base_url}/products/{handle}"
 
-            # 检查缓存
+            # 检查缓存（updated_at 变化说明商品已修改，缓存作废）
             if self.use_cache and self.cache:
                 cached_data = self.cache.get(product_url)
-                if cached_data:
+                cached_updated_at = (cached_data or {}).get('metadata', {}).get('updated_at')
+                if cached_data and cached_updated_at == product_data.get('updated_at'):
                     try:
                         return Product(**cached_data)
                     except Exception as e:
@@ -415,7 +977,8 @@ class ProductCrawler:
                     'handle': handle,
                     'available': product_data.get('available', False),
                     'collection_path': collection_path,  # 保留原始分类路径
-                    'category_slug': category_slug  # 保留URL友好的分类名称
+                    'category_slug': category_slug,  # 保留URL友好的分类名称
+                    'updated_at': product_data.get('updated_at')
                 }
             )
 
@@ -515,7 +1078,7 @@ class ProductCrawler:
             Product 对象列表
         """
         collection_url = f"{self.base_url}{collection_path}"
-        response = self.session.get(collection_url, timeout=self.timeout)
+        response = self._get(collection_url)
         response.raise_for_status()
 
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -573,7 +1136,11 @@ class ProductCrawler:
                 selectors=Selectors(),
                 priority="P1",
                 tags=[],
-                metadata={'handle': handle, 'needs_detail_fetch': True}
+                metadata={
+                    'handle': handle,
+                    'needs_detail_fetch': True,
+                    'collection_path': collection_path
+                }
             )
 
             products.append(product)
@@ -582,6 +1149,8 @@ class ProductCrawler:
         return products
 
     def close(self):
-        """关闭 Session，释放资源"""
+        """关闭 Session 和缓存索引，释放资源"""
         self.session.close()
+        if self.cache:
+            self.cache.close()
         logger.info("ProductCrawler session closed")
@@ -0,0 +1,320 @@
+"""
+测试事件日志模块
+
+批量测试的结果原本只保存在内存中，测试结束时一次性写入报告；进程被杀、超时或内存不足时
+已完成的结果全部丢失。本模块在测试执行过程中把事件逐行追加到 JSONL 文件：
+每个步骤开始/结束、每个商品开始/结束各一条，最终报告由事件日志生成。
+
+- 每条事件用一次 O_APPEND write() 写入，写入后其他进程立即可读，
+  多个分片进程可以安全地追加到同一个文件；进程被杀时已写入的事件不会丢失
+- fsync 分批执行（每 FSYNC_EVERY 条或间隔 FSYNC_INTERVAL 秒，以及商品/运行结束时），
+  系统崩溃时最多丢失最近一批事件
+- 读取时跳过末尾未写完的半行，Web 界面可以用 EventTail 增量读取新事件
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+# 每写入多少条事件 fsync 一次
+FSYNC_EVERY = 50
+
+# 距上次 fsync 超过多少秒时立即 fsync
+FSYNC_INTERVAL = 1.0
+
+# 写入后立即 fsync 的事件
+DURABLE_EVENTS = ('product_end', 'run_end', 'test_case')
+
+# 事件日志默认后缀（与报告同名）
+EVENT_LOG_SUFFIX = '.events.jsonl'
+
+
+def event_log_path_for(report_path: Union[str, Path]) -> Path:
+    """报告文件对应的事件日志路径（batch_test_xxx.json -> batch_test_xxx.events.jsonl）"""
+    report_path = Path(report_path)
+    return report_path.with_name(f"{report_path.stem}{EVENT_LOG_SUFFIX}")
+
+
+class EventLog:
+    """只追加的 JSONL 事件日志（线程安全，可多进程同时追加）
+
+    使用示例:
+        with EventLog("reports/batch_test_20251205_091054.events.jsonl") as log:
+            log.emit("step_start", product_id="d11", number=1, name="页面访问")
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        append: bool = True,
+        fsync_every: int = FSYNC_EVERY,
+        fsync_interval: float = FSYNC_INTERVAL
+    ):
+        """
+        打开（或创建）事件日志
+
+        Args:
+            path: 事件日志路径
+            append: 追加到已有日志；False 时清空已有内容
+            fsync_every: 每写入多少条事件 fsync 一次
+            fsync_interval: 距上次 fsync 超过多少秒时立即 fsync
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | (0 if append else os.O_TRUNC)
+        self._fd: Optional[int] = os.open(self.path, flags, 0o644)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def emit(self, event: str, **fields) -> Dict[str, Any]:
+        """
+        追加一条事件
+
+        Args:
+            event: 事件类型（run_start / product_start / step_start / step_end / product_end / run_end ...）
+            **fields: 事件内容（需可 JSON 序列化）
+
+        Returns:
+            写入的事件
+        """
+        record = {'event': event, 'ts': datetime.now().isoformat(), 'pid': os.getpid(), **fields}
+        line = (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        with self._lock:
+            if self._fd is None:
+                raise ValueError(f"事件日志已关闭: {self.path}")
+            os.write(self._fd, line)
+            self._unsynced += 1
+            if (event in DURABLE_EVENTS
+                    or self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+        return record
+
+    def _sync(self):
+        os.fsync(self._fd)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """把已写入的事件刷到磁盘"""
+        with self._lock:
+            if self._fd is not None and self._unsynced:
+                self._sync()
+
+    def close(self):
+        """fsync 并关闭事件日志"""
+        with self._lock:
+            if self._fd is None:
+                return
+            try:
+                if self._unsynced:
+                    self._sync()
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> 'EventLog':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_events(path: Union[str, Path], offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    从指定偏移读取完整的事件行
+
+    末尾没有换行的半行（写入中或进程崩溃时截断）不读取，下次从该位置继续；
+    无法解析的行记录警告后跳过。
+
+    Args:
+        path: 事件日志路径
+        offset: 起始字节偏移
+
+    Returns:
+        (事件列表, 下次读取的偏移)；文件不存在时返回 ([], offset)
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+
+    end = data.rfind(b'\n') + 1
+    events = []
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            events.append(json.loads(line))
+        except ValueError as e:
+            logger.warning(f"跳过无效事件: {path} ({e})")
+    return events, offset + end
+
+
+class EventTail:
+    """增量读取事件日志（用于实时显示测试进度）"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.offset = 0
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """读取上次调用之后新写入的事件"""
+        events, self.offset = read_events(self.path, self.offset)
+        return events
+
+
+class RunReport:
+    """由事件重建批量测试报告（与 batch_test_products.py 写出的报告格式相同）
+
+    商品有 product_end 事件时使用其中的完整结果；只有开始事件（进程被杀、超时）的商品
+    以已完成的步骤记为 error，run_start 中列出但未开始的商品同样记为 error。
+    """
+
+    def __init__(self):
+        self.run: Dict[str, Any] = {}
+        self.ended_at: Optional[str] = None
+        self.last_ts: Optional[str] = None
+        # 商品ID -> {'product_id', 'product_name', 'index', 'started_at', 'steps', 'result'}
+        self.products: Dict[str, Dict[str, Any]] = {}
+
+    def _product(self, product_id: str, **defaults) -> Dict[str, Any]:
+        entry = self.products.get(product_id)
+        if entry is None:
+            entry = self.products[product_id] = {
+                'product_id': product_id,
+                'product_name': defaults.get('product_name', product_id),
+                'index': defaults.get('index'),
+                'started_at': None,
+                'steps': {},
+                'result': None,
+            }
+        return entry
+
+    def apply(self, event: Dict[str, Any]):
+        """应用一条事件"""
+        kind = event.get('event')
+        self.last_ts = event.get('ts', self.last_ts)
+
+        if kind == 'run_start':
+            self.run = event
+            for index, product in enumerate(event.get('products') or (), 1):
+                self._product(product['product_id'], product_name=product.get('product_name'), index=index)
+        elif kind == 'run_end':
+            self.ended_at = event.get('ts')
+        elif kind == 'product_start':
+            entry = self._product(event['product_id'], product_name=event.get('product_name'),
+                                  index=event.get('index'))
+            entry['product_name'] = event.get('product_name', entry['product_name'])
+            entry['index'] = event.get('index', entry['index'])
+            entry['started_at'] = event.get('ts')
+            entry['steps'] = {}
+            entry['result'] = None
+        elif kind == 'step_end':
+            step = event.get('step') or {}
+            self._product(event['product_id'])['steps'][step.get('number')] = step
+        elif kind == 'product_end':
+            result = event.get('result') or {}
+            entry = self._product(result.get('product_id', event.get('product_id')),
+                                  product_name=result.get('product_name'), index=event.get('index'))
+            entry['result'] = result
+
+    def extend(self, events: Iterable[Dict[str, Any]]):
+        """依次应用多条事件"""
+        for event in events:
+            self.apply(event)
+
+    @property
+    def finished(self) -> bool:
+        """是否记录了 run_end 事件"""
+        return self.ended_at is not None
+
+    @staticmethod
+    def _elapsed(start: Optional[str], end: Optional[str]) -> float:
+        if not start or not end:
+            return 0
+        return (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds()
+
+    def results(self) -> List[Dict[str, Any]]:
+        """每个商品的结果，按批次序号排序"""
+        results = []
+        entries = sorted(self.products.values(),
+                         key=lambda e: (e['index'] is None, e['index'] or 0))
+        for entry in entries:
+            if entry['result'] is not None:
+                results.append(entry['result'])
+                continue
+            if entry['started_at']:
+                error = '测试中断：商品未正常结束（进程被终止或超时）'
+            else:
+                error = '商品未执行（测试在开始前中断）'
+            results.append({
+                'product_id': entry['product_id'],
+                'product_name': entry['product_name'],
+                'status': 'error',
+                'duration': round(self._elapsed(entry['started_at'], self.last_ts), 2) if entry['started_at'] else 0,
+                'steps': [entry['steps'][number] for number in sorted(entry['steps'], key=lambda n: n or 0)],
+                'errors': [error],
+            })
+        return results
+
+    def report(self) -> Dict[str, Any]:
+        """生成报告字典"""
+        results = self.results()
+        passed = sum(1 for r in results if r.get('status') == 'passed')
+        failed = sum(1 for r in results if r.get('status') == 'failed')
+        errors = sum(1 for r in results if r.get('status') == 'error')
+        duration = self._elapsed(self.run.get('ts'), self.ended_at or self.last_ts)
+
+        report = {
+            # 与原报告一致使用完成时间（中断时为最后一条事件的时间），报告列表按它排序
+            'timestamp': self.ended_at or self.last_ts or '',
+            'started_at': self.run.get('ts', ''),
+            'test_mode': self.run.get('test_mode'),
+            'test_scope': self.run.get('test_scope', ''),
+            'test_config': self.run.get('test_config', {}),
+            'summary': {
+                'total': len(results),
+                'passed': passed,
+                'failed': failed,
+                'error': errors,
+                'duration': duration
+            },
+            'total': len(results),
+            'passed': passed,
+            'failed': failed,
+            'error': errors,
+            'total_duration': duration,
+            'results': results
+        }
+        if not self.finished:
+            report['interrupted'] = True
+        return report
+
+
+def build_report(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    读取事件日志并生成批量测试报告
+
+    Args:
+        path: 事件日志路径
+
+    Returns:
+        报告字典（未记录 run_end 时带 'interrupted': True）
+    """
+    run_report = RunReport()
+    run_report.extend(read_events(path)[0])
+    return run_report.report()
@@ -5,7 +5,7 @@
 """
 
 from datetime import datetime
-from typing import Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 
@@ -102,6 +102,10 @@ class Product(BaseModel):
         description="测试优先级: P0=核心, P1=重要, P2=普通"
     )
     tags: List[str] = Field(default_factory=list, description="商品标签")
+    metadata: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="爬虫附加信息（handle、分类路径、updated_at 等）"
+    )
 
     # 元数据
     discovered_at: datetime = Field(
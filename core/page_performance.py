@@ -0,0 +1,154 @@
+"""
+页面性能采集模块
+
+在测试步骤边界从浏览器读取 Navigation Timing、Resource Timing 和 Paint 指标
+（TTFB、DOMContentLoaded、load、FCP、LCP、传输字节数、最慢资源），
+用于区分步骤耗时究竟来自服务器响应、页面渲染还是测试自身的等待。
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+
+# LCP 只能通过 PerformanceObserver 获取，需要在页面脚本执行前注册
+LCP_OBSERVER_SCRIPT = """
+(() => {
+    try {
+        new PerformanceObserver((list) => {
+            const entries = list.getEntries();
+            if (entries.length) {
+                window.__perfLcp = entries[entries.length - 1].startTime;
+            }
+        }).observe({type: 'largest-contentful-paint', buffered: true});
+    } catch (e) {}
+})();
+"""
+
+# 读取当前文档的性能指标；resource 只统计上次采集之后新增的条目
+COLLECT_SCRIPT = """
+([lastOrigin, lastResourceIndex, topN]) => {
+    const round = (v) => (typeof v === 'number' && v > 0) ? Math.round(v) : null;
+    const nav = performance.getEntriesByType('navigation')[0];
+    const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+    const newNavigation = performance.timeOrigin !== lastOrigin;
+    const resources = performance.getEntriesByType('resource');
+    const start = newNavigation ? 0 : Math.min(lastResourceIndex, resources.length);
+    const added = resources.slice(start);
+
+    return {
+        url: location.href,
+        new_navigation: newNavigation,
+        time_origin: performance.timeOrigin,
+        ttfb: nav ? round(nav.responseStart) : null,
+        dom_content_loaded: nav ? round(nav.domContentLoadedEventEnd) : null,
+        load: nav ? round(nav.loadEventEnd) : null,
+        fcp: fcp ? round(fcp.startTime) : null,
+        lcp: round(window.__perfLcp),
+        document_transfer_size: nav ? nav.transferSize : null,
+        resource_count: added.length,
+        resource_index: resources.length,
+        resource_transfer_size: added.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+        slowest_resources: added
+            .slice()
+            .sort((a, b) => b.duration - a.duration)
+            .slice(0, topN)
+            .map((r) => ({
+                url: r.name.slice(0, 200),
+                type: r.initiatorType,
+                duration: Math.round(r.duration),
+                transfer_size: r.transferSize || 0
+            }))
+    };
+}
+"""
+
+# 每个步骤最多记录的最慢资源数
+SLOWEST_RESOURCES_LIMIT = 5
+
+
+class PagePerformanceCollector:
+    """按步骤采集页面性能指标
+
+    同一文档内多次采集时，资源统计只包含上次采集之后新增的请求；
+    发生新的导航时 new_navigation 为 True，导航指标属于新页面。
+
+    使用示例:
+        collector = PagePerformanceCollector()
+        await collector.attach(page)
+        ...
+        step.performance = await collector.collect(page)
+    """
+
+    def __init__(self):
+        self._time_origin: Optional[float] = None
+        self._resource_index = 0
+
+    async def attach(self, page: Page):
+        """注册 LCP 观察脚本（对之后加载的页面生效）"""
+        await page.add_init_script(script=LCP_OBSERVER_SCRIPT)
+
+    async def collect(self, page: Optional[Page]) -> Optional[Dict]:
+        """采集当前页面的性能指标
+
+        Args:
+            page: 页面对象
+
+        Returns:
+            性能指标字典（时间单位毫秒，大小单位字节）；页面不可用时返回 None
+        """
+        if page is None or page.is_closed():
+            return None
+
+        try:
+            metrics = await page.evaluate(
+                COLLECT_SCRIPT,
+                [self._time_origin, self._resource_index, SLOWEST_RESOURCES_LIMIT]
+            )
+        except Exception as e:
+            logger.debug(f"采集页面性能指标失败: {e}")
+            return None
+
+        self._time_origin = metrics.pop("time_origin", None)
+        self._resource_index = metrics.pop("resource_index", 0)
+        return metrics
+
+
+def product_page_metrics(result: Dict) -> Optional[Dict]:
+    """从单个商品的测试结果中取商品页的导航性能指标
+
+    取第一个发生新导航的步骤（即「页面访问」步骤）的性能数据。
+
+    Args:
+        result: ProductTester.run() 或批量报告中的单个商品结果
+
+    Returns:
+        性能指标字典；没有采集到时返回 None
+    """
+    for step in result.get("steps", []):
+        performance = step.get("performance")
+        if performance and performance.get("new_navigation"):
+            return performance
+    return None
+
+
+def slowest_resources(results: List[Dict], limit: int = 10) -> List[Dict]:
+    """汇总一批结果中所有步骤的最慢资源
+
+    Args:
+        results: 商品测试结果列表
+        limit: 返回的资源数量
+
+    Returns:
+        按耗时降序的资源列表（附带商品ID）
+    """
+    resources = []
+    for result in results:
+        for step in result.get("steps", []):
+            for resource in (step.get("performance") or {}).get("slowest_resources", []):
+                resources.append({**resource, "product_id": result.get("product_id")})
+    resources.sort(key=lambda r: r.get("duration", 0), reverse=True)
+    return resources[:limit]
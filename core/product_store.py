@@ -0,0 +1,346 @@
+"""
+商品索引存储模块
+
+data/products.json 仍是商品目录的标准格式（discover_products.py 写入，脚本和 Web 读取），
+本模块在旁边维护一个 SQLite 索引（默认与 JSON 同名的 .db 文件）：按商品 ID 主键查找，
+按分类、优先级、测试状态走索引过滤，不必每次都解析整个 JSON 文件。
+
+索引记录导入时 JSON 文件的大小和修改时间，文件被重写后再次打开会自动重新导入。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+# 等待其他进程释放数据库锁的最长时间（秒）
+BUSY_TIMEOUT_SECONDS = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    category TEXT,
+    priority TEXT,
+    test_status TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_position ON products (position);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category, position);
+CREATE INDEX IF NOT EXISTS idx_products_priority ON products (priority, position);
+CREATE INDEX IF NOT EXISTS idx_products_test_status ON products (test_status, position);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _file_stamp(path: Path) -> str:
+    """文件大小和修改时间，用于判断 JSON 文件是否变化"""
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class ProductStore:
+    """商品索引存储（线程安全，SQLite WAL 模式允许多个进程同时读取）
+
+    使用示例:
+        store = ProductStore.for_catalog("data/products.json")
+        product = store.get("6129961074884")
+        p0_bikes = store.find(category="Electric Bikes", priority="P0")
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        打开（或创建）索引数据库
+
+        Args:
+            db_path: 索引数据库路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_catalog(
+        cls,
+        json_path: Union[str, Path],
+        db_path: Optional[Union[str, Path]] = None
+    ) -> 'ProductStore':
+        """
+        打开 JSON 商品目录对应的索引，JSON 文件变化时重新导入
+
+        Args:
+            json_path: 商品目录 JSON 文件
+            db_path: 索引数据库路径，默认与 JSON 同名的 .db 文件
+
+        Returns:
+            与 JSON 文件内容一致的 ProductStore
+        """
+        json_path = Path(json_path)
+        store = cls(db_path or json_path.with_suffix('.db'))
+        store.sync(json_path)
+        return store
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, json_path: Union[str, Path]) -> bool:
+        """
+        JSON 文件与上次导入时不同则重新导入
+
+        Args:
+            json_path: 商品目录 JSON 文件
+
+        Returns:
+            是否重新导入
+        """
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return False
+        if (self._get_meta('source') == str(json_path.resolve())
+                and self._get_meta('source_stamp') == _file_stamp(json_path)):
+            return False
+        self.import_json(json_path)
+        return True
+
+    def import_json(self, json_path: Union[str, Path]) -> int:
+        """
+        从 JSON 商品目录导入，替换索引中的全部商品
+
+        支持 {"metadata": ..., "products": [...]} 格式和旧的商品数组格式。
+
+        Args:
+            json_path: 商品目录 JSON 文件
+
+        Returns:
+            导入的商品数量
+        """
+        json_path = Path(json_path)
+        stamp = _file_stamp(json_path)
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if isinstance(data, dict):
+            products = data.get('products', [])
+            metadata = data.get('metadata', {})
+        else:
+            products = data if isinstance(data, list) else []
+            metadata = {}
+
+        self.replace_all(products, metadata, source=json_path, source_stamp=stamp)
+        logger.info(f"已从 {json_path} 导入 {len(products)} 个商品到索引 {self.db_path}")
+        return len(products)
+
+    def replace_all(
+        self,
+        products: Iterable[Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]] = None,
+        source: Optional[Path] = None,
+        source_stamp: Optional[str] = None
+    ):
+        """
+        用给定商品替换索引中的全部商品
+
+        Args:
+            products: 商品字典（按目录顺序）
+            metadata: 目录元数据
+            source: 对应的 JSON 文件
+            source_stamp: JSON 文件的大小和修改时间
+        """
+        rows = [self._row(position, product) for position, product in enumerate(products)]
+        meta = {'metadata': json.dumps(metadata or {}, ensure_ascii=False)}
+        if source is not None:
+            meta['source'] = str(Path(source).resolve())
+            meta['source_stamp'] = source_stamp or ''
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM products")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO products (id, position, category, priority, test_status, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute("DELETE FROM store_meta")
+            self._conn.executemany(
+                "INSERT INTO store_meta (key, value) VALUES (?, ?)", list(meta.items())
+            )
+
+    @staticmethod
+    def _row(position: int, product: Dict[str, Any]) -> tuple:
+        return (
+            str(product['id']),
+            position,
+            product.get('category'),
+            product.get('priority'),
+            product.get('test_status'),
+            json.dumps(product, ensure_ascii=False),
+        )
+
+    def upsert(self, products: Iterable[Dict[str, Any]]):
+        """
+        新增或更新商品；新商品追加到目录末尾
+
+        索引的修改需要 export_json() 写回 JSON 文件才会被其他读取 JSON 的工具看到。
+
+        Args:
+            products: 商品字典
+        """
+        with self._lock, self._conn:
+            next_position = self._conn.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM products"
+            ).fetchone()[0]
+            for product in products:
+                existing = self._conn.execute(
+                    "SELECT position FROM products WHERE id = ?", (str(product['id']),)
+                ).fetchone()
+                if existing:
+                    position = existing[0]
+                else:
+                    position = next_position
+                    next_position += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO products (id, position, category, priority, test_status, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self._row(position, product)
+                )
+
+    def export_json(self, json_path: Union[str, Path]):
+        """
+        导出为 {"metadata": ..., "products": [...]} 格式的 JSON 文件（原子替换）
+
+        Args:
+            json_path: 输出文件路径
+        """
+        json_path = Path(json_path)
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {'metadata': self.metadata(), 'products': self.find()}
+
+        fd, tmp_path = tempfile.mkstemp(dir=json_path.parent, prefix=f".{json_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, json_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        # 导出的文件与索引内容一致，记录下来避免下次打开时重复导入
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)",
+                [('source', str(json_path.resolve())), ('source_stamp', _file_stamp(json_path))]
+            )
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """
+        按商品 ID 查找
+
+        Args:
+            product_id: 商品 ID
+
+        Returns:
+            商品字典；不存在时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM products WHERE id = ?", (product_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, product_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量按商品 ID 查找
+
+        Args:
+            product_ids: 商品 ID 列表
+
+        Returns:
+            {商品ID: 商品字典}，不存在的 ID 不在结果中
+        """
+        found = {}
+        for product_id in product_ids:
+            product = self.get(product_id)
+            if product is not None:
+                found[product_id] = product
+        return found
+
+    @staticmethod
+    def _where(category, priority, test_status):
+        clauses, params = [], []
+        for column, value in (('category', category), ('priority', priority), ('test_status', test_status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def find(
+        self,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        test_status: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按条件过滤商品，保持目录顺序
+
+        Args:
+            category: 分类（精确匹配）
+            priority: 优先级（P0/P1/P2）
+            test_status: 测试状态
+            limit: 最多返回数量
+
+        Returns:
+            商品字典列表
+        """
+        where, params = self._where(category, priority, test_status)
+        sql = f"SELECT data FROM products{where} ORDER BY position"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(
+        self,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        test_status: Optional[str] = None
+    ) -> int:
+        """按条件统计商品数量"""
+        where, params = self._where(category, priority, test_status)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM products{where}", params).fetchone()[0]
+
+    def metadata(self) -> Dict[str, Any]:
+        """目录元数据"""
+        value = self._get_meta('metadata')
+        return json.loads(value) if value else {}
+
+    def close(self):
+        """关闭索引数据库"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'ProductStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,226 @@
+"""
+请求限速模块
+
+按域名的自适应令牌桶限速器，供爬虫在多线程并发抓取时共享，
+替代固定的 time.sleep 间隔：同一域名的请求按当前速率排队，不同域名互不影响。
+
+速率按 AIMD 调整：响应快时线性提高速率，收到 429/503 时速率减半，
+并在 Retry-After 指定的时间内暂停该域名的所有请求。
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+# 每个域名默认每秒请求数（初始速率）
+DEFAULT_REQUESTS_PER_SECOND = 4.0
+# 自适应调整的速率上下限
+DEFAULT_MIN_REQUESTS_PER_SECOND = 0.5
+DEFAULT_MAX_REQUESTS_PER_SECOND = 10.0
+# 响应快于该耗时（秒）时提高速率
+FAST_RESPONSE_SECONDS = 1.0
+# 每次快速响应提高的速率（请求/秒）
+RATE_INCREASE_STEP = 0.25
+# 表示服务端限流的状态码
+THROTTLE_STATUS_CODES = (429, 503)
+# 没有 Retry-After 头时的默认暂停时间（秒）
+DEFAULT_RETRY_AFTER = 5.0
+# Retry-After 最长遵循时间（秒），防止异常值让爬虫长时间挂起
+MAX_RETRY_AFTER = 120.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 响应头
+
+    Args:
+        value: 秒数或 HTTP 日期格式的头部值
+
+    Returns:
+        需要等待的秒数；无法解析时返回 None
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class _HostState:
+    """单个域名的令牌桶状态"""
+    rate: float
+    tokens: float
+    updated_at: float
+    blocked_until: float = 0.0
+    requests: int = 0
+    throttled: int = 0
+    rate_decreases: int = 0
+
+
+class HostRateLimiter:
+    """按域名的自适应令牌桶限速器（线程安全）
+
+    acquire() 在锁内预约令牌（令牌可以为负，表示已被后续请求预约），
+    在锁外等待，多个线程并发请求同一域名时会被均匀错开。
+    每次响应后调用 record_response() 反馈状态码和耗时以调整速率。
+
+    使用示例:
+        limiter = HostRateLimiter(requests_per_second=4)
+        limiter.acquire(url)
+        response = session.get(url)
+        limiter.record_response(url, response.status_code, elapsed,
+                                response.headers.get('Retry-After'))
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        min_rate: float = DEFAULT_MIN_REQUESTS_PER_SECOND,
+        max_rate: float = DEFAULT_MAX_REQUESTS_PER_SECOND,
+        burst: float = 1.0
+    ):
+        """
+        初始化限速器
+
+        Args:
+            requests_per_second: 每个域名的初始每秒请求数，<= 0 表示不限速
+            min_rate: 限流后速率下限
+            max_rate: 自适应提速的速率上限
+            burst: 令牌桶容量（允许的突发请求数）
+        """
+        self.requests_per_second = requests_per_second
+        self.min_rate = min(min_rate, requests_per_second) if requests_per_second > 0 else min_rate
+        self.max_rate = max(max_rate, requests_per_second)
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+        self.total_wait_time = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用限速"""
+        return self.requests_per_second > 0
+
+    def _state(self, host: str, now: float) -> _HostState:
+        """获取域名状态并按当前速率补充令牌（调用方需持有锁）"""
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(rate=self.requests_per_second, tokens=self.burst, updated_at=now)
+            self._hosts[host] = state
+        else:
+            elapsed = now - state.updated_at
+            state.tokens = min(self.burst, state.tokens + elapsed * state.rate)
+            state.updated_at = now
+        return state
+
+    def acquire(self, url: str) -> float:
+        """等待直到可以向该 URL 所在域名发起请求
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            实际等待的秒数
+        """
+        if not self.enabled:
+            return 0.0
+
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host, now)
+            state.requests += 1
+            state.tokens -= 1
+            # 暂停期间排队的请求在暂停结束后仍按令牌间隔错开，避免同时涌向该域名
+            delay = max(0.0, state.blocked_until - now) + max(0.0, -state.tokens) / state.rate
+            self.total_wait_time += delay
+
+        if delay > 0:
+            logger.debug(f"Rate limit: waiting {delay:.2f}s for {host}")
+            time.sleep(delay)
+        return delay
+
+    def record_response(
+        self,
+        url: str,
+        status_code: int,
+        elapsed: float,
+        retry_after: Optional[str] = None
+    ):
+        """根据响应调整该域名的速率
+
+        Args:
+            url: 请求 URL
+            status_code: HTTP 状态码
+            elapsed: 请求耗时（秒）
+            retry_after: Retry-After 响应头
+        """
+        if not self.enabled:
+            return
+
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host, now)
+
+            if status_code in THROTTLE_STATUS_CODES:
+                state.throttled += 1
+                state.rate_decreases += 1
+                state.rate = max(self.min_rate, state.rate / 2)
+                # 清空已预约的令牌，暂停期结束后按新速率重新开始
+                state.tokens = min(state.tokens, 0.0)
+
+                wait = parse_retry_after(retry_after)
+                wait = DEFAULT_RETRY_AFTER if wait is None else min(wait, MAX_RETRY_AFTER)
+                state.blocked_until = max(state.blocked_until, now + wait)
+                logger.warning(
+                    f"Throttled by {host} (HTTP {status_code}), "
+                    f"rate -> {state.rate:.2f}/s, pausing {wait:.1f}s"
+                )
+            elif isinstance(status_code, int) and status_code < 400 and elapsed <= FAST_RESPONSE_SECONDS:
+                state.rate = min(self.max_rate, state.rate + RATE_INCREASE_STEP)
+
+    def get_rate(self, url: str) -> float:
+        """获取 URL 所在域名的当前速率（请求/秒）"""
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            state = self._hosts.get(host)
+            return state.rate if state else self.requests_per_second
+
+    def get_stats(self) -> Dict:
+        """获取限速统计
+
+        Returns:
+            统计信息字典，hosts 为各域名的当前速率、请求数和被限流次数
+        """
+        with self._lock:
+            return {
+                'requests_per_second': self.requests_per_second,
+                'total_wait_time': round(self.total_wait_time, 2),
+                'throttled_responses': sum(s.throttled for s in self._hosts.values()),
+                'hosts': {
+                    host: {
+                        'current_rate': round(state.rate, 2),
+                        'requests': state.requests,
+                        'throttled': state.throttled,
+                        'rate_decreases': state.rate_decreases,
+                    }
+                    for host, state in self._hosts.items()
+                },
+            }
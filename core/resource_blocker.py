@@ -0,0 +1,157 @@
+"""
+网络资源拦截模块
+
+按测试模式拦截与测试无关的资源（大图、视频、字体、第三方统计/客服组件），
+减少页面下载量，并统计拦截数量、节省字节数与页面加载耗时。
+"""
+
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import Page, Request, Response, Route
+
+logger = logging.getLogger(__name__)
+
+
+# 第三方统计、广告、客服聊天和弹窗组件，所有模式都不需要
+THIRD_PARTY_BLOCKED_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "connect.facebook.net",
+    "facebook.com",
+    "analytics.tiktok.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "static.klaviyo.com",
+    "a.klaviyo.com",
+    "ct.pinterest.com",
+    "sc-static.net",
+    "snap.licdn.com",
+    "gorgias.chat",
+    "widget.tidio.co",
+    "static.zdassets.com",
+    "widget.intercom.io",
+    "cdn.judge.me",
+]
+
+# 各测试模式的拦截规则
+# quick: 只检查标题/价格/加购/购物车，图片、视频、字体都不需要
+# full: 保留图片（步骤5 商品图片验证需要），仍拦截视频和字体
+BLOCK_PROFILES: Dict[str, Dict[str, List[str]]] = {
+    "quick": {
+        "resource_types": ["image", "media", "font"],
+        "hosts": THIRD_PARTY_BLOCKED_HOSTS,
+    },
+    "full": {
+        "resource_types": ["media", "font"],
+        "hosts": THIRD_PARTY_BLOCKED_HOSTS,
+    },
+}
+
+# 被拦截请求无法得知实际大小，按资源类型的典型体积估算节省字节数
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 150 * 1024,
+    "media": 2 * 1024 * 1024,
+    "font": 40 * 1024,
+    "script": 80 * 1024,
+}
+DEFAULT_ESTIMATED_BYTES = 20 * 1024
+
+
+class ResourceBlocker:
+    """按测试模式拦截页面网络资源
+
+    使用示例:
+        blocker = ResourceBlocker("quick")
+        await blocker.attach(page)
+        ...
+        stats = blocker.get_stats()
+    """
+
+    def __init__(self, test_mode: str = "quick", enabled: bool = True):
+        """
+        初始化资源拦截器
+
+        Args:
+            test_mode: 测试模式 (quick/full)，决定使用哪套拦截规则
+            enabled: 是否启用拦截；关闭时仍统计下载字节数，便于对比
+        """
+        profile = BLOCK_PROFILES.get(test_mode, BLOCK_PROFILES["full"])
+        self.test_mode = test_mode
+        self.enabled = enabled
+        self.blocked_types = set(profile["resource_types"])
+        self.blocked_hosts = list(profile["hosts"])
+
+        self.blocked_requests = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.estimated_bytes_saved = 0
+        self.bytes_loaded = 0
+        self.page_load_time: Optional[float] = None
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """判断请求是否应被拦截
+
+        Args:
+            resource_type: Playwright 资源类型 (document/script/image/...)
+            url: 请求 URL
+
+        Returns:
+            是否拦截
+        """
+        if not self.enabled or resource_type == "document":
+            return False
+        if resource_type in self.blocked_types:
+            return True
+
+        host = urlparse(url).hostname or ""
+        return any(host == blocked or host.endswith("." + blocked) for blocked in self.blocked_hosts)
+
+    async def attach(self, page: Page):
+        """在页面上注册路由拦截和响应统计"""
+        if self.enabled:
+            await page.route("**/*", self._handle_route)
+        page.on("response", self._on_response)
+
+    async def _handle_route(self, route: Route):
+        """路由处理：命中规则的请求直接中止，其余交给后续路由（如 HAR 回放）或网络"""
+        request: Request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self._record_blocked(request.resource_type)
+            await route.abort()
+        else:
+            await route.fallback()
+
+    def _record_blocked(self, resource_type: str):
+        """记录一次被拦截的请求"""
+        self.blocked_requests += 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        self.estimated_bytes_saved += ESTIMATED_RESOURCE_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+
+    def _on_response(self, response: Response):
+        """累计实际下载的字节数（以 content-length 为准，缺失时忽略）"""
+        try:
+            length = response.headers.get("content-length")
+            if length:
+                self.bytes_loaded += int(length)
+        except (ValueError, TypeError):
+            pass
+
+    def get_stats(self) -> Dict:
+        """获取拦截统计
+
+        Returns:
+            统计信息字典
+        """
+        return {
+            "blocking_enabled": self.enabled,
+            "blocking_profile": self.test_mode,
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "bytes_loaded": self.bytes_loaded,
+            "page_load_time": round(self.page_load_time, 2) if self.page_load_time is not None else None,
+        }
@@ -0,0 +1,633 @@
+"""
+测试结果数据库模块
+
+reports/ 下的 JSON 报告文件仍是各工具写出的标准格式，本模块在 reports/results.db
+维护一个 SQLite 结果库：运行（runs）、每次运行的商品结果（run_products）、
+步骤结果（run_steps）和 AI 分析（ai_analyses）分表保存，并按时间、商品和状态建立索引。
+Web 报告中心和趋势分析直接查询结果库，不必每次 glob 并解析全部报告文件。
+
+写入方在保存报告文件后调用 record_run() / record_ai_analysis() 写入结果库；
+import_reports() 导入已有的报告文件，并按文件大小和修改时间跳过未变化的文件。
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+# 等待其他进程释放数据库锁的最长时间（秒）
+BUSY_TIMEOUT_SECONDS = 10.0
+
+# 结果库默认文件名（位于报告目录下）
+DEFAULT_DB_NAME = "results.db"
+
+# 运行类型：suite = test_results.json（pytest 报告目录），batch = batch_test_*.json，
+# web = Web 界面保存的 test_*.json
+RUN_KINDS = ('suite', 'batch', 'web')
+
+# suite 报告文件的 glob 规则（相对报告目录）：报告中心只列出 test_* 目录中的报告
+SUITE_REPORT_PATTERN = 'test_*/test_results.json'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    timestamp TEXT NOT NULL DEFAULT '',
+    test_mode TEXT,
+    test_scope TEXT,
+    status TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    duration REAL NOT NULL DEFAULT 0,
+    summary TEXT NOT NULL DEFAULT '{}',
+    test_config TEXT NOT NULL DEFAULT '{}',
+    path TEXT,
+    source_stamp TEXT,
+    -- 报告文件的修改时间（Unix 时间戳），用于查找最新报告
+    recorded_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_kind ON runs (kind, timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_status ON runs (status);
+CREATE INDEX IF NOT EXISTS idx_runs_path ON runs (path);
+CREATE TABLE IF NOT EXISTS run_products (
+    run_id TEXT NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    product_id TEXT,
+    product_name TEXT,
+    status TEXT,
+    duration REAL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_run_products_product ON run_products (product_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_run_products_status ON run_products (status);
+CREATE TABLE IF NOT EXISTS run_steps (
+    run_id TEXT NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    product_position INTEGER NOT NULL,
+    number INTEGER,
+    name TEXT,
+    status TEXT,
+    duration REAL,
+    message TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_run_steps_run ON run_steps (run_id, product_position);
+CREATE INDEX IF NOT EXISTS idx_run_steps_status ON run_steps (status, name);
+CREATE TABLE IF NOT EXISTS ai_analyses (
+    id TEXT PRIMARY KEY,
+    report_id TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT '',
+    provider TEXT,
+    summary TEXT,
+    path TEXT,
+    source_stamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ai_analyses_report ON ai_analyses (report_id);
+CREATE INDEX IF NOT EXISTS idx_ai_analyses_created ON ai_analyses (created_at);
+"""
+
+_RUN_COLUMNS = "id, kind, timestamp, test_mode, test_scope, summary, test_config, path"
+
+
+def _file_stamp(path: Path) -> str:
+    """文件大小和修改时间，用于判断报告文件是否变化"""
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _product_entries(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """报告中的商品结果（batch: results，web: products，suite: tests）"""
+    for key in ('results', 'products', 'tests'):
+        entries = data.get(key)
+        if isinstance(entries, list):
+            return [e for e in entries if isinstance(e, dict)]
+    return []
+
+
+def _summary(data: Dict[str, Any], products: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """报告摘要；旧的批量报告只有顶层的 total/passed/failed 字段"""
+    summary = data.get('summary')
+    if isinstance(summary, dict):
+        return summary
+    summary = {key: data[key] for key in ('total', 'passed', 'failed', 'error') if key in data}
+    if 'total_duration' in data:
+        summary['duration'] = data['total_duration']
+    if not summary and products:
+        summary = {
+            'total': len(products),
+            'passed': sum(1 for p in products if p.get('status') == 'passed'),
+            'failed': sum(1 for p in products if p.get('status') != 'passed'),
+        }
+    return summary
+
+
+def _number(value: Any) -> float:
+    return value if isinstance(value, (int, float)) else 0
+
+
+def _ai_summary(data: Dict[str, Any]) -> str:
+    """AI 分析列表中显示的摘要"""
+    if data.get('summary'):
+        return data['summary']
+    analysis = data.get('analysis') or ''
+    return analysis[:100] + '...' if analysis else ''
+
+
+class ResultsDB:
+    """测试结果数据库（线程安全，SQLite WAL 模式允许多个进程同时读取）
+
+    使用示例:
+        db = ResultsDB.for_reports("reports")
+        reports = db.list_runs()
+        report = db.get_run("batch_test_20251205_091054")
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        打开（或创建）结果库
+
+        Args:
+            db_path: 结果库路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_reports(
+        cls,
+        reports_dir: Union[str, Path],
+        db_path: Optional[Union[str, Path]] = None,
+        suite_pattern: str = SUITE_REPORT_PATTERN
+    ) -> 'ResultsDB':
+        """
+        打开报告目录对应的结果库，并导入新增或变化的报告文件
+
+        Args:
+            reports_dir: 报告目录
+            db_path: 结果库路径，默认 <报告目录>/results.db
+            suite_pattern: suite 报告文件的 glob 规则
+
+        Returns:
+            与报告目录内容一致的 ResultsDB
+        """
+        reports_dir = Path(reports_dir)
+        db = cls(db_path or reports_dir / DEFAULT_DB_NAME)
+        db.import_reports(reports_dir, suite_pattern=suite_pattern)
+        return db
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def record_run(
+        self,
+        run_id: str,
+        data: Dict[str, Any],
+        kind: str,
+        path: Optional[Union[str, Path]] = None,
+        source_stamp: Optional[str] = None
+    ):
+        """
+        写入（或替换）一次测试运行
+
+        Args:
+            run_id: 报告ID（文件名或报告目录名）
+            data: 报告内容（与报告文件相同的字典）
+            kind: 运行类型（suite / batch / web）
+            path: 报告文件路径
+            source_stamp: 报告文件的大小和修改时间，默认在写入时读取
+        """
+        if kind not in RUN_KINDS:
+            raise ValueError(f"未知的运行类型: {kind}")
+        recorded_at = time.time()
+        if path is not None:
+            path = Path(path).resolve()
+            if path.exists():
+                recorded_at = path.stat().st_mtime
+                if source_stamp is None:
+                    source_stamp = _file_stamp(path)
+
+        products = _product_entries(data)
+        summary = _summary(data, products)
+        test_config = data.get('test_config') or {}
+
+        product_rows = []
+        step_rows = []
+        for position, product in enumerate(products):
+            product_rows.append((
+                run_id,
+                position,
+                product.get('product_id'),
+                product.get('product_name'),
+                product.get('status'),
+                product.get('duration'),
+            ))
+            for step in product.get('steps') or ():
+                if not isinstance(step, dict):
+                    continue
+                step_rows.append((
+                    run_id,
+                    position,
+                    step.get('number'),
+                    step.get('name'),
+                    step.get('status'),
+                    step.get('duration'),
+                    step.get('message'),
+                    step.get('error'),
+                ))
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            self._conn.execute(
+                "INSERT INTO runs (id, kind, timestamp, test_mode, test_scope, status, total, passed, failed, "
+                "duration, summary, test_config, path, source_stamp, recorded_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    kind,
+                    data.get('timestamp') or '',
+                    data.get('test_mode'),
+                    data.get('test_scope'),
+                    data.get('status'),
+                    _number(summary.get('total')),
+                    _number(summary.get('passed')),
+                    _number(summary.get('failed')),
+                    _number(summary.get('duration')),
+                    json.dumps(summary, ensure_ascii=False),
+                    json.dumps(test_config, ensure_ascii=False),
+                    str(path) if path is not None else None,
+                    source_stamp,
+                    recorded_at,
+                    json.dumps(data, ensure_ascii=False),
+                )
+            )
+            self._conn.executemany(
+                "INSERT INTO run_products (run_id, position, product_id, product_name, status, duration) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                product_rows
+            )
+            self._conn.executemany(
+                "INSERT INTO run_steps (run_id, product_position, number, name, status, duration, message, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                step_rows
+            )
+
+    def record_ai_analysis(
+        self,
+        analysis_id: str,
+        report_id: str,
+        data: Dict[str, Any],
+        path: Optional[Union[str, Path]] = None,
+        source_stamp: Optional[str] = None
+    ):
+        """
+        写入（或替换）一份 AI 分析的列表信息
+
+        Args:
+            analysis_id: AI 分析ID
+            report_id: 对应的报告ID
+            data: AI 分析文件内容
+            path: AI 分析文件路径
+            source_stamp: 文件的大小和修改时间，默认在写入时读取
+        """
+        if path is not None:
+            path = Path(path).resolve()
+            if source_stamp is None and path.exists():
+                source_stamp = _file_stamp(path)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_analyses (id, report_id, created_at, provider, summary, path, source_stamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    analysis_id,
+                    report_id,
+                    data.get('created_at', data.get('timestamp', '')) or '',
+                    data.get('provider', 'unknown'),
+                    _ai_summary(data),
+                    str(path) if path is not None else None,
+                    source_stamp,
+                )
+            )
+
+    def delete_run(self, run_id: str) -> bool:
+        """
+        删除一次运行及其 AI 分析
+
+        Args:
+            run_id: 报告ID
+
+        Returns:
+            结果库中是否存在该运行
+        """
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,)).rowcount
+            self._conn.execute("DELETE FROM ai_analyses WHERE report_id = ?", (run_id,))
+        return deleted > 0
+
+    # ------------------------------------------------------------------
+    # 导入已有报告文件
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _report_files(reports_dir: Path, suite_pattern: str) -> Iterable[Tuple[str, str, Path]]:
+        """报告目录中的 (运行类型, 报告ID, 文件)；batch/web 报告与报告中心原有的 glob 规则一致（不含 AI 分析文件）"""
+        for result_file in sorted(reports_dir.glob(suite_pattern)):
+            run_id = result_file.parent.relative_to(reports_dir).as_posix()
+            yield 'suite', result_file.stem if run_id == '.' else run_id, result_file
+        for report_file in sorted(reports_dir.glob('batch_test_*.json')):
+            if not report_file.name.endswith('_ai_analysis.json'):
+                yield 'batch', report_file.stem, report_file
+        for report_file in sorted(reports_dir.glob('test_*.json')):
+            if report_file.name != 'test_results.json' and not report_file.name.endswith('_ai_analysis.json'):
+                yield 'web', report_file.stem, report_file
+
+    @staticmethod
+    def _ai_files(reports_dir: Path) -> Iterable[Tuple[str, str, Path]]:
+        """报告目录中的 (AI 分析ID, 报告ID, 文件)"""
+        for ai_file in sorted(reports_dir.glob('*_ai_analysis.json')):
+            yield ai_file.stem, ai_file.stem[:-len('_ai_analysis')], ai_file
+        for ai_file in sorted(reports_dir.glob('test_*/ai_analysis.json')):
+            yield f"{ai_file.parent.name}_ai", ai_file.parent.name, ai_file
+
+    def _known_stamps(self, table: str) -> Dict[str, Tuple[str, Optional[str]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT path, id, source_stamp FROM {table} WHERE path IS NOT NULL"
+            ).fetchall()
+        return {path: (row_id, stamp) for path, row_id, stamp in rows}
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"跳过无效报告: {path} ({e})")
+            return None
+        return data if isinstance(data, dict) else None
+
+    def import_reports(
+        self,
+        reports_dir: Union[str, Path],
+        suite_pattern: str = SUITE_REPORT_PATTERN
+    ) -> Dict[str, int]:
+        """
+        导入报告目录中新增或变化的报告文件，删除文件已不存在的记录
+
+        Args:
+            reports_dir: 报告目录
+            suite_pattern: suite 报告文件的 glob 规则，默认只查找 test_* 目录
+
+        Returns:
+            {'imported': 导入数, 'unchanged': 未变化数, 'removed': 删除数, 'invalid': 无效文件数}
+        """
+        reports_dir = Path(reports_dir).resolve()
+        stats = {'imported': 0, 'unchanged': 0, 'removed': 0, 'invalid': 0}
+        if not reports_dir.is_dir():
+            return stats
+
+        known_runs = self._known_stamps('runs')
+        seen_ids = set()
+        for kind, run_id, report_file in self._report_files(reports_dir, suite_pattern):
+            # 同名的报告目录优先于 test_*.json 文件
+            if run_id in seen_ids:
+                continue
+            seen_ids.add(run_id)
+            path = str(report_file.resolve())
+            stamp = _file_stamp(report_file)
+            if known_runs.pop(path, (None, None))[1] == stamp:
+                stats['unchanged'] += 1
+                continue
+            data = self._read_json(report_file)
+            if data is None:
+                stats['invalid'] += 1
+                continue
+            self.record_run(run_id, data, kind, path=path, source_stamp=stamp)
+            stats['imported'] += 1
+
+        known_ai = self._known_stamps('ai_analyses')
+        for analysis_id, report_id, ai_file in self._ai_files(reports_dir):
+            path = str(ai_file.resolve())
+            stamp = _file_stamp(ai_file)
+            if known_ai.pop(path, (None, None))[1] == stamp:
+                continue
+            data = self._read_json(ai_file)
+            if data is not None:
+                self.record_ai_analysis(analysis_id, report_id, data, path=path, source_stamp=stamp)
+
+        # 报告目录下已被删除的文件
+        with self._lock, self._conn:
+            for table, stale in (('runs', known_runs), ('ai_analyses', known_ai)):
+                for path, (row_id, _) in stale.items():
+                    if Path(path).is_relative_to(reports_dir) and not Path(path).exists():
+                        self._conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+                        if table == 'runs':
+                            stats['removed'] += 1
+
+        if stats['imported'] or stats['removed']:
+            logger.info(
+                f"结果库 {self.db_path}: 导入 {stats['imported']} 份报告，删除 {stats['removed']} 份"
+            )
+        return stats
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _run_summary(row: tuple) -> Dict[str, Any]:
+        run_id, kind, timestamp, test_mode, test_scope, summary, test_config, path = row
+        return {
+            'id': run_id,
+            'kind': kind,
+            'timestamp': timestamp,
+            'summary': json.loads(summary),
+            'test_mode': test_mode or '',
+            'test_scope': test_scope or '',
+            'test_config': json.loads(test_config),
+            'path': path,
+        }
+
+    @staticmethod
+    def _where(kinds: Optional[Iterable[str]], since: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if kinds is not None:
+            kinds = list(kinds)
+            clauses.append(f"kind IN ({', '.join('?' * len(kinds))})")
+            params.extend(kinds)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def list_runs(
+        self,
+        kinds: Optional[Iterable[str]] = None,
+        since: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        报告列表（不含商品和步骤明细），按时间倒序
+
+        Args:
+            kinds: 只返回这些运行类型
+            since: 只返回该时间（ISO 格式）之后的运行
+            limit: 最多返回数量
+
+        Returns:
+            [{'id', 'kind', 'timestamp', 'summary', 'test_mode', 'test_scope', 'test_config', 'path'}, ...]
+        """
+        where, params = self._where(kinds, since)
+        sql = f"SELECT {_RUN_COLUMNS} FROM runs{where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._run_summary(row) for row in rows]
+
+    def load_runs(
+        self,
+        kinds: Optional[Iterable[str]] = None,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        完整报告内容，按时间正序（供趋势分析使用）
+
+        Args:
+            kinds: 只返回这些运行类型
+            since: 只返回该时间（ISO 格式）之后的运行
+
+        Returns:
+            报告字典列表
+        """
+        where, params = self._where(kinds, since)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM runs{where} ORDER BY timestamp, id", params
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        按报告ID查找完整报告
+
+        Args:
+            run_id: 报告ID
+
+        Returns:
+            报告字典；不存在时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def latest_run_id(self, kinds: Iterable[str] = ('batch', 'web')) -> Optional[str]:
+        """
+        最近写入的报告ID
+
+        Args:
+            kinds: 运行类型
+
+        Returns:
+            报告ID；没有报告时返回 None
+        """
+        where, params = self._where(kinds, None)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT id FROM runs{where} ORDER BY recorded_at DESC, timestamp DESC LIMIT 1", params
+            ).fetchone()
+        return row[0] if row else None
+
+    def product_history(self, product_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        单个商品的历史结果，按时间倒序
+
+        Args:
+            product_id: 商品ID
+            limit: 最多返回数量
+
+        Returns:
+            [{'run_id', 'timestamp', 'test_mode', 'status', 'duration'}, ...]
+        """
+        sql = (
+            "SELECT p.run_id, r.timestamp, r.test_mode, p.status, p.duration "
+            "FROM run_products p JOIN runs r ON r.id = p.run_id "
+            "WHERE p.product_id = ? ORDER BY r.timestamp DESC"
+        )
+        params: List[Any] = [product_id]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        keys = ('run_id', 'timestamp', 'test_mode', 'status', 'duration')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def average_durations(self, test_mode: str) -> Dict[str, float]:
+        """
+        批量测试中每个商品的平均耗时
+
+        只统计相同测试模式（未记录模式的旧报告也计入）、正常结束（passed/failed）的记录。
+
+        Args:
+            test_mode: 测试模式
+
+        Returns:
+            {商品ID: 平均耗时(秒)}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.product_id, AVG(p.duration) "
+                "FROM run_products p JOIN runs r ON r.id = p.run_id "
+                "WHERE r.kind = 'batch' AND (r.test_mode = ? OR r.test_mode IS NULL) "
+                "AND p.status IN ('passed', 'failed') AND p.duration > 0 "
+                "GROUP BY p.product_id",
+                (test_mode,)
+            ).fetchall()
+        return {product_id: duration for product_id, duration in rows}
+
+    def list_ai_analyses(self) -> List[Dict[str, Any]]:
+        """
+        AI 分析列表，按创建时间倒序
+
+        Returns:
+            [{'id', 'report_id', 'created_at', 'provider', 'summary'}, ...]
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, report_id, created_at, provider, summary FROM ai_analyses "
+                "ORDER BY created_at DESC"
+            ).fetchall()
+        keys = ('id', 'report_id', 'created_at', 'provider', 'summary')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def close(self):
+        """关闭结果库"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'ResultsDB':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -6,8 +6,10 @@
 
 import asyncio
 import logging
-from typing import Optional, Callable, Any, List
-from playwright.async_api import Page, Locator, expect, TimeoutError as PlaywrightTimeoutError
+from typing import Optional, Callable, Any, List, Union
+from playwright.async_api import (
+    Page, Locator, ElementHandle, Response, expect, TimeoutError as PlaywrightTimeoutError
+)
 
 logger = logging.getLogger(__name__)
 
@@ -141,7 +143,7 @@ class SmartWaiter:
         等待多个选择器中的任意一个出现（并行等待）
 
         优化策略:
-        使用 asyncio.gather 并行等待多个元素，哪个先出现就返回哪个
+        并行等待多个元素，哪个先出现就立即返回，并取消其余等待
 
         Args:
             selectors: CSS 选择器列表
@@ -165,15 +167,19 @@ class SmartWaiter:
             except PlaywrightTimeoutError:
                 return None
 
-        # 并行等待所有选择器
-        tasks = [check_selector(sel) for sel in selectors]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 返回第一个成功的结果
-        for result in results:
-            if result and not isinstance(result, Exception):
-                logger.debug(f"✅ 找到元素: {result[1]}")
-                return result
+        # 并行等待所有选择器，第一个成功即返回
+        pending = {asyncio.ensure_future(check_selector(sel)) for sel in selectors}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result():
+                        result = task.result()
+                        logger.debug(f"✅ 找到元素: {result[1]}")
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
 
         # 所有选择器都失败
         logger.error(f"❌ 所有选择器都未找到: {selectors}")
@@ -181,6 +187,39 @@ class SmartWaiter:
             f"等待元素超时 ({timeout}ms): {selectors}"
         )
 
+    async def wait_for_first_visible(
+        self,
+        selectors: List[str],
+        timeout: Optional[int] = None
+    ) -> Optional[Locator]:
+        """
+        等待多个选择器中任意一个匹配到可见元素
+
+        与 wait_for_any_element 不同，这里把所有选择器合并为一个带 :visible 过滤的
+        选择器交给浏览器端等待。同一选择器匹配多个元素（第一个可能是隐藏的）时
+        也能正确返回可见的那个。选择器按逗号拆分，因此不支持引号内含逗号的选择器。
+
+        Args:
+            selectors: CSS 选择器列表（每项也可以是逗号分隔的选择器组）
+            timeout: 超时时间（毫秒）
+
+        Returns:
+            第一个可见元素的 Locator；超时返回 None
+        """
+        timeout = timeout or self.default_timeout
+        parts = [part.strip() for selector in selectors for part in selector.split(',') if part.strip()]
+        combined = ', '.join(f"{part}:visible" for part in dict.fromkeys(parts))
+        locator = self.page.locator(combined).first
+
+        try:
+            await locator.wait_for(state="visible", timeout=timeout)
+            logger.debug(f"✅ 可见元素已出现: {combined}")
+            return locator
+
+        except PlaywrightTimeoutError:
+            logger.debug(f"⏱️  未等到可见元素 ({timeout}ms): {combined}")
+            return None
+
     async def wait_for_condition(
         self,
         condition: Callable[[], Any],
@@ -335,6 +374,84 @@ class SmartWaiter:
             logger.error(f"   错误: {e}")
             raise
 
+    async def wait_for_text_change(
+        self,
+        selector: str,
+        previous_text: Optional[str],
+        timeout: Optional[int] = None
+    ) -> bool:
+        """
+        等待元素文本发生变化（如购物车数量角标更新）
+
+        在浏览器端轮询，元素文本与 previous_text 不同即返回，不做固定等待。
+
+        Args:
+            selector: CSS 选择器（document.querySelector 语法）
+            previous_text: 变化前的文本（已 strip），None 表示元素原本不存在
+            timeout: 超时时间（毫秒）
+
+        Returns:
+            是否在超时前检测到变化
+        """
+        timeout = timeout or self.default_timeout
+
+        try:
+            await self.page.wait_for_function(
+                """([selector, previous]) => {
+                    const el = document.querySelector(selector);
+                    if (!el) return false;
+                    return el.textContent.trim() !== previous;
+                }""",
+                arg=[selector, previous_text],
+                timeout=timeout
+            )
+            logger.debug(f"✅ 元素文本已变化: {selector}")
+            return True
+
+        except PlaywrightTimeoutError:
+            logger.debug(f"⏱️  元素文本未变化 ({timeout}ms): {selector}")
+            return False
+
+    async def click_and_wait_for_response(
+        self,
+        element: Union[Locator, ElementHandle],
+        url_pattern: str,
+        timeout: Optional[int] = None
+    ) -> Optional[Response]:
+        """
+        点击元素并等待匹配的网络响应（如加购请求 /cart/add）
+
+        Args:
+            element: 要点击的元素
+            url_pattern: 响应 URL 中应包含的片段
+            timeout: 超时时间（毫秒）
+
+        Returns:
+            匹配的 Response；超时返回 None（点击本身已完成）
+
+        Raises:
+            PlaywrightTimeoutError: 点击本身超时
+        """
+        timeout = timeout or self.default_timeout
+        clicked = False
+
+        try:
+            async with self.page.expect_response(
+                lambda response: url_pattern in response.url,
+                timeout=timeout
+            ) as response_info:
+                await element.click(timeout=timeout)
+                clicked = True
+            response = await response_info.value
+            logger.debug(f"✅ 收到响应 {response.status}: {response.url}")
+            return response
+
+        except PlaywrightTimeoutError:
+            if not clicked:
+                raise
+            logger.debug(f"⏱️  未等到匹配 '{url_pattern}' 的响应 ({timeout}ms)")
+            return None
+
     async def wait_for_no_animations(
         self,
         selector: Optional[str] = None,
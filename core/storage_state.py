@@ -0,0 +1,164 @@
+"""
+浏览器存储状态预热模块
+
+批量测试前先访问一次店铺首页，处理 Cookie 同意、地区/货币选择和订阅弹窗，
+把 cookies 与 localStorage 保存为 storage_state 快照（带有效期的磁盘缓存）。
+之后每个商品的 BrowserContext 都从该快照创建，无需在每个页面重复处理弹窗。
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import Browser, Page
+
+from core.smart_wait import SmartWaiter
+
+logger = logging.getLogger(__name__)
+
+
+# Cookie 同意横幅的接受按钮
+CONSENT_SELECTORS = [
+    "#onetrust-accept-btn-handler",
+    "button#accept-recommended-btn-handler",
+    ".cc-btn.cc-allow",
+    "button[data-cookie-accept]",
+    ".shopify-pc__banner__btn-accept",
+    "button:has-text('Accept All')",
+    "button:has-text('Accept')",
+]
+
+# 地区/货币选择和订阅弹窗的关闭按钮
+POPUP_CLOSE_SELECTORS = [
+    ".needsclick.klaviyo-close-form",
+    "button[aria-label='Close dialog']",
+    ".popup-close",
+    ".modal__close",
+    ".newsletter-popup__close",
+    "[data-action='close-popup']",
+    "button[aria-label='Close']",
+]
+
+# 弹窗通常在页面加载后延迟出现，最多等待这么久（毫秒）
+POPUP_APPEAR_TIMEOUT = 5000
+
+
+class StorageStateCache:
+    """storage_state 快照的磁盘缓存
+
+    每个店铺域名一个快照文件，超过有效期后重新预热。
+
+    使用示例:
+        cache = StorageStateCache()
+        state_path = await cache.warm_up(browser, "https://fiido.com")
+        context = await browser.new_context(storage_state=state_path)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "data/cache/storage_state",
+        ttl_hours: float = 12
+    ):
+        """
+        初始化快照缓存
+
+        Args:
+            cache_dir: 快照保存目录
+            ttl_hours: 快照有效期（小时）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_hours * 3600
+
+    def get_path(self, base_url: str) -> Path:
+        """获取店铺对应的快照文件路径"""
+        host = urlparse(base_url).hostname or "default"
+        return self.cache_dir / f"{host}.json"
+
+    def is_fresh(self, base_url: str) -> bool:
+        """快照是否存在且未过期"""
+        path = self.get_path(base_url)
+        if not path.exists():
+            return False
+        return time.time() - path.stat().st_mtime < self.ttl_seconds
+
+    def load(self, base_url: str) -> Optional[str]:
+        """获取未过期的快照路径
+
+        Returns:
+            快照文件路径；不存在或已过期时返回 None
+        """
+        if self.is_fresh(base_url):
+            return str(self.get_path(base_url))
+        return None
+
+    def clear(self, base_url: str):
+        """删除店铺的快照"""
+        path = self.get_path(base_url)
+        if path.exists():
+            path.unlink()
+
+    async def warm_up(self, browser: Browser, base_url: str, force: bool = False) -> Optional[str]:
+        """访问店铺首页、处理弹窗并保存 storage_state 快照
+
+        快照未过期时直接返回缓存，不访问网站。
+
+        Args:
+            browser: 用于预热的浏览器
+            base_url: 店铺首页 URL
+            force: 忽略缓存强制重新预热
+
+        Returns:
+            快照文件路径；预热失败时返回 None（调用方退回空白配置）
+        """
+        if not force:
+            cached = self.load(base_url)
+            if cached:
+                logger.info(f"使用缓存的 storage_state: {cached}")
+                return cached
+
+        path = self.get_path(base_url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        context = await browser.new_context()
+        try:
+            page = await context.new_page()
+            await page.goto(base_url, wait_until="domcontentloaded", timeout=30000)
+            dismissed = await dismiss_popups(page)
+            await context.storage_state(path=str(path))
+            logger.info(f"storage_state 预热完成 (处理弹窗 {dismissed} 个): {path}")
+            return str(path)
+        except Exception as e:
+            logger.warning(f"storage_state 预热失败，使用空白配置: {e}")
+            return None
+        finally:
+            await context.close()
+
+
+async def dismiss_popups(page: Page, timeout: int = POPUP_APPEAR_TIMEOUT) -> int:
+    """接受 Cookie 同意并关闭弹窗
+
+    先等待任意弹窗出现（最多 timeout 毫秒），再依次点击所有可见的接受/关闭按钮。
+
+    Args:
+        page: 页面对象
+        timeout: 等待弹窗出现的超时（毫秒）
+
+    Returns:
+        点击的按钮数量
+    """
+    waiter = SmartWaiter(page, default_timeout=timeout)
+    if await waiter.wait_for_first_visible(CONSENT_SELECTORS + POPUP_CLOSE_SELECTORS) is None:
+        return 0
+
+    clicked = 0
+    for selector in CONSENT_SELECTORS + POPUP_CLOSE_SELECTORS:
+        try:
+            button = page.locator(selector).first
+            if await button.is_visible():
+                await button.click(timeout=2000)
+                clicked += 1
+        except Exception as e:
+            logger.debug(f"关闭弹窗失败 {selector}: {e}")
+    return clicked
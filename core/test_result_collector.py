@@ -2,6 +2,8 @@
 测试结果收集器
 
 用于收集 pytest 测试结果并生成结构化的 JSON 报告。
+测试过程中每个用例的结果同时追加到事件日志（默认与报告同名的 .events.jsonl），
+会话被中断时可用 from_event_log() 恢复已完成的结果。
 """
 
 import json
@@ -11,6 +13,8 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 
+from core.event_log import EventLog, event_log_path_for, read_events
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,18 +47,21 @@ class TestSummary:
 class TestResultCollector:
     """测试结果收集器"""
 
-    def __init__(self, output_path: str = "reports/test-results.json"):
+    def __init__(self, output_path: str = "reports/test-results.json", event_log_path: Optional[str] = None):
         """初始化测试结果收集器
 
         Args:
             output_path: 输出 JSON 文件路径
+            event_log_path: 事件日志路径，默认与输出文件同名的 .events.jsonl
         """
         self.output_path = Path(output_path)
         self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.event_log_path = Path(event_log_path) if event_log_path else event_log_path_for(self.output_path)
 
         self.test_cases: List[TestCase] = []
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
+        self._event_log: Optional[EventLog] = None
 
         logger.info(f"TestResultCollector initialized: {output_path}")
 
@@ -62,13 +69,46 @@ class TestResultCollector:
         """开始测试会话"""
         self.start_time = datetime.now()
         self.test_cases = []
+        if self._event_log:
+            self._event_log.close()
+        self._event_log = EventLog(self.event_log_path, append=False)
+        self._event_log.emit("run_start", kind="pytest", output_path=str(self.output_path))
         logger.info("Test session started")
 
     def end_session(self):
         """结束测试会话"""
         self.end_time = datetime.now()
+        if self._event_log:
+            self._event_log.emit("run_end")
+            self._event_log.close()
+            self._event_log = None
         logger.info("Test session ended")
 
+    @classmethod
+    def from_event_log(cls, event_log_path: str, output_path: Optional[str] = None) -> 'TestResultCollector':
+        """从事件日志恢复收集器（用于会话被中断后生成报告）
+
+        Args:
+            event_log_path: 事件日志路径
+            output_path: 输出 JSON 文件路径，默认使用事件日志中记录的路径
+
+        Returns:
+            TestResultCollector: 包含日志中全部用例结果的收集器
+        """
+        events, _ = read_events(event_log_path)
+        run_start = next((e for e in events if e.get('event') == 'run_start'), {})
+        run_end = next((e for e in events if e.get('event') == 'run_end'), None)
+
+        collector = cls(output_path or run_start.get('output_path', "reports/test-results.json"),
+                        event_log_path=event_log_path)
+        collector.test_cases = [TestCase(**e['case']) for e in events if e.get('event') == 'test_case']
+        if run_start.get('ts'):
+            collector.start_time = datetime.fromisoformat(run_start['ts'])
+        last = run_end or (events[-1] if events else None)
+        if last and last.get('ts'):
+            collector.end_time = datetime.fromisoformat(last['ts'])
+        return collector
+
     def add_test_result(
         self,
         test_id: str,
@@ -104,6 +144,8 @@ class TestResultCollector:
         )
 
         self.test_cases.append(test_case)
+        if self._event_log:
+            self._event_log.emit("test_case", case=asdict(test_case))
         logger.debug(f"Added test result: {test_id} - {status}")
 
     def get_summary(self) -> TestSummary:
@@ -181,8 +181,8 @@ class ProductPage:
                 )
 
                 if cart_count:
-                    # 等待元素可见
-                    await self.page.wait_for_timeout(1000)  # 简单等待
+                    # 等待元素可见（可见即返回，不再固定等待）
+                    await cart_count.wait_for_element_state("visible", timeout=1000)
                     logger.debug("Cart count element updated")
             except Exception as e:
                 logger.debug(f"Cart count check skipped: {e}")
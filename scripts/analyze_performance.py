@@ -8,10 +8,20 @@
 import json
 import sys
 from pathlib import Path
+from statistics import median
 from typing import Dict, List
 from datetime import datetime
 import argparse
 
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.page_performance import product_page_metrics, slowest_resources
+
+# 页面性能阈值（毫秒），参考 Core Web Vitals 的「较差」分界
+LCP_POOR_THRESHOLD = 4000
+TTFB_POOR_THRESHOLD = 1800
+
 
 class PerformanceAnalyzer:
     """测试性能分析器"""
@@ -44,7 +54,8 @@ class PerformanceAnalyzer:
 
         report = {
             "timestamp": datetime.now().isoformat(),
-            "total_duration": self.results.get('duration', 0),
+            # 批量测试报告 (batch_test_*.json) 使用 total_duration 字段
+            "total_duration": self.results.get('duration', self.results.get('total_duration', 0)),
             "total_tests": self.results.get('total', 0),
             "avg_test_duration": 0,
             "slowest_tests": [],
@@ -73,6 +84,24 @@ class PerformanceAnalyzer:
                 }
                 for t in sorted_tests[:10]
             ]
+        elif 'results' in self.results:
+            sorted_results = sorted(
+                self.results['results'],
+                key=lambda x: x.get('duration', 0),
+                reverse=True
+            )
+            report['slowest_tests'] = [
+                {
+                    'name': r.get('product_name', r.get('product_id', 'unknown')),
+                    'duration': r.get('duration', 0),
+                    'type': 'product'
+                }
+                for r in sorted_results[:10]
+            ]
+
+        # 批量商品测试报告：分析浏览器端的页面性能指标
+        if 'results' in self.results:
+            report['page_performance'] = self._analyze_page_performance(self.results['results'])
 
         # 识别性能瓶颈
         report['bottlenecks'] = self._identify_bottlenecks(report)
@@ -85,6 +114,37 @@ class PerformanceAnalyzer:
 
         return report
 
+    def _analyze_page_performance(self, results: List[Dict]) -> Dict:
+        """分析商品页的浏览器端性能指标（TTFB/DCL/load/LCP）"""
+        products = []
+        for result in results:
+            metrics = product_page_metrics(result)
+            if metrics:
+                products.append({
+                    'product_id': result.get('product_id'),
+                    'product_name': result.get('product_name', ''),
+                    'ttfb': metrics.get('ttfb'),
+                    'dom_content_loaded': metrics.get('dom_content_loaded'),
+                    'load': metrics.get('load'),
+                    'lcp': metrics.get('lcp'),
+                })
+
+        def median_of(key):
+            values = [p[key] for p in products if p.get(key)]
+            return round(median(values)) if values else None
+
+        return {
+            'measured_products': len(products),
+            'median_ttfb': median_of('ttfb'),
+            'median_dom_content_loaded': median_of('dom_content_loaded'),
+            'median_load': median_of('load'),
+            'median_lcp': median_of('lcp'),
+            'slowest_products': sorted(
+                products, key=lambda p: p.get('lcp') or p.get('load') or 0, reverse=True
+            )[:10],
+            'slowest_resources': slowest_resources(results)
+        }
+
     def _identify_bottlenecks(self, report: Dict) -> List[Dict]:
         """识别性能瓶颈"""
         bottlenecks = []
@@ -135,6 +195,20 @@ class PerformanceAnalyzer:
                     "metric": e2e_count
                 })
 
+        # 瓶颈5: 商品页本身加载慢（站点问题，而非测试等待）
+        page_perf = report.get('page_performance', {})
+        for product in page_perf.get('slowest_products', []):
+            lcp = product.get('lcp') or 0
+            ttfb = product.get('ttfb') or 0
+            if lcp > LCP_POOR_THRESHOLD or ttfb > TTFB_POOR_THRESHOLD:
+                bottlenecks.append({
+                    "type": "slow_product_page",
+                    "severity": "medium",
+                    "description": f"商品页加载慢: {product['product_name'][:40]} (TTFB {ttfb}ms, LCP {lcp}ms)",
+                    "metric": lcp,
+                    "test_name": product['product_id']
+                })
+
         return bottlenecks
 
     def _generate_recommendations(self, report: Dict) -> List[str]:
@@ -167,6 +241,11 @@ class PerformanceAnalyzer:
                         f"({b['metric']:.1f}秒 → 目标 <30秒)"
                     )
 
+        if 'slow_product_page' in bottleneck_types:
+            recommendations.append(
+                "🌐 部分商品页 TTFB/LCP 超过阈值，属于站点性能问题，建议反馈给站点优化（见最慢资源列表）"
+            )
+
         if 'too_many_e2e_tests' in bottleneck_types:
             recommendations.append(
                 "🎯 减少E2E测试覆盖范围，仅测试关键路径（Happy Path）"
@@ -247,6 +326,17 @@ class PerformanceAnalyzer:
         print(f"  总执行时间: {report['total_duration']:.1f}秒 ({report['total_duration']/60:.1f}分钟)")
         print(f"  平均测试时间: {report['avg_test_duration']:.2f}秒/测试")
 
+        # 页面性能
+        page_perf = report.get('page_performance')
+        if page_perf and page_perf['measured_products']:
+            print(f"\n🌐 商品页性能 (中位数, {page_perf['measured_products']} 个商品):")
+            print(f"  TTFB: {page_perf['median_ttfb']}ms  DOMContentLoaded: {page_perf['median_dom_content_loaded']}ms")
+            print(f"  load: {page_perf['median_load']}ms  LCP: {page_perf['median_lcp']}ms")
+            if page_perf['slowest_resources']:
+                print(f"\n🐢 最慢的资源:")
+                for i, resource in enumerate(page_perf['slowest_resources'][:5], 1):
+                    print(f"  {i}. [{resource['type']}] {resource['url'][:80]}: {resource['duration']}ms")
+
         # 最慢的测试
         if report['slowest_tests']:
             print(f"\n🐌 最慢的10个测试:")
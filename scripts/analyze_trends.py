@@ -11,12 +11,23 @@
 
 import json
 import statistics
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 import argparse
 
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.page_performance import product_page_metrics
+from core.results_db import ResultsDB
+
+# 商品页性能回归判定：最新值比历史中位数慢 20% 以上且至少慢 200ms
+PAGE_REGRESSION_RATIO = 1.2
+PAGE_REGRESSION_MIN_MS = 200
+
 
 class TrendAnalyzer:
     """历史趋势分析器"""
@@ -46,39 +57,58 @@ class TrendAnalyzer:
         Returns:
             测试报告列表，按时间排序
         """
-        reports = []
+        # test_results.json 报告
+        return self._load_reports('suite')
+
+    def _load_reports(self, kind: str) -> List[Dict]:
+        """
+        从结果库加载最近 N 天的某类报告（先导入新增或变化的报告文件）
 
-        # 加载最近 N 天的报告
+        Args:
+            kind: 运行类型（suite / batch）
+
+        Returns:
+            报告列表，按时间排序
+        """
+        reports = []
         cutoff_date = datetime.now() - timedelta(days=self.days)
 
-        # 查找所有测试结果文件
-        result_files = list(self.reports_dir.glob("**/test_results.json"))
+        # 趋势分析沿用原有规则，统计报告目录下任意层级的 test_results.json
+        with ResultsDB.for_reports(self.reports_dir, suite_pattern='**/test_results.json') as db:
+            # 按日期粗筛（时间戳格式不统一），再逐个精确比较
+            runs = db.load_runs(kinds=[kind], since=(cutoff_date - timedelta(days=1)).date().isoformat())
 
-        for result_file in result_files:
+        for data in runs:
+            timestamp_str = data.get('timestamp', '')
+            if not timestamp_str:
+                continue
             try:
-                with open(result_file) as f:
-                    data = json.load(f)
-
-                # 解析时间戳
-                timestamp_str = data.get('timestamp', '')
-                if timestamp_str:
-                    timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-
-                    # 只保留最近 N 天的数据
-                    if timestamp >= cutoff_date:
-                        reports.append({
-                            'timestamp': timestamp,
-                            'data': data
-                        })
-            except (json.JSONDecodeError, ValueError) as e:
-                print(f"⚠️ 跳过无效报告: {result_file} ({e})")
+                timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+            except ValueError as e:
+                print(f"⚠️ 跳过无效报告: {timestamp_str} ({e})")
                 continue
 
+            # 只保留最近 N 天的数据
+            if timestamp >= cutoff_date:
+                reports.append({
+                    'timestamp': timestamp,
+                    'data': data
+                })
+
         # 按时间排序
         reports.sort(key=lambda x: x['timestamp'])
 
         return reports
 
+    def _load_batch_reports(self) -> List[Dict]:
+        """
+        加载批量商品测试报告（batch_test_*.json），用于页面性能趋势
+
+        Returns:
+            批量报告列表，按时间排序
+        """
+        return self._load_reports('batch')
+
     def _calculate_pass_rate_trend(self, reports: List[Dict]) -> Dict:
         """
         计算测试通过率趋势
@@ -289,10 +319,14 @@ class TrendAnalyzer:
         """
         daily_performance = defaultdict(lambda: {
             'page_load_times': [],
-            'api_response_times': []
+            'api_response_times': [],
+            'ttfb_times': [],
+            'lcp_times': []
         })
+        # 每个商品按时间顺序的商品页性能样本，用于识别单个商品的性能回归
+        product_samples = defaultdict(list)
 
-        for report in reports:
+        for report in sorted(reports, key=lambda x: x['timestamp']):
             date = report['timestamp'].date()
             data = report['data']
 
@@ -308,6 +342,27 @@ class TrendAnalyzer:
                 if api_response_time:
                     daily_performance[date]['api_response_times'].append(api_response_time)
 
+            # 批量商品测试报告：浏览器端采集的商品页性能（毫秒）
+            for result in data.get('results', []):
+                metrics = product_page_metrics(result)
+                if not metrics:
+                    continue
+
+                if metrics.get('load'):
+                    daily_performance[date]['page_load_times'].append(metrics['load'] / 1000)
+                if metrics.get('ttfb'):
+                    daily_performance[date]['ttfb_times'].append(metrics['ttfb'])
+                if metrics.get('lcp'):
+                    daily_performance[date]['lcp_times'].append(metrics['lcp'])
+
+                product_samples[result.get('product_id')].append({
+                    'product_name': result.get('product_name', ''),
+                    'timestamp': report['timestamp'],
+                    'ttfb': metrics.get('ttfb'),
+                    'load': metrics.get('load'),
+                    'lcp': metrics.get('lcp')
+                })
+
         # 计算每日平均性能
         performance_data = []
         for date in sorted(daily_performance.keys()):
@@ -320,6 +375,8 @@ class TrendAnalyzer:
                 'date': date.isoformat(),
                 'avg_page_load_time': round(avg_page_load, 2),
                 'avg_api_response_time': round(avg_api_response, 2),
+                'avg_ttfb': round(statistics.mean(perf['ttfb_times'])) if perf['ttfb_times'] else None,
+                'avg_lcp': round(statistics.mean(perf['lcp_times'])) if perf['lcp_times'] else None,
                 'test_count': len(perf['page_load_times'])
             })
 
@@ -334,9 +391,50 @@ class TrendAnalyzer:
                 'avg_api_response_time': round(statistics.mean(api_response_times), 2) if api_response_times else 0,
                 'page_load_trend': self._calculate_trend(page_load_times) if page_load_times else 'stable',
                 'api_response_trend': self._calculate_trend(api_response_times) if api_response_times else 'stable'
-            }
+            },
+            'product_regressions': self._find_page_regressions(product_samples)
         }
 
+    def _find_page_regressions(self, product_samples: Dict[str, List[Dict]]) -> List[Dict]:
+        """
+        识别单个商品的商品页性能回归
+
+        将每个商品最近一次的 TTFB/load/LCP 与之前所有样本的中位数比较。
+
+        Args:
+            product_samples: {商品ID: 按时间排序的性能样本}
+
+        Returns:
+            回归列表，按变慢幅度降序
+        """
+        regressions = []
+
+        for product_id, samples in product_samples.items():
+            if len(samples) < 2:
+                continue
+
+            latest = samples[-1]
+            for metric in ('ttfb', 'load', 'lcp'):
+                history = [s[metric] for s in samples[:-1] if s.get(metric)]
+                current = latest.get(metric)
+                if not history or not current:
+                    continue
+
+                baseline = statistics.median(history)
+                if current > baseline * PAGE_REGRESSION_RATIO and current - baseline >= PAGE_REGRESSION_MIN_MS:
+                    regressions.append({
+                        'product_id': product_id,
+                        'product_name': latest['product_name'],
+                        'metric': metric,
+                        'baseline_ms': round(baseline),
+                        'latest_ms': current,
+                        'change_percent': round((current - baseline) / baseline * 100, 1),
+                        'latest_timestamp': latest['timestamp'].isoformat()
+                    })
+
+        regressions.sort(key=lambda r: r['change_percent'], reverse=True)
+        return regressions
+
     def _identify_periodic_issues(self, reports: List[Dict]) -> Dict:
         """
         识别周期性问题
@@ -419,7 +517,7 @@ class TrendAnalyzer:
         regional_performance = self._analyze_regional_performance(reports)
 
         print("🔍 分析性能趋势...")
-        performance_trends = self._analyze_performance_trends(reports)
+        performance_trends = self._analyze_performance_trends(reports + self._load_batch_reports())
 
         print("🔍 识别周期性问题...")
         periodic_issues = self._identify_periodic_issues(reports)
@@ -555,6 +653,19 @@ class TrendAnalyzer:
                 'priority': 'medium'
             })
 
+        product_regressions = performance_trends.get('product_regressions', [])
+        if product_regressions:
+            worst = product_regressions[0]
+            insights.append({
+                'type': 'warning',
+                'category': 'performance',
+                'message': f'{len({r["product_id"] for r in product_regressions})} 个商品页性能回归，'
+                           f'最严重: {worst["product_name"][:40]} {worst["metric"].upper()} '
+                           f'{worst["baseline_ms"]}ms → {worst["latest_ms"]}ms',
+                'data': worst,
+                'priority': 'medium'
+            })
+
         # 5. 周期性问题洞察
         highest_failure_day = periodic_issues.get('highest_failure_day')
         if highest_failure_day and highest_failure_day['failure_rate'] > 10:
@@ -5,44 +5,128 @@
 """
 
 import asyncio
+import heapq
 import json
+import logging
+import multiprocessing
+import queue
+import sqlite3
 import sys
 import argparse
+from contextvars import ContextVar
 from pathlib import Path
 from datetime import datetime
+from statistics import median
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 # 添加项目根目录到路径
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from run_product_test import ProductTester
+from run_product_test import ProductTester, HAR_DIR, har_path_for
+from core.browser_pool import BrowserPool
+from core.cart_api import reset_cart
+from core.event_log import EventLog, build_report, event_log_path_for
 from core.models import Product
+from core.product_store import ProductStore
+from core.results_db import DEFAULT_DB_NAME, ResultsDB
+from core.storage_state import StorageStateCache
 
 
-async def test_product(product_data, index, total, test_mode="quick"):
-    """测试单个商品"""
-    print(f"\n{'='*80}")
-    print(f"[{index}/{total}] 测试商品: {product_data['name']}")
-    print(f"商品ID: {product_data['id']}")
-    print(f"测试模式: {test_mode}")
-    print(f"{'='*80}\n")
+# 并发测试时每个商品的输出先写入各自的缓冲区，完成后整块输出，
+# 保证 "[i/N] 测试商品:" 及其步骤日志在 stdout 中连续，便于 Web 端逐行解析
+_output_buffer: ContextVar[Optional[List[str]]] = ContextVar('batch_output_buffer', default=None)
 
+
+class _BufferedOutputFilter(logging.Filter):
+    """将当前任务的日志记录转入输出缓冲区"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        buffer = _output_buffer.get()
+        if buffer is None:
+            return True
+        buffer.append(record.getMessage())
+        return False
+
+
+def _install_output_buffering():
+    """为根日志处理器安装缓冲过滤器（重复调用安全）"""
+    for handler in logging.getLogger().handlers:
+        if not any(isinstance(f, _BufferedOutputFilter) for f in handler.filters):
+            handler.addFilter(_BufferedOutputFilter())
+
+
+def _emit(text: str = ""):
+    """输出一行文本：并发模式下写入当前任务的缓冲区，否则直接打印"""
+    buffer = _output_buffer.get()
+    if buffer is None:
+        print(text)
+    else:
+        buffer.append(text)
+
+
+def _store_base_url(product_data) -> str:
+    """从商品 URL 中取店铺根 URL"""
+    parsed = urlparse(product_data['url'])
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+async def test_product(product_data, index, total, test_mode="quick", browser_pool=None,
+                       block_resources=True, storage_state=None, reuse_context=False,
+                       har_mode=None, har_dir=None, event_log=None):
+    """测试单个商品
+
+    Args:
+        browser_pool: 共享浏览器池；提供时在共享浏览器上新建独立上下文，
+            否则 ProductTester 自行启动浏览器
+        block_resources: 是否按测试模式拦截无关网络资源
+        storage_state: 预热得到的 storage_state 快照路径
+        reuse_context: 复用浏览器池中的上下文（复用前通过购物车接口清空购物车）
+        har_mode: "record"/"replay"，录制或回放每个商品的 HAR
+        har_dir: HAR 文件目录，默认 data/har
+        event_log: 事件日志，记录商品和步骤的开始/结束
+    """
+    if event_log:
+        event_log.emit('product_start', index=index, product_id=product_data['id'],
+                       product_name=product_data['name'])
+
+    _emit(f"\n{'='*80}")
+    _emit(f"[{index}/{total}] 测试商品: {product_data['name']}")
+    _emit(f"商品ID: {product_data['id']}")
+    _emit(f"测试模式: {test_mode}")
+    _emit(f"{'='*80}\n")
+
+    context = None
     try:
         product = Product(**product_data)
-        tester = ProductTester(product, test_mode=test_mode, headless=True)
+        browser = await browser_pool.start() if browser_pool else None
+        if browser_pool and reuse_context:
+            base_url = _store_base_url(product_data)
+            options = {"storage_state": storage_state} if storage_state else {}
+            context = await browser_pool.acquire_context(
+                reset=lambda ctx: reset_cart(ctx, base_url), **options
+            )
+        tester = ProductTester(product, test_mode=test_mode, headless=True, browser=browser,
+                               context=context, block_resources=block_resources,
+                               storage_state=storage_state, har_mode=har_mode,
+                               har_path=har_path_for(product.id, Path(har_dir or HAR_DIR)),
+                               event_log=event_log)
         result = await tester.run()
 
-        return {
+        product_result = {
             'product_id': product_data['id'],
             'product_name': product_data['name'],
             'status': result['status'],
             'duration': result['duration'],
             'steps': result['steps'],
-            'errors': result.get('errors', [])
+            'errors': result.get('errors', []),
+            'network': result.get('network'),
+            'performance': result.get('performance')
         }
     except Exception as e:
-        print(f"❌ 测试异常: {e}")
-        return {
+        _emit(f"❌ 测试异常: {e}")
+        product_result = {
             'product_id': product_data['id'],
             'product_name': product_data['name'],
             'status': 'error',
@@ -50,6 +134,297 @@ async def test_product(product_data, index, total, test_mode="quick"):
             'steps': [],
             'errors': [str(e)]
         }
+    finally:
+        if context is not None:
+            await browser_pool.release_context(context)
+
+    if event_log:
+        event_log.emit('product_end', index=index, result=product_result)
+    return product_result
+
+
+def print_product_summary(result, index, total):
+    """输出单个商品的简短总结"""
+    status_icon = "✓" if result['status'] == 'passed' else "✗"
+    _emit(f"\n{status_icon} [{index}/{total}] {result['product_name'][:60]} - {result['status'].upper()} ({result['duration']:.1f}s)")
+
+    # 显示失败的步骤
+    if result['status'] != 'passed':
+        for step in result['steps']:
+            if step['status'] == 'failed':
+                _emit(f"  ✗ 步骤{step['number']}: {step['name']} - {step.get('message', 'N/A')}")
+                if step.get('error'):
+                    _emit(f"     错误: {step['error'][:100]}")
+
+
+async def run_batch(selected_products, test_mode="quick", browser_pool=None, concurrency=1,
+                    block_resources=True, indices=None, total=None,
+                    on_result: Optional[Callable[[int, Dict, str], None]] = None,
+                    storage_state=None, reuse_context=False, har_mode=None, har_dir=None,
+                    event_log=None):
+    """执行一批商品测试
+
+    Args:
+        selected_products: 商品数据列表
+        test_mode: 测试模式
+        browser_pool: 共享浏览器池（可选）
+        concurrency: 同时测试的商品数，1 表示顺序执行
+        block_resources: 是否按测试模式拦截无关网络资源
+        indices: 每个商品在整个批次中的序号（从1开始），默认按列表顺序编号
+        total: 整个批次的商品总数，默认为 len(selected_products)
+        on_result: 每个商品完成后的回调 (序号, 结果, 该商品的输出文本)；
+            提供时输出始终缓冲并交给回调，不直接打印
+        storage_state: 预热得到的 storage_state 快照路径
+        reuse_context: 在商品之间复用 BrowserContext（需要 browser_pool）
+        har_mode: "record"/"replay"，录制或回放每个商品的 HAR
+        har_dir: HAR 文件目录
+        event_log: 事件日志，记录商品和步骤的开始/结束
+
+    Returns:
+        与 selected_products 顺序一致的结果列表
+    """
+    indices = indices or list(range(1, len(selected_products) + 1))
+    total = total or len(selected_products)
+    results = [None] * len(selected_products)
+    concurrency = max(1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    buffered = concurrency > 1 or on_result is not None
+
+    if buffered:
+        _install_output_buffering()
+
+    async def worker(position, product_data):
+        index = indices[position]
+        async with semaphore:
+            buffer = [] if buffered else None
+            token = _output_buffer.set(buffer)
+            try:
+                result = await test_product(product_data, index, total,
+                                            test_mode=test_mode, browser_pool=browser_pool,
+                                            block_resources=block_resources,
+                                            storage_state=storage_state,
+                                            reuse_context=reuse_context,
+                                            har_mode=har_mode, har_dir=har_dir,
+                                            event_log=event_log)
+                print_product_summary(result, index, total)
+            finally:
+                _output_buffer.reset(token)
+
+            if on_result is not None:
+                on_result(index, result, "\n".join(buffer))
+            elif buffer is not None:
+                print("\n".join(buffer), flush=True)
+
+            # 按原始顺序写入结果，报告顺序与完成顺序无关
+            results[position] = result
+
+    await asyncio.gather(*(worker(i, p) for i, p in enumerate(selected_products)))
+    return results
+
+
+# 没有历史耗时记录时使用的默认单商品耗时（秒）
+DEFAULT_PRODUCT_DURATION = {'quick': 30.0, 'full': 90.0}
+
+
+def load_historical_durations(reports_dir: Path, test_mode: str) -> Dict[str, float]:
+    """从历史批量测试报告中读取每个商品的平均耗时
+
+    只统计相同测试模式、正常结束（passed/failed）的记录。
+    查询报告目录的结果库（先导入新增的报告文件）。
+
+    Args:
+        reports_dir: 报告目录
+        test_mode: 测试模式
+
+    Returns:
+        {商品ID: 平均耗时(秒)}
+    """
+    with ResultsDB.for_reports(reports_dir) as db:
+        return db.average_durations(test_mode)
+
+
+def balance_shards(selected_products, shard_count: int,
+                   durations: Dict[str, float], default_duration: float) -> List[List[Tuple[int, Dict]]]:
+    """按历史耗时把商品分配到各分片（最长耗时优先的贪心分配）
+
+    每次把剩余耗时最长的商品分给当前总耗时最小的分片，
+    使各分片的预计耗时尽量接近，而不是简单按数量平均。
+
+    Args:
+        selected_products: 商品数据列表
+        shard_count: 分片数
+        durations: 历史耗时 {商品ID: 秒}
+        default_duration: 没有历史记录的商品使用的估计耗时；
+            有历史记录时改用历史耗时的中位数
+
+    Returns:
+        每个分片的 [(批次序号, 商品数据), ...]，分片内按批次序号排序
+    """
+    if durations:
+        default_duration = median(durations.values())
+
+    items = sorted(
+        enumerate(selected_products, 1),
+        key=lambda item: durations.get(item[1]['id'], default_duration),
+        reverse=True
+    )
+    shard_count = max(1, min(shard_count, len(selected_products)))
+    shards: List[List[Tuple[int, Dict]]] = [[] for _ in range(shard_count)]
+    loads = [(0.0, i) for i in range(shard_count)]
+
+    for index, product_data in items:
+        load, shard_id = heapq.heappop(loads)
+        shards[shard_id].append((index, product_data))
+        heapq.heappush(loads, (load + durations.get(product_data['id'], default_duration), shard_id))
+
+    return [sorted(shard, key=lambda item: item[0]) for shard in shards]
+
+
+def _shard_process_main(shard_id, shard, total, test_mode, concurrency, block_resources,
+                        use_browser_pool, storage_state, reuse_context, har_mode, har_dir,
+                        event_log_path, result_queue):
+    """分片子进程入口：独立事件循环 + 独立浏览器，结果写入事件日志，逐个回传商品输出"""
+    async def run_shard():
+        browser_pool = BrowserPool(headless=True) if use_browser_pool else None
+        # 各分片进程以追加方式写同一个事件日志
+        event_log = EventLog(event_log_path)
+        try:
+            await run_batch(
+                [product_data for _, product_data in shard],
+                test_mode=test_mode,
+                browser_pool=browser_pool,
+                concurrency=concurrency,
+                block_resources=block_resources,
+                indices=[index for index, _ in shard],
+                total=total,
+                on_result=lambda index, result, output: result_queue.put(('output', index, output)),
+                storage_state=storage_state,
+                reuse_context=reuse_context,
+                har_mode=har_mode,
+                har_dir=har_dir,
+                event_log=event_log
+            )
+        finally:
+            event_log.close()
+            if browser_pool:
+                await browser_pool.close()
+
+    try:
+        asyncio.run(run_shard())
+    finally:
+        result_queue.put(('done', shard_id, None))
+
+
+async def run_sharded(selected_products, event_log_path, test_mode="quick", shards=2, concurrency=1,
+                      block_resources=True, use_browser_pool=True, reports_dir=None,
+                      storage_state=None, reuse_context=False, har_mode=None, har_dir=None):
+    """多进程分片执行一批商品测试
+
+    每个分片在独立进程中运行（各自的事件循环和浏览器），商品和步骤事件追加到同一个事件日志，
+    商品完成后立即把输出回传给父进程整块打印。结果由 build_report(event_log_path) 生成，
+    分片进程崩溃时未完成的商品在报告中记为 error。
+
+    Args:
+        selected_products: 商品数据列表
+        event_log_path: 事件日志路径，各分片进程追加商品和步骤事件
+        test_mode: 测试模式
+        shards: 分片（进程）数
+        concurrency: 每个分片内同时测试的商品数
+        block_resources: 是否按测试模式拦截无关网络资源
+        use_browser_pool: 分片内是否共享浏览器
+        reports_dir: 历史报告目录，用于按耗时均衡分片
+        storage_state: 预热得到的 storage_state 快照路径（各分片共用）
+        reuse_context: 分片内在商品之间复用 BrowserContext
+        har_mode: "record"/"replay"，录制或回放每个商品的 HAR
+        har_dir: HAR 文件目录
+    """
+    total = len(selected_products)
+    durations = load_historical_durations(reports_dir or PROJECT_ROOT / "reports", test_mode)
+    shard_plan = balance_shards(selected_products, shards, durations,
+                                DEFAULT_PRODUCT_DURATION.get(test_mode, 30.0))
+
+    for shard_id, shard in enumerate(shard_plan):
+        estimate = sum(durations.get(p['id'], 0) for _, p in shard)
+        print(f"分片 {shard_id + 1}: {len(shard)} 个商品 (历史耗时约 {estimate:.0f}秒)")
+
+    # 使用 spawn 避免在已运行的事件循环中 fork
+    mp_context = multiprocessing.get_context('spawn')
+    result_queue = mp_context.Queue()
+    processes = [
+        mp_context.Process(
+            target=_shard_process_main,
+            args=(shard_id, shard, total, test_mode, concurrency, block_resources,
+                  use_browser_pool, storage_state, reuse_context, har_mode, har_dir,
+                  str(event_log_path), result_queue),
+            daemon=True
+        )
+        for shard_id, shard in enumerate(shard_plan)
+    ]
+    for process in processes:
+        process.start()
+
+    loop = asyncio.get_running_loop()
+    finished = set()
+
+    def next_message():
+        try:
+            return result_queue.get(timeout=1)
+        except queue.Empty:
+            return None
+
+    try:
+        while len(finished) < len(processes):
+            message = await loop.run_in_executor(None, next_message)
+            if message is None:
+                # 子进程异常退出时不会发送 done 消息
+                for shard_id, process in enumerate(processes):
+                    if shard_id not in finished and not process.is_alive():
+                        finished.add(shard_id)
+                continue
+
+            kind, key, output = message
+            if kind == 'done':
+                finished.add(key)
+            elif output:
+                print(output, flush=True)
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+
+async def prepare_storage_state(selected_products, browser_pool=None,
+                                cache: Optional[StorageStateCache] = None) -> Optional[str]:
+    """批量测试前预热 storage_state 快照
+
+    快照未过期时直接复用，不启动浏览器；否则用共享浏览器（或临时浏览器）
+    访问一次店铺首页并保存快照。
+
+    Args:
+        selected_products: 商品数据列表（用第一个商品的 URL 确定店铺域名）
+        browser_pool: 共享浏览器池（可选）
+        cache: 快照缓存，默认 data/cache/storage_state
+
+    Returns:
+        快照文件路径；预热失败时返回 None
+    """
+    if not selected_products:
+        return None
+
+    cache = cache or StorageStateCache(cache_dir=str(PROJECT_ROOT / "data" / "cache" / "storage_state"))
+    base_url = _store_base_url(selected_products[0])
+
+    cached = cache.load(base_url)
+    if cached:
+        return cached
+
+    pool = browser_pool or BrowserPool(headless=True)
+    try:
+        return await cache.warm_up(await pool.start(), base_url)
+    finally:
+        if browser_pool is None:
+            await pool.close()
 
 
 async def main():
@@ -66,15 +441,40 @@ async def main():
                         help='指定商品ID列表，逗号分隔 (自定义多选模式)')
     parser.add_argument('--limit', type=int, default=20,
                         help='最多测试多少个商品 (默认20，仅在未指定product-ids时生效)')
+    parser.add_argument('--no-browser-pool', action='store_true',
+                        help='禁用共享浏览器池，每个商品单独启动浏览器')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='同时测试的商品数 (默认1，即顺序执行)')
+    parser.add_argument('--no-block-resources', action='store_true',
+                        help='不拦截图片/视频/字体/第三方组件（用于对比拦截前后的结果）')
+    parser.add_argument('--shards', type=int, default=1,
+                        help='多进程分片数 (默认1，即单进程)；按历史耗时均衡分配商品')
+    parser.add_argument('--no-warm-up', action='store_true',
+                        help='不预热 storage_state，每个商品从空白配置开始')
+    parser.add_argument('--reuse-context', action='store_true',
+                        help='在商品之间复用 BrowserContext，每个商品开始前通过购物车接口清空购物车')
+    har_group = parser.add_mutually_exclusive_group()
+    har_group.add_argument('--record-har', nargs='?', const=str(HAR_DIR), metavar='DIR',
+                           help='录制每个商品的网络流量到 HAR (默认目录 data/har)')
+    har_group.add_argument('--replay-har', nargs='?', const=str(HAR_DIR), metavar='DIR',
+                           help='从已录制的 HAR 离线回放，用于可重复的性能基准 (默认目录 data/har)')
+    parser.add_argument('--event-log', type=Path, metavar='FILE',
+                        help='事件日志路径 (默认与报告同名的 .events.jsonl)')
     args = parser.parse_args()
 
+    har_mode = 'record' if args.record_har else 'replay' if args.replay_har else None
+    har_dir = args.record_har or args.replay_har
+    if har_mode:
+        # 录制需要每个商品独立的上下文；回放时预热和购物车接口都会访问网络
+        if args.reuse_context:
+            print("⚠️  HAR 模式下不复用上下文 (--reuse-context 已忽略)")
+            args.reuse_context = False
+        if har_mode == 'replay':
+            args.no_warm_up = True
+
     # 加载商品数据
     products_file = PROJECT_ROOT / "data" / "products.json"
-    with open(products_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    all_products = data.get("products", [])
-    products_dict = {p['id']: p for p in all_products}  # 用于快速查找
+    store = ProductStore.for_catalog(products_file)
 
     # 判断测试模式：自定义多选 vs 过滤模式
     if args.product_ids:
@@ -82,6 +482,7 @@ async def main():
         product_ids = [pid.strip() for pid in args.product_ids.split(',') if pid.strip()]
         print(f"📋 自定义多选模式: 指定了 {len(product_ids)} 个商品ID")
 
+        products_dict = store.get_many(product_ids)
         selected_products = []
         missing_ids = []
 
@@ -96,16 +497,13 @@ async def main():
 
         print(f"✓ 找到 {len(selected_products)} 个商品，准备测试")
     else:
-        # 过滤模式：按优先级/分类过滤
-        products = all_products.copy()
+        # 过滤模式：按优先级/分类过滤（走索引）
+        products = store.find(priority=args.priority, category=args.category)
 
-        # 应用过滤条件
         if args.priority:
-            products = [p for p in products if p.get('priority') == args.priority]
-            print(f"📊 按优先级过滤: {args.priority}, 找到 {len(products)} 个商品")
+            print(f"📊 按优先级过滤: {args.priority}, 找到 {store.count(priority=args.priority)} 个商品")
 
         if args.category:
-            products = [p for p in products if p.get('category') == args.category]
             print(f"📊 按分类过滤: {args.category}, 找到 {len(products)} 个商品")
 
         # 选择商品进行测试
@@ -132,43 +530,106 @@ async def main():
                     if len(selected_products) >= args.limit:
                         break
 
+    store.close()
+
     print("="*80)
     print(f"批量测试开始 - 共 {len(selected_products)} 个商品")
     print(f"测试模式: {args.mode} ({'快速测试' if args.mode == 'quick' else '全面测试'})")
+    if args.concurrency > 1:
+        print(f"并发数: {args.concurrency}")
+    if args.shards > 1:
+        print(f"分片进程数: {args.shards}")
+    if har_mode:
+        print(f"HAR 模式: {'录制' if har_mode == 'record' else '回放'} ({har_dir})")
     print(f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
 
-    # 逐个测试商品
-    results = []
-    start_time = datetime.now()
-
-    for i, product_data in enumerate(selected_products, 1):
-        result = await test_product(product_data, i, len(selected_products), test_mode=args.mode)
-        results.append(result)
-
-        # 简短总结
-        status_icon = "✓" if result['status'] == 'passed' else "✗"
-        print(f"\n{status_icon} [{i}/{len(selected_products)}] {result['product_name'][:60]} - {result['status'].upper()} ({result['duration']:.1f}s)")
+    # 报告文件和事件日志（测试过程中逐条追加，最终报告由事件日志生成）
+    report_file = PROJECT_ROOT / "reports" / f"batch_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    report_file.parent.mkdir(exist_ok=True)
 
-        # 显示失败的步骤
-        if result['status'] != 'passed':
-            for step in result['steps']:
-                if step['status'] == 'failed':
-                    print(f"  ✗ 步骤{step['number']}: {step['name']} - {step.get('message', 'N/A')}")
-                    if step.get('error'):
-                        print(f"     错误: {step['error'][:100]}")
+    # 构建测试配置描述
+    test_scope_desc = ""
+    if args.product_ids:
+        # 自定义多选
+        if len(selected_products) == 1:
+            test_scope_desc = f"单个商品: {selected_products[0]['name'][:30]}"
+        else:
+            test_scope_desc = f"自定义选择 {len(selected_products)} 个商品"
+    elif args.category:
+        test_scope_desc = f"分类: {args.category}"
+    elif args.priority:
+        test_scope_desc = f"优先级: {args.priority}"
+    else:
+        test_scope_desc = f"所有商品 ({len(selected_products)} 个)"
 
-    end_time = datetime.now()
-    total_duration = (end_time - start_time).total_seconds()
+    test_config = {
+        'mode': args.mode,
+        'priority': args.priority,
+        'category': args.category,
+        'product_ids': args.product_ids.split(',') if args.product_ids else None,
+        'product_count': len(selected_products),
+        'concurrency': args.concurrency,
+        'block_resources': not args.no_block_resources,
+        'shards': args.shards,
+        'warm_up': not args.no_warm_up,
+        'reuse_context': args.reuse_context and not args.no_browser_pool,
+        'har_mode': har_mode
+    }
+
+    event_log_path = args.event_log or event_log_path_for(report_file)
+    event_log = EventLog(event_log_path, append=False)
+    event_log.emit('run_start', kind='batch', test_mode=args.mode, test_scope=test_scope_desc,
+                   test_config=test_config,
+                   products=[{'product_id': p['id'], 'product_name': p['name']} for p in selected_products])
+    print(f"事件日志: {event_log_path}")
+
+    # 执行测试（concurrency > 1 时并发执行）
+    try:
+        if args.shards > 1 and len(selected_products) > 1:
+            # 多进程分片：父进程预热快照后，每个进程各自启动浏览器
+            storage_state = None if args.no_warm_up else await prepare_storage_state(selected_products)
+            await run_sharded(selected_products, test_mode=args.mode, shards=args.shards,
+                              concurrency=args.concurrency,
+                              block_resources=not args.no_block_resources,
+                              use_browser_pool=not args.no_browser_pool,
+                              storage_state=storage_state,
+                              reuse_context=args.reuse_context,
+                              har_mode=har_mode, har_dir=har_dir,
+                              event_log_path=event_log_path)
+        else:
+            # 整个批次共享一个浏览器，每个商品使用独立的 BrowserContext
+            browser_pool = None if args.no_browser_pool else BrowserPool(headless=True)
+
+            try:
+                storage_state = None if args.no_warm_up else await prepare_storage_state(selected_products, browser_pool)
+                await run_batch(selected_products, test_mode=args.mode,
+                                browser_pool=browser_pool, concurrency=args.concurrency,
+                                block_resources=not args.no_block_resources,
+                                storage_state=storage_state,
+                                reuse_context=args.reuse_context,
+                                har_mode=har_mode, har_dir=har_dir,
+                                event_log=event_log)
+            finally:
+                if browser_pool:
+                    await browser_pool.close()
+        event_log.emit('run_end')
+    finally:
+        event_log.close()
+
+    # 由事件日志生成报告（与中断后用 recover_report.py 恢复的报告完全一致）
+    report = build_report(event_log_path)
+    results = report['results']
+    total_duration = report['total_duration']
 
     # 生成汇总报告
     print("\n" + "="*80)
     print("批量测试完成")
     print("="*80)
 
-    passed_count = sum(1 for r in results if r['status'] == 'passed')
-    failed_count = sum(1 for r in results if r['status'] == 'failed')
-    error_count = sum(1 for r in results if r['status'] == 'error')
+    passed_count = report['passed']
+    failed_count = report['failed']
+    error_count = report['error']
 
     print(f"总商品数: {len(results)}")
     if len(results) > 0:
@@ -176,6 +637,14 @@ async def main():
         print(f"失败: {failed_count} ({failed_count/len(results)*100:.1f}%)")
         print(f"异常: {error_count} ({error_count/len(results)*100:.1f}%)")
         print(f"总耗时: {total_duration:.1f}秒 (平均 {total_duration/len(results):.1f}秒/商品)")
+
+        network_stats = [r['network'] for r in results if r.get('network')]
+        if network_stats:
+            blocked = sum(n['blocked_requests'] for n in network_stats)
+            saved_mb = sum(n['estimated_bytes_saved'] for n in network_stats) / 1024 / 1024
+            load_times = [n['page_load_time'] for n in network_stats if n.get('page_load_time') is not None]
+            avg_load = f"{sum(load_times)/len(load_times):.1f}秒" if load_times else "N/A"
+            print(f"资源拦截: {blocked} 个请求, 约节省 {saved_mb:.1f}MB, 平均页面加载 {avg_load}")
     else:
         print("⚠️  没有找到符合条件的商品进行测试")
 
@@ -204,51 +673,14 @@ async def main():
                     for error in r['errors']:
                         print(f"    - {error}")
 
-    # 保存详细结果
-    report_file = PROJECT_ROOT / "reports" / f"batch_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    report_file.parent.mkdir(exist_ok=True)
-
-    # 构建测试配置描述
-    test_scope_desc = ""
-    if args.product_ids:
-        # 自定义多选
-        if len(selected_products) == 1:
-            test_scope_desc = f"单个商品: {selected_products[0]['name'][:30]}"
-        else:
-            test_scope_desc = f"自定义选择 {len(selected_products)} 个商品"
-    elif args.category:
-        test_scope_desc = f"分类: {args.category}"
-    elif args.priority:
-        test_scope_desc = f"优先级: {args.priority}"
-    else:
-        test_scope_desc = f"所有商品 ({len(selected_products)} 个)"
-
     with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'timestamp': datetime.now().isoformat(),
-            'test_mode': args.mode,
-            'test_scope': test_scope_desc,
-            'test_config': {
-                'mode': args.mode,
-                'priority': args.priority,
-                'category': args.category,
-                'product_ids': args.product_ids.split(',') if args.product_ids else None,
-                'product_count': len(selected_products)
-            },
-            'summary': {
-                'total': len(results),
-                'passed': passed_count,
-                'failed': failed_count,
-                'error': error_count,
-                'duration': total_duration
-            },
-            'total': len(results),
-            'passed': passed_count,
-            'failed': failed_count,
-            'error': error_count,
-            'total_duration': total_duration,
-            'results': results
-        }, f, ensure_ascii=False, indent=2)
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    try:
+        with ResultsDB(report_file.parent / DEFAULT_DB_NAME) as db:
+            db.record_run(report_file.stem, report, 'batch', path=report_file)
+    except sqlite3.Error as e:
+        print(f"⚠️  写入结果库失败: {e}")
 
     print(f"\n详细报告已保存: {report_file}")
     print("="*80)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+浏览器池性能基准测试
+
+对比「每个商品单独启动浏览器」与「共享浏览器池 + 独立 BrowserContext」
+两种方式的吞吐量（商品数/分钟）。
+
+使用示例:
+    # 只测量浏览器启动开销（离线，不访问网站）
+    python scripts/benchmark_browser_pool.py --startup-only --count 20
+
+    # 用真实商品跑快速测试对比
+    python scripts/benchmark_browser_pool.py --count 5 --mode quick
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from playwright.async_api import async_playwright
+
+from batch_test_products import test_product
+from core.browser_pool import BrowserPool
+
+
+async def bench_startup_without_pool(count: int) -> float:
+    """每次启动新浏览器并打开空白页，返回总耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(count):
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.goto("about:blank")
+        await browser.close()
+        await playwright.stop()
+    return time.perf_counter() - start
+
+
+async def bench_startup_with_pool(count: int) -> float:
+    """共享浏览器，每次新建 BrowserContext 并打开空白页，返回总耗时（秒）"""
+    start = time.perf_counter()
+    async with BrowserPool(headless=True) as pool:
+        for _ in range(count):
+            context = await pool.new_context()
+            page = await context.new_page()
+            await page.goto("about:blank")
+            await context.close()
+    return time.perf_counter() - start
+
+
+async def bench_products(products, test_mode: str, use_pool: bool) -> float:
+    """对给定商品逐个执行测试，返回总耗时（秒）"""
+    start = time.perf_counter()
+    pool = BrowserPool(headless=True) if use_pool else None
+    try:
+        for i, product_data in enumerate(products, 1):
+            await test_product(product_data, i, len(products), test_mode=test_mode, browser_pool=pool)
+    finally:
+        if pool:
+            await pool.close()
+    return time.perf_counter() - start
+
+
+def _throughput(count: int, seconds: float) -> float:
+    """计算商品数/分钟"""
+    return count / seconds * 60 if seconds > 0 else 0.0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='浏览器池性能基准测试')
+    parser.add_argument('--count', type=int, default=10, help='测试商品数量 (默认10)')
+    parser.add_argument('--mode', choices=['quick', 'full'], default='quick',
+                        help='测试模式 (仅在非 --startup-only 时生效)')
+    parser.add_argument('--startup-only', action='store_true',
+                        help='只测量浏览器启动/上下文创建开销，不访问网站')
+    parser.add_argument('--output', type=Path,
+                        help='基准结果输出文件 (默认 reports/benchmark_browser_pool_<时间戳>.json)')
+    args = parser.parse_args()
+
+    if args.startup_only:
+        without_pool = await bench_startup_without_pool(args.count)
+        with_pool = await bench_startup_with_pool(args.count)
+        count = args.count
+    else:
+        with open(PROJECT_ROOT / "data" / "products.json", "r", encoding="utf-8") as f:
+            products = [p for p in json.load(f).get("products", []) if '#' not in p['id']]
+        products = products[:args.count]
+        count = len(products)
+        without_pool = await bench_products(products, args.mode, use_pool=False)
+        with_pool = await bench_products(products, args.mode, use_pool=True)
+
+    result = {
+        'timestamp': datetime.now().isoformat(),
+        'startup_only': args.startup_only,
+        'test_mode': None if args.startup_only else args.mode,
+        'count': count,
+        'without_pool': {
+            'duration': round(without_pool, 2),
+            'products_per_minute': round(_throughput(count, without_pool), 2)
+        },
+        'with_pool': {
+            'duration': round(with_pool, 2),
+            'products_per_minute': round(_throughput(count, with_pool), 2)
+        },
+        'speedup': round(without_pool / with_pool, 2) if with_pool > 0 else None
+    }
+
+    print("\n" + "=" * 60)
+    print("浏览器池基准测试结果")
+    print("=" * 60)
+    print(f"商品数: {count}")
+    print(f"无浏览器池: {without_pool:.1f}秒 ({result['without_pool']['products_per_minute']:.1f} 商品/分钟)")
+    print(f"共享浏览器池: {with_pool:.1f}秒 ({result['with_pool']['products_per_minute']:.1f} 商品/分钟)")
+    print(f"加速比: {result['speedup']}x")
+    print("=" * 60)
+
+    output = args.output or PROJECT_ROOT / "reports" / f"benchmark_browser_pool_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"基准结果已保存: {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
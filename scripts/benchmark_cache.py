@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+爬虫缓存微基准测试
+
+在临时目录中预填充指定数量的缓存条目，测量 CrawlerCache get/set 的单次延迟和磁盘占用，
+并与旧版本「每次访问重写整个 cache_metadata.json」的开销对比。
+
+使用示例:
+    # 默认 10000 个条目
+    python scripts/benchmark_cache.py
+
+    # 自定义条目数和采样次数
+    python scripts/benchmark_cache.py --entries 20000 --samples 2000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.cache import CrawlerCache
+
+
+def _payload(i: int) -> dict:
+    """模拟一条商品 JSON 缓存内容（约 1KB）"""
+    return {
+        'id': str(i),
+        'name': f'Product {i}',
+        'url': f'https://fiido.com/products/product-{i}',
+        'variants': [{'id': f'{i}-{v}', 'price': 999.0 + v, 'available': True} for v in range(8)],
+    }
+
+
+def _url(i: int) -> str:
+    return f'https://fiido.com/products/product-{i}'
+
+
+def _summary(samples) -> dict:
+    """延迟统计（毫秒）"""
+    samples = sorted(samples)
+    return {
+        'mean_ms': round(statistics.mean(samples) * 1000, 4),
+        'p50_ms': round(samples[len(samples) // 2] * 1000, 4),
+        'p95_ms': round(samples[int(len(samples) * 0.95)] * 1000, 4),
+    }
+
+
+def bench_cache(entries: int, samples: int) -> dict:
+    """预填充缓存后测量随机 get 与覆盖写 set 的延迟"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = CrawlerCache(cache_dir=cache_dir, max_size_mb=None)
+
+        start = time.perf_counter()
+        for i in range(entries):
+            cache.set(_url(i), _payload(i))
+        fill_seconds = time.perf_counter() - start
+        stats = cache.get_stats()
+        cache.flush()
+        # 把 WAL 合并回数据库文件后再统计磁盘占用
+        cache._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        disk_files = [path for path in Path(cache_dir).iterdir() if path.is_file()]
+        disk_bytes = sum(path.stat().st_size for path in disk_files)
+
+        get_samples = []
+        for i in random.sample(range(entries), min(samples, entries)):
+            start = time.perf_counter()
+            cache.get(_url(i))
+            get_samples.append(time.perf_counter() - start)
+
+        set_samples = []
+        for i in random.sample(range(entries), min(samples, entries)):
+            start = time.perf_counter()
+            cache.set(_url(i), _payload(i))
+            set_samples.append(time.perf_counter() - start)
+
+        cache.close()
+
+    return {
+        'fill_seconds': round(fill_seconds, 2),
+        'raw_size_mb': round(stats['raw_size_mb'], 2),
+        'stored_size_mb': round(stats['total_size_mb'], 2),
+        'disk_size_mb': round(disk_bytes / (1024 * 1024), 2),
+        'disk_files': len(disk_files),
+        'get': _summary(get_samples),
+        'set': _summary(set_samples),
+    }
+
+
+def bench_legacy_metadata_write(entries: int, samples: int) -> dict:
+    """测量旧实现每次 get/set 都要执行的 cache_metadata.json 整体重写"""
+    now = datetime.now().isoformat()
+    metadata = {
+        f'{i:032x}': {'url': _url(i), 'cached_at': now, 'last_accessed': now, 'size_bytes': 1024}
+        for i in range(entries)
+    }
+    write_samples = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        metadata_file = Path(cache_dir) / 'cache_metadata.json'
+        for _ in range(min(samples, 200)):
+            start = time.perf_counter()
+            with open(metadata_file, 'w') as f:
+                json.dump(metadata, f, indent=2)
+            write_samples.append(time.perf_counter() - start)
+    return _summary(write_samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫缓存微基准测试')
+    parser.add_argument('--entries', type=int, default=10000, help='预填充的缓存条目数 (默认10000)')
+    parser.add_argument('--samples', type=int, default=1000, help='get/set 各采样次数 (默认1000)')
+    parser.add_argument('--output', type=Path,
+                        help='基准结果输出文件 (默认 reports/benchmark_cache_<时间戳>.json)')
+    args = parser.parse_args()
+
+    cache_result = bench_cache(args.entries, args.samples)
+    legacy_result = bench_legacy_metadata_write(args.entries, args.samples)
+
+    result = {
+        'timestamp': datetime.now().isoformat(),
+        'entries': args.entries,
+        'samples': args.samples,
+        'sqlite_index': cache_result,
+        'legacy_metadata_rewrite': legacy_result,
+    }
+
+    print("\n" + "=" * 60)
+    print("爬虫缓存基准测试结果")
+    print("=" * 60)
+    print(f"缓存条目数: {args.entries}（预填充耗时 {cache_result['fill_seconds']} 秒）")
+    print(
+        f"磁盘占用: {cache_result['disk_size_mb']} MB / {cache_result['disk_files']} 个文件 "
+        f"（内容压缩前 {cache_result['raw_size_mb']} MB，压缩后 {cache_result['stored_size_mb']} MB）"
+    )
+    for op in ('get', 'set'):
+        stats = cache_result[op]
+        print(f"{op}: 平均 {stats['mean_ms']} ms, p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms")
+    print(f"旧实现每次访问重写元数据: 平均 {legacy_result['mean_ms']} ms, p95 {legacy_result['p95_ms']} ms")
+    print("=" * 60)
+
+    output = args.output or PROJECT_ROOT / "reports" / f"benchmark_cache_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"基准结果已保存: {output}")
+
+
+if __name__ == "__main__":
+    main()
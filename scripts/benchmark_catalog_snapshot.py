@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+商品目录快照基准测试
+
+对比「解析 JSON + 逐个 Product(**data) 校验」与从已校验快照加载 Product 对象的耗时，
+分别在当前商品目录和合成的大规模目录（默认 50000 个商品）上测量。
+
+使用示例:
+    python scripts/benchmark_catalog_snapshot.py
+
+    # 自定义合成目录规模
+    python scripts/benchmark_catalog_snapshot.py --synthetic 100000 --repeat 5
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.catalog_snapshot import load_catalog
+from core.models import Product
+
+
+def _best_of(repeat: int, func) -> float:
+    """多次执行取最短耗时（秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _validate_from_json(path: Path):
+    """当前做法：解析整个 JSON 后逐个校验"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [Product(**entry) for entry in data.get('products', [])]
+
+
+def bench_catalog(path: Path, repeat: int) -> dict:
+    """在临时目录中复制商品目录并测量各加载方式的耗时"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog = Path(tmp_dir) / 'products.json'
+        shutil.copyfile(path, catalog)
+
+        validate = _best_of(repeat, lambda: _validate_from_json(catalog))
+
+        start = time.perf_counter()
+        built = load_catalog(catalog)
+        build = time.perf_counter() - start
+
+        snapshot = _best_of(repeat, lambda: load_catalog(catalog))
+        strict = _best_of(repeat, lambda: load_catalog(catalog, strict=True))
+        snapshot_size = catalog.with_name('products.snapshot.pkl').stat().st_size
+
+    return {
+        'products': len(built.products),
+        'json_size_mb': round(path.stat().st_size / (1024 * 1024), 2),
+        'snapshot_size_mb': round(snapshot_size / (1024 * 1024), 2),
+        'json_validate_ms': round(validate * 1000, 1),
+        'snapshot_build_ms': round(build * 1000, 1),
+        'snapshot_load_ms': round(snapshot * 1000, 1),
+        'strict_load_ms': round(strict * 1000, 1),
+        'speedup': round(validate / snapshot, 2) if snapshot > 0 else None,
+    }
+
+
+def write_synthetic_catalog(source: Path, target: Path, size: int):
+    """以当前商品目录为模板生成指定规模的合成目录"""
+    with open(source, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    templates = data.get('products', [])
+    products = []
+    for i in range(size):
+        product = dict(templates[i % len(templates)])
+        product['id'] = f"{product['id']}-{i}"
+        products.append(product)
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_products': size, 'synthetic': True}, 'products': products}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='商品目录快照基准测试')
+    parser.add_argument('--catalog', type=Path, default=PROJECT_ROOT / 'data' / 'products.json',
+                        help='当前商品目录 (默认 data/products.json)')
+    parser.add_argument('--synthetic', type=int, default=50000, help='合成目录商品数 (默认50000，0 表示跳过)')
+    parser.add_argument('--repeat', type=int, default=3, help='每种方式重复次数，取最短耗时 (默认3)')
+    parser.add_argument('--output', type=Path,
+                        help='基准结果输出文件 (默认 reports/benchmark_catalog_snapshot_<时间戳>.json)')
+    args = parser.parse_args()
+
+    results = {'current': bench_catalog(args.catalog, args.repeat)}
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            synthetic = Path(tmp_dir) / 'synthetic.json'
+            write_synthetic_catalog(args.catalog, synthetic, args.synthetic)
+            results['synthetic'] = bench_catalog(synthetic, args.repeat)
+
+    print("\n" + "=" * 60)
+    print("商品目录快照基准测试结果")
+    print("=" * 60)
+    for name, r in results.items():
+        print(f"{'当前目录' if name == 'current' else '合成目录'}: {r['products']} 个商品 "
+              f"(JSON {r['json_size_mb']} MB, 快照 {r['snapshot_size_mb']} MB)")
+        print(f"  JSON 解析 + 校验: {r['json_validate_ms']} ms")
+        print(f"  快照加载: {r['snapshot_load_ms']} ms (加速 {r['speedup']}x)")
+        print(f"  首次生成快照: {r['snapshot_build_ms']} ms, strict 重新校验: {r['strict_load_ms']} ms")
+    print("=" * 60)
+
+    output = args.output or PROJECT_ROOT / "reports" / f"benchmark_catalog_snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': datetime.now().isoformat(), 'results': results}, f, ensure_ascii=False, indent=2)
+    print(f"基准结果已保存: {output}")
+
+
+if __name__ == "__main__":
+    main()
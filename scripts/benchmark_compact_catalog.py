@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+紧凑商品目录内存基准测试
+
+生成带多个变体的合成商品目录，用 tracemalloc 对比以 Product 对象列表保存
+和以 CompactCatalog 保存时的内存占用，并测量构建耗时和按 ID 创建 Product 的耗时。
+
+使用示例:
+    # 默认 10000 和 50000 个商品，每个商品 8 个变体
+    python scripts/benchmark_compact_catalog.py
+
+    # 自定义规模
+    python scripts/benchmark_compact_catalog.py --sizes 100000 --variants 12
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.compact_catalog import CompactCatalog
+from core.models import Product
+
+CATEGORIES = ['Electric Bikes', 'Electric Scooters', 'Accessories', 'Spare Parts', 'Apparel']
+PRIORITIES = ['P0', 'P1', 'P2']
+COLORS = ['Black', 'White', 'Grey', 'Blue', 'Green', 'Red']
+SIZES = ['S', 'M', 'L', 'XL']
+
+
+def _product(i: int, variants: int) -> dict:
+    """模拟多店铺目录中带多个变体的商品"""
+    options = [
+        {'name': COLORS[j % len(COLORS)], 'type': 'color',
+         'selector': f"button[data-value='{COLORS[j % len(COLORS)]}']"}
+        if j % 2 == 0 else
+        {'name': SIZES[j % len(SIZES)], 'type': 'size',
+         'selector': f"button[data-value='{SIZES[j % len(SIZES)]}']", 'price_modifier': 20.0 * (j % 3)}
+        for j in range(variants)
+    ]
+    return {
+        'id': str(6000000000000 + i),
+        'name': f'Fiido Product {i}',
+        'url': f'https://fiido.com/products/product-{i}',
+        'category': CATEGORIES[i % len(CATEGORIES)],
+        'price_min': 18.0 + i % 100,
+        'price_max': 48.0 + i % 100,
+        'currency': 'USD',
+        'variants': options,
+        'selectors': {
+            'product_title': '.product-title, h1.product__title',
+            'product_price': '.product-price, .price',
+            'add_to_cart_button': "button[name='add'], button:has-text('Add to Cart')",
+            'variant_options': {},
+        },
+        'priority': PRIORITIES[i % len(PRIORITIES)],
+        'tags': ['Replacement Parts', 'D11', 'M1 Pro'],
+        'metadata': {'handle': f'product-{i}', 'vendor': 'Fiido'},
+        'discovered_at': '2025-12-05T10:42:22.866581',
+        'last_tested': None,
+        'test_status': 'untested',
+    }
+
+
+def _measure(build) -> tuple:
+    """测量 build() 返回对象的常驻内存（MB）和构建耗时（毫秒）"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, round(current / (1024 * 1024), 1), round(elapsed * 1000, 1)
+
+
+def bench_size(size: int, variants: int) -> dict:
+    """对单个规模对比两种表示的内存和耗时"""
+    entries = [_product(i, variants) for i in range(size)]
+
+    products, products_mb, products_ms = _measure(lambda: [Product(**entry) for entry in entries])
+    del products
+
+    catalog, compact_mb, compact_ms = _measure(lambda: CompactCatalog.from_products(entries))
+
+    sample = [str(6000000000000 + i) for i in range(0, size, max(1, size // 1000))]
+    start = time.perf_counter()
+    for product_id in sample:
+        catalog.get(product_id).to_product()
+    materialize = (time.perf_counter() - start) / len(sample)
+
+    return {
+        'products': size,
+        'variants_per_product': variants,
+        'product_list_mb': products_mb,
+        'compact_mb': compact_mb,
+        'reduction': round(products_mb / compact_mb, 1) if compact_mb else None,
+        'product_list_build_ms': products_ms,
+        'compact_build_ms': compact_ms,
+        'materialize_ms': round(materialize * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='紧凑商品目录内存基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000],
+                        help='商品目录规模 (默认 10000 50000)')
+    parser.add_argument('--variants', type=int, default=8, help='每个商品的变体数 (默认8)')
+    parser.add_argument('--output', type=Path,
+                        help='基准结果输出文件 (默认 reports/benchmark_compact_catalog_<时间戳>.json)')
+    args = parser.parse_args()
+
+    results = [bench_size(size, args.variants) for size in args.sizes]
+
+    print("\n" + "=" * 60)
+    print("紧凑商品目录基准测试结果")
+    print("=" * 60)
+    for r in results:
+        print(f"商品数: {r['products']} (每个商品 {r['variants_per_product']} 个变体)")
+        print(f"  Product 列表: {r['product_list_mb']} MB, 构建 {r['product_list_build_ms']} ms")
+        print(f"  CompactCatalog: {r['compact_mb']} MB, 构建 {r['compact_build_ms']} ms "
+              f"(内存减少 {r['reduction']}x)")
+        print(f"  按 ID 创建 Product: {r['materialize_ms']} ms/个")
+    print("=" * 60)
+
+    output = args.output or PROJECT_ROOT / "reports" / f"benchmark_compact_catalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': datetime.now().isoformat(), 'results': results}, f, ensure_ascii=False, indent=2)
+    print(f"基准结果已保存: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+商品索引基准测试
+
+生成指定规模的合成商品目录，对比「每次解析整个 products.json 再线性查找/过滤」
+与「ProductStore 索引查找/过滤」的耗时。
+
+使用示例:
+    # 默认 10000 和 100000 个商品
+    python scripts/benchmark_product_store.py
+
+    # 自定义规模
+    python scripts/benchmark_product_store.py --sizes 1000 50000 --lookups 500
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.product_store import ProductStore
+
+CATEGORIES = ['Electric Bikes', 'Electric Scooters', 'Accessories', 'Spare Parts', 'Apparel']
+PRIORITIES = ['P0', 'P1', 'P2']
+
+
+def _product(i: int) -> dict:
+    """模拟 data/products.json 中的一条商品（约 800 字节）"""
+    return {
+        'id': str(6000000000000 + i),
+        'name': f'Fiido Product {i}',
+        'url': f'https://fiido.com/products/product-{i}',
+        'category': CATEGORIES[i % len(CATEGORIES)],
+        'price_min': 18.0 + i % 100,
+        'price_max': 18.0 + i % 100,
+        'currency': 'USD',
+        'variants': [],
+        'selectors': {
+            'product_title': '.product-title, h1.product__title',
+            'product_price': '.product-price, .price',
+            'add_to_cart_button': "button[name='add'], button:has-text('Add to Cart')",
+            'variant_options': {},
+        },
+        'priority': PRIORITIES[i % len(PRIORITIES)],
+        'tags': ['Replacement Parts', 'D11', 'M1 Pro'],
+        'discovered_at': '2025-12-05T10:42:22.866581',
+        'last_tested': None,
+        'test_status': 'untested',
+    }
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def bench_size(size: int, lookups: int) -> dict:
+    """对单个规模测量 JSON 方式与索引方式的查找和过滤耗时"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog = Path(tmp_dir) / 'products.json'
+        with open(catalog, 'w', encoding='utf-8') as f:
+            json.dump({'metadata': {'total_products': size}, 'products': [_product(i) for i in range(size)]}, f, indent=2)
+
+        ids = [str(6000000000000 + i) for i in random.sample(range(size), min(lookups, size))]
+
+        # 旧方式：每个进程都解析整个文件后线性查找（run_product_test.main）
+        start = time.perf_counter()
+        with open(catalog, 'r', encoding='utf-8') as f:
+            products = json.load(f)['products']
+        json_load = time.perf_counter() - start
+        scan_samples = []
+        for product_id in ids[:50]:
+            start = time.perf_counter()
+            next((p for p in products if p['id'] == product_id), None)
+            scan_samples.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        [p for p in products if p.get('priority') == 'P0' and p.get('category') == 'Electric Bikes']
+        json_filter = time.perf_counter() - start
+        del products
+
+        # 索引：首次打开导入，之后打开只比较文件大小和修改时间
+        start = time.perf_counter()
+        ProductStore.for_catalog(catalog).close()
+        index_import = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store = ProductStore.for_catalog(catalog)
+        index_open = time.perf_counter() - start
+        get_samples = []
+        for product_id in ids:
+            start = time.perf_counter()
+            store.get(product_id)
+            get_samples.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        store.find(priority='P0', category='Electric Bikes')
+        index_filter = time.perf_counter() - start
+        store.close()
+
+        file_size = catalog.stat().st_size
+
+    return {
+        'products': size,
+        'json_size_mb': round(file_size / (1024 * 1024), 2),
+        'json': {
+            'load_ms': _ms(json_load),
+            'lookup_ms': _ms(statistics.mean(scan_samples)),
+            'filter_ms': _ms(json_filter),
+            'open_and_lookup_ms': _ms(json_load + statistics.mean(scan_samples)),
+        },
+        'index': {
+            'import_ms': _ms(index_import),
+            'open_ms': _ms(index_open),
+            'lookup_ms': _ms(statistics.mean(get_samples)),
+            'filter_ms': _ms(index_filter),
+            'open_and_lookup_ms': _ms(index_open + statistics.mean(get_samples)),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='商品索引基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000],
+                        help='商品目录规模 (默认 10000 100000)')
+    parser.add_argument('--lookups', type=int, default=1000, help='索引按 ID 查找的采样次数 (默认1000)')
+    parser.add_argument('--output', type=Path,
+                        help='基准结果输出文件 (默认 reports/benchmark_product_store_<时间戳>.json)')
+    args = parser.parse_args()
+
+    results = [bench_size(size, args.lookups) for size in args.sizes]
+
+    print("\n" + "=" * 60)
+    print("商品索引基准测试结果")
+    print("=" * 60)
+    for r in results:
+        print(f"商品数: {r['products']} (JSON {r['json_size_mb']} MB)")
+        print(f"  JSON: 解析 {r['json']['load_ms']} ms, 线性查找 {r['json']['lookup_ms']} ms, "
+              f"过滤 {r['json']['filter_ms']} ms")
+        print(f"  索引: 首次导入 {r['index']['import_ms']} ms, 打开 {r['index']['open_ms']} ms, "
+              f"查找 {r['index']['lookup_ms']} ms, 过滤 {r['index']['filter_ms']} ms")
+        print(f"  打开并查找一个商品: JSON {r['json']['open_and_lookup_ms']} ms vs "
+              f"索引 {r['index']['open_and_lookup_ms']} ms")
+    print("=" * 60)
+
+    output = args.output or PROJECT_ROOT / "reports" / f"benchmark_product_store_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': datetime.now().isoformat(), 'results': results}, f, ensure_ascii=False, indent=2)
+    print(f"基准结果已保存: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+测试结果库基准测试
+
+生成指定数量的合成批量测试报告，对比报告列表的两种读取方式：
+「glob 并解析全部 batch_test_*.json」（原报告中心做法）与「查询结果库」。
+
+使用示例:
+    # 默认 2000 份报告（约三个月每小时一次的运行），每份 20 个商品
+    python scripts/benchmark_results_db.py
+
+    # 自定义规模
+    python scripts/benchmark_results_db.py --reports 5000 --products 50
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.results_db import ResultsDB
+
+STEP_NAMES = ['页面访问', '商品信息显示', '添加购物车', '购物车验证', '支付流程']
+
+
+def _report(index: int, products: int) -> dict:
+    """模拟 batch_test_products.py 写出的报告"""
+    timestamp = datetime(2025, 12, 1) + timedelta(hours=index)
+    results = [
+        {
+            'product_id': f'product-{p}',
+            'product_name': f'Fiido Product {p}',
+            'status': 'passed' if (index + p) % 10 else 'failed',
+            'duration': 10.0 + p % 7,
+            'steps': [
+                {'number': n + 1, 'name': name, 'description': name, 'status': 'passed',
+                 'message': f'{name}正常', 'error': None, 'duration': 1.5}
+                for n, name in enumerate(STEP_NAMES)
+            ],
+            'errors': [],
+        }
+        for p in range(products)
+    ]
+    passed = sum(1 for r in results if r['status'] == 'passed')
+    return {
+        'timestamp': timestamp.isoformat(),
+        'test_mode': 'quick',
+        'test_scope': f'所有商品 ({products} 个)',
+        'test_config': {'mode': 'quick', 'product_count': products},
+        'summary': {'total': products, 'passed': passed, 'failed': products - passed, 'duration': 300.0},
+        'results': results,
+    }
+
+
+def _glob_and_parse(reports_dir: Path) -> list:
+    """原做法：每次请求解析全部报告文件"""
+    reports = []
+    for report_file in reports_dir.glob('batch_test_*.json'):
+        with open(report_file) as f:
+            data = json.load(f)
+        reports.append({
+            'id': report_file.stem,
+            'timestamp': data.get('timestamp', ''),
+            'summary': data.get('summary', {}),
+            'test_mode': data.get('test_mode', ''),
+            'test_scope': data.get('test_scope', ''),
+            'test_config': data.get('test_config', {}),
+        })
+    reports.sort(key=lambda x: x['timestamp'], reverse=True)
+    return reports
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测试结果库基准测试')
+    parser.add_argument('--reports', type=int, default=2000, help='报告数量 (默认2000)')
+    parser.add_argument('--products', type=int, default=20, help='每份报告的商品数 (默认20)')
+    parser.add_argument('--output', type=Path,
+                        help='基准结果输出文件 (默认 reports/benchmark_results_db_<时间戳>.json)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        reports_dir = Path(tmp_dir)
+        for i in range(args.reports):
+            report = _report(i, args.products)
+            name = datetime.fromisoformat(report['timestamp']).strftime('%Y%m%d_%H%M%S')
+            with open(reports_dir / f"batch_test_{name}.json", 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+        start = time.perf_counter()
+        _glob_and_parse(reports_dir)
+        glob_parse = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db = ResultsDB.for_reports(reports_dir)
+        first_import = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db.import_reports(reports_dir)
+        incremental = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db.list_runs()
+        query = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db.product_history('product-1')
+        history = time.perf_counter() - start
+        db.close()
+
+    results = {
+        'reports': args.reports,
+        'products_per_report': args.products,
+        'glob_and_parse_ms': _ms(glob_parse),
+        'first_import_ms': _ms(first_import),
+        'incremental_import_ms': _ms(incremental),
+        'list_runs_ms': _ms(query),
+        'product_history_ms': _ms(history),
+        'speedup': round(glob_parse / query, 1) if query > 0 else None,
+    }
+
+    print("\n" + "=" * 60)
+    print("测试结果库基准测试结果")
+    print("=" * 60)
+    print(f"报告数: {results['reports']} (每份 {results['products_per_report']} 个商品)")
+    print(f"  glob + 解析全部报告: {results['glob_and_parse_ms']} ms")
+    print(f"  结果库查询报告列表: {results['list_runs_ms']} ms (加速 {results['speedup']}x)")
+    print(f"  单个商品历史查询: {results['product_history_ms']} ms")
+    print(f"  首次导入: {results['first_import_ms']} ms, 无变化时增量导入: {results['incremental_import_ms']} ms")
+    print("=" * 60)
+
+    output = args.output or PROJECT_ROOT / "reports" / f"benchmark_results_db_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': datetime.now().isoformat(), 'results': results}, f, ensure_ascii=False, indent=2)
+    print(f"基准结果已保存: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,15 @@
 
 比较当前商品数据与历史数据，识别新增、修改、删除的商品。
 用于增量测试，仅对变更的商品执行 E2E 测试。
+
+discover_products.py --incremental 会输出按 updated_at 计算的变更增量，
+通过 --delta 传入时直接使用增量，不再对全部商品计算哈希。
 """
 
 import json
 import hashlib
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 import argparse
 
@@ -54,6 +57,10 @@ class ProductChangeDetector:
         with open(file_path) as f:
             products_list = json.load(f)
 
+        # discover_products.py 输出的格式为 {"metadata": ..., "products": [...]}
+        if isinstance(products_list, dict):
+            products_list = products_list.get('products', [])
+
         # 转换为字典，以 ID 为 key
         products_dict = {}
         for product in products_list:
@@ -101,10 +108,32 @@ class ProductChangeDetector:
         # 计算 SHA256 哈希
         return hashlib.sha256(normalized_json.encode()).hexdigest()
 
-    def detect_changes(self) -> Dict:
+    @staticmethod
+    def load_delta(file_path: str) -> Optional[Dict]:
+        """
+        加载 discover_products.py 输出的变更增量
+
+        Args:
+            file_path: 增量文件路径
+
+        Returns:
+            增量字典，文件不存在时返回 None
+        """
+        path = Path(file_path)
+        if not path.exists():
+            return None
+
+        with open(path) as f:
+            return json.load(f)
+
+    def detect_changes(self, delta: Optional[Dict] = None) -> Dict:
         """
         检测商品变更
 
+        Args:
+            delta: 变更增量（added / changed / removed 商品ID列表）。
+                传入时新增、删除和修改的商品直接取自增量，不计算哈希
+
         Returns:
             变更报告，包含新增、修改、删除的商品列表
         """
@@ -124,8 +153,16 @@ class ProductChangeDetector:
         current_ids = set(current_products.keys())
         history_ids = set(history_products.keys())
 
+        if delta is not None:
+            added_ids = set(delta.get('added', [])) & current_ids
+            removed_ids = set(delta.get('removed', []))
+            changed_ids = set(delta.get('changed', [])) & current_ids
+        else:
+            added_ids = current_ids - history_ids
+            removed_ids = history_ids - current_ids
+            changed_ids = None
+
         # 1. 新增的商品
-        added_ids = current_ids - history_ids
         added_products = [
             {
                 'id': pid,
@@ -137,12 +174,11 @@ class ProductChangeDetector:
         ]
 
         # 2. 删除的商品
-        removed_ids = history_ids - current_ids
         removed_products = [
             {
                 'id': pid,
-                'name': history_products[pid].get('name', ''),
-                'url': history_products[pid].get('url', ''),
+                'name': history_products.get(pid, {}).get('name', ''),
+                'url': history_products.get(pid, {}).get('url', ''),
                 'reason': 'removed_product'
             }
             for pid in removed_ids
@@ -150,27 +186,27 @@ class ProductChangeDetector:
 
         # 3. 修改的商品（内容发生变化）
         modified_products = []
-        for pid in current_ids & history_ids:
-            current_hash = self._calculate_product_hash(current_products[pid])
-            history_hash = self._calculate_product_hash(history_products[pid])
-
-            if current_hash != history_hash:
-                # 分析具体变更原因
-                reason = self._analyze_modification(
-                    current_products[pid],
-                    history_products[pid]
-                )
-
-                modified_products.append({
-                    'id': pid,
-                    'name': current_products[pid].get('name', ''),
-                    'url': current_products[pid].get('url', ''),
-                    'reason': reason,
-                    'changes': self._get_field_changes(
-                        current_products[pid],
-                        history_products[pid]
-                    )
-                })
+        if changed_ids is None:
+            # 没有增量时逐个比较哈希
+            changed_ids = {
+                pid for pid in current_ids & history_ids
+                if self._calculate_product_hash(current_products[pid])
+                != self._calculate_product_hash(history_products[pid])
+            }
+
+        for pid in changed_ids:
+            history_product = history_products.get(pid, {})
+
+            # 分析具体变更原因
+            reason = self._analyze_modification(current_products[pid], history_product)
+
+            modified_products.append({
+                'id': pid,
+                'name': current_products[pid].get('name', ''),
+                'url': current_products[pid].get('url', ''),
+                'reason': reason,
+                'changes': self._get_field_changes(current_products[pid], history_product)
+            })
 
         # 生成变更报告
         report = {
@@ -183,7 +219,7 @@ class ProductChangeDetector:
                 'added': len(added_products),
                 'removed': len(removed_products),
                 'modified': len(modified_products),
-                'unchanged': len(current_ids & history_ids) - len(modified_products)
+                'unchanged': len(current_ids) - len(added_products) - len(modified_products)
             },
             'changes': {
                 'added': added_products,
@@ -474,6 +510,10 @@ def main():
         default='data/product_changes.json',
         help='变更报告输出文件'
     )
+    parser.add_argument(
+        '--delta',
+        help='discover_products.py --incremental 输出的变更增量文件（如 data/product_delta.json）'
+    )
     parser.add_argument(
         '--save-history',
         action='store_true',
@@ -494,7 +534,13 @@ def main():
     )
 
     # 检测变更
-    report = detector.detect_changes()
+    delta = None
+    if args.delta:
+        delta = detector.load_delta(args.delta)
+        if delta is None:
+            print(f"⚠️ 增量文件不存在: {args.delta}，改为全量比较")
+
+    report = detector.detect_changes(delta=delta)
 
     # 保存报告
     detector.save_changes(report)
@@ -14,25 +14,40 @@
     # 限制每个分类的商品数量
     python scripts/discover_products.py --limit 10
 
-    # 增量更新（只抓取新商品）
+    # 增量更新：updated_at 未变化的商品直接复用，并输出变更增量
     python scripts/discover_products.py --incremental
 
+    # 中断后从最后完成的分类继续
+    python scripts/discover_products.py --resume
+
     # 指定输出文件
     python scripts/discover_products.py --output data/my_products.json
+
+    # 8 个线程并发抓取分类，每个域名初始每秒 4 个请求（按响应自适应调整）
+    python scripts/discover_products.py --workers 8 --rate 4
+
+    # 全站 /products.json 只抓一次，分类只取 handle 确定归属
+    python scripts/discover_products.py --strategy storewide
+
+    # 按 sitemap lastmod 只抓取新增和修改过的商品（基于现有商品文件）
+    python scripts/discover_products.py --strategy sitemap
 """
 
 import argparse
 import json
 import logging
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.crawler import ProductCrawler
+from core.rate_limiter import DEFAULT_REQUESTS_PER_SECOND
 from core.models import Product
 
 
@@ -94,12 +109,66 @@ def save_products(products: List[Product], file_path: Path, metadata: Dict[str,
     logger.info(f"Products saved to {file_path}")
 
 
+def compute_delta(
+    product_ids: List[str],
+    existing_products: Dict[str, Dict[str, Any]],
+    unchanged_ids: Set[str]
+) -> Dict[str, Any]:
+    """计算本次发现结果相对上次的变更增量
+
+    两次都存在的商品中，updated_at 未变化（由爬虫复用）的为未变更，
+    其余（包括缺少 updated_at 的 HTML 解析商品）都视为已修改。
+
+    Args:
+        product_ids: 本次发现的商品ID列表（按输出顺序）
+        existing_products: 上次的商品字典
+        unchanged_ids: 爬虫复用的商品ID集合
+
+    Returns:
+        增量字典，包含 added / changed / removed 商品ID列表和摘要
+    """
+    current_ids = list(product_ids)
+    current_set = set(current_ids)
+
+    added = [pid for pid in current_ids if pid not in existing_products]
+    changed = [pid for pid in current_ids if pid in existing_products and pid not in unchanged_ids]
+    removed = sorted(pid for pid in existing_products if pid not in current_set)
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'summary': {
+            'added': len(added),
+            'changed': len(changed),
+            'removed': len(removed),
+            'unchanged': len(current_ids) - len(added) - len(changed)
+        },
+        'added': added,
+        'changed': changed,
+        'removed': removed
+    }
+
+
+def save_delta(delta: Dict[str, Any], file_path: Path):
+    """保存变更增量
+
+    Args:
+        delta: compute_delta() 的结果
+        file_path: 输出文件路径
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(delta, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"Delta saved to {file_path}")
+
+
 def print_statistics(
     total_collections: int,
     total_products: int,
     new_products: int,
     updated_products: int,
-    duration: float
+    duration: float,
+    crawl_stats: Optional[Dict[str, Any]] = None
 ):
     """打印统计信息
 
@@ -109,6 +178,7 @@ def print_statistics(
         new_products: 新增商品数
         updated_products: 更新商品数
         duration: 执行耗时（秒）
+        crawl_stats: ProductCrawler.get_stats() 返回的抓取统计
     """
     print("\n" + "=" * 60)
     print("商品发现统计")
@@ -118,79 +188,513 @@ def print_statistics(
     print(f"新增商品: {new_products}")
     print(f"更新商品: {updated_products}")
     print(f"执行耗时: {duration:.2f} 秒")
+
+    if crawl_stats:
+        rate_limit = crawl_stats.get('rate_limit', {})
+        print(f"限速等待: {rate_limit.get('total_wait_time', 0):.2f} 秒")
+        print(f"被限流次数 (429/503): {rate_limit.get('throttled_responses', 0)}")
+        enrichment = crawl_stats.get('enrichment', {})
+        if enrichment.get('enriched') or enrichment.get('failed'):
+            print(f"补抓详情: 成功 {enrichment['enriched']}, 失败 {enrichment['failed']}")
+        sitemap = crawl_stats.get('sitemap', {})
+        if sitemap.get('urls'):
+            print(
+                f"Sitemap 商品: {sitemap['urls']} 个, 请求详情 {sitemap['fetched']}, "
+                f"复用 {sitemap['reused']}, 失败 {sitemap['failed']}"
+            )
+        for host, host_stats in rate_limit.get('hosts', {}).items():
+            print(
+                f"  {host}: {host_stats['requests']} 个请求, "
+                f"当前速率 {host_stats['current_rate']}/s, 限流 {host_stats['throttled']} 次"
+            )
+
     print("=" * 60)
 
 
+def _fetch_collections(
+    crawler: ProductCrawler,
+    collections: List[Tuple[int, str]],
+    limit_per_collection: Optional[int],
+    workers: int
+) -> Iterator[Tuple[int, str, Optional[List[Product]]]]:
+    """抓取各分类的商品，按完成顺序逐个产出
+
+    workers > 1 时用线程池并发抓取各分类（同一分类内的分页仍按顺序，
+    需要根据最后一页不满判断结束），请求速率由爬虫共享的按域名限速器控制。
+
+    Args:
+        crawler: ProductCrawler 实例
+        collections: (分类序号, 分类路径) 列表
+        limit_per_collection: 每个分类的商品数量限制
+        workers: 并发线程数
+
+    Yields:
+        (分类序号, 分类路径, 商品列表)，抓取失败时商品列表为 None
+    """
+    def fetch(collection_path: str) -> Optional[List[Product]]:
+        try:
+            return crawler.discover_products(collection_path, limit=limit_per_collection)
+        except Exception as e:
+            logger.error(f"  Failed to process {collection_path}: {e}")
+            return None
+
+    if workers <= 1:
+        for done, (index, collection_path) in enumerate(collections, 1):
+            logger.info(f"[{done}/{len(collections)}] Processing collection: {collection_path}")
+            yield index, collection_path, fetch(collection_path)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(fetch, collection_path): (index, collection_path)
+            for index, collection_path in collections
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            # 取出后不再引用已产出的结果，内存不随抓取的分类数增长
+            index, collection_path = futures.pop(future)
+            logger.info(f"[{done}/{len(collections)}] Finished collection: {collection_path}")
+            yield index, collection_path, future.result()
+
+
+def iter_discovered_products(
+    crawler: ProductCrawler,
+    collection_paths: List[str],
+    limit_per_collection: Optional[int] = None,
+    workers: int = 1,
+    completed: Optional[Set[int]] = None,
+    seen_ranks: Optional[Dict[str, Tuple[int, int]]] = None
+) -> Iterator[Tuple[str, Any]]:
+    """商品发现流水线：抓取 → 解析 → 去重，边抓取边产出
+
+    每个商品的位置记为 (分类序号, 分类内位置)。商品ID第一次出现、或出现在更靠前
+    的位置时产出（并发模式下分类按完成顺序到达，靠前的分类可能晚到），
+    消费方对同一商品ID保留最后产出的那条即与顺序抓取的去重结果一致。
+    只在内存中保留商品ID到位置的映射。
+
+    Args:
+        crawler: ProductCrawler 实例
+        collection_paths: 分类路径列表
+        limit_per_collection: 每个分类的商品数量限制
+        workers: 并发抓取分类的线程数
+        completed: 已完成的分类序号（断点续传时跳过）
+        seen_ranks: 已产出商品的位置（断点续传时传入，原地更新）
+
+    Yields:
+        ('product', ((分类序号, 分类内位置), Product))；
+        分类处理完后产出 ('collection', (分类序号, 分类路径, 商品数, 重复数))；
+        抓取失败的分类不产出 collection 事件
+    """
+    completed = completed or set()
+    seen_ranks = {} if seen_ranks is None else seen_ranks
+    pending = [(index, path) for index, path in enumerate(collection_paths) if index not in completed]
+
+    for index, collection_path, products in _fetch_collections(
+        crawler, pending, limit_per_collection, workers
+    ):
+        if products is None:
+            continue
+
+        duplicates = 0
+        for position, product in enumerate(products):
+            rank = (index, position)
+
+            # 去重检查：如果商品ID已存在，保留分类顺序靠前的一条
+            best = seen_ranks.get(product.id)
+            if best is not None:
+                duplicates += 1
+                logger.debug(f"  Duplicate product: {product.name} (ID: {product.id})")
+                if rank > best:
+                    continue
+
+            seen_ranks[product.id] = rank
+            yield 'product', (rank, product)
+
+        yield 'collection', (index, collection_path, len(products), duplicates)
+
+
 def discover_products_from_collections(
     crawler: ProductCrawler,
     collection_paths: List[str],
     limit_per_collection: int = None,
-    existing_products: Dict[str, Dict[str, Any]] = None
+    existing_products: Dict[str, Dict[str, Any]] = None,
+    workers: int = 1
 ) -> tuple[List[Product], int, int]:
-    """从分类列表中发现商品
+    """从分类列表中发现商品（结果保存在内存中）
+
+    并发模式下分类按完成顺序到达，去重时保留分类顺序最靠前的那一条，
+    最终结果按 (分类序号, 分类内位置) 排序，与顺序抓取的结果完全一致。
 
     Args:
         crawler: ProductCrawler 实例
         collection_paths: 分类路径列表
         limit_per_collection: 每个分类的商品数量限制
         existing_products: 已存在的商品字典
+        workers: 并发抓取分类的线程数，1 表示顺序抓取
 
     Returns:
         (商品列表, 新增数量, 更新数量)
     """
-    # 使用字典进行去重，key为商品ID
-    products_dict = {}
-    new_count = 0
-    updated_count = 0
+    # 使用字典进行去重，key为商品ID，value为 ((分类序号, 分类内位置), 商品)
+    products_dict: Dict[str, Tuple[Tuple[int, int], Product]] = {}
     duplicate_count = 0
-    existing_products = existing_products or {}
 
-    for i, collection_path in enumerate(collection_paths, 1):
-        logger.info(f"[{i}/{len(collection_paths)}] Processing collection: {collection_path}")
+    for event, payload in iter_discovered_products(
+        crawler, collection_paths, limit_per_collection, workers
+    ):
+        if event == 'product':
+            rank, product = payload
+            products_dict[product.id] = (rank, product)
+        else:
+            _, collection_path, found, duplicates = payload
+            duplicate_count += duplicates
+            logger.info(f"  Found {found} products in {collection_path}")
 
-        try:
-            products = crawler.discover_products(collection_path, limit=limit_per_collection)
+    # 按分类顺序转换为列表
+    all_products = [product for _, product in sorted(products_dict.values(), key=lambda item: item[0])]
+    new_count, updated_count = _merge_existing_products(all_products, existing_products or {})
 
-            for product in products:
-                # 去重检查：如果商品ID已存在，跳过
-                if product.id in products_dict:
-                    duplicate_count += 1
-                    logger.debug(f"  Skipping duplicate product: {product.name} (ID: {product.id})")
-                    continue
+    if duplicate_count > 0:
+        logger.info(f"📊 De-duplication: Removed {duplicate_count} duplicate products")
 
-                # 检查是新商品还是更新
-                if product.id in existing_products:
-                    # 更新已存在的商品
-                    existing_product = existing_products[product.id]
-                    # 保留原有的测试状态和最后测试时间
-                    if 'test_status' in existing_product:
-                        product.test_status = existing_product['test_status']
-                    if 'last_tested' in existing_product and existing_product['last_tested']:
-                        # 不覆盖 last_tested，保持原值
-                        pass
-                    updated_count += 1
-                else:
-                    # 新商品
-                    new_count += 1
-
-                # 添加到去重字典
-                products_dict[product.id] = product
-
-            logger.info(f"  Found {len(products)} products in {collection_path}")
+    return all_products, new_count, updated_count
 
-        except Exception as e:
-            logger.error(f"  Failed to process {collection_path}: {e}")
-            continue
 
-    # 转换为列表
-    all_products = list(products_dict.values())
+class DiscoveryJournal:
+    """商品发现的追加式 JSONL 日志
+
+    抓取过程中每个商品解析后立即追加一行，分类处理完后追加完成记录并落盘，
+    中断后可从最后完成的分类继续。结束时压缩为 {metadata, products} 格式的商品文件：
+    只保留已完成分类中每个商品ID位置最靠前的一条，按位置排序后逐条写出，
+    内存中只保留商品ID、位置和行偏移。
+
+    记录格式:
+        {"type": "start", "collections": [...], "base_url": ..., "started_at": ...}
+        {"type": "product", "id": ..., "rank": [分类序号, 分类内位置], "unchanged": bool, "product": {...}}
+        {"type": "collection", "index": ..., "path": ..., "count": ..., "duplicates": ...}
+    """
+
+    def __init__(self, path: Path):
+        """
+        初始化日志
+
+        Args:
+            path: JSONL 日志文件路径
+        """
+        self.path = Path(path)
+        self._file = None
+
+    def start(self, collection_paths: List[str], base_url: str):
+        """开始新的日志（覆盖已有文件）
+
+        Args:
+            collection_paths: 本次要处理的分类列表
+            base_url: 网站根 URL
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write({
+            'type': 'start',
+            'collections': collection_paths,
+            'base_url': base_url,
+            'started_at': datetime.now().isoformat()
+        })
+        self._sync()
+
+    def resume(self, base_url: str) -> Optional[Tuple[List[str], Set[int], Dict[str, Tuple[int, int]]]]:
+        """打开已有日志继续追加
+
+        截掉中断时写了一半的最后一行，读取已完成的分类和已写入商品的位置。
+
+        Args:
+            base_url: 网站根 URL，与日志记录的不一致时不续传
+
+        Returns:
+            (分类列表, 已完成分类序号, 已完成分类中商品的最靠前位置)；没有可续传的日志时返回 None
+        """
+        if not self.path.exists():
+            return None
+
+        # 截掉不完整的最后一行，避免后续追加的记录与其拼在一起
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            f.truncate(data.rfind(b'\n') + 1)
+
+        header = None
+        completed: Set[int] = set()
+        for _, record in self._records():
+            if record['type'] == 'start':
+                header = record
+            elif record['type'] == 'collection':
+                completed.add(record['index'])
+
+        if not header or header.get('base_url') != base_url:
+            return None
+
+        seen_ranks: Dict[str, Tuple[int, int]] = {}
+        for _, record in self._records():
+            if record['type'] == 'product' and record['rank'][0] in completed:
+                rank = tuple(record['rank'])
+                if record['id'] not in seen_ranks or rank < seen_ranks[record['id']]:
+                    seen_ranks[record['id']] = rank
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return header['collections'], completed, seen_ranks
+
+    def append_product(self, rank: Tuple[int, int], product: Product, unchanged: bool = False):
+        """追加一个商品
+
+        Args:
+            rank: (分类序号, 分类内位置)
+            product: 商品
+            unchanged: 是否为增量抓取复用的未变更商品
+        """
+        self._write({
+            'type': 'product',
+            'id': product.id,
+            'rank': list(rank),
+            'unchanged': unchanged,
+            'product': product.model_dump(mode='json')
+        })
+
+    def complete_collection(self, index: int, collection_path: str, count: int, duplicates: int):
+        """记录分类已处理完成并落盘
+
+        Args:
+            index: 分类序号
+            collection_path: 分类路径
+            count: 分类内商品数
+            duplicates: 重复商品数
+        """
+        self._write({
+            'type': 'collection',
+            'index': index,
+            'path': collection_path,
+            'count': count,
+            'duplicates': duplicates
+        })
+        self._sync()
+
+    def entries(self) -> List[Tuple[Tuple[int, int], str, int, bool]]:
+        """读取去重后的商品条目
+
+        Returns:
+            按位置排序的 (位置, 商品ID, 行偏移, 是否未变更) 列表
+        """
+        completed = {record['index'] for _, record in self._records() if record['type'] == 'collection'}
+
+        best: Dict[str, Tuple[Tuple[int, int], int, bool]] = {}
+        for offset, record in self._records():
+            if record['type'] != 'product' or record['rank'][0] not in completed:
+                continue
+            rank = tuple(record['rank'])
+            if record['id'] not in best or rank < best[record['id']][0]:
+                best[record['id']] = (rank, offset, record.get('unchanged', False))
+
+        return sorted(
+            (rank, product_id, offset, unchanged)
+            for product_id, (rank, offset, unchanged) in best.items()
+        )
+
+    def write_catalog(
+        self,
+        file_path: Path,
+        metadata: Dict[str, Any],
+        entries: List[Tuple[Tuple[int, int], str, int, bool]],
+        existing_products: Dict[str, Dict[str, Any]]
+    ):
+        """将日志压缩为商品文件（先写临时文件再原子替换）
+
+        Args:
+            file_path: 输出文件路径
+            metadata: 元数据信息
+            entries: entries() 的结果
+            existing_products: 已存在的商品字典（保留其测试状态）
+        """
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = file_path.with_name(file_path.name + '.tmp')
+
+        with open(tmp_path, 'w', encoding='utf-8') as out, open(self.path, 'rb') as journal:
+            metadata_json = json.dumps(metadata, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            out.write('{\n  "metadata": ' + metadata_json + ',\n  "products": [')
+
+            for n, (_, product_id, offset, _) in enumerate(entries):
+                journal.seek(offset)
+                product = json.loads(journal.readline())['product']
+
+                # 保留原有的测试状态
+                existing_product = existing_products.get(product_id)
+                if existing_product and 'test_status' in existing_product:
+                    product['test_status'] = existing_product['test_status']
+
+                product_json = json.dumps(product, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+                out.write((',' if n else '') + '\n    ' + product_json)
+
+            out.write('\n  ]\n}\n')
+
+        os.replace(tmp_path, file_path)
+        logger.info(f"Products saved to {file_path}")
+
+    def close(self):
+        """关闭日志文件"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """压缩完成后删除日志"""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def _write(self, record: Dict[str, Any]):
+        """追加一条记录"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _sync(self):
+        """刷新到磁盘"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _records(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """逐行读取记录，跳过无法解析的行
+
+        Yields:
+            (行偏移, 记录)
+        """
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                try:
+                    yield offset, json.loads(line)
+                except ValueError:
+                    logger.debug(f"Skipping corrupt journal line at offset {offset}")
+                offset += len(line)
+
+
+def run_journaled_discovery(
+    crawler: ProductCrawler,
+    journal: DiscoveryJournal,
+    collection_paths: List[str],
+    limit_per_collection: Optional[int] = None,
+    workers: int = 1,
+    resume: bool = False
+) -> List[str]:
+    """流式发现商品并写入日志
+
+    Args:
+        crawler: ProductCrawler 实例
+        journal: 商品发现日志
+        collection_paths: 分类路径列表
+        limit_per_collection: 每个分类的商品数量限制
+        workers: 并发抓取分类的线程数
+        resume: 是否从已有日志的最后完成分类继续
+
+    Returns:
+        实际使用的分类列表（续传时取日志中记录的列表，保证分类序号一致）
+    """
+    state = journal.resume(crawler.base_url) if resume else None
+    if state:
+        collection_paths, completed, seen_ranks = state
+        logger.info(
+            f"Resuming from {journal.path}: {len(completed)}/{len(collection_paths)} collections completed, "
+            f"{len(seen_ranks)} products recorded"
+        )
+    else:
+        if resume:
+            logger.info(f"No resumable journal at {journal.path}, starting a new run")
+        journal.start(collection_paths, crawler.base_url)
+        completed, seen_ranks = set(), {}
+
+    duplicate_count = 0
+    try:
+        for event, payload in iter_discovered_products(
+            crawler, collection_paths, limit_per_collection, workers,
+            completed=completed, seen_ranks=seen_ranks
+        ):
+            if event == 'product':
+                rank, product = payload
+                journal.append_product(rank, product, unchanged=product.id in crawler.unchanged_product_ids)
+            else:
+                index, collection_path, found, duplicates = payload
+                journal.complete_collection(index, collection_path, found, duplicates)
+                duplicate_count += duplicates
+                logger.info(f"  Found {found} products in {collection_path}")
+    finally:
+        journal.close()
 
     if duplicate_count > 0:
         logger.info(f"📊 De-duplication: Removed {duplicate_count} duplicate products")
 
+    return collection_paths
+
+
+def discover_products_storewide(
+    crawler: ProductCrawler,
+    collection_paths: List[str],
+    limit_per_collection: int = None,
+    existing_products: Dict[str, Dict[str, Any]] = None,
+    workers: int = 1
+) -> tuple[List[Product], int, int]:
+    """通过全站 /products.json 发现商品
+
+    每个商品只下载和解析一次，分类归属由各分类的商品 handle 列表决定，
+    结果与 discover_products_from_collections 去重后的商品一致。
+
+    Args:
+        crawler: ProductCrawler 实例
+        collection_paths: 分类路径列表
+        limit_per_collection: 每个分类的商品数量限制
+        existing_products: 已存在的商品字典
+        workers: 并发获取分类归属的线程数
+
+    Returns:
+        (商品列表, 新增数量, 更新数量)
+    """
+    all_products, membership = crawler.discover_products_storewide(
+        collection_paths,
+        limit_per_collection=limit_per_collection,
+        workers=workers
+    )
+
+    shared = sum(1 for collections in membership.values() if len(collections) > 1)
+    if shared:
+        logger.info(f"📊 {shared} products belong to more than one collection (downloaded once)")
+
+    new_count, updated_count = _merge_existing_products(all_products, existing_products or {})
     return all_products, new_count, updated_count
 
 
+def _merge_existing_products(
+    products: List[Product],
+    existing_products: Dict[str, Dict[str, Any]]
+) -> Tuple[int, int]:
+    """合并已存在商品的测试状态，统计新增和更新数量
+
+    Args:
+        products: 本次发现的商品列表（原地更新）
+        existing_products: 已存在的商品字典
+
+    Returns:
+        (新增数量, 更新数量)
+    """
+    new_count = 0
+    updated_count = 0
+
+    for product in products:
+        # 检查是新商品还是更新
+        if product.id in existing_products:
+            # 更新已存在的商品
+            existing_product = existing_products[product.id]
+            # 保留原有的测试状态（不覆盖 last_tested，保持原值）
+            if 'test_status' in existing_product:
+                product.test_status = existing_product['test_status']
+            updated_count += 1
+        else:
+            # 新商品
+            new_count += 1
+
+    return new_count, updated_count
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(
@@ -227,7 +731,14 @@ def main():
     parser.add_argument(
         '--incremental',
         action='store_true',
-        help='增量更新模式：只抓取新商品，保留已有商品的测试状态'
+        help='增量更新模式：updated_at 未变化的商品跳过解析，保留已有商品的测试状态，并输出变更增量'
+    )
+
+    parser.add_argument(
+        '--delta-output',
+        type=Path,
+        default=None,
+        help='增量模式下变更增量的输出路径 (默认: 与 --output 同目录的 product_delta.json)'
     )
 
     parser.add_argument(
@@ -237,6 +748,53 @@ def main():
         help='请求超时时间（秒）(默认: 30)'
     )
 
+    parser.add_argument(
+        '--journal',
+        type=Path,
+        help='分类抓取的 JSONL 日志路径 (默认: 输出文件同目录下的 <输出文件名>.discovery.jsonl)'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='从上次中断的日志继续，跳过已完成的分类'
+    )
+
+    parser.add_argument(
+        '--strategy',
+        choices=['collections', 'storewide', 'sitemap'],
+        default='collections',
+        help='发现策略: collections 逐个分类抓取商品; storewide 抓取全站 /products.json 一次; '
+             'sitemap 按 sitemap lastmod 只抓取新增和修改的商品 (默认: collections)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='并发抓取分类的线程数 (默认: 1，顺序抓取)'
+    )
+
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        help=f'每个域名的初始每秒请求数，之后按响应自适应调整 (默认: {DEFAULT_REQUESTS_PER_SECOND})'
+    )
+
+    parser.add_argument(
+        '--no-enrich',
+        action='store_true',
+        help='不补抓 HTML 降级商品的详情（价格、变体）'
+    )
+
+    parser.add_argument(
+        '--detail-workers',
+        type=int,
+        default=4,
+        help='补抓商品详情的并发线程数 (默认: 4)'
+    )
+
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -254,11 +812,19 @@ def main():
 
     # 初始化爬虫
     logger.info(f"Initializing ProductCrawler for {args.base_url}")
-    crawler = ProductCrawler(base_url=args.base_url, timeout=args.timeout)
+    crawler = ProductCrawler(
+        base_url=args.base_url,
+        timeout=args.timeout,
+        requests_per_second=args.rate,
+        enrich_details=not args.no_enrich,
+        detail_workers=args.detail_workers
+    )
 
     try:
-        # 确定要扫描的分类
-        if args.collections:
+        # 确定要扫描的分类（sitemap 策略不需要分类）
+        if args.strategy == 'sitemap':
+            collection_paths = []
+        elif args.collections:
             # 用户指定分类
             collection_paths = [f'/collections/{c.strip()}' for c in args.collections.split(',')]
             logger.info(f"Scanning specified collections: {collection_paths}")
@@ -268,47 +834,107 @@ def main():
             collection_paths = crawler.discover_collections()
             logger.info(f"Found {len(collection_paths)} collections")
 
-        if not collection_paths:
+        if not collection_paths and args.strategy != 'sitemap':
             logger.warning("No collections found!")
             return
 
-        # 加载已存在的商品（如果是增量更新）
+        # 加载已存在的商品（增量更新；sitemap 策略需要现有目录比较 lastmod）
         existing_products = {}
-        if args.incremental:
+        if args.incremental or args.strategy == 'sitemap':
             logger.info(f"Loading existing products from {args.output}")
             existing_products = load_existing_products(args.output)
             logger.info(f"Loaded {len(existing_products)} existing products")
+            crawler.set_known_products(existing_products)
 
         # 从分类中发现商品
-        logger.info(f"Starting product discovery from {len(collection_paths)} collections...")
-        all_products, new_count, updated_count = discover_products_from_collections(
-            crawler=crawler,
-            collection_paths=collection_paths,
-            limit_per_collection=args.limit,
-            existing_products=existing_products if args.incremental else None
-        )
+        if args.strategy == 'sitemap':
+            logger.info("Starting product discovery from sitemap...")
+            all_products = crawler.discover_products_from_sitemap(
+                existing_products, workers=args.detail_workers
+            )
+            new_count, updated_count = _merge_existing_products(all_products, existing_products)
+            product_ids = [p.id for p in all_products]
+            unchanged_ids = crawler.unchanged_product_ids
+
+            def write_catalog(metadata):
+                save_products(all_products, args.output, metadata)
+        elif args.strategy == 'storewide':
+            logger.info(f"Starting product discovery from {len(collection_paths)} collections...")
+            all_products, new_count, updated_count = discover_products_storewide(
+                crawler=crawler,
+                collection_paths=collection_paths,
+                limit_per_collection=args.limit,
+                existing_products=existing_products,
+                workers=args.workers
+            )
+            product_ids = [p.id for p in all_products]
+            unchanged_ids = crawler.unchanged_product_ids
+
+            def write_catalog(metadata):
+                save_products(all_products, args.output, metadata)
+        else:
+            logger.info(f"Starting product discovery from {len(collection_paths)} collections...")
+            # 逐个分类抓取：商品边解析边写入 JSONL 日志，结束后压缩为商品文件
+            journal = DiscoveryJournal(
+                args.journal or args.output.with_name(f"{args.output.stem}.discovery.jsonl")
+            )
+            collection_paths = run_journaled_discovery(
+                crawler=crawler,
+                journal=journal,
+                collection_paths=collection_paths,
+                limit_per_collection=args.limit,
+                workers=args.workers,
+                resume=args.resume
+            )
+            entries = journal.entries()
+            product_ids = [product_id for _, product_id, _, _ in entries]
+            unchanged_ids = {product_id for _, product_id, _, unchanged in entries if unchanged}
+            new_count = sum(1 for product_id in product_ids if product_id not in existing_products)
+            updated_count = len(product_ids) - new_count
+
+            def write_catalog(metadata):
+                journal.write_catalog(args.output, metadata, entries, existing_products)
 
         # 保存结果
         metadata = {
             'base_url': args.base_url,
             'discovered_at': datetime.now().isoformat(),
             'total_collections': len(collection_paths),
-            'total_products': len(all_products),
+            'total_products': len(product_ids),
             'new_products': new_count,
             'updated_products': updated_count,
-            'incremental': args.incremental
+            'incremental': args.incremental,
+            'strategy': args.strategy,
+            'crawl_stats': crawler.get_stats()
         }
 
-        save_products(all_products, args.output, metadata)
+        if args.incremental or args.strategy == 'sitemap':
+            delta = compute_delta(product_ids, existing_products, unchanged_ids)
+            delta['catalog'] = str(args.output)
+            save_delta(delta, args.delta_output or args.output.parent / 'product_delta.json')
+            metadata['delta'] = delta['summary']
+            logger.info(
+                f"Delta: +{delta['summary']['added']} ~{delta['summary']['changed']} "
+                f"-{delta['summary']['removed']} (unchanged {delta['summary']['unchanged']})"
+            )
+
+        if existing_products and 'delta' in metadata and not (delta['added'] or delta['changed'] or delta['removed']):
+            logger.info(f"Catalog unchanged, keeping {args.output}")
+        else:
+            write_catalog(metadata)
+
+        if args.strategy == 'collections':
+            journal.remove()
 
         # 打印统计信息
         duration = (datetime.now() - start_time).total_seconds()
         print_statistics(
             total_collections=len(collection_paths),
-            total_products=len(all_products),
+            total_products=len(product_ids),
             new_products=new_count,
             updated_products=updated_count,
-            duration=duration
+            duration=duration,
+            crawl_stats=metadata['crawl_stats']
         )
 
         logger.info("Product discovery completed successfully!")
@@ -11,6 +11,7 @@
 """
 
 import os
+import sqlite3
 import sys
 import json
 import argparse
@@ -22,6 +23,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from dotenv import load_dotenv
 
+from core.results_db import DEFAULT_DB_NAME, ResultsDB
+
 # 加载环境变量
 load_dotenv()
 
@@ -367,6 +370,13 @@ class UniversalAIReportGenerator:
             with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(json_data, f, ensure_ascii=False, indent=2)
             print(f"✅ AI分析报告已保存: {output_file}")
+
+            if report_id:
+                try:
+                    with ResultsDB(output_file.parent / DEFAULT_DB_NAME) as db:
+                        db.record_ai_analysis(output_file.stem, report_id, json_data, path=output_file)
+                except sqlite3.Error as e:
+                    print(f"⚠️ 写入结果库失败: {e}")
             return output_file
 
         # 否则保存为Markdown格式
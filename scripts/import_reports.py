@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+导入测试报告到结果库
+
+把 reports/ 下已有的报告文件（test_*/test_results.json、batch_test_*.json、test_*.json
+和 AI 分析文件）导入 reports/results.db。已导入且未变化的文件会被跳过，
+文件已删除的记录会从结果库中移除。
+
+使用示例:
+    python scripts/import_reports.py
+
+    # 删除结果库后全部重新导入
+    python scripts/import_reports.py --rebuild
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.results_db import DEFAULT_DB_NAME, ResultsDB
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导入测试报告到结果库')
+    parser.add_argument('--reports-dir', type=Path, default=PROJECT_ROOT / 'reports',
+                        help='报告目录 (默认 reports)')
+    parser.add_argument('--db', type=Path, help=f'结果库路径 (默认 <报告目录>/{DEFAULT_DB_NAME})')
+    parser.add_argument('--rebuild', action='store_true', help='删除结果库后全部重新导入')
+    args = parser.parse_args()
+
+    db_path = args.db or args.reports_dir / DEFAULT_DB_NAME
+    if args.rebuild:
+        for suffix in ('', '-wal', '-shm'):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+    with ResultsDB(db_path) as db:
+        stats = db.import_reports(args.reports_dir)
+        runs = db.list_runs()
+        ai_analyses = db.list_ai_analyses()
+
+    print("\n" + "=" * 60)
+    print("报告导入结果")
+    print("=" * 60)
+    print(f"结果库: {db_path}")
+    print(f"新导入/更新: {stats['imported']}, 未变化: {stats['unchanged']}, "
+          f"已删除: {stats['removed']}, 无效文件: {stats['invalid']}")
+    print(f"结果库中共 {len(runs)} 份报告, {len(ai_analyses)} 份 AI 分析")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+从事件日志恢复测试报告
+
+测试进程被杀、超时或系统崩溃时报告文件不会生成，但执行过程中写入的事件日志
+（*.events.jsonl）保留了已完成的商品和步骤。本脚本由事件日志重建报告并写入结果库：
+已完成的商品使用完整结果，中断时正在执行或尚未开始的商品记为 error。
+
+使用示例:
+    python scripts/recover_report.py reports/batch_test_20251205_091054.events.jsonl
+
+    # 指定输出文件
+    python scripts/recover_report.py reports/test-results.events.jsonl --output reports/test-results.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.event_log import EVENT_LOG_SUFFIX, RunReport, read_events
+from core.results_db import ResultsDB
+from core.test_result_collector import TestResultCollector
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从事件日志恢复测试报告')
+    parser.add_argument('event_log', type=Path, help='事件日志文件 (*.events.jsonl)')
+    parser.add_argument('--output', type=Path, help='报告输出文件 (默认与事件日志同名的 .json)')
+    parser.add_argument('--no-db', action='store_true', help='不写入结果库')
+    args = parser.parse_args()
+
+    if not args.event_log.exists():
+        print(f"❌ 事件日志不存在: {args.event_log}")
+        sys.exit(1)
+
+    events, _ = read_events(args.event_log)
+    run_start = next((e for e in events if e.get('event') == 'run_start'), {})
+
+    if run_start.get('kind') == 'pytest':
+        collector = TestResultCollector.from_event_log(str(args.event_log),
+                                                       str(args.output) if args.output else None)
+        collector.save()
+        print(f"✅ 已恢复 {len(collector.test_cases)} 个用例: {collector.output_path}")
+        return
+
+    run_report = RunReport()
+    run_report.extend(events)
+    report = run_report.report()
+
+    name = args.event_log.name
+    if name.endswith(EVENT_LOG_SUFFIX):
+        name = name[:-len(EVENT_LOG_SUFFIX)]
+    output = args.output or args.event_log.with_name(f"{name}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if not args.no_db:
+        try:
+            with ResultsDB.for_reports(output.parent) as db:
+                db.record_run(output.stem, report, 'batch', path=output)
+        except Exception as e:
+            print(f"⚠️  写入结果库失败: {e}")
+
+    print("\n" + "=" * 60)
+    print("报告恢复结果")
+    print("=" * 60)
+    print(f"事件日志: {args.event_log} ({len(events)} 条事件)")
+    print(f"运行状态: {'已完成' if run_report.finished else '中断'}")
+    print(f"商品: {report['total']} (通过 {report['passed']}, 失败 {report['failed']}, 错误 {report['error']})")
+    print(f"报告已保存: {output}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,20 +8,29 @@
 
 import argparse
 import asyncio
-import json
 import logging
+import re
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional
 
 # 添加项目根目录到路径
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import (
+    async_playwright, Browser, BrowserContext, ElementHandle, Page, Playwright,
+    TimeoutError as PlaywrightTimeoutError
+)
+from core.event_log import EventLog
 from core.models import Product
+from core.page_performance import PagePerformanceCollector, product_page_metrics
+from core.product_store import ProductStore
+from core.resource_blocker import ResourceBlocker
+from core.smart_wait import SmartWaiter
+from core.test_intelligence import FailureClassification, TestIntelligence
 from pages.product_page import ProductPage
 
 logging.basicConfig(
@@ -31,6 +40,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 就绪等待上限（毫秒）：条件满足即返回，只有条件始终不满足时才会等满
+PAGE_READY_TIMEOUT = 5000       # 商品页标题/加购按钮出现
+ADD_TO_CART_TIMEOUT = 8000      # 加购请求 /cart/add 返回
+CART_UPDATE_TIMEOUT = 3000      # 购物车角标数量变化
+CART_PAGE_READY_TIMEOUT = 5000  # 购物车页商品行/空购物车提示/结账按钮出现
+CART_CHANGE_TIMEOUT = 1500      # 购物车数量调整请求 /cart/change 返回
+CONTROL_SETTLE_TIMEOUT = 2000   # 变体切换、按钮启用等控件状态变化
+INPUT_SETTLE_TIMEOUT = 1000     # 输入框取值变化
+
+# 商品页就绪判定：任意一个商品标题可见即可开始后续步骤
+PRODUCT_READY_SELECTORS = [
+    "h1.product-meta__title",
+    ".product-meta__title",
+    "h1.product__title",
+    ".product-title",
+    "[data-product-title]",
+    ".product-single__title",
+]
+
+# 购物车页就绪判定：商品行、空购物车提示或结账按钮任意一个可见
+CART_READY_SELECTORS = [
+    "tr.cart-item",
+    ".cart-item",
+    "[data-cart-item]",
+    ".cart-empty",
+    ".empty-cart",
+    "button[name='checkout']",
+    "a[href*='/checkout']",
+]
+
+CART_COUNT_SELECTOR = ".cart-count, .cart-quantity, [data-cart-count], .header__cart-count"
+
+# 步骤级重试：只重试被判定为环境/瞬时问题的失败，按 1s、2s、4s... 退避（上限 STEP_RETRY_BACKOFF_MAX）
+STEP_RETRY_LIMIT = 2
+STEP_RETRY_BACKOFF = 1.0
+STEP_RETRY_BACKOFF_MAX = 4.0
+RETRYABLE_FAILURE_TYPES = {
+    FailureClassification.TYPE_TEST_TIMEOUT,
+    FailureClassification.TYPE_NETWORK_ERROR,
+}
+
+# HAR 录制/回放文件目录（每个商品一个 .har.zip）
+HAR_DIR = PROJECT_ROOT / "data" / "har"
+
+
+def har_path_for(product_id: str, har_dir: Path = HAR_DIR) -> Path:
+    """获取商品对应的 HAR 文件路径（商品ID中的特殊字符替换为下划线）"""
+    safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', product_id)
+    return Path(har_dir) / f"{safe_id}.har.zip"
+
 
 def analyze_js_error_root_cause(js_errors: List[str]) -> str:
     """
@@ -177,16 +236,28 @@ def analyze_js_error_root_cause(js_errors: List[str]) -> str:
 class TestStep:
     """测试步骤记录"""
 
-    def __init__(self, number: int, name: str, description: str):
+    def __init__(self, number: int, name: str, description: str, retryable: bool = True):
         self.number = number
         self.name = name
         self.description = description
+        self.retryable = retryable  # 加购、结账等会改变购物车状态的步骤重试可能重复操作，不可重试
         self.status = "pending"
         self.message = ""
         self.started_at: Optional[float] = None
         self.completed_at: Optional[float] = None
         self.error: Optional[str] = None
         self.issue_details: Optional[Dict] = None  # 新增：问题详情
+        self.wait_time: float = 0.0  # 等待页面就绪的累计耗时（秒）
+        self.performance: Optional[Dict] = None  # 步骤结束时的页面性能指标
+        self.retries: List[Dict] = []  # 每次重试前失败的记录
+
+    async def wait(self, awaitable):
+        """执行一次等待，并将耗时计入本步骤的等待时间"""
+        started = time.time()
+        try:
+            return await awaitable
+        finally:
+            self.wait_time += time.time() - started
 
     def start(self):
         """开始执行步骤"""
@@ -195,6 +266,33 @@ class TestStep:
         logger.info(f"[步骤 {self.number}] {self.name}")
         logger.info(f"  说明: {self.description}")
 
+    def record_retry(self, classification: FailureClassification, backoff: float):
+        """记录一次失败并重置状态，准备在当前页面状态下重新执行本步骤
+
+        失败尝试的耗时记入重试记录，步骤的 duration 只统计最后一次尝试（由 restart() 重新计时）。
+        """
+        attempt_end = self.completed_at or time.time()
+        self.retries.append({
+            "attempt": len(self.retries) + 1,
+            "failure_type": classification.failure_type,
+            "reason": classification.reason,
+            "message": self.message,
+            "error": self.error,
+            "duration": round(attempt_end - (self.started_at or attempt_end), 2),
+            "wait_duration": round(self.wait_time, 2),
+            "backoff": backoff
+        })
+        self.status = "running"
+        self.message = ""
+        self.error = None
+        self.issue_details = None
+        self.completed_at = None
+        self.wait_time = 0.0
+
+    def restart(self):
+        """退避结束后重新开始计时"""
+        self.started_at = time.time()
+
     def complete(self, status: str, message: str, error: Optional[str] = None, issue_details: Optional[Dict] = None):
         """完成步骤
 
@@ -247,27 +345,82 @@ class TestStep:
             "status": self.status,
             "message": self.message,
             "error": self.error,
-            "duration": round(duration, 2)
+            "duration": round(duration, 2),
+            # 拆分等待与实际操作耗时，便于衡量等待策略的优化效果
+            "wait_duration": round(self.wait_time, 2),
+            "work_duration": round(max(duration - self.wait_time, 0), 2)
         }
 
         # 如果有问题详情，添加到结果中
         if self.issue_details:
             result["issue_details"] = self.issue_details
 
+        if self.performance:
+            result["performance"] = self.performance
+
+        if self.retries:
+            result["retries"] = self.retries
+
         return result
 
 
 class ProductTester:
     """商品测试执行器"""
 
-    def __init__(self, product: Product, test_mode: str = "quick", headless: bool = True):
+    def __init__(
+        self,
+        product: Product,
+        test_mode: str = "quick",
+        headless: bool = True,
+        browser: Optional[Browser] = None,
+        context: Optional[BrowserContext] = None,
+        block_resources: bool = True,
+        storage_state: Optional[str] = None,
+        har_mode: Optional[str] = None,
+        har_path: Optional[Path] = None,
+        max_step_retries: int = STEP_RETRY_LIMIT,
+        event_log: Optional[EventLog] = None
+    ):
+        """
+        Args:
+            product: 待测试商品
+            test_mode: 测试模式 (quick/full)
+            headless: 是否无头模式（仅在自行启动浏览器时生效）
+            browser: 外部注入的共享浏览器，测试时在其上新建独立的 BrowserContext
+            context: 外部注入的 BrowserContext，测试只在其中新建页面，不负责关闭它
+            block_resources: 是否按测试模式拦截无关资源（图片/视频/字体/第三方组件）
+            storage_state: 预热得到的 storage_state 快照路径，自行创建上下文时使用，
+                跳过 Cookie 同意/地区选择等弹窗
+            har_mode: "record" 录制网络流量到 HAR；"replay" 从 HAR 回放（离线运行）
+            har_path: HAR 文件路径，默认 data/har/<商品ID>.har.zip
+            max_step_retries: 单个步骤因超时/网络错误失败时的最大重试次数，0 表示不重试
+            event_log: 事件日志，每个步骤开始和结束时写入一条事件
+        """
         self.product = product
         self.test_mode = test_mode  # quick 或 full
         self.headless = headless
+        self.block_resources = block_resources
+        self.storage_state = storage_state
+        if har_mode not in (None, "record", "replay"):
+            raise ValueError(f"未知的 HAR 模式: {har_mode}")
+        self.har_mode = har_mode
+        self.har_path = Path(har_path) if har_path else har_path_for(product.id)
+        self.max_step_retries = max_step_retries
+        self.event_log = event_log
+        self.resource_blocker: Optional[ResourceBlocker] = None
         self.steps: List[TestStep] = []
-        self.browser: Optional[Browser] = None
+        self.browser: Optional[Browser] = browser
+        self.context: Optional[BrowserContext] = context
         self.page: Optional[Page] = None
+        self._playwright: Optional[Playwright] = None
+        # 记录哪些资源由本实例创建，清理时只关闭自己创建的部分
+        self._owns_browser = False
+        self._owns_context = False
         self.product_page: Optional[ProductPage] = None
+        self.waiter: Optional[SmartWaiter] = None
+        self.perf_collector = PagePerformanceCollector()
+        self._current_step: Optional[TestStep] = None
+        self._already_on_cart_page = False  # 快速测试步骤4已进入购物车页面，供步骤5使用
         self.start_time: float = 0
         self.end_time: float = 0
 
@@ -280,9 +433,9 @@ class ProductTester:
         self.steps = [
             TestStep(1, "页面访问", "访问商品页面并检查页面是否正常加载"),
             TestStep(2, "商品信息显示", "验证商品标题、价格等核心信息是否正确显示"),
-            TestStep(3, "添加购物车", "点击添加购物车按钮，验证能否成功加入"),
+            TestStep(3, "添加购物车", "点击添加购物车按钮，验证能否成功加入", retryable=False),
             TestStep(4, "购物车验证", "检查购物车中是否有新增商品"),
-            TestStep(5, "支付流程", "访问购物车页面，验证Checkout按钮是否可用"),
+            TestStep(5, "支付流程", "访问购物车页面，验证Checkout按钮是否可用", retryable=False),
         ]
 
     def _init_full_test_steps(self):
@@ -296,10 +449,10 @@ class ProductTester:
             TestStep(6, "商品描述验证", "检查商品描述内容是否存在"),
             TestStep(7, "变体选择测试", "测试颜色/尺寸等变体选项功能"),
             TestStep(8, "数量选择测试", "测试商品数量增减功能"),
-            TestStep(9, "添加购物车", "测试添加购物车功能"),
+            TestStep(9, "添加购物车", "测试添加购物车功能", retryable=False),
             TestStep(10, "购物车验证", "验证购物车商品数量变化"),
             TestStep(11, "相关推荐验证", "检查相关商品推荐是否显示"),
-            TestStep(12, "支付流程验证", "验证从购物车到支付页面的完整流程"),
+            TestStep(12, "支付流程验证", "验证从购物车到支付页面的完整流程", retryable=False),
         ]
 
     async def run(self) -> Dict:
@@ -347,12 +500,16 @@ class ProductTester:
             result["errors"].append(str(e))
 
         finally:
-            # 清理环境
+            # 记录最后一个步骤的页面性能，再清理环境
+            await self._record_step_performance()
             await self._cleanup()
 
         self.end_time = time.time()
         result["duration"] = round(self.end_time - self.start_time, 2)
         result["steps"] = [step.to_dict() for step in self.steps]
+        result["performance"] = product_page_metrics(result)
+        if self.resource_blocker:
+            result["network"] = self.resource_blocker.get_stats()
 
         # 汇总结果
         passed_count = sum(1 for step in self.steps if step.status == "passed")
@@ -374,15 +531,45 @@ class ProductTester:
         return result
 
     async def _init_browser(self):
-        """初始化浏览器"""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(
-            headless=self.headless,
-            timeout=60000  # 60秒浏览器启动超时
-        )
-        self.page = await self.browser.new_page()
+        """初始化浏览器
+
+        优先使用外部注入的 context/browser（批量测试共享浏览器池），
+        否则自行启动一个 Chromium。
+        """
+        if self.har_mode == "record" and self.context is not None:
+            # HAR 在上下文关闭时写出，只能录制本实例创建的上下文
+            raise RuntimeError("HAR 录制需要独立的 BrowserContext，不能与复用的上下文同时使用")
+        if self.har_mode == "replay" and not self.har_path.exists():
+            raise FileNotFoundError(f"HAR 文件不存在，请先使用 --record-har 录制: {self.har_path}")
+
+        if self.context is None:
+            if self.browser is None:
+                self._playwright = await async_playwright().start()
+                self.browser = await self._playwright.chromium.launch(
+                    headless=self.headless,
+                    timeout=60000  # 60秒浏览器启动超时
+                )
+                self._owns_browser = True
+            context_options = {"storage_state": self.storage_state} if self.storage_state else {}
+            if self.har_mode == "record":
+                self.har_path.parent.mkdir(parents=True, exist_ok=True)
+                context_options["record_har_path"] = str(self.har_path)
+            self.context = await self.browser.new_context(**context_options)
+            self._owns_context = True
+
+        self.page = await self.context.new_page()
         # 设置页面默认超时为60秒
         self.page.set_default_timeout(60000)
+        self.waiter = SmartWaiter(self.page, default_timeout=PAGE_READY_TIMEOUT)
+        await self.perf_collector.attach(self.page)
+
+        if self.har_mode == "replay":
+            # 所有请求从 HAR 返回，HAR 中没有的请求直接中止，保证离线且结果可重复
+            await self.page.route_from_har(str(self.har_path), not_found="abort")
+
+        # 按测试模式拦截无关资源，并统计下载量（在 HAR 路由之后注册，优先匹配）
+        self.resource_blocker = ResourceBlocker(self.test_mode, enabled=self.block_resources)
+        await self.resource_blocker.attach(self.page)
 
         # 监听JavaScript错误（页面级别的未捕获错误）
         self.page.on("pageerror", lambda exc: self.js_errors.append(str(exc)))
@@ -395,29 +582,204 @@ class ProductTester:
         self.page.on("console", on_console)
 
     async def _cleanup(self):
-        """清理环境"""
-        if self.browser:
+        """清理环境（只关闭本实例创建的资源）"""
+        try:
+            if self._owns_context and self.context:
+                await self.context.close()
+            elif self.page and not self.page.is_closed():
+                await self.page.close()
+        except Exception as e:
+            logger.debug(f"关闭页面/上下文失败: {e}")
+
+        if self._owns_browser and self.browser:
             await self.browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _start_step(self, index: int) -> TestStep:
+        """开始一个测试步骤，并在步骤边界记录上一步骤的页面性能"""
+        await self._record_step_performance()
+        step = self.steps[index]
+        step.start()
+        self._current_step = step
+        if self.event_log:
+            self.event_log.emit("step_start", product_id=self.product.id,
+                                number=step.number, name=step.name)
+        return step
+
+    async def _run_steps(self, step_funcs: List[Callable[[TestStep], Awaitable[None]]]):
+        """依次执行测试步骤，每个步骤失败时按重试策略单独重试"""
+        for index, step_func in enumerate(step_funcs):
+            step = await self._start_step(index)
+            try:
+                await self._run_step_with_retry(step, step_func)
+            finally:
+                if self.event_log:
+                    self.event_log.emit("step_end", product_id=self.product.id, step=step.to_dict())
+
+    async def _run_step_with_retry(self, step: TestStep, step_func: Callable[[TestStep], Awaitable[None]]):
+        """执行单个步骤，对环境/瞬时失败在当前页面状态下有限次重试
+
+        Raises:
+            步骤最后一次执行抛出的异常（如页面访问失败需要中止整个测试）
+        """
+        attempt = 0
+        while True:
+            js_errors_before = len(self.js_errors)
+            raised: Optional[Exception] = None
+            try:
+                await step_func(step)
+            except Exception as e:
+                raised = e
+
+            if step.status != "failed" or attempt >= self.max_step_retries:
+                break
+
+            new_js_errors = self.js_errors[js_errors_before:]
+            classification = await self._classify_step_failure(step, raised, new_js_errors)
+            if not self._is_retryable(step, classification, new_js_errors):
+                break
+
+            attempt += 1
+            backoff = min(STEP_RETRY_BACKOFF * 2 ** (attempt - 1), STEP_RETRY_BACKOFF_MAX)
+            logger.info(f"  ↻ 步骤{step.number}失败属于{classification.failure_type}，"
+                        f"{backoff:.0f}秒后第{attempt}次重试 (原因: {classification.reason})")
+            step.record_retry(classification, backoff)
+            await asyncio.sleep(backoff)
+            step.restart()
+
+        if raised is not None:
+            raise raised
+
+    async def _classify_step_failure(self, step: TestStep, raised: Optional[Exception],
+                                     new_js_errors: List[str]) -> FailureClassification:
+        """使用 TestIntelligence 对失败步骤分类
+
+        步骤内部捕获异常后只留下 error 文本，此时用 error 文本重建异常用于分类。
+        """
+        exception = raised or (Exception(step.error) if step.error else None)
+        intelligence = TestIntelligence(self.page)
+        return await intelligence.classify_failure(
+            step_name=step.name,
+            expected_element=None,
+            operation_attempted=step.description,
+            js_errors=new_js_errors,
+            exception=exception
+        )
+
+    def _is_retryable(self, step: TestStep, classification: FailureClassification,
+                      new_js_errors: List[str]) -> bool:
+        """只有可重试步骤的超时/网络类失败可重试
+
+        加购、结账等非幂等步骤超时时操作可能已生效，重试会重复加购，不重试；
+        网站 Bug、已定位问题详情的失败，以及执行期间出现 JavaScript 错误的失败
+        都保留首次结果，避免重试掩盖网站问题。
+        """
+        if not step.retryable:
+            return False
+        if classification.is_website_bug() or step.issue_details or new_js_errors:
+            return False
+        return classification.failure_type in RETRYABLE_FAILURE_TYPES
+
+    async def _record_step_performance(self):
+        """为当前步骤记录页面性能指标（每个步骤只记录一次）"""
+        step, self._current_step = self._current_step, None
+        if step is not None:
+            step.performance = await self.perf_collector.collect(self.page)
+
+    async def _wait_quietly(self, step: TestStep, awaitable) -> bool:
+        """等待就绪条件并计入步骤等待时间；超时不视为失败
+
+        Returns:
+            条件是否在超时前满足
+        """
+        try:
+            result = await step.wait(awaitable)
+            return result is not None and result is not False
+        except (PlaywrightTimeoutError, TimeoutError):
+            return False
+
+    async def _wait_for_condition(self, step: TestStep, condition, timeout: int) -> bool:
+        """轮询等待自定义条件（如按钮启用、变体选中），超时返回 False"""
+        async def _checked():
+            await self.waiter.wait_for_condition(condition, error_message="控件状态未变化",
+                                                 timeout=timeout, polling=50)
+            return True
+        return await self._wait_quietly(step, _checked())
+
+    async def _wait_for_input_value(self, step: TestStep, element: ElementHandle,
+                                    predicate, timeout: int = INPUT_SETTLE_TIMEOUT) -> bool:
+        """等待输入框当前值满足 predicate"""
+        async def _value_matches():
+            return predicate(await element.input_value())
+        return await self._wait_for_condition(step, _value_matches, timeout)
+
+    async def _wait_for_product_ready(self, step: TestStep):
+        """等待商品页关键内容就绪（替代导航后的固定等待）"""
+        selectors = [self.product.selectors.product_title, *PRODUCT_READY_SELECTORS]
+        await self._wait_quietly(step, self.waiter.wait_for_first_visible(selectors, timeout=PAGE_READY_TIMEOUT))
+
+    async def _wait_for_cart_ready(self, step: TestStep):
+        """等待购物车页内容就绪（替代导航后的固定等待）"""
+        await self._wait_quietly(step, self.waiter.wait_for_first_visible(
+            CART_READY_SELECTORS, timeout=CART_PAGE_READY_TIMEOUT))
+
+    async def _get_cart_count_text(self) -> Optional[str]:
+        """读取购物车角标当前文本，角标不存在时返回 None"""
+        try:
+            return await self.page.evaluate(
+                "(selector) => { const el = document.querySelector(selector); "
+                "return el ? el.textContent.trim() : null; }",
+                CART_COUNT_SELECTOR
+            )
+        except Exception:
+            return None
+
+    async def _click_add_to_cart(self, step: TestStep, button: ElementHandle):
+        """点击加购按钮，等待 /cart/add 响应和购物车角标更新（替代固定等待）"""
+        previous_count = await self._get_cart_count_text()
+
+        response = await step.wait(
+            self.waiter.click_and_wait_for_response(button, "/cart/add", timeout=ADD_TO_CART_TIMEOUT)
+        )
+        if response is not None:
+            logger.info(f"  加购请求已完成: HTTP {response.status}")
+        else:
+            logger.info(f"  {ADD_TO_CART_TIMEOUT}ms 内未捕获到 /cart/add 请求")
+
+        # 角标存在时再等待其数量变化，避免无角标页面白白等到超时
+        if previous_count is not None:
+            await self._wait_quietly(step, self.waiter.wait_for_text_change(
+                CART_COUNT_SELECTOR, previous_count, timeout=CART_UPDATE_TIMEOUT))
 
     async def _run_quick_test(self):
         """运行快速测试（核心购物流程）"""
-        # 步骤1: 页面访问
-        step = self.steps[0]
-        step.start()
+        await self._run_steps([
+            self._quick_step_1,
+            self._quick_step_2,
+            self._quick_step_3,
+            self._quick_step_4,
+            self._quick_step_5,
+        ])
+
+    async def _quick_step_1(self, step: TestStep):
+        """步骤1: 页面访问"""
         try:
             self.product_page = ProductPage(self.page, self.product)
             # 使用domcontentloaded而不是load，更快
-            await self.product_page.navigate(wait_until="domcontentloaded")
-            # 等待页面稳定
-            await self.page.wait_for_timeout(3000)
+            load_started = time.time()
+            await step.wait(self.product_page.navigate(wait_until="domcontentloaded"))
+            # 等待商品标题出现，而不是固定等待
+            await self._wait_for_product_ready(step)
+            self.resource_blocker.page_load_time = time.time() - load_started
             step.complete("passed", f"成功访问页面: {self.page.url}")
         except Exception as e:
             step.complete("failed", "页面访问失败", str(e))
             raise
 
-        # 步骤2: 商品信息显示
-        step = self.steps[1]
-        step.start()
+    async def _quick_step_2(self, step: TestStep):
+        """步骤2: 商品信息显示"""
         try:
             title_visible = False
             price_visible = False
@@ -539,9 +901,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "检测商品信息时出错", str(e))
 
-        # 步骤3: 添加购物车
-        step = self.steps[2]
-        step.start()
+    async def _quick_step_3(self, step: TestStep):
+        """步骤3: 添加购物车"""
         try:
             button_selector = self.product.selectors.add_to_cart_button
             button = await self.page.query_selector(button_selector)
@@ -551,10 +912,8 @@ class ProductTester:
                 is_enabled = await button.is_enabled()
 
                 if is_visible and is_enabled:
-                    # 尝试点击
-                    await button.click()
-                    # 🔧 修复：增加等待时间，确保AJAX请求完成并同步到服务器
-                    await self.page.wait_for_timeout(4000)  # 从2秒增加到4秒
+                    # 尝试点击，并等待加购请求完成、角标更新
+                    await self._click_add_to_cart(step, button)
                     step.complete("passed", "成功点击添加购物车按钮")
                 elif is_visible:
                     # 🔧 修复：按钮可见但禁用，尝试自动选择变体
@@ -577,7 +936,6 @@ class ProductTester:
                                     label = await self.page.query_selector(f"label[for='{radio_id}']")
                                     if label:
                                         await label.click(timeout=2000)
-                                        await self.page.wait_for_timeout(500)
                                         variant_selected = True
                                         logger.info(f"  已选择变体: {radio_id}")
                                         break
@@ -586,13 +944,11 @@ class ProductTester:
 
                     # 重新检查按钮状态
                     if variant_selected:
-                        await self.page.wait_for_timeout(500)
+                        await self._wait_for_condition(step, button.is_enabled, CONTROL_SETTLE_TIMEOUT)
                         is_enabled = await button.is_enabled()
 
                     if is_enabled:
-                        await button.click()
-                        # 🔧 修复：增加等待时间，确保AJAX请求完成
-                        await self.page.wait_for_timeout(4000)
+                        await self._click_add_to_cart(step, button)
                         step.complete("passed", "自动选择变体后成功点击添加购物车按钮")
                     else:
                         # 检查是否是售罄状态
@@ -629,11 +985,10 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "添加购物车操作失败", str(e))
 
-        # 步骤4: 购物车验证
-        step = self.steps[3]
-        step.start()
+    async def _quick_step_4(self, step: TestStep):
+        """步骤4: 购物车验证"""
         # 🔧 新增：记录是否已经在购物车页面，供步骤5使用
-        already_on_cart_page = False
+        self._already_on_cart_page = False
         cart_has_items = False
         try:
             # 检查购物车图标或数量badge
@@ -660,9 +1015,9 @@ class ProductTester:
                 logger.info("  未检测到购物车数量变化，进行二次验证...")
                 try:
                     cart_url = "https://fiido.com/cart"
-                    await self.page.goto(cart_url, wait_until="domcontentloaded")
-                    await self.page.wait_for_timeout(2000)
-                    already_on_cart_page = True  # 🔧 标记已在购物车页面
+                    await step.wait(self.page.goto(cart_url, wait_until="domcontentloaded"))
+                    await self._wait_for_cart_ready(step)
+                    self._already_on_cart_page = True  # 🔧 标记已在购物车页面
 
                     # 检查购物车是否有商品
                     cart_items = await self.page.query_selector_all("tr.cart-item, .cart-item, [data-cart-item]")
@@ -691,22 +1046,19 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "检查购物车时出错", str(e))
 
-        # 步骤5: 支付流程
-        step = self.steps[4]
-        step.start()
+    async def _quick_step_5(self, step: TestStep):
+        """步骤5: 支付流程"""
         try:
             # 🔧 修复：如果步骤4已经在购物车页面且有商品，不需要再次导航
             current_url = self.page.url
-            if not already_on_cart_page or '/cart' not in current_url:
+            if not self._already_on_cart_page or '/cart' not in current_url:
                 cart_url = "https://fiido.com/cart"
                 logger.info(f"导航到购物车页面: {cart_url}")
-                await self.page.goto(cart_url, wait_until="domcontentloaded")
-                await self.page.wait_for_timeout(2000)
+                await step.wait(self.page.goto(cart_url, wait_until="domcontentloaded"))
+                await self._wait_for_cart_ready(step)
                 current_url = self.page.url
             else:
                 logger.info("已在购物车页面，无需重复导航")
-                # 🔧 刷新页面确保状态最新，但不是重新导航
-                await self.page.wait_for_timeout(500)
 
             logger.info(f"当前URL: {current_url}")
 
@@ -813,21 +1165,36 @@ class ProductTester:
 
     async def _run_full_test(self):
         """运行全面测试（全链路场景覆盖）"""
-        # 步骤1: 页面访问
-        step = self.steps[0]
-        step.start()
+        await self._run_steps([
+            self._full_step_1,
+            self._full_step_2,
+            self._full_step_3,
+            self._full_step_4,
+            self._full_step_5,
+            self._full_step_6,
+            self._full_step_7,
+            self._full_step_8,
+            self._full_step_9,
+            self._full_step_10,
+            self._full_step_11,
+            self._full_step_12,
+        ])
+
+    async def _full_step_1(self, step: TestStep):
+        """步骤1: 页面访问"""
         try:
             self.product_page = ProductPage(self.page, self.product)
-            await self.product_page.navigate(wait_until="domcontentloaded")  # 使用domcontentloaded更快
-            await self.page.wait_for_timeout(3000)  # 等待3秒让页面完全加载
+            load_started = time.time()
+            await step.wait(self.product_page.navigate(wait_until="domcontentloaded"))  # 使用domcontentloaded更快
+            await self._wait_for_product_ready(step)  # 等待商品标题出现
+            self.resource_blocker.page_load_time = time.time() - load_started
             step.complete("passed", f"页面加载完成: {self.page.url}")
         except Exception as e:
             step.complete("failed", "页面访问失败", str(e))
             raise
 
-        # 步骤2: 页面结构检测
-        step = self.steps[1]
-        step.start()
+    async def _full_step_2(self, step: TestStep):
+        """步骤2: 页面结构检测"""
         try:
             body = await self.page.query_selector("body")
             header = await self.page.query_selector("header, .header")
@@ -840,9 +1207,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "检测页面结构时出错", str(e))
 
-        # 步骤3: 商品标题验证
-        step = self.steps[2]
-        step.start()
+    async def _full_step_3(self, step: TestStep):
+        """步骤3: 商品标题验证"""
         try:
             # 🔧 修复：使用与快速测试一致的选择器列表，移除过于宽泛的 "h1"
             title_selectors = [
@@ -893,9 +1259,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "验证标题时出错", str(e))
 
-        # 步骤4: 价格信息验证
-        step = self.steps[3]
-        step.start()
+    async def _full_step_4(self, step: TestStep):
+        """步骤4: 价格信息验证"""
         try:
             price_selectors = [
                 ".price--highlight",
@@ -935,9 +1300,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "验证价格时出错", str(e))
 
-        # 步骤5: 商品图片验证
-        step = self.steps[4]
-        step.start()
+    async def _full_step_5(self, step: TestStep):
+        """步骤5: 商品图片验证"""
         try:
             # 检查主图 - 包括懒加载的图片
             main_image_selectors = [
@@ -990,9 +1354,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "验证图片时出错", str(e))
 
-        # 步骤6: 商品描述验证
-        step = self.steps[5]
-        step.start()
+    async def _full_step_6(self, step: TestStep):
+        """步骤6: 商品描述验证"""
         try:
             description_selectors = [
                 ".product__description",
@@ -1019,9 +1382,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "验证描述时出错", str(e))
 
-        # 步骤7: 变体选择测试 (颜色/型号/配件等)
-        step = self.steps[6]
-        step.start()
+    async def _full_step_7(self, step: TestStep):
+        """步骤7: 变体选择测试 (颜色/型号/配件等)"""
         try:
             variant_results = []
 
@@ -1083,13 +1445,15 @@ class ProductTester:
                                     label = await self.page.query_selector(f"label[for='{radio_id}']")
                                     if label:
                                         await label.click(timeout=3000)
-                                        await self.page.wait_for_timeout(500)
+                                        await self._wait_for_condition(step, unchecked_radio['element'].is_checked,
+                                                                       CONTROL_SETTLE_TIMEOUT)
                                         variant_results.append(f"{variant_type}: {len(radios)}个选项，已测试切换")
                                         logger.info(f"  成功切换{variant_type}: {first_radio['value']} -> {unchecked_radio['value']}")
                                     else:
                                         # label不存在，直接点击radio
                                         await unchecked_radio['element'].click(timeout=3000)
-                                        await self.page.wait_for_timeout(500)
+                                        await self._wait_for_condition(step, unchecked_radio['element'].is_checked,
+                                                                       CONTROL_SETTLE_TIMEOUT)
                                         variant_results.append(f"{variant_type}: {len(radios)}个选项，已测试切换")
                                 else:
                                     variant_results.append(f"{variant_type}: {len(radios)}个选项（无法点击）")
@@ -1116,7 +1480,7 @@ class ProductTester:
                 try:
                     first_cb = visible_checkboxes[0]
                     await first_cb.click(timeout=3000)
-                    await self.page.wait_for_timeout(500)
+                    await self._wait_for_condition(step, first_cb.is_checked, CONTROL_SETTLE_TIMEOUT)
                     variant_results.append(f"配件选项: {accessories_found}个，已测试勾选")
                     logger.info(f"  成功测试配件勾选")
                 except:
@@ -1129,9 +1493,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "测试变体选择时出错", str(e))
 
-        # 步骤8: 数量选择测试
-        step = self.steps[7]
-        step.start()
+    async def _full_step_8(self, step: TestStep):
+        """步骤8: 数量选择测试"""
         try:
             # 在商品详情页，很多网站只有数量输入框，而加减按钮在购物车页面
             # 所以这一步主要验证数量输入框的存在和可用性
@@ -1175,7 +1538,7 @@ class ProductTester:
                         await quantity_input.click(timeout=2000)
                         await quantity_input.select_text(timeout=1000)
                         await quantity_input.type("2", timeout=2000)
-                        await self.page.wait_for_timeout(300)
+                        await self._wait_for_input_value(step, quantity_input, lambda v: v == "2")
                         new_value = await quantity_input.get_attribute("value")
 
                         if new_value == "2":
@@ -1193,7 +1556,7 @@ class ProductTester:
                         await self.page.keyboard.press("Control+A")  # 全选
                         await self.page.keyboard.press("Backspace")  # 删除
                         await self.page.keyboard.type("3")  # 输入3
-                        await self.page.wait_for_timeout(300)
+                        await self._wait_for_input_value(step, quantity_input, lambda v: v == "3")
                         new_value = await quantity_input.get_attribute("value")
 
                         if new_value == "3":
@@ -1210,7 +1573,8 @@ class ProductTester:
                             is_button_visible = await plus_button.is_visible()
                             if is_button_visible:
                                 await plus_button.click(timeout=2000)
-                                await self.page.wait_for_timeout(300)
+                                await self._wait_for_input_value(step, quantity_input,
+                                                                 lambda v: v != current_value)
                                 new_value = await quantity_input.get_attribute("value")
                                 if int(new_value) > int(current_value):
                                     logger.info(f"  加号按钮可用: {current_value} -> {new_value}")
@@ -1229,9 +1593,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "测试数量选择时出错", str(e))
 
-        # 步骤9: 添加购物车
-        step = self.steps[8]
-        step.start()
+    async def _full_step_9(self, step: TestStep):
+        """步骤9: 添加购物车"""
         try:
             button_selector = self.product.selectors.add_to_cart_button
             button = await self.page.query_selector(button_selector)
@@ -1241,10 +1604,8 @@ class ProductTester:
                 is_enabled = await button.is_enabled()
 
                 if is_visible and is_enabled:
-                    await button.click()
-                    # 🔧 改进: 等待更长时间让AJAX请求完成并同步到服务器
-                    await self.page.wait_for_timeout(5000)  # 从2秒增加到5秒
-                    logger.info("等待购物车同步到服务器...")
+                    # 等待加购请求完成并同步到服务器
+                    await self._click_add_to_cart(step, button)
                     step.complete("passed", "成功点击添加购物车按钮")
                 elif is_visible:
                     step.complete("passed", "加购按钮可见但已禁用（可能需要选择变体）")
@@ -1255,9 +1616,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "添加购物车操作失败", str(e))
 
-        # 步骤10: 购物车验证
-        step = self.steps[9]
-        step.start()
+    async def _full_step_10(self, step: TestStep):
+        """步骤10: 购物车验证"""
         try:
             cart_selectors = [
                 ".cart-count",
@@ -1281,8 +1641,8 @@ class ProductTester:
                 logger.info("  未检测到购物车数量变化，进行二次验证...")
                 try:
                     cart_url = "https://fiido.com/cart"
-                    await self.page.goto(cart_url, wait_until="domcontentloaded")
-                    await self.page.wait_for_timeout(2000)
+                    await step.wait(self.page.goto(cart_url, wait_until="domcontentloaded"))
+                    await self._wait_for_cart_ready(step)
 
                     # 检查购物车是否有商品
                     cart_items = await self.page.query_selector_all("tr.cart-item, .cart-item, [data-cart-item]")
@@ -1310,9 +1670,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "检查购物车时出错", str(e))
 
-        # 步骤11: 相关推荐验证
-        step = self.steps[10]
-        step.start()
+    async def _full_step_11(self, step: TestStep):
+        """步骤11: 相关推荐验证"""
         try:
             recommendation_selectors = [
                 ".product-recommendations",
@@ -1340,9 +1699,8 @@ class ProductTester:
         except Exception as e:
             step.complete("failed", "验证相关推荐时出错", str(e))
 
-        # 步骤12: 支付流程验证
-        step = self.steps[11]
-        step.start()
+    async def _full_step_12(self, step: TestStep):
+        """步骤12: 支付流程验证"""
         try:
             # 清空之前的错误记录
             errors_before_cart = len(self.js_errors)
@@ -1352,8 +1710,8 @@ class ProductTester:
             cart_url = "https://fiido.com/cart"
             logger.info(f"导航到购物车页面: {cart_url}")
 
-            await self.page.goto(cart_url, wait_until="domcontentloaded")
-            await self.page.wait_for_timeout(3000)  # 等待页面和动态内容加载
+            await step.wait(self.page.goto(cart_url, wait_until="domcontentloaded"))
+            await self._wait_for_cart_ready(step)  # 等待购物车内容出现
 
             current_url = self.page.url
             logger.info(f"当前URL: {current_url}")
@@ -1419,8 +1777,12 @@ class ProductTester:
                             js_errors_before_click = len(self.js_errors)
 
                             try:
-                                await plus_button.click(timeout=2000)
-                                await self.page.wait_for_timeout(1500)
+                                # 等待数量调整请求返回，点击无响应时最多等待 CART_CHANGE_TIMEOUT
+                                response = await step.wait(self.waiter.click_and_wait_for_response(
+                                    plus_button, "/cart/change", timeout=CART_CHANGE_TIMEOUT))
+                                if response is not None and cart_qty_input and current_qty:
+                                    await self._wait_for_input_value(step, cart_qty_input,
+                                                                     lambda v: v != current_qty)
 
                                 # 检查数量是否变化
                                 new_qty = None
@@ -1581,6 +1943,17 @@ async def main():
                        help="测试模式: quick(快速测试) 或 full(全面测试)")
     parser.add_argument("--headless", action="store_true", default=True, help="无头模式运行")
     parser.add_argument("--visible", action="store_true", help="显示浏览器窗口")
+    parser.add_argument("--no-block-resources", action="store_true",
+                       help="不拦截图片/视频/字体/第三方组件（用于对比拦截前后的结果）")
+    parser.add_argument("--step-retries", type=int, default=STEP_RETRY_LIMIT,
+                       help=f"步骤因超时/网络错误失败时的最大重试次数 (默认{STEP_RETRY_LIMIT}，0 表示不重试；加购和结账步骤不重试)")
+    har_group = parser.add_mutually_exclusive_group()
+    har_group.add_argument("--record-har", nargs="?", const=str(HAR_DIR), metavar="DIR",
+                           help="录制网络流量到 HAR (默认目录 data/har)")
+    har_group.add_argument("--replay-har", nargs="?", const=str(HAR_DIR), metavar="DIR",
+                           help="从已录制的 HAR 离线回放 (默认目录 data/har)")
+    parser.add_argument("--event-log", type=Path, metavar="FILE",
+                        help="把商品和步骤的开始/结束事件追加到 JSONL 事件日志")
     args = parser.parse_args()
 
     # 加载商品数据
@@ -1589,11 +1962,9 @@ async def main():
         logger.error(f"商品数据文件不存在: {products_file}")
         sys.exit(1)
 
-    with open(products_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    products_list = data.get("products", [])
-    product_data = next((p for p in products_list if p["id"] == args.product_id), None)
+    # 通过索引按 ID 查找，不必解析整个商品文件
+    with ProductStore.for_catalog(products_file) as store:
+        product_data = store.get(args.product_id)
 
     if not product_data:
         logger.error(f"未找到商品: {args.product_id}")
@@ -1603,8 +1974,28 @@ async def main():
     headless = args.headless and not args.visible
 
     # 运行测试
-    tester = ProductTester(product, test_mode=args.mode, headless=headless)
-    result = await tester.run()
+    har_mode = "record" if args.record_har else "replay" if args.replay_har else None
+    har_dir = args.record_har or args.replay_har
+    event_log = EventLog(args.event_log) if args.event_log else None
+    tester = ProductTester(product, test_mode=args.mode, headless=headless,
+                           block_resources=not args.no_block_resources,
+                           har_mode=har_mode,
+                           har_path=har_path_for(product.id, Path(har_dir)) if har_dir else None,
+                           max_step_retries=args.step_retries,
+                           event_log=event_log)
+    if event_log:
+        event_log.emit("run_start", kind="product", test_mode=args.mode, test_scope="单个商品测试",
+                       test_config={'mode': args.mode, 'product_id': product.id},
+                       products=[{'product_id': product.id, 'product_name': product.name}])
+        event_log.emit("product_start", index=1, product_id=product.id, product_name=product.name)
+    try:
+        result = await tester.run()
+        if event_log:
+            event_log.emit("product_end", index=1, result=result)
+            event_log.emit("run_end")
+    finally:
+        if event_log:
+            event_log.close()
 
     # 返回退出码
     sys.exit(0 if result["status"] == "passed" else 1)
@@ -13,14 +13,16 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Mapping
 
 import pytest
 from pydantic import ValidationError
 from playwright.async_api import Page
 from playwright.sync_api import Page as SyncPage
 
+from core.compact_catalog import CompactCatalog
 from core.models import Product
+from core.product_store import ProductStore
 from pages.product_page import ProductPage
 
 logger = logging.getLogger(__name__)
@@ -32,11 +34,15 @@ SCREENSHOT_DIR.mkdir(exist_ok=True)
 
 @dataclass(frozen=True)
 class ProductDataset:
-    """Container for a discovered product dataset."""
+    """Container for a discovered product dataset.
+
+    Products are kept in a columnar CompactCatalog; full Product models are only
+    created for the products a test session actually selects.
+    """
 
     path: Path
     metadata: Dict[str, Any]
-    products: List[Product]
+    catalog: CompactCatalog
 
 
 _DATASET_CACHE: Dict[Path, ProductDataset] = {}
@@ -77,6 +83,12 @@ def pytest_addoption(parser: pytest.Parser) -> None:
              "Defaults to the first existing file among data/discovered_products.json, "
              "data/products.json, data/demo_products.json, data/test_products.json.",
     )
+    group.addoption(
+        "--strict-catalog",
+        action="store_true",
+        default=False,
+        help="Re-validate every product from the JSON file instead of using the validated snapshot.",
+    )
 
 
 def _resolve_product_file(config: pytest.Config) -> Path:
@@ -97,42 +109,31 @@ def _resolve_product_file(config: pytest.Config) -> Path:
     )
 
 
-def _load_dataset_from_file(file_path: Path) -> ProductDataset:
-    """Load the dataset from disk and convert entries into Product models."""
+def _load_dataset_from_file(file_path: Path, strict: bool = False) -> ProductDataset:
+    """Load the dataset from disk, reusing the validated snapshot unless strict is set.
+
+    The compact catalog is built straight from the snapshot's validated field values,
+    so no full Product list is created up front.
+    """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            raw_data = json.load(f)
+        catalog = CompactCatalog.load(file_path, strict=strict)
     except json.JSONDecodeError as exc:
         raise pytest.UsageError(f"Invalid JSON in {file_path}: {exc}") from exc
 
-    metadata = raw_data.get("metadata", {})
-    products_raw = raw_data.get("products", [])
-
-    products: List[Product] = []
-    invalid_entries = 0
-
-    for entry in products_raw:
-        try:
-            products.append(Product(**entry))
-        except ValidationError as exc:
-            invalid_entries += 1
-            logger.warning(
-                "Skipping invalid product entry %s: %s",
-                entry.get("id", "<unknown>"),
-                exc,
-            )
+    for product_id, error in catalog.invalid:
+        logger.warning("Skipping invalid product entry %s: %s", product_id, error)
 
-    if not products:
+    if not len(catalog):
         pytest.skip(f"{file_path} 不包含可用的商品数据。")
 
-    if invalid_entries:
+    if catalog.invalid:
         logger.warning(
             "Skipped %d invalid product entries while loading %s",
-            invalid_entries,
+            len(catalog.invalid),
             file_path,
         )
 
-    return ProductDataset(path=file_path, metadata=metadata, products=products)
+    return ProductDataset(path=file_path, metadata=catalog.metadata, catalog=catalog)
 
 
 def _get_product_dataset(config: pytest.Config) -> ProductDataset:
@@ -141,21 +142,36 @@ def _get_product_dataset(config: pytest.Config) -> ProductDataset:
     cache_key = dataset_path.resolve()
 
     if cache_key not in _DATASET_CACHE:
-        _DATASET_CACHE[cache_key] = _load_dataset_from_file(cache_key)
+        _DATASET_CACHE[cache_key] = _load_dataset_from_file(
+            cache_key, strict=config.getoption("--strict-catalog")
+        )
 
     return _DATASET_CACHE[cache_key]
 
 
-def _filter_products(products: List[Product], config: pytest.Config) -> List[Product]:
-    """Apply CLI filters to the loaded product list."""
+def _lookup_product(file_path: Path, product_id: str) -> Product:
+    """Look up a single product through the on-disk index without loading the whole dataset."""
+    with ProductStore.for_catalog(file_path) as store:
+        entry = store.get(product_id)
+
+    if entry is None:
+        pytest.skip(f"商品 {product_id} 未在数据集中找到。")
+    try:
+        return Product(**entry)
+    except ValidationError as exc:
+        raise pytest.UsageError(f"Invalid product entry {product_id} in {file_path}: {exc}") from exc
+
+
+def _filter_products(catalog: CompactCatalog, config: pytest.Config) -> List[Product]:
+    """Apply CLI filters to the catalog columns and materialize only the matching products."""
     product_id = config.getoption("--product-id")
     if product_id:
-        match = next((p for p in products if p.id == product_id), None)
+        match = catalog.get(product_id)
         if not match:
             pytest.skip(f"商品 {product_id} 未在数据集中找到。")
-        return [match]
+        return [match.to_product()]
 
-    filtered = list(products)
+    filtered = list(catalog)
 
     priority = config.getoption("--priority")
     if priority:
@@ -164,14 +180,14 @@ def _filter_products(products: List[Product], config: pytest.Config) -> List[Pro
             raise pytest.UsageError(
                 f"未知的优先级 '{priority}'，请使用 P0/P1/P2。"
             )
-        filtered = [p for p in filtered if p.priority.upper() == normalized]
+        filtered = [p for p in filtered if p.priority == normalized]
 
     category = config.getoption("--category")
     if category:
         keyword = category.strip().lower()
         filtered = [p for p in filtered if keyword in p.category.lower()]
 
-    return filtered
+    return [record.to_product() for record in filtered]
 
 
 def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
@@ -179,8 +195,12 @@ def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
     if "test_product" not in metafunc.fixturenames:
         return
 
-    dataset = _get_product_dataset(metafunc.config)
-    filtered_products = _filter_products(dataset.products, metafunc.config)
+    product_id = metafunc.config.getoption("--product-id")
+    if product_id:
+        filtered_products = [_lookup_product(_resolve_product_file(metafunc.config), product_id)]
+    else:
+        dataset = _get_product_dataset(metafunc.config)
+        filtered_products = _filter_products(dataset.catalog, metafunc.config)
 
     if not filtered_products:
         pytest.skip(
@@ -201,13 +221,13 @@ def product_dataset(pytestconfig: pytest.Config) -> ProductDataset:
 
 
 @pytest.fixture(scope="session")
-def discovered_products(product_dataset: ProductDataset) -> Dict[str, Product]:
-    """Map of product id -> Product for quick lookup inside tests."""
-    return {product.id: product for product in product_dataset.products}
+def discovered_products(product_dataset: ProductDataset) -> Mapping[str, Product]:
+    """Map of product id -> Product for quick lookup inside tests (models are built on access)."""
+    return product_dataset.catalog.products()
 
 
 @pytest.fixture(scope="session")
-def product_by_id(discovered_products: Dict[str, Product]) -> Callable[[str], Product]:
+def product_by_id(discovered_products: Mapping[str, Product]) -> Callable[[str], Product]:
     """Helper fixture to fetch a product by id and skip tests if it is missing."""
 
     def _get_product(product_id: str) -> Product:
@@ -0,0 +1,39 @@
+"""
+商品目录测试共用的商品条目
+
+生成与 data/products.json 中结构一致的商品字典，供目录快照、紧凑目录和商品索引测试使用。
+"""
+
+from typing import Any, Dict
+
+
+def product_entry(product_id: str, **overrides: Any) -> Dict[str, Any]:
+    """生成一条商品目录条目
+
+    Args:
+        product_id: 商品 ID（同时用作 URL 和 metadata 中的 handle）
+        **overrides: 覆盖的字段
+
+    Returns:
+        商品字典，每次调用返回新对象
+    """
+    entry = {
+        "id": product_id,
+        "name": f"Fiido {product_id}",
+        "url": f"https://fiido.com/products/{product_id}",
+        "category": "Electric Bikes",
+        "price_min": 999.0,
+        "price_max": 1299.0,
+        "variants": [
+            {"name": "Black", "type": "color", "selector": "button[data-value='Black']"},
+            {"name": "Large", "type": "size", "selector": "button[data-value='L']",
+             "available": False, "price_modifier": 50.0},
+        ],
+        "selectors": {"product_title": "h1", "custom_badge": ".badge"},
+        "priority": "P0",
+        "tags": ["D11"],
+        "metadata": {"handle": product_id},
+        "discovered_at": "2025-12-05T10:42:22.866581",
+    }
+    entry.update(overrides)
+    return entry
@@ -0,0 +1,136 @@
+"""
+batch_test_products 批量执行单元测试
+
+测试并发执行时的结果顺序和输出分组。
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+# 添加项目根目录和 scripts 目录到 Python 路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+import batch_test_products
+from batch_test_products import run_batch, balance_shards, load_historical_durations
+
+
+def _products(count):
+    return [{'id': f'p{i}', 'name': f'Product {i}'} for i in range(1, count + 1)]
+
+
+async def _fake_test_product(product_data, index, total, test_mode="quick", browser_pool=None,
+                             block_resources=True, storage_state=None, reuse_context=False,
+                             har_mode=None, har_dir=None, event_log=None):
+    """模拟测试：先开始的商品反而更晚完成，并在中途输出日志"""
+    batch_test_products._emit(f"[{index}/{total}] 测试商品: {product_data['name']}")
+    await asyncio.sleep(0.01 * (total - index))
+    batch_test_products._emit(f"  ✓ 结果: {product_data['id']} done")
+    return {
+        'product_id': product_data['id'],
+        'product_name': product_data['name'],
+        'status': 'passed',
+        'duration': 0.0,
+        'steps': [],
+        'errors': []
+    }
+
+
+class TestRunBatch:
+    """测试 run_batch"""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_selection_order(self):
+        """测试并发执行时结果顺序与商品顺序一致"""
+        with patch.object(batch_test_products, 'test_product', _fake_test_product):
+            results = await run_batch(_products(5), concurrency=5)
+
+        assert [r['product_id'] for r in results] == ['p1', 'p2', 'p3', 'p4', 'p5']
+
+    @pytest.mark.asyncio
+    async def test_concurrent_output_is_grouped(self, capsys):
+        """测试并发执行时每个商品的输出连续，不与其他商品交错"""
+        with patch.object(batch_test_products, 'test_product', _fake_test_product):
+            await run_batch(_products(4), concurrency=4)
+
+        lines = [line for line in capsys.readouterr().out.splitlines() if line.strip()]
+        for i, line in enumerate(lines):
+            if '测试商品:' in line:
+                index = line.split(']')[0].lstrip('[').split('/')[0]
+                assert lines[i + 1] == f"  ✓ 结果: p{index} done"
+
+    @pytest.mark.asyncio
+    async def test_sequential_mode_prints_directly(self, capsys):
+        """测试 concurrency=1 时按顺序直接输出"""
+        with patch.object(batch_test_products, 'test_product', _fake_test_product):
+            results = await run_batch(_products(2), concurrency=1)
+
+        out = capsys.readouterr().out
+        assert len(results) == 2
+        assert out.index('[1/2] 测试商品') < out.index('[2/2] 测试商品')
+
+    @pytest.mark.asyncio
+    async def test_on_result_receives_grouped_output(self, capsys):
+        """测试提供回调时使用批次序号，输出交给回调而不直接打印"""
+        received = []
+        with patch.object(batch_test_products, 'test_product', _fake_test_product):
+            results = await run_batch(_products(2), indices=[3, 5], total=6,
+                                      on_result=lambda i, r, out: received.append((i, r['product_id'], out)))
+
+        assert [r['product_id'] for r in results] == ['p1', 'p2']
+        assert sorted(i for i, _, _ in received) == [3, 5]
+        for index, _, output in received:
+            assert f"[{index}/6] 测试商品" in output
+        assert capsys.readouterr().out == ""
+
+
+class TestSharding:
+    """测试分片均衡与历史耗时读取"""
+
+    def test_balance_shards_by_duration(self):
+        """测试按历史耗时而非数量均衡分片"""
+        products = _products(5)
+        durations = {'p1': 100.0, 'p2': 10.0, 'p3': 10.0, 'p4': 10.0, 'p5': 10.0}
+
+        shards = balance_shards(products, 2, durations, default_duration=30.0)
+
+        assert [[i for i, _ in shard] for shard in shards] == [[1], [2, 3, 4, 5]]
+
+    def test_balance_shards_unknown_products_use_median(self):
+        """测试无历史记录的商品按历史中位数估算，且每个商品只分配一次"""
+        products = _products(4)
+        shards = balance_shards(products, 3, {'p1': 50.0}, default_duration=30.0)
+
+        assigned = sorted(i for shard in shards for i, _ in shard)
+        assert assigned == [1, 2, 3, 4]
+        assert len(shards) == 3
+
+    def test_balance_shards_caps_shard_count(self):
+        """测试分片数不超过商品数"""
+        shards = balance_shards(_products(2), 8, {}, default_duration=30.0)
+        assert len(shards) == 2
+
+    def test_load_historical_durations(self, tmp_path):
+        """测试只统计相同模式、正常结束的记录并取平均"""
+        reports = [
+            {'test_mode': 'quick', 'results': [
+                {'product_id': 'p1', 'status': 'passed', 'duration': 20},
+                {'product_id': 'p2', 'status': 'error', 'duration': 0},
+            ]},
+            {'test_mode': 'quick', 'results': [
+                {'product_id': 'p1', 'status': 'failed', 'duration': 40},
+            ]},
+            {'test_mode': 'full', 'results': [
+                {'product_id': 'p1', 'status': 'passed', 'duration': 500},
+            ]},
+        ]
+        for i, report in enumerate(reports):
+            (tmp_path / f"batch_test_2025010{i}_000000.json").write_text(json.dumps(report), encoding='utf-8')
+        (tmp_path / "batch_test_broken.json").write_text("{", encoding='utf-8')
+
+        assert load_historical_durations(tmp_path, 'quick') == {'p1': 30.0}
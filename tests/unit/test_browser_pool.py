@@ -0,0 +1,128 @@
+"""
+BrowserPool 单元测试
+
+测试共享浏览器池的启动、上下文创建与关闭。
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock, AsyncMock, patch
+import pytest
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.browser_pool import BrowserPool
+
+
+@pytest.fixture
+def mock_playwright():
+    """创建 Mock Playwright 对象（async_playwright().start() 的返回值）"""
+    browser = AsyncMock()
+    browser.is_connected = Mock(return_value=True)
+    browser.new_context = AsyncMock(side_effect=lambda **kwargs: AsyncMock())
+
+    playwright = AsyncMock()
+    playwright.chromium.launch = AsyncMock(return_value=browser)
+
+    manager = Mock()
+    manager.start = AsyncMock(return_value=playwright)
+    return manager, playwright, browser
+
+
+class TestBrowserPool:
+    """测试 BrowserPool"""
+
+    @pytest.mark.asyncio
+    async def test_start_launches_browser_once(self, mock_playwright):
+        """测试多次 start 只启动一次浏览器"""
+        manager, playwright, browser = mock_playwright
+        with patch('core.browser_pool.async_playwright', return_value=manager):
+            pool = BrowserPool(headless=True)
+            first = await pool.start()
+            second = await pool.start()
+
+        assert first is browser
+        assert second is browser
+        playwright.chromium.launch.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_new_context_is_isolated(self, mock_playwright):
+        """测试每次调用 new_context 都创建新的上下文"""
+        manager, playwright, browser = mock_playwright
+        with patch('core.browser_pool.async_playwright', return_value=manager):
+            pool = BrowserPool(context_options={'locale': 'en-US'})
+            ctx1 = await pool.new_context()
+            ctx2 = await pool.new_context(viewport={'width': 800, 'height': 600})
+
+        assert ctx1 is not ctx2
+        assert pool.contexts_created == 2
+        playwright.chromium.launch.assert_called_once()
+        browser.new_context.assert_called_with(locale='en-US', viewport={'width': 800, 'height': 600})
+
+    @pytest.mark.asyncio
+    async def test_relaunch_after_disconnect(self, mock_playwright):
+        """测试浏览器断开后自动重新启动"""
+        manager, playwright, browser = mock_playwright
+        with patch('core.browser_pool.async_playwright', return_value=manager):
+            pool = BrowserPool()
+            await pool.start()
+            browser.is_connected.return_value = False
+            await pool.new_context()
+
+        assert playwright.chromium.launch.call_count == 2
+        manager.start.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_context_manager_closes(self, mock_playwright):
+        """测试 async with 退出时关闭浏览器与 Playwright"""
+        manager, playwright, browser = mock_playwright
+        with patch('core.browser_pool.async_playwright', return_value=manager):
+            async with BrowserPool() as pool:
+                assert pool.browser is browser
+
+        browser.close.assert_awaited_once()
+        playwright.stop.assert_awaited_once()
+        assert pool.browser is None
+
+    @pytest.mark.asyncio
+    async def test_acquire_reuses_released_context(self, mock_playwright):
+        """测试归还的上下文在重置成功后被复用"""
+        manager, playwright, browser = mock_playwright
+        reset = AsyncMock(return_value=True)
+        with patch('core.browser_pool.async_playwright', return_value=manager):
+            pool = BrowserPool()
+            ctx1 = await pool.acquire_context(reset=reset)
+            await pool.release_context(ctx1)
+            ctx2 = await pool.acquire_context(reset=reset)
+
+        assert ctx2 is ctx1
+        reset.assert_awaited_once_with(ctx1)
+        assert pool.contexts_created == 1
+        assert pool.contexts_reused == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_replaces_context_when_reset_fails(self, mock_playwright):
+        """测试重置失败时关闭旧上下文并新建"""
+        manager, playwright, browser = mock_playwright
+        with patch('core.browser_pool.async_playwright', return_value=manager):
+            pool = BrowserPool()
+            ctx1 = await pool.acquire_context()
+            await pool.release_context(ctx1)
+            ctx2 = await pool.acquire_context(reset=AsyncMock(return_value=False))
+
+        assert ctx2 is not ctx1
+        ctx1.close.assert_awaited_once()
+        assert pool.contexts_created == 2
+
+    @pytest.mark.asyncio
+    async def test_close_closes_idle_contexts(self, mock_playwright):
+        """测试关闭浏览器池时关闭空闲上下文"""
+        manager, playwright, browser = mock_playwright
+        with patch('core.browser_pool.async_playwright', return_value=manager):
+            pool = BrowserPool()
+            ctx = await pool.acquire_context()
+            await pool.release_context(ctx)
+            await pool.close()
+
+        ctx.close.assert_awaited_once()
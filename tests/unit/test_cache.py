@@ -0,0 +1,279 @@
+"""
+CrawlerCache 单元测试
+
+测试缓存读写、条件请求验证器、命中统计与 SQLite 索引（批量访问时间、LRU 淘汰、压缩去重）。
+"""
+
+import json
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import core.cache
+from core.cache import CrawlerCache
+from core.crawler import ProductCrawler
+
+
+URL = "https://fiido.com/collections/bikes/products.json?page=1&limit=250"
+
+
+def _expire(cache: CrawlerCache, url: str):
+    """将缓存条目标记为已过期"""
+    key = cache._get_cache_key(url)
+    with cache._conn:
+        cache._conn.execute(
+            "UPDATE entries SET cached_at = ? WHERE cache_key = ?", (time.time() - 48 * 3600, key)
+        )
+
+
+def _last_accessed(cache: CrawlerCache, url: str) -> float:
+    """读取索引中的最近访问时间"""
+    key = cache._get_cache_key(url)
+    return cache._conn.execute(
+        "SELECT last_accessed FROM entries WHERE cache_key = ?", (key,)
+    ).fetchone()[0]
+
+
+class TestValidators:
+    """测试验证器存储与重新验证"""
+
+    def test_validators_survive_expiry(self, tmp_path):
+        """测试缓存过期后仍可取得条件请求头"""
+        cache = CrawlerCache(cache_dir=str(tmp_path))
+        cache.set(URL, {"products": []}, validators={"etag": 'W/"abc"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+        _expire(cache, URL)
+
+        assert cache.get(URL) is None
+        assert cache.get_validators(URL) == {
+            "If-None-Match": 'W/"abc"',
+            "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+        }
+
+    def test_no_validators_without_entry(self, tmp_path):
+        """测试没有缓存时不发送条件请求头"""
+        cache = CrawlerCache(cache_dir=str(tmp_path))
+        assert cache.get_validators(URL) == {}
+
+    def test_revalidate_refreshes_ttl(self, tmp_path):
+        """测试重新验证后复用缓存内容并刷新有效期"""
+        cache = CrawlerCache(cache_dir=str(tmp_path))
+        cache.set(URL, {"products": [1]}, validators={"etag": '"v1"'})
+        _expire(cache, URL)
+
+        assert cache.revalidate(URL) == {"products": [1]}
+        assert cache.get(URL) == {"products": [1]}
+
+    def test_stats_count_hits_misses_revalidated(self, tmp_path):
+        """测试统计命中、未命中和重新验证次数"""
+        cache = CrawlerCache(cache_dir=str(tmp_path))
+        cache.get(URL)
+        cache.set(URL, {"products": []}, validators={"etag": '"v1"'})
+        cache.get(URL)
+        cache.revalidate(URL)
+
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['revalidated']) == (1, 1, 1)
+
+
+class TestIndex:
+    """测试 SQLite 索引"""
+
+    def test_hits_batch_access_time_updates(self, tmp_path, monkeypatch):
+        """测试命中时只在内存记录访问时间，累积到批量大小后才写回索引"""
+        monkeypatch.setattr(core.cache, "ACCESS_FLUSH_BATCH", 3)
+        cache = CrawlerCache(cache_dir=str(tmp_path))
+        urls = [f"{URL}&n={i}" for i in range(3)]
+        for url in urls:
+            cache.set(url, {"n": url})
+        before = _last_accessed(cache, urls[0])
+
+        cache.get(urls[0])
+        cache.get(urls[1])
+        assert _last_accessed(cache, urls[0]) == before
+
+        cache.get(urls[2])
+        assert _last_accessed(cache, urls[0]) > before
+        assert cache._pending_access == {}
+
+    def test_lru_eviction_keeps_recently_used(self, tmp_path):
+        """测试超过大小上限时淘汰最久未访问的条目"""
+        cache = CrawlerCache(cache_dir=str(tmp_path), max_size_mb=None)
+        payloads = [{"body": f"{i:04d}" * 250} for i in range(6)]
+        for i in range(5):
+            cache.set(f"{URL}&n={i}", payloads[i])
+        entry_size = cache.get_stats()['total_size_mb'] * 1024 * 1024 / 5
+        cache.get(f"{URL}&n=0")
+
+        cache.max_size_bytes = int(entry_size * 5.5)
+        cache.set(f"{URL}&n=5", payloads[5])
+
+        assert cache.get(f"{URL}&n=0") == payloads[0]
+        assert cache.get(f"{URL}&n=1") is None
+        stats = cache.get_stats()
+        assert (stats['total_items'], stats['stored_bodies'], stats['evicted']) == (5, 5, 1)
+
+    def test_identical_bodies_stored_once_and_compressed(self, tmp_path):
+        """测试相同内容只存一份，压缩后大小小于原始 JSON"""
+        cache = CrawlerCache(cache_dir=str(tmp_path))
+        body = {"products": [{"id": i, "title": "Fiido D11"} for i in range(50)]}
+        cache.set(f"{URL}&store=a", body)
+        cache.set(f"{URL}&store=b", body)
+
+        stats = cache.get_stats()
+        assert (stats['total_items'], stats['stored_bodies']) == (2, 1)
+        assert stats['total_size_mb'] < stats['raw_size_mb'] / 2
+        assert list(tmp_path.glob("*.json")) == []
+
+        cache.clear(f"{URL}&store=a")
+        assert cache.get(f"{URL}&store=b") == body
+        cache.set(f"{URL}&store=b", {"products": []})
+        assert cache.get_stats()['stored_bodies'] == 1
+
+    def test_shared_body_freed_only_after_last_reference(self, tmp_path):
+        """测试被多个条目引用的内容在全部条目淘汰后才释放"""
+        cache = CrawlerCache(cache_dir=str(tmp_path), max_size_mb=None)
+        shared = {"body": "shared" * 200}
+        cache.set(f"{URL}&n=0", shared)
+        cache.set(f"{URL}&n=1", {"body": "own" * 300})
+        cache.set(f"{URL}&n=2", shared)
+        cache.get(f"{URL}&n=1")
+        own_size = len(cache._read(cache._get_cache_key(f"{URL}&n=1")))
+        new_size = len(CrawlerCache._encode(json.dumps({"body": "new"}).encode())[1])
+
+        # 淘汰 n=0 不释放空间（n=2 仍引用相同内容），还需淘汰 n=2
+        cache.max_size_bytes = own_size + new_size
+        cache.set(f"{URL}&n=3", {"body": "new"})
+
+        assert cache.get(f"{URL}&n=0") is None
+        assert cache.get(f"{URL}&n=2") is None
+        assert cache.get(f"{URL}&n=1") == {"body": "own" * 300}
+        assert cache.get(f"{URL}&n=3") == {"body": "new"}
+        stats = cache.get_stats()
+        assert (stats['total_items'], stats['stored_bodies'], stats['evicted']) == (2, 2, 2)
+
+    def test_previous_index_version_migrated(self, tmp_path):
+        """测试旧版本索引（逐条目 JSON 文件）迁移为压缩存储"""
+        key = CrawlerCache._get_cache_key(None, URL)
+        (tmp_path / f"{key}.json").write_text(json.dumps({"products": [3]}))
+        conn = sqlite3.connect(str(tmp_path / "cache_index.db"))
+        conn.executescript(
+            "CREATE TABLE entries (cache_key TEXT PRIMARY KEY, url TEXT NOT NULL, cached_at REAL NOT NULL, "
+            "last_accessed REAL NOT NULL, size_bytes INTEGER NOT NULL DEFAULT 0, etag TEXT, last_modified TEXT);"
+        )
+        conn.execute(
+            "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", (key, URL, time.time(), time.time(), 17, '"v3"', None)
+        )
+        conn.commit()
+        conn.close()
+
+        cache = CrawlerCache(cache_dir=str(tmp_path))
+
+        assert cache.get(URL) == {"products": [3]}
+        assert cache.get_validators(URL) == {"If-None-Match": '"v3"'}
+        assert not (tmp_path / f"{key}.json").exists()
+
+    def test_shared_between_instances(self, tmp_path):
+        """测试多个缓存实例（如多个爬虫进程）共享同一缓存目录"""
+        writer = CrawlerCache(cache_dir=str(tmp_path))
+        reader = CrawlerCache(cache_dir=str(tmp_path))
+
+        writer.set(URL, {"products": [1]}, validators={"etag": '"v1"'})
+
+        assert reader.get(URL) == {"products": [1]}
+        assert reader.get_validators(URL) == {"If-None-Match": '"v1"'}
+        writer.close()
+        reader.close()
+
+    def test_concurrent_threads(self, tmp_path):
+        """测试多个线程并发读写"""
+        cache = CrawlerCache(cache_dir=str(tmp_path))
+
+        def work(i):
+            url = f"{URL}&n={i % 20}"
+            cache.set(url, {"n": i % 20})
+            return cache.get(url)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(work, range(200)))
+
+        assert all(result is not None for result in results)
+        assert cache.get_stats()['total_items'] == 20
+
+    def test_legacy_metadata_imported(self, tmp_path):
+        """测试旧版本 cache_metadata.json 导入索引后删除"""
+        key = CrawlerCache._get_cache_key(None, URL)
+        (tmp_path / f"{key}.json").write_text(json.dumps({"products": [2]}))
+        now = datetime.now().isoformat()
+        (tmp_path / "cache_metadata.json").write_text(json.dumps({
+            key: {"url": URL, "cached_at": now, "last_accessed": now, "size_bytes": 16, "etag": '"v2"'}
+        }))
+
+        cache = CrawlerCache(cache_dir=str(tmp_path))
+
+        assert not (tmp_path / "cache_metadata.json").exists()
+        assert cache.get(URL) == {"products": [2]}
+        assert cache.get_validators(URL) == {"If-None-Match": '"v2"'}
+
+
+class TestCrawlerConditionalRequests:
+    """测试爬虫的条件请求"""
+
+    def _crawler(self, tmp_path):
+        crawler = ProductCrawler(use_cache=False)
+        crawler.use_cache = True
+        crawler.cache = CrawlerCache(cache_dir=str(tmp_path))
+        crawler.rate_limiter.requests_per_second = 0
+        return crawler
+
+    def test_304_reuses_cached_body(self, tmp_path):
+        """测试携带验证器请求，响应 304 时返回缓存内容"""
+        crawler = self._crawler(tmp_path)
+        url = "https://fiido.com/collections/bikes/products.json"
+        fresh = Mock(status_code=200, headers={"ETag": '"v1"'})
+        fresh.json.return_value = {"products": [{"id": 1}]}
+        not_modified = Mock(status_code=304, headers={})
+        crawler.session.get = Mock(side_effect=[fresh, not_modified])
+
+        first = crawler._get_json(url, params={"page": 1})
+        second = crawler._get_json(url, params={"page": 1})
+
+        assert first == second == {"products": [{"id": 1}]}
+        assert crawler.session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        stats = crawler.get_stats()['cache']
+        assert (stats['hits'], stats['misses'], stats['revalidated']) == (0, 1, 1)
+
+    def test_full_response_counts_miss(self, tmp_path):
+        """测试条件请求返回 200 时计入未命中"""
+        crawler = self._crawler(tmp_path)
+        url = "https://fiido.com/collections/bikes/products.json"
+        first = Mock(status_code=200, headers={"ETag": '"v1"'})
+        first.json.return_value = {"products": [{"id": 1}]}
+        changed = Mock(status_code=200, headers={"ETag": '"v2"'})
+        changed.json.return_value = {"products": [{"id": 2}]}
+        crawler.session.get = Mock(side_effect=[first, changed])
+
+        crawler._get_json(url)
+        assert crawler._get_json(url) == {"products": [{"id": 2}]}
+
+        stats = crawler.get_stats()['cache']
+        assert (stats['hits'], stats['misses'], stats['revalidated']) == (0, 2, 0)
+
+    def test_response_without_validators_not_cached(self, tmp_path):
+        """测试没有验证器的响应不写入缓存，下一次仍为普通请求"""
+        crawler = self._crawler(tmp_path)
+        url = "https://fiido.com/collections/bikes/products.json"
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = {"products": []}
+        crawler.session.get = Mock(return_value=response)
+
+        crawler._get_json(url)
+        crawler._get_json(url)
+
+        assert "headers" not in crawler.session.get.call_args.kwargs
@@ -0,0 +1,72 @@
+"""
+购物车接口单元测试
+
+测试通过 /cart/clear.js 和 /cart.js 清空并确认购物车。
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock, AsyncMock
+import pytest
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.cart_api import get_cart, reset_cart
+
+
+BASE_URL = "https://fiido.com/"
+
+
+def _response(ok=True, status=200, data=None):
+    """创建 Mock APIResponse"""
+    response = Mock(ok=ok, status=status)
+    response.json = AsyncMock(return_value=data)
+    return response
+
+
+@pytest.fixture
+def mock_context():
+    """创建 Mock BrowserContext"""
+    context = Mock()
+    context.request.get = AsyncMock(return_value=_response(data={'item_count': 0, 'items': []}))
+    context.request.post = AsyncMock(return_value=_response(data={}))
+    return context
+
+
+class TestCartApi:
+    """测试购物车接口"""
+
+    @pytest.mark.asyncio
+    async def test_get_cart(self, mock_context):
+        """测试读取购物车"""
+        cart = await get_cart(mock_context, BASE_URL)
+
+        assert cart == {'item_count': 0, 'items': []}
+        mock_context.request.get.assert_awaited_once_with("https://fiido.com/cart.js", timeout=10000)
+
+    @pytest.mark.asyncio
+    async def test_reset_cart_success(self, mock_context):
+        """测试清空后确认购物车为空"""
+        assert await reset_cart(mock_context, BASE_URL) is True
+        mock_context.request.post.assert_awaited_once_with("https://fiido.com/cart/clear.js", timeout=10000)
+
+    @pytest.mark.asyncio
+    async def test_reset_cart_not_empty(self, mock_context):
+        """测试清空后仍有商品时返回 False"""
+        mock_context.request.get.return_value = _response(data={'item_count': 2})
+        assert await reset_cart(mock_context, BASE_URL) is False
+
+    @pytest.mark.asyncio
+    async def test_reset_cart_clear_failed(self, mock_context):
+        """测试清空请求失败时返回 False，不再读取购物车"""
+        mock_context.request.post.return_value = _response(ok=False, status=500)
+
+        assert await reset_cart(mock_context, BASE_URL) is False
+        mock_context.request.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reset_cart_network_error(self, mock_context):
+        """测试网络异常时返回 False"""
+        mock_context.request.post.side_effect = Exception("connection reset")
+        assert await reset_cart(mock_context, BASE_URL) is False
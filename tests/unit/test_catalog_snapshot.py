@@ -0,0 +1,104 @@
+"""
+商品目录快照单元测试
+
+测试已校验快照的生成、复用、失效以及 strict 模式重新校验。
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import core.catalog_snapshot
+from core.catalog_snapshot import load_catalog, snapshot_path_for
+from core.models import Product, ProductVariant, Selectors
+from tests.unit.product_factory import product_entry
+
+
+def _write(path, entries):
+    path.write_text(json.dumps({"metadata": {"total_products": len(entries)}, "products": entries}))
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestCatalogSnapshot:
+    """测试商品目录快照"""
+
+    def test_snapshot_reused_and_equal_to_validated(self, tmp_path):
+        """测试第二次加载来自快照，还原的商品与校验结果一致"""
+        catalog = tmp_path / "products.json"
+        _write(catalog, [product_entry("d11"), product_entry("d3")])
+
+        first = load_catalog(catalog)
+        second = load_catalog(catalog)
+
+        assert first.from_snapshot is False
+        assert snapshot_path_for(catalog).exists()
+        assert second.from_snapshot is True
+        assert second.metadata == {"total_products": 2}
+        assert [p.model_dump() for p in second.products] == [p.model_dump() for p in first.products]
+
+        product = second.products[0]
+        assert isinstance(product, Product)
+        assert product.url.host == "fiido.com"
+        assert isinstance(product.variants[0], ProductVariant)
+        assert isinstance(product.selectors, Selectors)
+        assert product.selectors.custom_badge == ".badge"
+        assert product.discovered_at.year == 2025
+        assert product == first.products[0]
+
+    def test_invalid_entries_recorded_in_snapshot(self, tmp_path):
+        """测试校验失败的条目被跳过，快照加载时仍能报告"""
+        catalog = tmp_path / "products.json"
+        _write(catalog, [product_entry("d11"), product_entry("broken", price_min=-1)])
+
+        load_catalog(catalog)
+        loaded = load_catalog(catalog)
+
+        assert loaded.from_snapshot is True
+        assert [p.id for p in loaded.products] == ["d11"]
+        assert [product_id for product_id, _ in loaded.invalid] == ["broken"]
+
+    def test_changed_source_rebuilds_snapshot(self, tmp_path):
+        """测试源文件内容变化后重新校验，仅修改时间变化时继续使用快照"""
+        catalog = tmp_path / "products.json"
+        _write(catalog, [product_entry("d11")])
+        load_catalog(catalog)
+
+        _bump_mtime(catalog)
+        touched = load_catalog(catalog)
+        assert touched.from_snapshot is True
+
+        _write(catalog, [product_entry("d11"), product_entry("new")])
+        _bump_mtime(catalog)
+        changed = load_catalog(catalog)
+        assert changed.from_snapshot is False
+        assert [p.id for p in changed.products] == ["d11", "new"]
+        assert load_catalog(catalog).from_snapshot is True
+
+    def test_model_change_invalidates_snapshot(self, tmp_path, monkeypatch):
+        """测试 Product 模型结构变化后旧快照失效"""
+        catalog = tmp_path / "products.json"
+        _write(catalog, [product_entry("d11")])
+        load_catalog(catalog)
+
+        monkeypatch.setattr(core.catalog_snapshot, "_schema_fingerprint", lambda: "changed")
+
+        assert load_catalog(catalog).from_snapshot is False
+
+    def test_strict_mode_revalidates(self, tmp_path):
+        """测试 strict 模式忽略快照重新校验"""
+        catalog = tmp_path / "products.json"
+        _write(catalog, [product_entry("d11")])
+        load_catalog(catalog)
+
+        strict = load_catalog(catalog, strict=True)
+
+        assert strict.from_snapshot is False
+        assert strict.products[0].id == "d11"
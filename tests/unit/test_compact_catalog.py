@@ -0,0 +1,139 @@
+"""
+紧凑商品目录单元测试
+
+测试按列保存的商品能够无损还原为 Product，以及字符串驻留、过滤和按需创建模型。
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.compact_catalog import CompactCatalog, ProductRecord, compact_snapshot_path_for
+from core.models import Product
+from tests.unit.product_factory import product_entry
+
+
+class TestCompactCatalog:
+    """测试紧凑商品目录"""
+
+    def test_round_trip_matches_product(self):
+        """测试还原的 Product 与直接校验的结果一致"""
+        entries = [
+            product_entry("d11"),
+            product_entry("c11", priority="P2", variants=[], tags=[], metadata={},
+                   last_tested="2025-12-06T08:00:00", test_status="failing"),
+        ]
+        catalog = CompactCatalog.from_products(entries)
+
+        for entry, record in zip(entries, catalog):
+            assert record.to_product() == Product(**entry)
+
+    def test_timezone_offsets_are_kept(self):
+        """测试带时区的时间按原偏移还原"""
+        entry = product_entry("d11", discovered_at="2025-12-05T10:42:22.866581+08:00",
+                       last_tested="2025-12-06T08:00:00-05:00")
+        record = CompactCatalog.from_products([entry])[0]
+
+        data = record.to_dict()
+        assert data["discovered_at"] == datetime.fromisoformat(entry["discovered_at"])
+        assert data["discovered_at"].utcoffset() == timedelta(hours=8)
+        assert data["last_tested"].utcoffset() == timedelta(hours=-5)
+        assert record.to_product() == Product(**entry)
+
+    def test_load_from_validated_snapshot(self, tmp_path, monkeypatch):
+        """测试 load() 使用已校验的字段值，创建 Product 时不再校验"""
+        entries = [product_entry("d11"), product_entry("broken", price_min=-1), product_entry("d3", discovered_at="2025-12-05T10:42:22+08:00")]
+        catalog_file = tmp_path / "products.json"
+        catalog_file.write_text(json.dumps({"metadata": {"total_products": 3}, "products": entries}))
+
+        for _ in range(2):  # 第一次校验源文件并写入快照，第二次读取紧凑目录快照
+            catalog = CompactCatalog.load(catalog_file)
+            assert [r.id for r in catalog] == ["d11", "d3"]
+            assert [product_id for product_id, _ in catalog.invalid] == ["broken"]
+            assert catalog.metadata == {"total_products": 3}
+            assert compact_snapshot_path_for(catalog_file).exists()
+        assert catalog.get("d11").tags == ["D11"]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("不应重新校验")
+
+        monkeypatch.setattr(Product, "model_validate", fail)
+        product = catalog.get("d3").to_product()
+        assert product.url.host == "fiido.com"
+        assert product.selectors.custom_badge == ".badge"
+        assert product.discovered_at.utcoffset() == timedelta(hours=8)
+        monkeypatch.undo()
+        assert product == Product(**entries[2])
+
+    def test_accepts_product_objects(self):
+        """测试可以由 Product 对象创建"""
+        product = Product(**product_entry("d11"))
+        catalog = CompactCatalog.from_products([product], {"total_products": 1})
+
+        assert catalog.metadata == {"total_products": 1}
+        assert catalog[0].to_product() == product
+
+    def test_record_reads_columns(self):
+        """测试 ProductRecord 直接读取列并按需创建模型"""
+        catalog = CompactCatalog.from_products([product_entry("d11"), product_entry("d3", price_min=18.5)])
+
+        record = catalog.get("d3")
+        assert isinstance(record, ProductRecord)
+        assert (record.id, record.price_min, record.priority, record.test_status) == ("d3", 18.5, "P0", "untested")
+        assert record.url == "https://fiido.com/products/d3"
+        assert record.variant_count == 2
+        assert record._product is None
+
+        # 未直接保存为列的属性委托给完整模型
+        assert record.variants[1].price_modifier == 50.0
+        assert record.selectors.custom_badge == ".badge"
+        assert record.to_product() is record.to_product()
+
+        assert catalog.get("missing") is None
+        assert "d11" in catalog
+        assert catalog[-1].id == "d3"
+        with pytest.raises(IndexError):
+            catalog[2]
+
+    def test_repeated_strings_are_shared(self):
+        """测试重复的分类、变体选择器和选择器配置只保存一份"""
+        entries = [json.loads(json.dumps(product_entry(f"p{i}"))) for i in range(3)]
+        catalog = CompactCatalog.from_products(entries)
+
+        assert len(catalog._selector_table) == 1
+        assert catalog._categories[0] is catalog._categories[2]
+        assert catalog._variant_selectors[0] is catalog._variant_selectors[2]
+        assert catalog._tags[0] is catalog._tags[2]
+
+    def test_filter_by_columns(self):
+        """测试按分类、优先级和测试状态过滤"""
+        catalog = CompactCatalog.from_products([
+            product_entry("a", priority="P0"),
+            product_entry("b", priority="P1", category="Accessories"),
+            product_entry("c", priority="P1", test_status="failing"),
+        ])
+
+        assert [r.id for r in catalog.filter(priority="P1")] == ["b", "c"]
+        assert [r.id for r in catalog.filter(category="Accessories")] == ["b"]
+        assert [r.id for r in catalog.filter(priority="P1", test_status="failing")] == ["c"]
+
+    def test_lazy_products_mapping(self, tmp_path):
+        """测试按 ID 访问的 Product 映射只在访问时创建模型"""
+        catalog_file = tmp_path / "products.json"
+        catalog_file.write_text(json.dumps({"metadata": {}, "products": [product_entry("d11"), product_entry("d3")]}))
+        products = CompactCatalog.load(catalog_file).products()
+
+        assert len(products) == 2
+        assert list(products) == ["d11", "d3"]
+        assert products._cache == {}
+        assert products["d3"].name == "Fiido d3"
+        assert products["d3"] is products["d3"]
+        assert "d11" in products and "missing" not in products
+        with pytest.raises(KeyError):
+            products["missing"]
@@ -5,6 +5,7 @@ ProductCrawler 单元测试
 """
 
 import json
+from io import BytesIO
 from unittest.mock import Mock, patch, MagicMock
 import pytest
 import requests
@@ -13,6 +14,12 @@ from core.crawler import ProductCrawler
 from core.models import Product, ProductVariant, Selectors
 
 
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    """在临时目录中运行，缓存索引（data/cache）不写入仓库"""
+    monkeypatch.chdir(tmp_path)
+
+
 class TestProductCrawlerInit:
     """测试 ProductCrawler 初始化"""
 
@@ -266,6 +273,262 @@ class TestDiscoverProductsViaJSON:
         assert mock_get.call_count == 2
 
 
+class TestDiscoverProductsStorewide:
+    """测试全站 /products.json 商品发现"""
+
+    @staticmethod
+    def _product_json(handle, product_id):
+        return {
+            'id': product_id,
+            'title': handle.title(),
+            'handle': handle,
+            'variants': [{'id': product_id * 10, 'price': '100.00', 'available': True}],
+            'tags': [],
+            'updated_at': '2025-01-01T00:00:00Z'
+        }
+
+    def test_storewide_matches_collection_order(self):
+        """测试分类取第一个包含商品的分类，顺序与逐个分类去重一致，每个商品只解析一次"""
+        crawler = ProductCrawler(use_cache=False)
+        memberships = {
+            '/collections/bikes': ['bike-a', 'bike-b'],
+            '/collections/sale': ['bike-b', 'pads'],
+        }
+        storewide = [
+            self._product_json('pads', 3),
+            self._product_json('bike-b', 2),
+            self._product_json('bike-a', 1),
+            self._product_json('gift-card', 4),
+        ]
+
+        def get_json(url, params=None):
+            if url == 'https://fiido.com/products.json':
+                return {'products': storewide}
+            path = url.replace('https://fiido.com', '').replace('/products.json', '')
+            assert params['fields'] == 'handle'
+            return {'products': [{'handle': h} for h in memberships[path]]}
+
+        with patch.object(crawler, '_get_json', side_effect=get_json), \
+                patch.object(crawler, '_parse_product_from_json', wraps=crawler._parse_product_from_json) as parse:
+            products, membership = crawler.discover_products_storewide(list(memberships))
+
+        assert [(p.id, p.metadata['collection_path']) for p in products] == [
+            ('1', '/collections/bikes'),
+            ('2', '/collections/bikes'),
+            ('3', '/collections/sale'),
+        ]
+        assert parse.call_count == 3
+        assert membership['bike-b'] == ['/collections/bikes', '/collections/sale']
+        assert products[1].metadata['collections'] == ['/collections/bikes', '/collections/sale']
+
+    def test_membership_falls_back_to_html(self):
+        """测试分类 JSON 失败时从 HTML 链接获取 handle"""
+        crawler = ProductCrawler(use_cache=False)
+        html_product = Mock(metadata={'handle': 'bike-a'})
+
+        with patch.object(crawler, '_get_json', side_effect=requests.HTTPError("404")), \
+                patch.object(crawler, '_discover_products_via_html', return_value=[html_product]):
+            handles = crawler._discover_collection_handles('/collections/bikes')
+
+        assert handles == ['bike-a']
+
+
+class TestIncrementalCrawl:
+    """测试按 updated_at 的增量抓取"""
+
+    @staticmethod
+    def _product_json(updated_at):
+        return {
+            'id': 123,
+            'title': 'Test Bike',
+            'handle': 'test-bike',
+            'variants': [{'id': 456, 'price': '999.00', 'available': True, 'option1': 'Black'}],
+            'tags': [],
+            'updated_at': updated_at
+        }
+
+    def test_unchanged_product_reused_without_parsing(self):
+        """测试 updated_at 未变化的商品复用上次数据，不再解析变体"""
+        crawler = ProductCrawler(use_cache=False)
+        previous = crawler._parse_product_from_json(self._product_json('2025-01-01T00:00:00Z'), '/collections/bikes')
+        previous_data = previous.model_dump(mode='json')
+        previous_data['test_status'] = 'passing'
+        crawler.set_known_products({'123': previous_data})
+
+        with patch.object(crawler, '_parse_variant_from_json') as parse_variant:
+            product = crawler._parse_product_from_json(self._product_json('2025-01-01T00:00:00Z'), '/collections/sale')
+
+        parse_variant.assert_not_called()
+        assert crawler.unchanged_product_ids == {'123'}
+        assert product.test_status == 'passing'
+        assert product.category == 'Sale'
+        assert product.metadata['collection_path'] == '/collections/sale'
+        assert product.model_dump(mode='json')['variants'] == previous_data['variants']
+
+    def test_changed_product_reparsed(self):
+        """测试 updated_at 变化的商品重新解析"""
+        crawler = ProductCrawler(use_cache=False)
+        previous = crawler._parse_product_from_json(self._product_json('2025-01-01T00:00:00Z'), '/collections/bikes')
+        crawler.set_known_products({'123': previous.model_dump(mode='json')})
+
+        product = crawler._parse_product_from_json(self._product_json('2025-02-01T00:00:00Z'), '/collections/bikes')
+
+        assert crawler.unchanged_product_ids == set()
+        assert product.metadata['updated_at'] == '2025-02-01T00:00:00Z'
+
+
+class TestEnrichProducts:
+    """测试 HTML 降级商品的详情补抓"""
+
+    @staticmethod
+    def _placeholder(handle):
+        return Product(
+            id=handle,
+            name=handle.title(),
+            url=f"https://fiido.com/products/{handle}",
+            category="Bikes",
+            price_min=0.0,
+            price_max=0.0,
+            selectors=Selectors(),
+            metadata={'handle': handle, 'needs_detail_fetch': True, 'collection_path': '/collections/bikes'}
+        )
+
+    def test_enrich_fills_prices_and_variants(self):
+        """测试补抓详情后价格和变体完整，失败的商品保留占位数据"""
+        crawler = ProductCrawler(use_cache=False, detail_workers=2)
+        complete = Product(
+            id="7", name="Complete", url="https://fiido.com/products/complete",
+            category="Bikes", price_min=10.0, price_max=10.0, selectors=Selectors()
+        )
+        details = {
+            'https://fiido.com/products/bike-a.json': {'product': {
+                'id': 1,
+                'title': 'Bike A',
+                'handle': 'bike-a',
+                'variants': [
+                    {'id': 11, 'price': '899.00', 'available': True, 'option1': 'Black'},
+                    {'id': 12, 'price': '999.00', 'available': True, 'option1': 'White'}
+                ],
+                'tags': []
+            }},
+        }
+
+        def get_json(url, params=None):
+            if url not in details:
+                raise requests.HTTPError("404")
+            return details[url]
+
+        with patch.object(crawler, '_get_json', side_effect=get_json) as mock_get_json:
+            products = crawler.enrich_products([self._placeholder('bike-a'), complete, self._placeholder('gone')])
+
+        assert mock_get_json.call_count == 2
+        assert products[0].id == '1'
+        assert (products[0].price_min, products[0].price_max) == (899.0, 999.0)
+        assert len(products[0].variants) == 2
+        assert products[0].category == 'Bikes'
+        assert products[1] is complete
+        assert products[2].metadata['needs_detail_fetch'] is True
+        assert crawler.get_stats()['enrichment'] == {'enriched': 1, 'failed': 1}
+
+    @patch('core.crawler.ProductCrawler._discover_products_via_html')
+    @patch('core.crawler.ProductCrawler._discover_products_via_json')
+    def test_discover_enriches_html_fallback(self, mock_json, mock_html):
+        """测试降级到 HTML 解析时自动补抓详情，关闭后不补抓"""
+        mock_json.side_effect = Exception("JSON API failed")
+        mock_html.return_value = [self._placeholder('bike-a')]
+
+        crawler = ProductCrawler(use_cache=False)
+        with patch.object(crawler, 'enrich_products', side_effect=lambda p: p) as enrich:
+            crawler.discover_products('/collections/bikes')
+        enrich.assert_called_once()
+
+        crawler = ProductCrawler(use_cache=False, enrich_details=False)
+        with patch.object(crawler, 'enrich_products') as enrich:
+            crawler.discover_products('/collections/bikes')
+        enrich.assert_not_called()
+
+
+class TestSitemapDiscovery:
+    """测试按 sitemap lastmod 的商品发现"""
+
+    SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://fiido.com/sitemap_products_1.xml?from=1&amp;to=9</loc></sitemap>
+  <sitemap><loc>https://fiido.com/sitemap_pages_1.xml</loc></sitemap>
+</sitemapindex>"""
+
+    PRODUCTS_SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://fiido.com/</loc></url>
+  <url><loc>https://fiido.com/products/bike-a</loc><lastmod>2025-01-01T00:00:00+00:00</lastmod></url>
+  <url><loc>https://fiido.com/products/bike-b</loc><lastmod>2025-03-01T00:00:00+00:00</lastmod></url>
+  <url><loc>https://fiido.com/products/bike-new</loc><lastmod>2025-03-02T00:00:00+00:00</lastmod></url>
+</urlset>"""
+
+    @staticmethod
+    def _product_json(product_id, handle, updated_at, product_type='E-Bike'):
+        return {'product': {
+            'id': product_id,
+            'title': handle.title(),
+            'handle': handle,
+            'product_type': product_type,
+            'variants': [{'id': product_id * 10, 'price': '999.00', 'available': True, 'option1': 'Black'}],
+            'tags': [],
+            'updated_at': updated_at
+        }}
+
+    def _crawler(self, known_products):
+        crawler = ProductCrawler(use_cache=False, detail_workers=2)
+        sitemaps = {
+            'https://fiido.com/sitemap.xml': self.SITEMAP_INDEX,
+            'https://fiido.com/sitemap_products_1.xml?from=1&to=9': self.PRODUCTS_SITEMAP,
+        }
+        crawler._get = Mock(side_effect=lambda url, **kwargs: Mock(status_code=200, raw=BytesIO(sitemaps[url])))
+        crawler.set_known_products(known_products)
+        return crawler
+
+    def _known(self, product_id, handle, updated_at):
+        crawler = ProductCrawler(use_cache=False)
+        data = self._product_json(product_id, handle, updated_at)['product']
+        return crawler._parse_product_from_json(data, '/collections/bikes').model_dump(mode='json')
+
+    def test_only_new_and_modified_products_fetched(self):
+        """测试只请求新增和 lastmod 更新的商品，未变化的复用，已下架的移除"""
+        known = {
+            '1': self._known(1, 'bike-a', '2025-01-01T00:00:00Z'),
+            '2': self._known(2, 'bike-b', '2025-01-01T00:00:00Z'),
+            '3': self._known(3, 'bike-removed', '2025-01-01T00:00:00Z'),
+        }
+        crawler = self._crawler(known)
+        details = {
+            'https://fiido.com/products/bike-b.json': self._product_json(2, 'bike-b', '2025-03-01T00:00:00Z'),
+            'https://fiido.com/products/bike-new.json': self._product_json(4, 'bike-new', '2025-03-02T00:00:00Z'),
+        }
+
+        with patch.object(crawler, '_get_json', side_effect=lambda url, params=None: details[url]) as mock_get_json:
+            products = crawler.discover_products_from_sitemap(known)
+
+        assert sorted(call.args[0] for call in mock_get_json.call_args_list) == sorted(details)
+        assert [p.id for p in products] == ['1', '2', '4']
+        assert crawler.unchanged_product_ids == {'1'}
+        assert products[1].category == 'Bikes'
+        assert products[1].metadata['updated_at'] == '2025-03-01T00:00:00Z'
+        assert products[2].category == 'E-Bike'
+        assert products[2].metadata['sitemap_lastmod'] == '2025-03-02T00:00:00+00:00'
+        assert crawler.get_stats()['sitemap'] == {'urls': 3, 'fetched': 2, 'reused': 1, 'failed': 0}
+
+    def test_failed_fetch_keeps_known_product(self):
+        """测试详情请求失败时保留目录中的旧数据"""
+        known = {'2': self._known(2, 'bike-b', '2025-01-01T00:00:00Z')}
+        crawler = self._crawler(known)
+
+        with patch.object(crawler, '_get_json', side_effect=requests.HTTPError("503")):
+            products = crawler.discover_products_from_sitemap(known)
+
+        assert [p.id for p in products] == ['2']
+        assert crawler.get_stats()['sitemap']['failed'] == 3
+
+
 class TestParseProductFromJSON:
     """测试 JSON 商品解析"""
 
@@ -18,7 +18,11 @@ from scripts.discover_products import (
     load_existing_products,
     save_products,
     print_statistics,
-    discover_products_from_collections
+    discover_products_from_collections,
+    compute_delta,
+    DiscoveryJournal,
+    run_journaled_discovery,
+    _fetch_collections
 )
 
 
@@ -246,6 +250,181 @@ class TestDiscoverProductsFromCollections:
         assert len(products) == 0
         assert mock_crawler.discover_products.call_count == 2
 
+    def test_concurrent_matches_sequential(self):
+        """测试并发抓取的去重结果与顺序抓取一致（重复商品保留靠前分类的那条）"""
+        import time
+
+        def make(product_id, category):
+            return Product(
+                id=product_id,
+                name=f"Product {product_id}",
+                url=f"https://fiido.com/products/{product_id}",
+                category=category,
+                price_min=100.0,
+                price_max=100.0,
+                currency="USD",
+                variants=[],
+                selectors=Selectors()
+            )
+
+        catalog = {
+            '/collections/bikes': ['1', '2', '3'],
+            '/collections/sale': ['2', '4'],
+            '/collections/accessories': ['4', '5', '1'],
+        }
+
+        def discover(collection_path, limit=None):
+            # 第一个分类最慢，保证并发模式下它最后完成
+            if collection_path == '/collections/bikes':
+                time.sleep(0.05)
+            return [make(pid, collection_path) for pid in catalog[collection_path]]
+
+        mock_crawler = Mock()
+        mock_crawler.discover_products.side_effect = discover
+        paths = list(catalog)
+
+        sequential = discover_products_from_collections(mock_crawler, paths)
+        concurrent = discover_products_from_collections(mock_crawler, paths, workers=3)
+
+        def summary(result):
+            products, new_count, updated_count = result
+            return [(p.id, p.category) for p in products], new_count, updated_count
+
+        assert summary(concurrent) == summary(sequential)
+        assert summary(sequential)[0] == [
+            ('1', '/collections/bikes'),
+            ('2', '/collections/bikes'),
+            ('3', '/collections/bikes'),
+            ('4', '/collections/sale'),
+            ('5', '/collections/accessories'),
+        ]
+
+
+    def test_concurrent_fetch_releases_consumed_results(self):
+        """测试并发抓取时已产出的分类结果不再被持有"""
+        import gc
+        import weakref
+
+        class Batch(list):
+            pass
+
+        mock_crawler = Mock()
+        mock_crawler.discover_products.side_effect = lambda path, limit=None: Batch([path])
+        collections = list(enumerate(['/collections/a', '/collections/b', '/collections/c', '/collections/d']))
+
+        stream = _fetch_collections(mock_crawler, collections, None, workers=2)
+        refs = []
+        for _ in range(3):
+            _, _, products = next(stream)
+            refs.append(weakref.ref(products))
+            del products
+        gc.collect()
+
+        # 生成器仍在运行时，前面产出的结果已经可以回收
+        assert [ref() for ref in refs[:2]] == [None, None]
+        assert len(list(stream)) == 1
+
+
+class TestComputeDelta:
+    """测试增量计算"""
+
+    def test_compute_delta(self):
+        """测试区分新增、修改、删除和未变更商品"""
+        existing = {'1': {'id': '1'}, '2': {'id': '2'}, '9': {'id': '9'}}
+
+        delta = compute_delta(['1', '2', '3'], existing, unchanged_ids={'1'})
+
+        assert delta['added'] == ['3']
+        assert delta['changed'] == ['2']
+        assert delta['removed'] == ['9']
+        assert delta['summary'] == {'added': 1, 'changed': 1, 'removed': 1, 'unchanged': 1}
+
+
+def _catalog_product(product_id, collection_path):
+    """创建分类抓取结果中的商品"""
+    return Product(
+        id=product_id,
+        name=f"Product {product_id}",
+        url=f"https://fiido.com/products/{product_id}",
+        category=collection_path,
+        price_min=100.0,
+        price_max=100.0,
+        selectors=Selectors()
+    )
+
+
+class TestDiscoveryJournal:
+    """测试流式发现日志与断点续传"""
+
+    CATALOG = {
+        '/collections/bikes': ['1', '2'],
+        '/collections/sale': ['2', '3'],
+        '/collections/accessories': ['4', '1'],
+    }
+
+    def _crawler(self, fail_on=None):
+        crawler = Mock()
+        crawler.base_url = 'https://fiido.com'
+        crawler.unchanged_product_ids = set()
+
+        def discover(collection_path, limit=None):
+            if collection_path == fail_on:
+                raise KeyboardInterrupt()
+            return [_catalog_product(pid, collection_path) for pid in self.CATALOG[collection_path]]
+
+        crawler.discover_products.side_effect = discover
+        return crawler
+
+    def _compact(self, journal, output):
+        entries = journal.entries()
+        journal.write_catalog(output, {'total_products': len(entries)}, entries, {'3': {'test_status': 'passing'}})
+        with open(output) as f:
+            return json.load(f)
+
+    def test_journal_matches_in_memory_discovery(self, tmp_path):
+        """测试日志压缩后的商品文件与内存中发现的结果一致"""
+        paths = list(self.CATALOG)
+        journal = DiscoveryJournal(tmp_path / "products.discovery.jsonl")
+
+        run_journaled_discovery(self._crawler(), journal, paths)
+        data = self._compact(journal, tmp_path / "products.json")
+
+        expected, _, _ = discover_products_from_collections(self._crawler(), paths)
+        assert [p['id'] for p in data['products']] == [p.id for p in expected]
+        assert [p['category'] for p in data['products']] == [p.category for p in expected]
+        assert data['metadata'] == {'total_products': 4}
+        assert data['products'][2]['test_status'] == 'passing'
+
+    def test_resume_after_interruption(self, tmp_path):
+        """测试中断后从最后完成的分类继续，已完成的分类不再抓取"""
+        paths = list(self.CATALOG)
+        journal_path = tmp_path / "products.discovery.jsonl"
+
+        with pytest.raises(KeyboardInterrupt):
+            run_journaled_discovery(self._crawler(fail_on='/collections/accessories'), DiscoveryJournal(journal_path), paths)
+
+        # 模拟崩溃时写了一半的最后一行
+        with open(journal_path, 'a') as f:
+            f.write('{"type": "product", "id": "9')
+
+        crawler = self._crawler()
+        journal = DiscoveryJournal(journal_path)
+        resumed_paths = run_journaled_discovery(crawler, journal, ['/collections/other'], resume=True)
+
+        assert resumed_paths == paths
+        crawler.discover_products.assert_called_once_with('/collections/accessories', limit=None)
+        data = self._compact(journal, tmp_path / "products.json")
+        assert [p['id'] for p in data['products']] == ['1', '2', '3', '4']
+
+    def test_incomplete_collection_excluded(self, tmp_path):
+        """测试未完成分类中已写入的商品不进入压缩结果"""
+        journal = DiscoveryJournal(tmp_path / "products.discovery.jsonl")
+        journal.start(['/collections/bikes'], 'https://fiido.com')
+        journal.append_product((0, 0), _catalog_product('1', '/collections/bikes'))
+        journal.close()
+
+        assert journal.entries() == []
+
 
 class TestMainFunction:
     """测试主函数"""
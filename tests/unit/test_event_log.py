@@ -0,0 +1,152 @@
+"""
+测试事件日志单元测试
+
+测试事件的追加与读取、截断行的处理、增量读取以及由事件重建报告。
+"""
+
+import multiprocessing
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.event_log import EventLog, EventTail, RunReport, build_report, event_log_path_for, read_events
+from core.test_result_collector import TestResultCollector
+
+
+def _step(number, status='passed'):
+    return {'number': number, 'name': f'步骤{number}', 'status': status, 'duration': 1.0}
+
+
+def _emit_products(path, start, count):
+    with EventLog(path) as log:
+        for i in range(start, start + count):
+            log.emit('product_start', index=i, product_id=f'p{i}', product_name=f'P{i}')
+            log.emit('product_end', index=i, result={'product_id': f'p{i}', 'status': 'passed', 'steps': []})
+
+
+class TestEventLog:
+    """事件日志读写"""
+
+    def test_emit_and_read(self, tmp_path):
+        """测试追加事件后可完整读取，append=False 时清空已有内容"""
+        path = tmp_path / "run.events.jsonl"
+        with EventLog(path) as log:
+            log.emit('run_start', kind='batch')
+            log.emit('step_end', product_id='p1', step=_step(1))
+
+        events, offset = read_events(path)
+        assert [e['event'] for e in events] == ['run_start', 'step_end']
+        assert events[1]['step']['name'] == '步骤1'
+        assert offset == path.stat().st_size
+
+        with EventLog(path, append=False) as log:
+            log.emit('run_start', kind='product')
+        assert [e['kind'] for e in read_events(path)[0]] == ['product']
+
+    def test_torn_trailing_line_is_skipped(self, tmp_path):
+        """测试末尾未写完的行不读取，写完后从原位置继续"""
+        path = tmp_path / "run.events.jsonl"
+        with EventLog(path) as log:
+            log.emit('product_start', product_id='p1')
+        with open(path, 'ab') as f:
+            f.write(b'{"event": "product_e')
+
+        tail = EventTail(path)
+        assert [e['event'] for e in tail.poll()] == ['product_start']
+        assert tail.poll() == []
+
+        with open(path, 'ab') as f:
+            f.write(b'nd", "product_id": "p1"}\n')
+        assert [e['event'] for e in tail.poll()] == ['product_end']
+
+    def test_concurrent_writers(self, tmp_path):
+        """测试多个进程同时追加到同一日志时事件完整不交错"""
+        path = tmp_path / "run.events.jsonl"
+        processes = [multiprocessing.Process(target=_emit_products, args=(path, start, 50))
+                     for start in (0, 50, 100)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        report = build_report(path)
+        assert report['total'] == 150
+        assert report['passed'] == 150
+
+    def test_event_log_path_for(self):
+        """测试报告文件对应的事件日志路径"""
+        assert event_log_path_for('reports/batch_test_1.json') == Path('reports/batch_test_1.events.jsonl')
+
+
+class TestRunReport:
+    """由事件重建报告"""
+
+    def test_finished_run(self, tmp_path):
+        """测试正常结束的运行使用 product_end 中的结果"""
+        path = tmp_path / "run.events.jsonl"
+        with EventLog(path) as log:
+            log.emit('run_start', kind='batch', test_mode='quick', test_scope='所有商品 (2 个)',
+                     products=[{'product_id': 'p1', 'product_name': 'P1'},
+                               {'product_id': 'p2', 'product_name': 'P2'}])
+            for index, (product_id, status) in enumerate([('p2', 'failed'), ('p1', 'passed')], 1):
+                log.emit('product_start', index=index, product_id=product_id, product_name=product_id.upper())
+                log.emit('product_end', index=index,
+                         result={'product_id': product_id, 'status': status, 'steps': [_step(1, status)]})
+            log.emit('run_end')
+
+        events, _ = read_events(path)
+        report = build_report(path)
+        assert 'interrupted' not in report
+        assert report['timestamp'] == events[-1]['ts']
+        assert report['started_at'] == events[0]['ts']
+        assert report['test_mode'] == 'quick'
+        assert [r['product_id'] for r in report['results']] == ['p2', 'p1']
+        assert (report['total'], report['passed'], report['failed'], report['error']) == (2, 1, 1, 0)
+        assert report['summary']['total'] == 2
+
+    def test_interrupted_run(self, tmp_path):
+        """测试中断的运行：未结束的商品保留已完成步骤，未开始的商品记为 error"""
+        path = tmp_path / "run.events.jsonl"
+        with EventLog(path) as log:
+            log.emit('run_start', kind='batch',
+                     products=[{'product_id': p, 'product_name': p.upper()} for p in ('p1', 'p2', 'p3')])
+            log.emit('product_start', index=1, product_id='p1', product_name='P1')
+            log.emit('product_end', index=1, result={'product_id': 'p1', 'status': 'passed', 'steps': []})
+            log.emit('product_start', index=2, product_id='p2', product_name='P2')
+            log.emit('step_start', product_id='p2', number=1, name='步骤1')
+            log.emit('step_end', product_id='p2', step=_step(1))
+            log.emit('step_start', product_id='p2', number=2, name='步骤2')
+
+        run_report = RunReport()
+        run_report.extend(read_events(path)[0])
+        assert not run_report.finished
+
+        report = run_report.report()
+        assert report['interrupted'] is True
+        assert report['timestamp'] == read_events(path)[0][-1]['ts']
+        assert [(r['product_id'], r['status']) for r in report['results']] == [
+            ('p1', 'passed'), ('p2', 'error'), ('p3', 'error')
+        ]
+        assert report['results'][1]['steps'] == [_step(1)]
+        assert report['results'][2]['product_name'] == 'P3'
+        assert (report['passed'], report['error']) == (1, 2)
+
+
+class TestCollectorEventLog:
+    """测试结果收集器的事件日志"""
+
+    def test_recover_from_event_log(self, tmp_path):
+        """测试会话未结束时可由事件日志恢复用例结果"""
+        collector = TestResultCollector(str(tmp_path / "test-results.json"))
+        collector.start_session()
+        collector.add_test_result('tests/test_a.py::test_ok', 'test_ok', 'passed', 0.5)
+        collector.add_test_result('tests/test_a.py::test_bad', 'test_bad', 'failed', 1.0,
+                                  error_message='AssertionError')
+
+        recovered = TestResultCollector.from_event_log(str(collector.event_log_path))
+        assert recovered.output_path == collector.output_path
+        assert [(tc.test_name, tc.status) for tc in recovered.test_cases] == [('test_ok', 'passed'), ('test_bad', 'failed')]
+        assert recovered.test_cases[1].error_message == 'AssertionError'
+        collector.end_session()
@@ -0,0 +1,99 @@
+"""
+页面性能采集单元测试
+
+测试步骤边界的性能指标采集与结果提取。
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock, AsyncMock
+import pytest
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.page_performance import PagePerformanceCollector, product_page_metrics, slowest_resources
+
+
+def _metrics(time_origin, resource_index, **extra):
+    """构造浏览器端返回的指标"""
+    return {
+        "url": "https://fiido.com/products/x",
+        "new_navigation": True,
+        "time_origin": time_origin,
+        "resource_index": resource_index,
+        "ttfb": 200,
+        **extra
+    }
+
+
+@pytest.fixture
+def mock_page():
+    """创建 Mock Page 对象"""
+    page = Mock()
+    page.is_closed = Mock(return_value=False)
+    page.evaluate = AsyncMock()
+    page.add_init_script = AsyncMock()
+    return page
+
+
+class TestPagePerformanceCollector:
+    """测试 PagePerformanceCollector"""
+
+    @pytest.mark.asyncio
+    async def test_collect_tracks_document_and_resource_offset(self, mock_page):
+        """测试采集后记住文档和资源位置，下次只统计新增资源"""
+        collector = PagePerformanceCollector()
+        mock_page.evaluate.return_value = _metrics(1000.5, 12)
+
+        first = await collector.collect(mock_page)
+        await collector.collect(mock_page)
+
+        assert first["ttfb"] == 200
+        assert "time_origin" not in first and "resource_index" not in first
+        assert mock_page.evaluate.call_args_list[0].args[1] == [None, 0, 5]
+        assert mock_page.evaluate.call_args_list[1].args[1] == [1000.5, 12, 5]
+
+    @pytest.mark.asyncio
+    async def test_collect_closed_page_returns_none(self, mock_page):
+        """测试页面已关闭时返回 None"""
+        mock_page.is_closed.return_value = True
+        assert await PagePerformanceCollector().collect(mock_page) is None
+        mock_page.evaluate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_collect_error_returns_none(self, mock_page):
+        """测试采集脚本异常时返回 None"""
+        mock_page.evaluate.side_effect = Exception("Execution context was destroyed")
+        assert await PagePerformanceCollector().collect(mock_page) is None
+
+    @pytest.mark.asyncio
+    async def test_attach_registers_lcp_observer(self, mock_page):
+        """测试注册 LCP 观察脚本"""
+        await PagePerformanceCollector().attach(mock_page)
+        assert "largest-contentful-paint" in mock_page.add_init_script.call_args.kwargs["script"]
+
+
+class TestResultHelpers:
+    """测试结果提取函数"""
+
+    def test_product_page_metrics_uses_first_navigation(self):
+        """测试取第一个发生新导航的步骤的指标"""
+        result = {"steps": [
+            {"number": 1, "performance": {"new_navigation": True, "lcp": 1800}},
+            {"number": 2, "performance": {"new_navigation": False, "lcp": 1800}},
+            {"number": 5, "performance": {"new_navigation": True, "lcp": 900}},
+        ]}
+        assert product_page_metrics(result)["lcp"] == 1800
+        assert product_page_metrics({"steps": [{"number": 1}]}) is None
+
+    def test_slowest_resources_across_products(self):
+        """测试汇总多个商品的最慢资源"""
+        results = [
+            {"product_id": "a", "steps": [{"performance": {"slowest_resources": [
+                {"url": "a.js", "duration": 300}]}}]},
+            {"product_id": "b", "steps": [{"performance": {"slowest_resources": [
+                {"url": "b.js", "duration": 900}, {"url": "c.css", "duration": 100}]}}]},
+        ]
+        slowest = slowest_resources(results, limit=2)
+        assert [(r["url"], r["product_id"]) for r in slowest] == [("b.js", "b"), ("a.js", "a")]
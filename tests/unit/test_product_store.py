@@ -0,0 +1,88 @@
+"""
+ProductStore 单元测试
+
+测试商品索引的导入导出、按 ID 查找、按条件过滤以及 JSON 文件变化后的自动重新导入。
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.product_store import ProductStore
+from tests.unit.product_factory import product_entry
+
+
+def _write_catalog(path, products, metadata=None):
+    path.write_text(json.dumps({"metadata": metadata or {"total_products": len(products)}, "products": products}))
+
+
+class TestProductStore:
+    """测试商品索引"""
+
+    def test_lookup_and_filters(self, tmp_path):
+        """测试按 ID 查找，按分类/优先级/测试状态过滤并保持目录顺序"""
+        catalog = tmp_path / "products.json"
+        _write_catalog(catalog, [
+            product_entry("a", priority="P0"),
+            product_entry("b", category="Accessories", priority="P2"),
+            product_entry("c", priority="P0", test_status="failed"),
+        ])
+
+        with ProductStore.for_catalog(catalog) as store:
+            assert store.get("b")["category"] == "Accessories"
+            assert store.get("missing") is None
+            assert [p["id"] for p in store.find(priority="P0")] == ["a", "c"]
+            assert [p["id"] for p in store.find(category="Electric Bikes", test_status="failed")] == ["c"]
+            assert [p["id"] for p in store.find(limit=2)] == ["a", "b"]
+            assert store.count(priority="P0") == 2
+            assert store.get_many(["c", "missing", "a"]) == {"c": product_entry("c", priority="P0", test_status="failed"),
+                                                             "a": product_entry("a", priority="P0")}
+            assert store.metadata() == {"total_products": 3}
+
+        assert (tmp_path / "products.db").exists()
+
+    def test_reimports_when_json_changes(self, tmp_path):
+        """测试 JSON 文件未变化时不重新导入，被重写后自动重新导入"""
+        catalog = tmp_path / "products.json"
+        _write_catalog(catalog, [product_entry("a")])
+        ProductStore.for_catalog(catalog).close()
+
+        store = ProductStore(tmp_path / "products.db")
+        assert store.sync(catalog) is False
+        store.close()
+
+        _write_catalog(catalog, [product_entry("a"), product_entry("new")])
+        stat = catalog.stat()
+        os.utime(catalog, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        with ProductStore.for_catalog(catalog) as store:
+            assert store.get("new") is not None
+            assert store.count() == 2
+
+    def test_legacy_list_format(self, tmp_path):
+        """测试兼容旧的商品数组格式"""
+        catalog = tmp_path / "products.json"
+        catalog.write_text(json.dumps([product_entry("a"), product_entry("b")]))
+
+        with ProductStore.for_catalog(catalog) as store:
+            assert [p["id"] for p in store.find()] == ["a", "b"]
+            assert store.metadata() == {}
+
+    def test_upsert_and_export_roundtrip(self, tmp_path):
+        """测试更新后导出 JSON，导出的文件不会触发重新导入"""
+        catalog = tmp_path / "products.json"
+        _write_catalog(catalog, [product_entry("a"), product_entry("b")])
+
+        with ProductStore.for_catalog(catalog) as store:
+            store.upsert([product_entry("a", test_status="passed"), product_entry("c")])
+            store.export_json(catalog)
+            assert store.sync(catalog) is False
+
+        data = json.loads(catalog.read_text())
+        assert [p["id"] for p in data["products"]] == ["a", "b", "c"]
+        assert data["products"][0]["test_status"] == "passed"
+        assert data["metadata"] == {"total_products": 2}
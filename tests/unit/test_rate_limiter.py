@@ -0,0 +1,164 @@
+"""
+HostRateLimiter 单元测试
+
+测试按域名限速的令牌分配与自适应速率调整。
+"""
+
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.crawler import ProductCrawler
+from core.rate_limiter import HostRateLimiter, parse_retry_after
+
+
+class TestHostRateLimiter:
+    """测试按域名限速"""
+
+    @patch('core.rate_limiter.time.sleep')
+    @patch('core.rate_limiter.time.monotonic', return_value=100.0)
+    def test_same_host_requests_are_spaced(self, mock_monotonic, mock_sleep):
+        """测试同一域名的连续请求按最小间隔排队"""
+        limiter = HostRateLimiter(requests_per_second=4)
+
+        delays = [limiter.acquire("https://fiido.com/collections/bikes/products.json") for _ in range(3)]
+
+        assert delays == [0.0, 0.25, 0.5]
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.25, 0.5]
+        assert limiter.get_stats()['total_wait_time'] == 0.75
+
+    @patch('core.rate_limiter.time.sleep')
+    @patch('core.rate_limiter.time.monotonic', return_value=100.0)
+    def test_hosts_are_independent(self, mock_monotonic, mock_sleep):
+        """测试不同域名互不影响"""
+        limiter = HostRateLimiter(requests_per_second=1)
+
+        assert limiter.acquire("https://fiido.com/a") == 0.0
+        assert limiter.acquire("https://cdn.shopify.com/b") == 0.0
+        assert len(limiter.get_stats()['hosts']) == 2
+        mock_sleep.assert_not_called()
+
+    @patch('core.rate_limiter.time.sleep')
+    def test_zero_rate_disables_limit(self, mock_sleep):
+        """测试速率 <= 0 时不限速"""
+        limiter = HostRateLimiter(requests_per_second=0)
+
+        for _ in range(5):
+            assert limiter.acquire("https://fiido.com/a") == 0.0
+        mock_sleep.assert_not_called()
+
+
+class TestAdaptiveRate:
+    """测试自适应速率调整"""
+
+    URL = "https://fiido.com/products.json"
+
+    def test_fast_responses_raise_rate(self):
+        """测试快速响应线性提高速率，不超过上限"""
+        limiter = HostRateLimiter(requests_per_second=4, max_rate=4.5)
+
+        limiter.record_response(self.URL, 200, 0.2)
+        assert limiter.get_rate(self.URL) == 4.25
+        for _ in range(5):
+            limiter.record_response(self.URL, 200, 0.2)
+        assert limiter.get_rate(self.URL) == 4.5
+
+    def test_slow_responses_keep_rate(self):
+        """测试慢响应和错误响应不提速"""
+        limiter = HostRateLimiter(requests_per_second=4)
+
+        limiter.record_response(self.URL, 200, 3.0)
+        limiter.record_response(self.URL, 404, 0.1)
+
+        assert limiter.get_rate(self.URL) == 4
+
+    @patch('core.rate_limiter.time.sleep')
+    @patch('core.rate_limiter.time.monotonic', return_value=100.0)
+    def test_throttle_halves_rate_and_honors_retry_after(self, mock_monotonic, mock_sleep):
+        """测试 429 时速率减半，并在 Retry-After 期间暂停该域名"""
+        limiter = HostRateLimiter(requests_per_second=4)
+
+        limiter.record_response(self.URL, 429, 0.1, retry_after="7")
+
+        assert limiter.get_rate(self.URL) == 2
+        # 暂停 7 秒后再按新速率（2/s）的间隔发出
+        assert limiter.acquire(self.URL) == 7.5
+        stats = limiter.get_stats()
+        assert stats['throttled_responses'] == 1
+        assert stats['hosts']['fiido.com']['current_rate'] == 2
+
+    @patch('core.rate_limiter.time.sleep')
+    @patch('core.rate_limiter.time.monotonic', return_value=100.0)
+    def test_requests_queued_during_pause_are_spaced(self, mock_monotonic, mock_sleep):
+        """测试暂停期间多个线程排队的请求在暂停结束后依次错开，而不是同时唤醒"""
+        limiter = HostRateLimiter(requests_per_second=4)
+        limiter.record_response(self.URL, 429, 0.1, retry_after="5")
+
+        delays = []
+        delays_lock = threading.Lock()
+
+        def worker():
+            delay = limiter.acquire(self.URL)
+            with delays_lock:
+                delays.append(delay)
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        delays.sort()
+        assert len(set(delays)) == 6
+        assert all(delay > 5.0 for delay in delays)
+        assert [round(b - a, 6) for a, b in zip(delays, delays[1:])] == [0.5] * 5
+
+    def test_throttle_rate_has_floor(self):
+        """测试连续限流时速率不低于下限"""
+        limiter = HostRateLimiter(requests_per_second=1, min_rate=0.5)
+
+        for _ in range(5):
+            limiter.record_response(self.URL, 503, 0.1, retry_after="0")
+
+        assert limiter.get_rate(self.URL) == 0.5
+
+    def test_parse_retry_after(self):
+        """测试解析秒数和 HTTP 日期格式的 Retry-After"""
+        assert parse_retry_after("30") == 30.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+class TestCrawlerThrottleRetry:
+    """测试爬虫遇到限流时的重试"""
+
+    @patch('core.rate_limiter.time.sleep')
+    def test_crawler_retries_after_429(self, mock_sleep):
+        """测试 429 响应后按 Retry-After 等待并重试，统计写入抓取统计"""
+        throttled = Mock(status_code=429, headers={'Retry-After': '2'})
+        ok = Mock(status_code=200, headers={})
+        crawler = ProductCrawler(use_cache=False)
+        crawler.session.get = Mock(side_effect=[throttled, ok])
+
+        response = crawler._get("https://fiido.com/collections/bikes/products.json")
+
+        assert response is ok
+        assert crawler.session.get.call_count == 2
+        assert any(c.args[0] >= 1.9 for c in mock_sleep.call_args_list)
+        assert crawler.get_stats()['rate_limit']['throttled_responses'] == 1
+
+    def test_crawler_gives_up_after_max_retries(self):
+        """测试限流重试次数用尽后返回最后的限流响应"""
+        throttled = Mock(status_code=503, headers={'Retry-After': '0'})
+        crawler = ProductCrawler(use_cache=False, max_retries=1)
+        crawler.session.get = Mock(return_value=throttled)
+
+        response = crawler._get("https://fiido.com/collections/bikes/products.json")
+
+        assert response is throttled
+        assert crawler.session.get.call_count == 2
@@ -0,0 +1,99 @@
+"""
+ResourceBlocker 单元测试
+
+测试按测试模式拦截网络资源以及统计信息。
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock, AsyncMock
+import pytest
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.resource_blocker import ResourceBlocker, ESTIMATED_RESOURCE_BYTES
+
+
+def _route(resource_type, url):
+    """创建 Mock Route 对象"""
+    route = AsyncMock()
+    route.request = Mock(resource_type=resource_type, url=url)
+    return route
+
+
+class TestShouldBlock:
+    """测试拦截规则"""
+
+    def test_quick_mode_blocks_images(self):
+        """测试快速模式拦截图片、视频和字体"""
+        blocker = ResourceBlocker("quick")
+        assert blocker.should_block("image", "https://fiido.com/cdn/shop/files/hero.jpg")
+        assert blocker.should_block("media", "https://fiido.com/video.mp4")
+        assert blocker.should_block("font", "https://fiido.com/font.woff2")
+
+    def test_full_mode_keeps_images(self):
+        """测试全面模式保留图片（图片验证步骤需要）"""
+        blocker = ResourceBlocker("full")
+        assert not blocker.should_block("image", "https://fiido.com/cdn/shop/files/hero.jpg")
+        assert blocker.should_block("media", "https://fiido.com/video.mp4")
+
+    def test_blocks_third_party_hosts_including_subdomains(self):
+        """测试拦截第三方统计域名（含子域名），不误伤相似域名"""
+        blocker = ResourceBlocker("full")
+        assert blocker.should_block("script", "https://www.googletagmanager.com/gtm.js")
+        assert blocker.should_block("xhr", "https://region1.google-analytics.com/g/collect")
+        assert not blocker.should_block("script", "https://notgoogletagmanager.com/app.js")
+        assert not blocker.should_block("script", "https://fiido.com/cdn/shop/t/1/assets/theme.js")
+
+    def test_never_blocks_document(self):
+        """测试主文档请求永不拦截"""
+        blocker = ResourceBlocker("quick")
+        assert not blocker.should_block("document", "https://www.facebook.com/tr")
+
+    def test_disabled_blocks_nothing(self):
+        """测试关闭拦截时全部放行"""
+        blocker = ResourceBlocker("quick", enabled=False)
+        assert not blocker.should_block("image", "https://fiido.com/hero.jpg")
+
+
+class TestRouting:
+    """测试路由处理与统计"""
+
+    @pytest.mark.asyncio
+    async def test_handle_route_aborts_and_records(self):
+        """测试命中规则的请求被中止并计入统计"""
+        blocker = ResourceBlocker("quick")
+        blocked = _route("image", "https://fiido.com/hero.jpg")
+        allowed = _route("script", "https://fiido.com/theme.js")
+
+        await blocker._handle_route(blocked)
+        await blocker._handle_route(allowed)
+
+        blocked.abort.assert_awaited_once()
+        allowed.fallback.assert_awaited_once()
+        stats = blocker.get_stats()
+        assert stats["blocked_requests"] == 1
+        assert stats["blocked_by_type"] == {"image": 1}
+        assert stats["estimated_bytes_saved"] == ESTIMATED_RESOURCE_BYTES["image"]
+
+    @pytest.mark.asyncio
+    async def test_attach_skips_route_when_disabled(self):
+        """测试关闭拦截时不注册路由，但仍统计下载字节"""
+        page = Mock()
+        page.route = AsyncMock()
+        blocker = ResourceBlocker("quick", enabled=False)
+
+        await blocker.attach(page)
+
+        page.route.assert_not_called()
+        page.on.assert_called_once_with("response", blocker._on_response)
+
+    def test_bytes_loaded_from_content_length(self):
+        """测试按 content-length 累计下载字节，缺失或非法时忽略"""
+        blocker = ResourceBlocker("quick")
+        blocker._on_response(Mock(headers={"content-length": "1024"}))
+        blocker._on_response(Mock(headers={}))
+        blocker._on_response(Mock(headers={"content-length": "abc"}))
+
+        assert blocker.get_stats()["bytes_loaded"] == 1024
@@ -0,0 +1,138 @@
+"""
+测试结果数据库单元测试
+
+测试报告的写入、已有报告文件的增量导入以及各类查询。
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.results_db import ResultsDB
+
+
+def _batch_report(timestamp, durations, test_mode='quick'):
+    return {
+        'timestamp': timestamp,
+        'test_mode': test_mode,
+        'test_scope': '所有商品',
+        'test_config': {'mode': test_mode},
+        'summary': {'total': len(durations), 'passed': len(durations), 'failed': 0},
+        'results': [
+            {
+                'product_id': product_id,
+                'product_name': product_id.upper(),
+                'status': 'passed',
+                'duration': duration,
+                'steps': [{'number': 1, 'name': '页面访问', 'status': 'passed', 'duration': duration}],
+            }
+            for product_id, duration in durations.items()
+        ],
+    }
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+
+class TestResultsDB:
+    """测试结果数据库"""
+
+    def test_record_and_query_run(self, tmp_path):
+        """测试写入运行后可按 ID、列表和商品查询"""
+        with ResultsDB(tmp_path / "results.db") as db:
+            report = _batch_report('2025-12-05T09:10:54', {'p1': 12.5, 'p2': 20.0})
+            db.record_run('batch_test_20251205_091054', report, 'batch')
+
+            assert db.get_run('batch_test_20251205_091054') == report
+            assert db.get_run('missing') is None
+
+            runs = db.list_runs()
+            assert [r['id'] for r in runs] == ['batch_test_20251205_091054']
+            assert runs[0]['summary'] == report['summary']
+            assert runs[0]['test_config'] == {'mode': 'quick'}
+
+            history = db.product_history('p1')
+            assert [(h['run_id'], h['status'], h['duration']) for h in history] == [
+                ('batch_test_20251205_091054', 'passed', 12.5)
+            ]
+
+            # 重新写入同一运行时替换商品和步骤
+            db.record_run('batch_test_20251205_091054', _batch_report('2025-12-05T09:10:54', {'p1': 30.0}), 'batch')
+            assert db.average_durations('quick') == {'p1': 30.0}
+            assert db._conn.execute("SELECT COUNT(*) FROM run_steps").fetchone()[0] == 1
+
+    def test_import_reports_incrementally(self, tmp_path):
+        """测试导入各类报告文件，跳过未变化的文件并移除已删除的文件"""
+        reports_dir = tmp_path / "reports"
+        _write(reports_dir / "batch_test_20251204_100000.json", _batch_report('2025-12-04T10:00:00', {'p1': 10}))
+        _write(reports_dir / "test_20251205_120000" / "test_results.json",
+               {'timestamp': '2025-12-05T12:00:00', 'summary': {'total': 1}, 'tests': []})
+        _write(reports_dir / "test_20251206_120000.json",
+               {'timestamp': '2025-12-06T12:00:00', 'products': [], 'summary': {'total': 0}})
+        _write(reports_dir / "batch_test_20251204_100000_ai_analysis.json",
+               {'analysis': 'x' * 200, 'provider': 'deepseek', 'created_at': '2025-12-07T00:00:00'})
+        (reports_dir / "batch_test_broken.json").write_text("{", encoding='utf-8')
+
+        with ResultsDB.for_reports(reports_dir) as db:
+            assert [(r['id'], r['kind']) for r in db.list_runs()] == [
+                ('test_20251206_120000', 'web'),
+                ('test_20251205_120000', 'suite'),
+                ('batch_test_20251204_100000', 'batch'),
+            ]
+            ai = db.list_ai_analyses()
+            assert [(a['report_id'], a['provider'], len(a['summary'])) for a in ai] == [
+                ('batch_test_20251204_100000', 'deepseek', 103)
+            ]
+
+            assert db.import_reports(reports_dir) == {'imported': 0, 'unchanged': 3, 'removed': 0, 'invalid': 1}
+
+            changed = reports_dir / "batch_test_20251204_100000.json"
+            _write(changed, _batch_report('2025-12-04T10:00:00', {'p1': 50}))
+            stat = changed.stat()
+            os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            (reports_dir / "test_20251206_120000.json").unlink()
+
+            stats = db.import_reports(reports_dir)
+            assert (stats['imported'], stats['removed']) == (1, 1)
+            assert db.average_durations('quick') == {'p1': 50.0}
+            assert db.get_run('test_20251206_120000') is None
+
+    def test_suite_pattern(self, tmp_path):
+        """测试默认只导入 test_* 目录中的 test_results.json，趋势分析可指定任意层级"""
+        reports_dir = tmp_path / "reports"
+        suite = {'timestamp': '2025-12-05T12:00:00', 'summary': {'total': 1}, 'tests': []}
+        _write(reports_dir / "test_20251205_120000" / "test_results.json", suite)
+        _write(reports_dir / "test_20251205_120000" / "screenshots" / "test_results.json", suite)
+        _write(reports_dir / "report_1" / "test_results.json", suite)
+
+        with ResultsDB(tmp_path / "results.db") as db:
+            db.import_reports(reports_dir)
+            assert [r['id'] for r in db.list_runs()] == ['test_20251205_120000']
+
+            db.import_reports(reports_dir, suite_pattern='**/test_results.json')
+            assert sorted(r['id'] for r in db.list_runs()) == [
+                'report_1', 'test_20251205_120000', 'test_20251205_120000/screenshots'
+            ]
+
+    def test_filters_and_latest(self, tmp_path):
+        """测试按类型和时间过滤，以及最新报告按文件修改时间判断"""
+        with ResultsDB(tmp_path / "results.db") as db:
+            db.record_run('batch_test_a', _batch_report('2025-12-01T00:00:00', {'p1': 10}), 'batch')
+            db.record_run('batch_test_b', _batch_report('2025-12-10T00:00:00', {'p1': 20}, 'full'), 'batch')
+            db.record_run('report_1', {'timestamp': '2025-12-05T00:00:00', 'tests': []}, 'suite')
+
+            assert [r['timestamp'] for r in db.load_runs(kinds=['batch'], since='2025-12-05')] == ['2025-12-10T00:00:00']
+            assert [r['id'] for r in db.list_runs(limit=1)] == ['batch_test_b']
+            assert db.average_durations('full') == {'p1': 20.0}
+            assert db.latest_run_id() == 'batch_test_b'
+
+            assert db.delete_run('batch_test_b') is True
+            assert db.delete_run('batch_test_b') is False
+            assert db.latest_run_id() == 'batch_test_a'
+            assert db.product_history('p1')[0]['run_id'] == 'batch_test_a'
@@ -0,0 +1,204 @@
+"""
+run_product_test 单元测试
+
+测试 ProductTester 的 HAR 录制/回放配置与步骤级重试。
+"""
+
+import sys
+from pathlib import Path
+import pytest
+
+# 添加项目根目录和 scripts 目录到 Python 路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from core.models import Product
+import run_product_test
+from run_product_test import ProductTester, TestStep, har_path_for
+
+
+@pytest.fixture
+def product():
+    """创建测试商品"""
+    return Product(
+        id="6129961074884#variant",
+        name="Fiido Electric Bike Brake Pads",
+        url="https://fiido.com/products/fiido-bike-brake-pads",
+        category="Accessories",
+        price_min=18.0,
+        price_max=18.0,
+        selectors={
+            "product_title": "h1.product__title",
+            "product_price": ".price",
+            "add_to_cart_button": "button[name='add']"
+        }
+    )
+
+
+class TestHarMode:
+    """测试 HAR 模式配置"""
+
+    def test_har_path_is_sanitized(self, tmp_path):
+        """测试 HAR 文件名中的特殊字符被替换"""
+        assert har_path_for("123#blue/large", tmp_path) == tmp_path / "123_blue_large.har.zip"
+
+    def test_default_har_path(self, product):
+        """测试默认 HAR 路径按商品ID生成"""
+        tester = ProductTester(product, har_mode="record")
+        assert tester.har_path == har_path_for(product.id)
+
+    def test_unknown_har_mode_rejected(self, product):
+        """测试未知 HAR 模式抛出异常"""
+        with pytest.raises(ValueError):
+            ProductTester(product, har_mode="stream")
+
+    @pytest.mark.asyncio
+    async def test_replay_without_har_fails_fast(self, product, tmp_path):
+        """测试回放时 HAR 文件不存在直接判定失败，不启动浏览器"""
+        tester = ProductTester(product, har_mode="replay", har_path=tmp_path / "missing.har.zip")
+
+        result = await tester.run()
+
+        assert result["status"] == "failed"
+        assert "HAR 文件不存在" in result["errors"][0]
+        assert tester.browser is None
+
+
+class TestStepRetry:
+    """测试步骤级重试"""
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        """去掉重试退避等待"""
+        monkeypatch.setattr(run_product_test, "STEP_RETRY_BACKOFF", 0)
+
+    @staticmethod
+    def _step():
+        step = TestStep(1, "页面访问", "访问商品页面")
+        step.start()
+        return step
+
+    @pytest.mark.asyncio
+    async def test_timeout_failure_is_retried(self, product):
+        """测试超时失败被重试，成功后记录重试历史"""
+        tester = ProductTester(product)
+        step = self._step()
+        attempts = []
+
+        async def flaky(step):
+            attempts.append(1)
+            if len(attempts) == 1:
+                step.complete("failed", "页面访问失败", "Timeout 30000ms exceeded")
+            else:
+                step.complete("passed", "成功访问页面")
+
+        await tester._run_step_with_retry(step, flaky)
+
+        assert len(attempts) == 2
+        result = step.to_dict()
+        assert result["status"] == "passed"
+        assert result["retries"][0]["failure_type"] == "test_timeout"
+        assert result["retries"][0]["error"] == "Timeout 30000ms exceeded"
+
+    @pytest.mark.asyncio
+    async def test_retried_step_duration_covers_last_attempt(self, product, monkeypatch):
+        """测试重试步骤的耗时只统计最后一次尝试，失败尝试的耗时记入重试记录，退避不计入"""
+        clock = [100.0]
+        monkeypatch.setattr(run_product_test.time, "time", lambda: clock[0])
+        monkeypatch.setattr(run_product_test, "STEP_RETRY_BACKOFF", 1.0)
+
+        async def fake_sleep(seconds):
+            clock[0] += seconds
+        monkeypatch.setattr(run_product_test.asyncio, "sleep", fake_sleep)
+
+        tester = ProductTester(product)
+        step = self._step()
+        attempts = []
+
+        async def flaky(step):
+            attempts.append(1)
+            if len(attempts) == 1:
+                await step.wait(fake_sleep(3.0))
+                clock[0] += 27.0
+                step.complete("failed", "页面访问失败", "Timeout 30000ms exceeded")
+            else:
+                await step.wait(fake_sleep(0.5))
+                clock[0] += 1.5
+                step.complete("passed", "成功访问页面")
+
+        await tester._run_step_with_retry(step, flaky)
+
+        result = step.to_dict()
+        assert (result["duration"], result["wait_duration"], result["work_duration"]) == (2.0, 0.5, 1.5)
+        assert (result["retries"][0]["duration"], result["retries"][0]["wait_duration"]) == (30.0, 3.0)
+        assert result["retries"][0]["backoff"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_logic_failure_not_retried(self, product):
+        """测试非超时/网络类失败不重试"""
+        tester = ProductTester(product)
+        step = self._step()
+        attempts = []
+
+        async def missing_price(step):
+            attempts.append(1)
+            step.complete("failed", "未找到价格信息")
+
+        await tester._run_step_with_retry(step, missing_price)
+
+        assert len(attempts) == 1
+        assert "retries" not in step.to_dict()
+
+    @pytest.mark.asyncio
+    async def test_non_idempotent_step_not_retried(self, product):
+        """测试加购步骤超时不重试，避免重复加入购物车"""
+        tester = ProductTester(product)
+        tester._init_quick_test_steps()
+        step = tester.steps[2]
+        step.start()
+        attempts = []
+
+        async def add_to_cart_timeout(step):
+            attempts.append(1)
+            step.complete("failed", "添加购物车失败", "Timeout 30000ms exceeded")
+
+        await tester._run_step_with_retry(step, add_to_cart_timeout)
+
+        assert step.name == "添加购物车"
+        assert len(attempts) == 1
+        assert "retries" not in step.to_dict()
+
+    @pytest.mark.asyncio
+    async def test_failure_with_js_errors_not_retried(self, product):
+        """测试执行期间出现 JavaScript 错误的失败不重试"""
+        tester = ProductTester(product)
+        step = self._step()
+        attempts = []
+
+        async def js_broken(step):
+            attempts.append(1)
+            tester.js_errors.append("TypeError: cart is undefined")
+            step.complete("failed", "添加购物车失败", "Timeout 5000ms exceeded")
+
+        await tester._run_step_with_retry(step, js_broken)
+
+        assert len(attempts) == 1
+
+    @pytest.mark.asyncio
+    async def test_exception_reraised_after_retries_exhausted(self, product):
+        """测试重试次数用尽后抛出最后一次的异常"""
+        tester = ProductTester(product, max_step_retries=2)
+        step = self._step()
+        attempts = []
+
+        async def always_down(step):
+            attempts.append(1)
+            step.complete("failed", "页面访问失败", "net::ERR_CONNECTION_RESET")
+            raise RuntimeError("net::ERR_CONNECTION_RESET")
+
+        with pytest.raises(RuntimeError):
+            await tester._run_step_with_retry(step, always_down)
+
+        assert len(attempts) == 3
+        assert [r["failure_type"] for r in step.retries] == ["network_error", "network_error"]
@@ -0,0 +1,140 @@
+"""
+SmartWaiter 单元测试
+
+测试事件驱动的等待策略（第一个满足即返回、超时不抛异常）。
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import Mock, AsyncMock, MagicMock
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.smart_wait import SmartWaiter
+
+
+@pytest.fixture
+def mock_page():
+    """创建 Mock Page 对象"""
+    page = AsyncMock()
+    page.locator = Mock()
+    return page
+
+
+class TestWaitForAnyElement:
+    """测试 wait_for_any_element"""
+
+    @pytest.mark.asyncio
+    async def test_returns_first_match_without_waiting_for_others(self, mock_page):
+        """测试第一个选择器出现后立即返回，不等待其他选择器超时"""
+        waiter = SmartWaiter(mock_page, default_timeout=5000)
+
+        async def fake_wait_for_element(selector, timeout=None, state='visible'):
+            if selector == '.slow':
+                await asyncio.sleep(5)
+            return f"locator:{selector}"
+
+        waiter.wait_for_element = fake_wait_for_element
+
+        result = await asyncio.wait_for(
+            waiter.wait_for_any_element(['.slow', '.fast']),
+            timeout=1
+        )
+        assert result == ("locator:.fast", '.fast')
+
+    @pytest.mark.asyncio
+    async def test_raises_when_all_fail(self, mock_page):
+        """测试所有选择器都超时时抛出异常"""
+        waiter = SmartWaiter(mock_page, default_timeout=100)
+        waiter.wait_for_element = AsyncMock(side_effect=PlaywrightTimeoutError("timeout"))
+
+        with pytest.raises(PlaywrightTimeoutError):
+            await waiter.wait_for_any_element(['.a', '.b'])
+
+
+class TestWaitForFirstVisible:
+    """测试 wait_for_first_visible"""
+
+    @pytest.mark.asyncio
+    async def test_combines_selectors_with_visible_filter(self, mock_page):
+        """测试合并选择器并追加 :visible 过滤（去重）"""
+        locator = MagicMock()
+        locator.first.wait_for = AsyncMock()
+        mock_page.locator.return_value = locator
+        waiter = SmartWaiter(mock_page)
+
+        result = await waiter.wait_for_first_visible(['h1, .title', '.title'], timeout=1000)
+
+        mock_page.locator.assert_called_once_with('h1:visible, .title:visible')
+        locator.first.wait_for.assert_awaited_once_with(state="visible", timeout=1000)
+        assert result is locator.first
+
+    @pytest.mark.asyncio
+    async def test_returns_none_on_timeout(self, mock_page):
+        """测试超时返回 None 而不是抛出异常"""
+        locator = MagicMock()
+        locator.first.wait_for = AsyncMock(side_effect=PlaywrightTimeoutError("timeout"))
+        mock_page.locator.return_value = locator
+        waiter = SmartWaiter(mock_page)
+
+        assert await waiter.wait_for_first_visible(['.missing'], timeout=100) is None
+
+
+class TestClickAndWaitForResponse:
+    """测试 click_and_wait_for_response"""
+
+    @staticmethod
+    def _expect_response(value_coro_factory):
+        """构造 page.expect_response 返回的异步上下文管理器"""
+        info = MagicMock()
+        type(info).value = property(lambda self: value_coro_factory())
+        manager = MagicMock()
+        manager.__aenter__ = AsyncMock(return_value=info)
+        manager.__aexit__ = AsyncMock(return_value=False)
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_returns_matching_response(self, mock_page):
+        """测试点击后返回匹配的响应"""
+        response = Mock(status=200, url="https://shop/cart/add.js")
+
+        async def value():
+            return response
+
+        mock_page.expect_response = Mock(return_value=self._expect_response(value))
+        element = AsyncMock()
+        waiter = SmartWaiter(mock_page)
+
+        result = await waiter.click_and_wait_for_response(element, "/cart/add", timeout=1000)
+
+        element.click.assert_awaited_once_with(timeout=1000)
+        assert result is response
+
+    @pytest.mark.asyncio
+    async def test_returns_none_when_no_response(self, mock_page):
+        """测试点击成功但未等到响应时返回 None"""
+        async def value():
+            raise PlaywrightTimeoutError("no response")
+
+        mock_page.expect_response = Mock(return_value=self._expect_response(value))
+        waiter = SmartWaiter(mock_page)
+
+        assert await waiter.click_and_wait_for_response(AsyncMock(), "/cart/add", timeout=100) is None
+
+    @pytest.mark.asyncio
+    async def test_click_timeout_is_raised(self, mock_page):
+        """测试点击本身超时时抛出异常"""
+        async def value():
+            return None
+
+        mock_page.expect_response = Mock(return_value=self._expect_response(value))
+        element = AsyncMock()
+        element.click.side_effect = PlaywrightTimeoutError("click timeout")
+        waiter = SmartWaiter(mock_page)
+
+        with pytest.raises(PlaywrightTimeoutError):
+            await waiter.click_and_wait_for_response(element, "/cart/add", timeout=100)
@@ -9,6 +9,7 @@ Sprint 4.4 单元测试
 """
 
 import unittest
+import unittest.mock
 import json
 import tempfile
 from pathlib import Path
@@ -154,6 +155,27 @@ class TestProductChangeDetector(unittest.TestCase):
         modified_target = next(t for t in test_targets if t['id'] == 'product-1')
         self.assertEqual(modified_target['priority'], 'P0')
 
+    def test_detect_changes_from_delta(self):
+        """测试使用变更增量时不计算哈希"""
+        delta = {'added': ['product-2'], 'changed': [], 'removed': ['product-3']}
+
+        with unittest.mock.patch.object(self.detector, '_calculate_product_hash') as calculate_hash:
+            report = self.detector.detect_changes(delta=delta)
+
+        calculate_hash.assert_not_called()
+        self.assertEqual([p['id'] for p in report['changes']['added']], ['product-2'])
+        self.assertEqual([p['id'] for p in report['changes']['removed']], ['product-3'])
+        self.assertEqual(report['changes']['modified'], [])
+        self.assertEqual(report['summary']['unchanged'], 1)
+
+    def test_load_products_from_catalog_format(self):
+        """测试加载 discover_products.py 输出的 {metadata, products} 格式"""
+        with open(self.current_products_file, 'w') as f:
+            json.dump({'metadata': {}, 'products': self.current_products}, f)
+
+        products = self.detector._load_products(self.current_products_file)
+        self.assertEqual(set(products), {"product-1", "product-2"})
+
 
 class TestTrendAnalyzer(unittest.TestCase):
     """测试历史趋势分析器"""
@@ -263,6 +285,34 @@ class TestTrendAnalyzer(unittest.TestCase):
         self.assertIn('performance_trends', report)
         self.assertIn('insights', report)
 
+    def test_batch_page_performance_regression(self):
+        """测试从批量测试报告中识别商品页性能回归"""
+        for i, lcp in enumerate([1500, 1600, 1550, 3200]):
+            batch_report = {
+                "timestamp": (datetime.now() - timedelta(days=3 - i)).isoformat(),
+                "results": [{
+                    "product_id": "product-1",
+                    "product_name": "Product 1",
+                    "steps": [{
+                        "number": 1,
+                        "performance": {"new_navigation": True, "ttfb": 300, "load": 2500, "lcp": lcp}
+                    }]
+                }]
+            }
+            with open(self.reports_dir / f"batch_test_2025010{i}_000000.json", 'w') as f:
+                json.dump(batch_report, f)
+
+        reports = self.analyzer._load_batch_reports()
+        self.assertEqual(len(reports), 4)
+
+        performance_trends = self.analyzer._analyze_performance_trends(reports)
+        regressions = performance_trends['product_regressions']
+
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0]['metric'], 'lcp')
+        self.assertEqual(regressions[0]['baseline_ms'], 1550)
+        self.assertEqual(regressions[0]['latest_ms'], 3200)
+
 
 class TestDashboardGenerator(unittest.TestCase):
     """测试质量看板生成器"""
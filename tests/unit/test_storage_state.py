@@ -0,0 +1,94 @@
+"""
+StorageStateCache 单元测试
+
+测试 storage_state 快照的有效期判断与预热流程。
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+import pytest
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.storage_state import StorageStateCache
+
+
+BASE_URL = "https://fiido.com"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """创建使用临时目录的快照缓存"""
+    return StorageStateCache(cache_dir=str(tmp_path), ttl_hours=1)
+
+
+@pytest.fixture
+def mock_browser():
+    """创建 Mock Browser，context.storage_state 会写出快照文件"""
+    context = AsyncMock()
+
+    async def storage_state(path):
+        Path(path).write_text('{"cookies": [], "origins": []}', encoding='utf-8')
+
+    context.storage_state = AsyncMock(side_effect=storage_state)
+    browser = AsyncMock()
+    browser.new_context = AsyncMock(return_value=context)
+    return browser, context
+
+
+class TestStorageStateCache:
+    """测试快照缓存"""
+
+    def test_path_is_per_host(self, cache, tmp_path):
+        """测试每个店铺域名一个快照文件"""
+        assert cache.get_path("https://fiido.com/products/x") == tmp_path / "fiido.com.json"
+
+    def test_load_missing_returns_none(self, cache):
+        """测试快照不存在时返回 None"""
+        assert cache.load(BASE_URL) is None
+
+    def test_expired_snapshot_is_ignored(self, cache):
+        """测试超过有效期的快照不再使用"""
+        path = cache.get_path(BASE_URL)
+        path.write_text("{}", encoding='utf-8')
+        assert cache.load(BASE_URL) == str(path)
+
+        two_hours_ago = time.time() - 7200
+        os.utime(path, (two_hours_ago, two_hours_ago))
+        assert cache.load(BASE_URL) is None
+
+    @pytest.mark.asyncio
+    async def test_warm_up_saves_snapshot(self, cache, mock_browser):
+        """测试预热访问首页、处理弹窗并保存快照"""
+        browser, context = mock_browser
+        with patch('core.storage_state.dismiss_popups', AsyncMock(return_value=2)) as dismiss:
+            path = await cache.warm_up(browser, BASE_URL)
+
+        assert path == str(cache.get_path(BASE_URL))
+        assert Path(path).exists()
+        dismiss.assert_awaited_once()
+        context.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_warm_up_uses_fresh_cache(self, cache, mock_browser):
+        """测试快照未过期时不访问网站"""
+        browser, _ = mock_browser
+        cache.get_path(BASE_URL).write_text("{}", encoding='utf-8')
+
+        path = await cache.warm_up(browser, BASE_URL)
+
+        assert path == str(cache.get_path(BASE_URL))
+        browser.new_context.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_warm_up_failure_returns_none(self, cache, mock_browser):
+        """测试预热失败时返回 None 并关闭上下文"""
+        browser, context = mock_browser
+        context.new_page.side_effect = Exception("navigation failed")
+
+        assert await cache.warm_up(browser, BASE_URL) is None
+        context.close.assert_awaited_once()
@@ -13,11 +13,17 @@ import json
 import subprocess
 from pathlib import Path
 from datetime import datetime
+import sqlite3
 import threading
+import time
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from core.event_log import EVENT_LOG_SUFFIX, EventTail, RunReport
+from core.product_store import ProductStore
+from core.results_db import ResultsDB
+
 app = Flask(__name__)
 CORS(app)  # 允许跨域访问
 
@@ -43,6 +49,50 @@ task_lock = threading.Lock()
 # 任务保留时间（秒）- 已完成的任务保留1小时后自动清理
 TASK_RETENTION_SECONDS = 3600
 
+# 测试事件日志的增量读取状态: task_id -> (EventTail, RunReport)
+task_event_tails = {}
+task_event_tails_lock = threading.Lock()
+
+# 测试结果库（首次使用时打开并导入已有报告文件）
+results_db = None
+results_db_lock = threading.Lock()
+
+# 报告列表接口重新导入报告目录的最小间隔（秒）
+RESULTS_DB_SYNC_INTERVAL = 300
+results_db_synced_at = 0.0
+
+
+def get_results_db():
+    """获取测试结果库
+
+    首次调用时导入 reports 目录中已有的报告文件，之后由各写入方在保存报告时写入。
+    """
+    global results_db, results_db_synced_at
+    with results_db_lock:
+        if results_db is None:
+            results_db = ResultsDB.for_reports(REPORTS_DIR)
+            results_db_synced_at = time.monotonic()
+        return results_db
+
+
+def get_synced_results_db():
+    """获取测试结果库，距上次导入超过 RESULTS_DB_SYNC_INTERVAL 时先重新导入报告目录
+
+    报告中心的列表接口使用，其他工具直接写入 reports 目录的报告（如从 CI 复制的文件）
+    最迟在一个间隔后显示；需要立即显示时运行 scripts/import_reports.py。
+    """
+    global results_db_synced_at
+    db = get_results_db()
+    with results_db_lock:
+        if time.monotonic() - results_db_synced_at < RESULTS_DB_SYNC_INTERVAL:
+            return db
+        results_db_synced_at = time.monotonic()
+    try:
+        db.import_reports(REPORTS_DIR)
+    except sqlite3.Error as e:
+        print(f"[结果库] 导入报告文件失败: {e}")
+    return db
+
 
 def cleanup_old_tasks():
     """清理已完成的旧任务，释放内存
@@ -69,6 +119,8 @@ def cleanup_old_tasks():
     # 删除旧任务
     for task_id in tasks_to_remove:
         del running_tasks[task_id]
+        with task_event_tails_lock:
+            task_event_tails.pop(task_id, None)
 
     if tasks_to_remove:
         print(f"[任务清理] 已清理 {len(tasks_to_remove)} 个旧任务，当前任务数: {len(running_tasks)}")
@@ -76,6 +128,30 @@ def cleanup_old_tasks():
     return len(tasks_to_remove)
 
 
+def _event_report(task_id):
+    """增量读取测试任务的事件日志，返回由事件重建的报告
+
+    测试脚本执行过程中把商品和步骤事件追加到事件日志，进程被终止或超时时
+    已完成的结果仍可从事件日志获得。
+
+    Args:
+        task_id: 任务ID
+
+    Returns:
+        报告字典；任务没有事件日志时返回 None
+    """
+    event_log = running_tasks.get(task_id, {}).get('event_log')
+    if not event_log:
+        return None
+
+    with task_event_tails_lock:
+        if task_id not in task_event_tails:
+            task_event_tails[task_id] = (EventTail(event_log), RunReport())
+        tail, run_report = task_event_tails[task_id]
+        run_report.extend(tail.poll())
+        return run_report.report()
+
+
 def _save_test_report(task_id):
     """保存测试报告到文件
 
@@ -99,6 +175,19 @@ def _save_test_report(task_id):
     params = task.get('params', {})
     test_mode = task.get('test_mode', 'quick')
 
+    # 未能从输出解析到结果时（进程被终止、超时或输出丢失），使用事件日志中的结果
+    if not product_results and not test_steps:
+        event_report = _event_report(task_id)
+        if event_report and event_report['results']:
+            product_results = {
+                r['product_id']: {
+                    'name': r.get('product_name', r['product_id']),
+                    'status': r.get('status', 'unknown'),
+                    'steps': r.get('steps', [])
+                }
+                for r in event_report['results']
+            }
+
     # 计算统计信息
     total_steps = 0
     passed_steps = 0
@@ -195,6 +284,12 @@ def _save_test_report(task_id):
         print(f"[报告保存] 测试报告已保存: {report_file}")
     except Exception as e:
         print(f"[报告保存] 保存失败: {e}")
+        return
+
+    try:
+        get_results_db().record_run(task_id, report_data, 'web', path=report_file)
+    except sqlite3.Error as e:
+        print(f"[报告保存] 写入结果库失败: {e}")
 
 
 def stop_task(task_id):
@@ -286,6 +381,7 @@ def run_command(command, task_id=None):
                     process.wait(timeout=5)
                 except subprocess.TimeoutExpired:
                     process.kill()
+                _save_test_report(task_id)
                 return {'success': False, 'stopped': True, 'error': '测试被用户停止'}
 
             # 检查超时
@@ -350,6 +446,8 @@ def run_command(command, task_id=None):
                 'result': error,
                 'completed_at': datetime.now().isoformat()
             })
+            # 保存已完成部分的测试报告
+            _save_test_report(task_id)
         return error
     except Exception as e:
         error = {'success': False, 'error': str(e)}
@@ -359,6 +457,7 @@ def run_command(command, task_id=None):
                 'result': error,
                 'completed_at': datetime.now().isoformat()
             })
+            _save_test_report(task_id)
         return error
 
 
@@ -640,39 +739,13 @@ def _save_product_result(task_id):
 
 
 def _find_latest_report():
-    """查找最新的测试报告文件
+    """查找最新的测试报告（批量测试和 Web 测试报告中文件修改时间最新的一份）
 
     Returns:
         最新报告的ID（不含扩展名），如 'batch_test_20251205_151606'
         如果没有找到报告，返回 None
     """
-    latest_file = None
-    latest_time = None
-
-    # 查找所有 batch_test_*.json 文件
-    for report_file in REPORTS_DIR.glob('batch_test_*.json'):
-        try:
-            mtime = report_file.stat().st_mtime
-            if latest_time is None or mtime > latest_time:
-                latest_time = mtime
-                latest_file = report_file
-        except Exception:
-            pass
-
-    # 也查找 test_*.json 文件
-    for report_file in REPORTS_DIR.glob('test_*.json'):
-        try:
-            mtime = report_file.stat().st_mtime
-            if latest_time is None or mtime > latest_time:
-                latest_time = mtime
-                latest_file = report_file
-        except Exception:
-            pass
-
-    if latest_file:
-        return latest_file.stem  # 返回文件名（不含扩展名）
-
-    return None
+    return get_synced_results_db().latest_run_id(kinds=('batch', 'web'))
 
 
 @app.route('/')
@@ -728,24 +801,24 @@ def discover_products():
 
 @app.route('/api/products/list')
 def list_products():
-    """获取商品列表"""
+    """获取商品列表
+
+    可选查询参数 category / priority / test_status 按索引过滤
+    """
     products_file = DATA_DIR / 'products.json'
 
     if not products_file.exists():
         return jsonify({'products': [], 'total': 0, 'metadata': {}})
 
     try:
-        with open(products_file) as f:
-            data = json.load(f)
-
-        # 处理新格式：{metadata: {...}, products: [...]}
-        if isinstance(data, dict) and 'products' in data:
-            products = data['products']
-            metadata = data.get('metadata', {})
-        else:
-            # 兼容旧格式：直接是数组
-            products = data if isinstance(data, list) else []
-            metadata = {}
+        # 商品索引兼容 {metadata: {...}, products: [...]} 新格式和数组旧格式
+        with ProductStore.for_catalog(products_file) as store:
+            products = store.find(
+                category=request.args.get('category'),
+                priority=request.args.get('priority'),
+                test_status=request.args.get('test_status')
+            )
+            metadata = store.metadata()
 
         return jsonify({
             'products': products,
@@ -839,13 +912,18 @@ def run_tests():
 
         task_id = f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
+        # 测试过程中的事件日志（进程被终止时仍保留已完成的结果）
+        event_log = REPORTS_DIR / f"{task_id}{EVENT_LOG_SUFFIX}"
+        command.extend(['--event-log', str(event_log)])
+
         running_tasks[task_id] = {
             'status': 'running',
             'started_at': datetime.now().isoformat(),
             'params': data,
             'test_steps': [],  # 存储测试步骤
             'test_mode': test_mode,  # 记录测试模式
-            'product_results': {}  # 存储多商品测试结果（按商品分组）
+            'product_results': {},  # 存储多商品测试结果（按商品分组）
+            'event_log': str(event_log)
         }
 
         # 设置为当前活跃测试
@@ -874,6 +952,11 @@ def test_status(task_id):
 
     # 排除不可序列化的字段（如process对象）
     task_data = {k: v for k, v in running_tasks[task_id].items() if k != 'process'}
+
+    # 事件日志中的实时结果
+    event_report = _event_report(task_id)
+    if event_report:
+        task_data['event_report'] = event_report
     return jsonify(task_data)
 
 
@@ -928,73 +1011,19 @@ def get_active_test():
 def list_reports():
     """获取报告列表"""
     reports = []
-
-    # 查找所有测试报告
-    for report_dir in REPORTS_DIR.glob('test_*'):
-        if report_dir.is_dir():
-            result_file = report_dir / 'test_results.json'
-            if result_file.exists():
-                try:
-                    with open(result_file) as f:
-                        data = json.load(f)
-
-                    reports.append({
-                        'id': report_dir.name,
-                        'timestamp': data.get('timestamp', ''),
-                        'summary': data.get('summary', {}),
-                        'test_mode': data.get('test_mode', ''),
-                        'test_scope': data.get('test_scope', ''),
-                        'test_config': data.get('test_config', {}),
-                        'path': str(report_dir.relative_to(PROJECT_ROOT))
-                    })
-                except:
-                    pass
-
-    # 也查找批量测试报告
-    for report_file in REPORTS_DIR.glob('batch_test_*.json'):
-        try:
-            with open(report_file) as f:
-                data = json.load(f)
-
-            # 从文件名提取时间戳
-            filename = report_file.stem
-            reports.append({
-                'id': filename,
-                'timestamp': data.get('timestamp', ''),
-                'summary': data.get('summary', {}),
-                'test_mode': data.get('test_mode', ''),
-                'test_scope': data.get('test_scope', ''),
-                'test_config': data.get('test_config', {}),
-                'path': str(report_file.relative_to(PROJECT_ROOT))
-            })
-        except:
-            pass
-
-    # 查找单商品测试报告文件 (test_*.json，排除目录形式的)
-    for report_file in REPORTS_DIR.glob('test_*.json'):
+    for run in get_synced_results_db().list_runs():
+        # 报告中心只显示 test_* 报告目录、batch_test_*.json 和 test_*.json
+        if not run['id'].startswith(('test_', 'batch_test_')):
+            continue
+        path = Path(run['path']) if run['path'] else None
+        if path is not None and path.name == 'test_results.json' and path.parent != REPORTS_DIR.resolve():
+            path = path.parent
         try:
-            with open(report_file) as f:
-                data = json.load(f)
-
-            filename = report_file.stem
-            # 避免重复添加（如果同名目录已处理过）
-            if any(r['id'] == filename for r in reports):
-                continue
-
-            reports.append({
-                'id': filename,
-                'timestamp': data.get('timestamp', ''),
-                'summary': data.get('summary', {}),
-                'test_mode': data.get('test_mode', ''),
-                'test_scope': data.get('test_scope', ''),
-                'test_config': data.get('test_config', {}),
-                'path': str(report_file.relative_to(PROJECT_ROOT))
-            })
-        except:
-            pass
-
-    # 按时间倒序排序
-    reports.sort(key=lambda x: x['timestamp'], reverse=True)
+            run['path'] = str(path.relative_to(PROJECT_ROOT.resolve())) if path else ''
+        except ValueError:
+            run['path'] = str(path)
+        del run['kind']
+        reports.append(run)
 
     return jsonify({'reports': reports, 'total': len(reports)})
 
@@ -1009,7 +1038,12 @@ def report_detail(report_id):
     Returns:
         报告详细内容
     """
-    # 尝试查找目录形式的报告
+    data = get_results_db().get_run(report_id)
+    if data is not None:
+        data['id'] = report_id
+        return jsonify(data)
+
+    # 结果库中没有时（例如其他工具刚写出的报告）直接读取报告文件
     report_dir = REPORTS_DIR / report_id
     if report_dir.is_dir():
         result_file = report_dir / 'test_results.json'
@@ -1075,6 +1109,9 @@ def delete_reports():
                 report_file.unlink()
                 report_found = True
 
+            if get_results_db().delete_run(report_id):
+                report_found = True
+
             # 始终尝试删除对应的AI分析报告（无论主报告是否存在）
             ai_report_file = REPORTS_DIR / f'{report_id}_ai_analysis.json'
             if ai_report_file.exists():
@@ -1145,48 +1182,7 @@ def list_ai_reports():
     Returns:
         AI分析报告列表
     """
-    ai_reports = []
-
-    # 查找所有AI分析文件 (格式: xxx_ai_analysis.json)
-    for ai_file in REPORTS_DIR.glob('*_ai_analysis.json'):
-        try:
-            with open(ai_file) as f:
-                data = json.load(f)
-
-            # 从文件名提取报告ID
-            report_id = ai_file.stem.replace('_ai_analysis', '')
-
-            ai_reports.append({
-                'id': ai_file.stem,
-                'report_id': report_id,
-                'created_at': data.get('created_at', data.get('timestamp', '')),
-                'provider': data.get('provider', 'unknown'),
-                'summary': data.get('summary', data.get('analysis', '')[:100] + '...' if data.get('analysis') else '')
-            })
-        except Exception:
-            pass
-
-    # 也查找报告目录内的AI分析文件
-    for report_dir in REPORTS_DIR.glob('test_*'):
-        if report_dir.is_dir():
-            ai_file = report_dir / 'ai_analysis.json'
-            if ai_file.exists():
-                try:
-                    with open(ai_file) as f:
-                        data = json.load(f)
-
-                    ai_reports.append({
-                        'id': f"{report_dir.name}_ai",
-                        'report_id': report_dir.name,
-                        'created_at': data.get('created_at', data.get('timestamp', '')),
-                        'provider': data.get('provider', 'unknown'),
-                        'summary': data.get('summary', data.get('analysis', '')[:100] + '...' if data.get('analysis') else '')
-                    })
-                except Exception:
-                    pass
-
-    # 按创建时间倒序排序
-    ai_reports.sort(key=lambda x: x['created_at'], reverse=True)
+    ai_reports = get_synced_results_db().list_ai_analyses()
 
     return jsonify({
         'ai_reports': ai_reports,